@@ -0,0 +1,54 @@
+"""add_email_copy_batch_mode
+
+Revision ID: 4b9d2e6f8a13
+Revises: e3a7c1f95b20
+Create Date: 2026-10-18 14:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b9d2e6f8a13'
+down_revision: Union[str, None] = 'e3a7c1f95b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Per-campaign email copy mode: 'realtime' (default) or 'batch' (OpenAI Batch API)
+    op.add_column(
+        'campaigns',
+        sa.Column('email_copy_mode', sa.String(length=16), nullable=False, server_default='realtime')
+    )
+
+    # Add GENERATE_EMAIL_COPY_BATCH to the JobType enum for OpenAI batch jobs
+    connection = op.get_bind()
+
+    result = connection.execute(sa.text("""
+        SELECT EXISTS (
+            SELECT 1 FROM pg_enum
+            WHERE enumlabel = 'GENERATE_EMAIL_COPY_BATCH'
+            AND enumtypid = (SELECT oid FROM pg_type WHERE typname = 'jobtype')
+        )
+    """)).scalar()
+
+    if not result:
+        # A new enum value can't be used before it is committed, so add it
+        # outside Alembic's migration transaction
+        with op.get_context().autocommit_block():
+            op.execute("ALTER TYPE jobtype ADD VALUE 'GENERATE_EMAIL_COPY_BATCH'")
+
+
+def downgrade() -> None:
+    # PostgreSQL doesn't support removing enum values directly.
+    # Leave the enum value in place and mark any email copy batch jobs as cancelled.
+    connection = op.get_bind()
+    connection.execute(sa.text(
+        "UPDATE jobs SET status = 'CANCELLED' WHERE job_type = 'GENERATE_EMAIL_COPY_BATCH'"
+    ))
+
+    op.drop_column('campaigns', 'email_copy_mode')
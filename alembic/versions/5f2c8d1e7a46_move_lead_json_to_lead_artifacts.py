@@ -0,0 +1,73 @@
+"""move_lead_json_to_lead_artifacts
+
+Revision ID: 5f2c8d1e7a46
+Revises: 9e4f1b7c2d58
+Create Date: 2026-10-19 10:15:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5f2c8d1e7a46'
+down_revision: Union[str, None] = '9e4f1b7c2d58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ARTIFACT_COLUMNS = (
+    'raw_data', 'email_verification', 'enrichment_results', 'email_copy_gen_results', 'instantly_lead_record'
+)
+
+
+def upgrade() -> None:
+    op.create_table('lead_artifacts',
+    sa.Column('lead_id', sa.String(length=36), nullable=False),
+    *(sa.Column(name, postgresql.JSONB(astext_type=sa.Text()), nullable=True) for name in ARTIFACT_COLUMNS),
+    sa.ForeignKeyConstraint(['lead_id'], ['leads.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('lead_id')
+    )
+    op.add_column('leads', sa.Column('email_verification_status', sa.String(length=32), nullable=True))
+    op.add_column('leads', sa.Column('enrichment_text', sa.Text(), nullable=True))
+    op.add_column('leads', sa.Column('email_copy', sa.Text(), nullable=True))
+    op.add_column('leads', sa.Column('instantly_lead_id', sa.String(length=64), nullable=True))
+
+    # The old JSON columns hold JSON 'null' where the ORM wrote None; store SQL NULL instead
+    values = ', '.join(f"NULLIF({name}::jsonb, 'null'::jsonb)" for name in ARTIFACT_COLUMNS)
+    any_set = ' OR '.join(f"NULLIF({name}::jsonb, 'null'::jsonb) IS NOT NULL" for name in ARTIFACT_COLUMNS)
+    op.execute(f"""
+        INSERT INTO lead_artifacts (lead_id, {', '.join(ARTIFACT_COLUMNS)})
+        SELECT id, {values} FROM leads WHERE {any_set}
+    """)
+    op.execute("""
+        UPDATE leads SET
+            email_verification_status = email_verification->>'result',
+            enrichment_text = enrichment_results->'choices'->0->'message'->>'content',
+            email_copy = email_copy_gen_results->'choices'->0->'message'->>'content',
+            instantly_lead_id = instantly_lead_record->>'id'
+        WHERE email_verification IS NOT NULL OR enrichment_results IS NOT NULL
+            OR email_copy_gen_results IS NOT NULL OR instantly_lead_record IS NOT NULL
+    """)
+
+    # Dropping the columns doesn't shrink the table; VACUUM FULL leads (or
+    # pg_repack) afterwards to get the space back
+    for name in ARTIFACT_COLUMNS:
+        op.drop_column('leads', name)
+
+
+def downgrade() -> None:
+    for name in ARTIFACT_COLUMNS:
+        op.add_column('leads', sa.Column(name, postgresql.JSON(astext_type=sa.Text()), nullable=True))
+    op.execute(f"""
+        UPDATE leads SET {', '.join(f'{name} = lead_artifacts.{name}::json' for name in ARTIFACT_COLUMNS)}
+        FROM lead_artifacts WHERE lead_artifacts.lead_id = leads.id
+    """)
+
+    op.drop_column('leads', 'instantly_lead_id')
+    op.drop_column('leads', 'email_copy')
+    op.drop_column('leads', 'enrichment_text')
+    op.drop_column('leads', 'email_verification_status')
+    op.drop_table('lead_artifacts')
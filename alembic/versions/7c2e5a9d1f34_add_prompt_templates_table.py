@@ -0,0 +1,45 @@
+"""add_prompt_templates_table
+
+Revision ID: 7c2e5a9d1f34
+Revises: 4b9d2e6f8a13
+Create Date: 2026-10-18 16:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c2e5a9d1f34'
+down_revision: Union[str, None] = '4b9d2e6f8a13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('prompt_templates',
+    sa.Column('id', sa.String(length=36), nullable=False),
+    sa.Column('name', sa.String(length=64), nullable=False),
+    sa.Column('organization_id', sa.String(length=36), nullable=True),
+    sa.Column('campaign_id', sa.String(length=36), nullable=True),
+    sa.Column('model', sa.String(length=100), nullable=False),
+    sa.Column('system_prompt', sa.Text(), nullable=False),
+    sa.Column('user_template', sa.Text(), nullable=False),
+    sa.Column('parameters', sa.JSON(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ),
+    sa.ForeignKeyConstraint(['campaign_id'], ['campaigns.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name', 'organization_id', 'campaign_id', name='uq_prompt_templates_name_scope')
+    )
+    op.create_index(op.f('ix_prompt_templates_id'), 'prompt_templates', ['id'], unique=False)
+    op.create_index(op.f('ix_prompt_templates_name'), 'prompt_templates', ['name'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_prompt_templates_name'), table_name='prompt_templates')
+    op.drop_index(op.f('ix_prompt_templates_id'), table_name='prompt_templates')
+    op.drop_table('prompt_templates')
@@ -0,0 +1,69 @@
+"""add_job_and_lead_access_path_indexes
+
+Revision ID: 8d3b6a0e4f19
+Revises: 5f2c8d1e7a46
+Create Date: 2026-10-19 14:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d3b6a0e4f19'
+down_revision: Union[str, None] = '5f2c8d1e7a46'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY so jobs and leads stay writable while the indexes build;
+    # it can't run inside a transaction, hence the autocommit block. Check
+    # scripts/explain_queries.py before and after on a copy of production data.
+    with op.get_context().autocommit_block():
+        # Latest job per campaign (DISTINCT ON campaign_id ORDER BY created_at DESC)
+        # and job cleanup by age. Replaces the single-column campaign_id index.
+        op.create_index(
+            'ix_jobs_campaign_id_created_at', 'jobs', ['campaign_id', 'created_at'],
+            unique=False, postgresql_concurrently=True
+        )
+        op.drop_index('ix_jobs_campaign_id', table_name='jobs', postgresql_concurrently=True)
+
+        # Circuit breaker pause/resume and the beat pollers look for open jobs only
+        op.create_index(
+            'ix_jobs_open_status', 'jobs', ['status', 'job_type'], unique=False,
+            postgresql_where=sa.text("status IN ('PENDING', 'PROCESSING', 'PAUSED')"),
+            postgresql_concurrently=True
+        )
+
+        # Lead fan-out, listing and bulk verification per campaign
+        op.create_index(
+            'ix_leads_campaign_id', 'leads', ['campaign_id'], unique=False, postgresql_concurrently=True
+        )
+
+        # process_job_task resuming an ENRICH_LEAD job
+        op.create_index(
+            'ix_leads_enrichment_job_id', 'leads', ['enrichment_job_id'], unique=False,
+            postgresql_where=sa.text('enrichment_job_id IS NOT NULL'),
+            postgresql_concurrently=True
+        )
+
+        # Leads waiting on an OpenAI email copy batch
+        op.create_index(
+            'ix_lead_artifacts_email_copy_batch', 'lead_artifacts',
+            [sa.text("(email_copy_gen_results ->> 'status')")], unique=False,
+            postgresql_where=sa.text("(email_copy_gen_results ->> 'status') IN ('batch_pending', 'batch_submitted')"),
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_lead_artifacts_email_copy_batch', table_name='lead_artifacts', postgresql_concurrently=True)
+        op.drop_index('ix_leads_enrichment_job_id', table_name='leads', postgresql_concurrently=True)
+        op.drop_index('ix_leads_campaign_id', table_name='leads', postgresql_concurrently=True)
+        op.drop_index('ix_jobs_open_status', table_name='jobs', postgresql_concurrently=True)
+        op.create_index('ix_jobs_campaign_id', 'jobs', ['campaign_id'], unique=False, postgresql_concurrently=True)
+        op.drop_index('ix_jobs_campaign_id_created_at', table_name='jobs', postgresql_concurrently=True)
@@ -0,0 +1,56 @@
+"""add_lead_traces_table
+
+Revision ID: 9e4f1b7c2d58
+Revises: 7c2e5a9d1f34
+Create Date: 2026-10-18 18:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e4f1b7c2d58'
+down_revision: Union[str, None] = '7c2e5a9d1f34'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('lead_traces',
+    sa.Column('id', sa.String(length=36), nullable=False),
+    sa.Column('lead_id', sa.String(length=36), nullable=False),
+    sa.Column('campaign_id', sa.String(length=36), nullable=False),
+    sa.Column('job_id', sa.String(length=36), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('attempt', sa.Integer(), nullable=False),
+    sa.Column('enqueued_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('started_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('queue_ms', sa.Integer(), nullable=True),
+    sa.Column('total_ms', sa.Integer(), nullable=False),
+    sa.Column('vendor_ms', sa.Integer(), nullable=False),
+    sa.Column('limiter_wait_ms', sa.Integer(), nullable=False),
+    sa.Column('db_ms', sa.Integer(), nullable=False),
+    sa.Column('vendor_calls', sa.Integer(), nullable=False),
+    sa.Column('email_verification_ms', sa.Integer(), nullable=True),
+    sa.Column('enrichment_ms', sa.Integer(), nullable=True),
+    sa.Column('email_copy_ms', sa.Integer(), nullable=True),
+    sa.Column('instantly_ms', sa.Integer(), nullable=True),
+    sa.Column('stages', sa.JSON(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['lead_id'], ['leads.id'], ),
+    sa.ForeignKeyConstraint(['campaign_id'], ['campaigns.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_lead_traces_id'), 'lead_traces', ['id'], unique=False)
+    op.create_index(op.f('ix_lead_traces_lead_id'), 'lead_traces', ['lead_id'], unique=False)
+    op.create_index(op.f('ix_lead_traces_campaign_id'), 'lead_traces', ['campaign_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_lead_traces_campaign_id'), table_name='lead_traces')
+    op.drop_index(op.f('ix_lead_traces_lead_id'), table_name='lead_traces')
+    op.drop_index(op.f('ix_lead_traces_id'), table_name='lead_traces')
+    op.drop_table('lead_traces')
@@ -0,0 +1,46 @@
+"""add_verify_emails_bulk_job_type
+
+Revision ID: e3a7c1f95b20
+Revises: 02bc375f16d5
+Create Date: 2026-10-18 10:12:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3a7c1f95b20'
+down_revision: Union[str, None] = '02bc375f16d5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Add VERIFY_EMAILS_BULK to the JobType enum for MillionVerifier bulk file jobs
+    connection = op.get_bind()
+
+    result = connection.execute(sa.text("""
+        SELECT EXISTS (
+            SELECT 1 FROM pg_enum
+            WHERE enumlabel = 'VERIFY_EMAILS_BULK'
+            AND enumtypid = (SELECT oid FROM pg_type WHERE typname = 'jobtype')
+        )
+    """)).scalar()
+
+    if not result:
+        # A new enum value can't be used before it is committed, so add it
+        # outside Alembic's migration transaction
+        with op.get_context().autocommit_block():
+            op.execute("ALTER TYPE jobtype ADD VALUE 'VERIFY_EMAILS_BULK'")
+
+
+def downgrade() -> None:
+    # PostgreSQL doesn't support removing enum values directly.
+    # Leave the enum value in place and mark any bulk verification jobs as cancelled.
+    connection = op.get_bind()
+    connection.execute(sa.text(
+        "UPDATE jobs SET status = 'CANCELLED' WHERE job_type = 'VERIFY_EMAILS_BULK'"
+    ))
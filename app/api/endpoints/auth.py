@@ -12,8 +12,11 @@ from app.models.user import User
 
 router = APIRouter()
 
+# Plain def endpoints: they use the sync session (get_db), so FastAPI runs them in
+# its threadpool instead of blocking the event loop
+
 @router.post("/signup", response_model=SignupResponse, status_code=status.HTTP_201_CREATED)
-async def signup(
+def signup(
     user_data: UserSignupRequest,
     db: Session = Depends(get_db)
 ):
@@ -28,7 +31,7 @@ async def signup(
     return result
 
 @router.post("/login", response_model=LoginResponse)
-async def login(
+def login(
     user_data: UserLoginRequest,
     db: Session = Depends(get_db)
 ):
@@ -42,7 +45,7 @@ async def login(
     return result
 
 @router.get("/me", response_model=UserResponse)
-async def get_current_user_info(
+def get_current_user_info(
     current_user: User = Depends(get_current_user)
 ):
     """Get current user information."""
@@ -1,9 +1,10 @@
 from typing import List, Dict, Any, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 import math
 
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.core.dependencies import get_current_active_user
 from app.models.campaign import Campaign
 from app.models.user import User
@@ -67,7 +68,7 @@ async def list_campaigns(
     per_page: int = Query(10, ge=1, le=100, description="Items per page"),
     organization_id: Optional[str] = Query(None, description="Filter by organization ID"),
     status_filter: Optional[str] = Query(None, alias="status", description="Filter by campaign status"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """List all campaigns with optional pagination and organization filtering"""
@@ -79,8 +80,8 @@ async def list_campaigns(
     # Convert to response models
     all_campaigns = []
     for campaign_dict in campaigns_data:
-        # Get the campaign object to create proper response
-        campaign = db.query(Campaign).filter(Campaign.id == campaign_dict['id']).first()
+        # Get the campaign object to create proper response (already in the session, no query)
+        campaign = await db.get(Campaign, campaign_dict['id'])
         if campaign:
             campaign_response = CampaignResponse.from_campaign(campaign)
             # Apply status filter if provided
@@ -109,7 +110,7 @@ async def list_campaigns(
 @router.post("/", response_model=CampaignCreateResponse, status_code=status.HTTP_201_CREATED)
 async def create_campaign(
     campaign_in: CampaignCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Create a new campaign"""
@@ -117,7 +118,7 @@ async def create_campaign(
     campaign_dict = await campaign_service.create_campaign(campaign_in, db)
     
     # Get the campaign object to create proper response
-    campaign = db.query(Campaign).filter(Campaign.id == campaign_dict['id']).first()
+    campaign = await db.get(Campaign, campaign_dict['id'])
     if not campaign:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -132,7 +133,7 @@ async def create_campaign(
 @router.get("/{campaign_id}", response_model=CampaignDetailResponse)
 async def get_campaign(
     campaign_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get a specific campaign by ID"""
@@ -140,7 +141,7 @@ async def get_campaign(
     campaign_dict = await campaign_service.get_campaign(campaign_id, db)
     
     # Get the campaign object to create proper response
-    campaign = db.query(Campaign).filter(Campaign.id == campaign_id).first()
+    campaign = await db.get(Campaign, campaign_id)
     if not campaign:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -156,7 +157,7 @@ async def get_campaign(
 async def update_campaign(
     campaign_id: str,
     campaign_update: CampaignUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Update campaign properties"""
@@ -164,7 +165,7 @@ async def update_campaign(
     campaign_dict = await campaign_service.update_campaign(campaign_id, campaign_update, db)
     
     # Get the campaign object to create proper response
-    campaign = db.query(Campaign).filter(Campaign.id == campaign_id).first()
+    campaign = await db.get(Campaign, campaign_id)
     if not campaign:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -179,14 +180,14 @@ async def update_campaign(
 @router.get("/{campaign_id}/start/validate", response_model=CampaignValidationResponse)
 async def validate_campaign_start(
     campaign_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Validate if a campaign can be started without actually starting it"""
     campaign_service = CampaignService()
     
     # Get campaign
-    campaign = db.query(Campaign).filter(Campaign.id == campaign_id).first()
+    campaign = await db.get(Campaign, campaign_id)
     if not campaign:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -205,7 +206,7 @@ async def validate_campaign_start(
 async def start_campaign(
     campaign_id: str,
     start_data: CampaignStart = CampaignStart(),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Start a campaign"""
@@ -213,7 +214,7 @@ async def start_campaign(
     campaign_dict = await campaign_service.start_campaign(campaign_id, start_data, db)
     
     # Get the campaign object to create proper response
-    campaign = db.query(Campaign).filter(Campaign.id == campaign_id).first()
+    campaign = await db.get(Campaign, campaign_id)
     if not campaign:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -228,7 +229,7 @@ async def start_campaign(
 @router.get("/{campaign_id}/leads/stats", response_model=CampaignStatsResponse)
 async def get_campaign_lead_stats(
     campaign_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get campaign lead statistics"""
@@ -243,7 +244,7 @@ async def get_campaign_lead_stats(
 @router.get("/{campaign_id}/instantly/analytics", response_model=InstantlyAnalyticsResponse)
 async def get_campaign_instantly_analytics(
     campaign_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get Instantly analytics for campaign"""
@@ -255,10 +256,25 @@ async def get_campaign_instantly_analytics(
         data=instantly_analytics
     )
 
+@router.get("/{campaign_id}/traces/summary")
+async def get_campaign_trace_summary(
+    campaign_id: str,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get p50/p95/p99 of queue wait, vendor, limiter, DB and stage time per lead"""
+    campaign_service = CampaignService()
+    summary = await campaign_service.get_campaign_trace_summary(campaign_id, db)
+
+    return {
+        "status": "success",
+        "data": summary
+    }
+
 @router.get("/{campaign_id}/details")
 async def get_campaign_details(
     campaign_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get campaign details including lead stats and Instantly analytics"""
@@ -286,7 +302,7 @@ async def get_campaign_details(
 async def cleanup_campaign_jobs(
     campaign_id: str,
     cleanup_data: Dict[str, int],
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Clean up old jobs for a campaign"""
@@ -315,14 +331,14 @@ async def cleanup_campaign_jobs(
 @router.get("/{campaign_id}/results")
 async def get_campaign_results(
     campaign_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get campaign results from completed jobs"""
     from app.models.job import Job, JobStatus
     
     # Get campaign
-    campaign = db.query(Campaign).filter(Campaign.id == campaign_id).first()
+    campaign = await db.get(Campaign, campaign_id)
     if not campaign:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -330,14 +346,13 @@ async def get_campaign_results(
         )
     
     # Get completed jobs
-    completed_jobs = (
-        db.query(Job)
-        .filter(
+    completed_jobs = (await db.scalars(
+        select(Job)
+        .where(
             Job.campaign_id == campaign_id,
             Job.status == JobStatus.COMPLETED
         )
-        .all()
-    )
+    )).all()
     
     if not completed_jobs:
         raise HTTPException(
@@ -39,8 +39,11 @@ class JobCancelResponse(BaseModel):
 
 router = APIRouter()
 
+# Plain def endpoints: they use the sync session (get_db), so FastAPI runs them in
+# its threadpool instead of blocking the event loop
+
 @router.post("/", response_model=JobCreateResponse, status_code=status.HTTP_201_CREATED)
-async def create_job(
+def create_job(
     job_in: JobCreate,
     db: Session = Depends(get_db)
 ):
@@ -71,7 +74,7 @@ async def create_job(
     )
 
 @router.get("/", response_model=JobsListResponse)
-async def list_jobs(
+def list_jobs(
     page: int = Query(1, ge=1, description="Page number"),
     per_page: int = Query(10, ge=1, le=100, description="Items per page"),
     status_filter: Optional[JobStatus] = Query(None, alias="status", description="Filter by job status"),
@@ -108,7 +111,7 @@ async def list_jobs(
     return JobsListResponse(status="success", data=data)
 
 @router.get("/{job_id}", response_model=JobDetailResponse)
-async def get_job(
+def get_job(
     job_id: int,
     db: Session = Depends(get_db)
 ):
@@ -126,7 +129,7 @@ async def get_job(
     )
 
 @router.get("/{job_id}/status", response_model=JobStatusResponse)
-async def get_job_status(
+def get_job_status(
     job_id: int,
     db: Session = Depends(get_db)
 ):
@@ -182,7 +185,7 @@ async def get_job_status(
     )
 
 @router.delete("/{job_id}", response_model=JobCancelResponse)
-async def cancel_job(
+def cancel_job(
     job_id: int,
     db: Session = Depends(get_db)
 ):
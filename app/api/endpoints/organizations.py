@@ -1,9 +1,9 @@
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 import math
 
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.models.organization import Organization
 from app.models.campaign import Campaign
 from app.schemas.organization import (
@@ -23,7 +23,7 @@ async def list_organizations(
     page: int = Query(1, ge=1, description="Page number"),
     limit: int = Query(10, ge=1, le=100, description="Items per page"),
     search: str = Query(None, description="Search term"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get all organizations with pagination"""
     organization_service = OrganizationService()
@@ -40,13 +40,15 @@ async def list_organizations(
         db, skip=skip, limit=limit, search=search
     )
     
-    # Convert to response models with campaign counts
+    # Convert to response models with campaign counts (one grouped query for the page)
+    campaign_counts = await organization_service.get_campaign_counts(
+        [org_dict['id'] for org_dict in organizations_data], db
+    )
     organizations = []
     for org_dict in organizations_data:
-        org = db.query(Organization).filter(Organization.id == org_dict['id']).first()
+        org = await db.get(Organization, org_dict['id'])
         if org:
-            campaign_count = organization_service.get_campaign_count(org.id, db)
-            organizations.append(OrganizationResponse.from_organization(org, campaign_count))
+            organizations.append(OrganizationResponse.from_organization(org, campaign_counts[org.id]))
     
     # Create pagination metadata
     meta = PaginationMeta(
@@ -61,14 +63,14 @@ async def list_organizations(
 @router.post("/", response_model=OrganizationResponse, status_code=status.HTTP_201_CREATED)
 async def create_organization(
     organization_in: OrganizationCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new organization"""
     organization_service = OrganizationService()
     org_dict = await organization_service.create_organization(organization_in, db)
     
     # Get the organization object to create proper response
-    organization = db.query(Organization).filter(Organization.id == org_dict['id']).first()
+    organization = await db.get(Organization, org_dict['id'])
     if not organization:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -76,13 +78,13 @@ async def create_organization(
         )
     
     # Get campaign count for the new organization (should be 0)
-    campaign_count = organization_service.get_campaign_count(organization.id, db)
+    campaign_count = await organization_service.get_campaign_count(organization.id, db)
     return OrganizationResponse.from_organization(organization, campaign_count)
 
 @router.get("/{org_id}", response_model=OrganizationResponse)
 async def get_organization(
     org_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get a specific organization by ID"""
     organization_service = OrganizationService()
@@ -95,8 +97,8 @@ async def get_organization(
         )
     
     # Get the organization object to create proper response
-    organization = db.query(Organization).filter(Organization.id == org_id).first()
-    campaign_count = organization_service.get_campaign_count(org_id, db)
+    organization = await db.get(Organization, org_id)
+    campaign_count = await organization_service.get_campaign_count(org_id, db)
     return OrganizationResponse.from_organization(organization, campaign_count)
 
 @router.get("/{org_id}/campaigns", response_model=List[CampaignResponse])
@@ -104,11 +106,11 @@ async def list_organization_campaigns(
     org_id: str,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get all campaigns for a specific organization"""
     # Verify organization exists
-    organization = db.query(Organization).filter(Organization.id == org_id).first()
+    organization = await db.get(Organization, org_id)
     if not organization:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -122,7 +124,7 @@ async def list_organization_campaigns(
     # Convert to response models and apply pagination
     campaigns = []
     for campaign_dict in campaigns_data:
-        campaign = db.query(Campaign).filter(Campaign.id == campaign_dict['id']).first()
+        campaign = await db.get(Campaign, campaign_dict['id'])
         if campaign:
             campaigns.append(CampaignResponse.from_campaign(campaign))
     
@@ -133,7 +135,7 @@ async def list_organization_campaigns(
 async def update_organization(
     org_id: str,
     organization_update: OrganizationUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update organization properties"""
     organization_service = OrganizationService()
@@ -146,6 +148,6 @@ async def update_organization(
         )
     
     # Get the organization object to create proper response
-    organization = db.query(Organization).filter(Organization.id == org_id).first()
-    campaign_count = organization_service.get_campaign_count(org_id, db)
+    organization = await db.get(Organization, org_id)
+    campaign_count = await organization_service.get_campaign_count(org_id, db)
     return OrganizationResponse.from_organization(organization, campaign_count) 
\ No newline at end of file
@@ -15,7 +15,9 @@ from app.models.job import Job, JobStatus
 from app.schemas.lead import LeadCreate
 from app.core.database import get_db
 from app.core.logger import get_logger
+from app.core.logging_config import should_sample
 from app.core.api_integration_rate_limiter import ApiIntegrationRateLimiter
+from app.core.metrics import observe_vendor_request
 from app.background_services.smoke_tests.mock_apify_client import MockApifyClient
 from app.core.config import settings
 
@@ -180,7 +182,8 @@ class ApolloService:
                 existing_emails.add(email_normalized)
                 
                 created_count += 1
-                logger.info(f"[LEAD] Created lead: {lead.email} for campaign {campaign_id}")
+                if should_sample('lead_created'):
+                    logger.info(f"[LEAD] Created lead: {lead.email} for campaign {campaign_id}")
                 
             except Exception as e:
                 logger.error(f"[LEAD] Error creating lead from data {lead_data.get('email', 'unknown')}: {str(e)}")
@@ -281,7 +284,13 @@ class ApolloService:
                     }
                 )
             
-            run = self.apify_client.actor(self.actor_id).call(run_input=params)
+            actor_started = time.monotonic()
+            try:
+                run = self.apify_client.actor(self.actor_id).call(run_input=params)
+            except Exception:
+                observe_vendor_request('apollo', actor_started, 'error')
+                raise
+            observe_vendor_request('apollo', actor_started, 'ok')
             dataset_id = run.get("defaultDatasetId")
             if not dataset_id:
                 raise Exception("No dataset ID returned from Apify actor run.")
@@ -0,0 +1,236 @@
+import json
+import re
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from redis import Redis
+
+from app.core.config import settings
+from app.core.logger import get_logger
+from app.background_services.perplexity_service import PerplexityService
+
+logger = get_logger(__name__)
+
+# Legal-entity suffixes stripped during normalization so that "Acme, Inc." and
+# "ACME Inc" share one cache entry
+COMPANY_SUFFIXES = {
+    'inc', 'incorporated', 'llc', 'ltd', 'limited', 'corp', 'corporation',
+    'co', 'company', 'plc', 'gmbh', 'ag', 'sa', 'bv', 'pty', 'srl', 'lp', 'llp'
+}
+
+
+def normalize_company_name(company: Optional[str]) -> str:
+    """
+    Normalize a company name for deduplication.
+
+    Lowercases, drops punctuation, collapses whitespace and strips trailing
+    legal-entity suffixes.
+
+    Args:
+        company: Raw company name from the lead record
+
+    Returns:
+        str: Normalized company name ('' if nothing usable remains)
+    """
+    if not company:
+        return ''
+    normalized = re.sub(r'[^\w\s]', ' ', company.lower())
+    words = normalized.split()
+    while len(words) > 1 and words[-1] in COMPANY_SUFFIXES:
+        words.pop()
+    return ' '.join(words)
+
+
+class CompanyEnrichmentService:
+    """
+    Company-level enrichment shared across leads.
+
+    Leads fetched from an Apollo search frequently share an employer. This service
+    runs the company part of the Perplexity research once per distinct normalized
+    company name per TTL window, caches it in Redis, and hands the cached context
+    to every lead at that company. The person lookup of those leads then uses a
+    slimmer prompt that leaves the company research out.
+
+    Concurrent requests for the same company are coalesced (single-flight): the
+    first caller takes a Redis lock and calls Perplexity, the others wait for the
+    leader's result to land in the cache instead of issuing duplicate calls.
+
+    Company context is best-effort: any failure returns None and the person-level
+    enrichment proceeds without it.
+    """
+
+    CACHE_KEY_PREFIX = "company_enrichment"
+    LOCK_KEY_PREFIX = "company_enrichment:lock"
+    POLL_INTERVAL = 0.5  # seconds
+
+    def __init__(
+        self,
+        redis_client: Redis,
+        perplexity_service: PerplexityService,
+        ttl_seconds: Optional[int] = None,
+        lock_timeout: Optional[int] = None,
+        wait_timeout: Optional[int] = None
+    ):
+        """
+        Initialize the CompanyEnrichmentService.
+
+        Args:
+            redis_client: Redis client used for the cache and single-flight lock
+            perplexity_service: Service used for the company lookup
+            ttl_seconds: Cache window, defaults to settings.COMPANY_ENRICHMENT_TTL_SECONDS
+            lock_timeout: Lock expiry, defaults to settings.COMPANY_ENRICHMENT_LOCK_TIMEOUT
+            wait_timeout: Follower wait, defaults to settings.COMPANY_ENRICHMENT_WAIT_TIMEOUT
+        """
+        self.redis = redis_client
+        self.perplexity_service = perplexity_service
+        self.ttl_seconds = ttl_seconds or settings.COMPANY_ENRICHMENT_TTL_SECONDS
+        self.lock_timeout = lock_timeout or settings.COMPANY_ENRICHMENT_LOCK_TIMEOUT
+        self.wait_timeout = wait_timeout if wait_timeout is not None else settings.COMPANY_ENRICHMENT_WAIT_TIMEOUT
+        # Company lookups this instance sent to Perplexity
+        self.vendor_calls = 0
+
+    def _cache_key(self, normalized: str) -> str:
+        return f"{self.CACHE_KEY_PREFIX}:{normalized}"
+
+    def _lock_key(self, normalized: str) -> str:
+        return f"{self.LOCK_KEY_PREFIX}:{normalized}"
+
+    def _get_cached(self, normalized: str) -> Optional[Dict[str, Any]]:
+        """Return the cached company entry, or None if absent/unreadable."""
+        try:
+            cached = self.redis.get(self._cache_key(normalized))
+            if cached is None:
+                return None
+            return json.loads(cached)
+        except Exception as e:
+            logger.warning(
+                f"Error reading company enrichment cache for '{normalized}': {e}",
+                extra={'component': 'company_enrichment'}
+            )
+            return None
+
+    def _release_lock(self, normalized: str, token: str) -> None:
+        """Release the single-flight lock if this caller still owns it."""
+        try:
+            lock_key = self._lock_key(normalized)
+            if self.redis.get(lock_key) == token:
+                self.redis.delete(lock_key)
+        except Exception as e:
+            logger.warning(
+                f"Error releasing company enrichment lock for '{normalized}': {e}",
+                extra={'component': 'company_enrichment'}
+            )
+
+    @staticmethod
+    def _extract_content(result: Dict[str, Any]) -> Optional[str]:
+        """Pull the completion text out of a Perplexity response."""
+        try:
+            return result['choices'][0]['message']['content']
+        except (KeyError, IndexError, TypeError):
+            return None
+
+    def _wait_for_leader(self, normalized: str) -> Optional[str]:
+        """Poll the cache while another worker performs the company lookup."""
+        deadline = time.time() + self.wait_timeout
+        while time.time() < deadline:
+            cached = self._get_cached(normalized)
+            if cached is not None:
+                return cached.get('context')
+            # Leader gave up (lock released or expired) without caching a result
+            try:
+                if not self.redis.exists(self._lock_key(normalized)):
+                    return None
+            except Exception as e:
+                logger.warning(
+                    f"Error checking company enrichment lock for '{normalized}': {e}",
+                    extra={'component': 'company_enrichment'}
+                )
+                return None
+            time.sleep(self.POLL_INTERVAL)
+        return None
+
+    def get_company_context(self, company: Optional[str], fetch_on_miss: bool = True) -> Optional[str]:
+        """
+        Get the shared company context for a lead's company.
+
+        Args:
+            company: Company name from the lead record
+            fetch_on_miss: Call Perplexity when the company is not cached yet.
+                False only reads the cache, for a company whose lookup would not
+                save any person-level research.
+
+        Returns:
+            Optional[str]: Company context text, or None if unavailable
+        """
+        normalized = normalize_company_name(company)
+        if not normalized:
+            return None
+
+        cached = self._get_cached(normalized)
+        if cached is not None:
+            logger.info(
+                f"Company enrichment cache hit for '{normalized}'",
+                extra={'component': 'company_enrichment', 'cache': 'hit'}
+            )
+            return cached.get('context')
+        if not fetch_on_miss:
+            return None
+
+        token = str(uuid.uuid4())
+        try:
+            is_leader = self.redis.set(self._lock_key(normalized), token, nx=True, ex=self.lock_timeout)
+        except Exception as e:
+            logger.warning(
+                f"Company enrichment lock unavailable for '{normalized}', skipping company context: {e}",
+                extra={'component': 'company_enrichment'}
+            )
+            return None
+
+        if not is_leader:
+            logger.info(
+                f"Company enrichment for '{normalized}' already in flight, waiting for result",
+                extra={'component': 'company_enrichment', 'cache': 'coalesced'}
+            )
+            return self._wait_for_leader(normalized)
+
+        try:
+            # Another leader may have finished between our cache miss and lock
+            cached = self._get_cached(normalized)
+            if cached is not None:
+                return cached.get('context')
+
+            logger.info(
+                f"Company enrichment cache miss for '{normalized}', calling Perplexity",
+                extra={'component': 'company_enrichment', 'cache': 'miss'}
+            )
+            self.vendor_calls += 1
+            result = self.perplexity_service.enrich_company(company)
+            if not result or 'error' in result or result.get('status') == 'rate_limited':
+                logger.warning(
+                    f"Company enrichment failed for '{normalized}': {result}",
+                    extra={'component': 'company_enrichment'}
+                )
+                return None
+
+            context = self._extract_content(result)
+            if not context:
+                return None
+
+            entry = {
+                'company': company,
+                'context': context,
+                'fetched_at': datetime.utcnow().isoformat()
+            }
+            self.redis.setex(self._cache_key(normalized), self.ttl_seconds, json.dumps(entry))
+            return context
+
+        except Exception as e:
+            logger.error(
+                f"Company enrichment error for '{normalized}': {e}",
+                extra={'component': 'company_enrichment'}
+            )
+            return None
+        finally:
+            self._release_lock(normalized, token)
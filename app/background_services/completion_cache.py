@@ -0,0 +1,83 @@
+import hashlib
+import json
+from typing import Any, Dict, Optional
+
+from redis import Redis
+
+from app.core.config import settings
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def prompt_hash(request_body: Dict[str, Any]) -> str:
+    """
+    Stable hash of a completion request.
+
+    The whole body is hashed (model, messages and parameters) with sorted
+    keys, so two requests share a hash only if the vendor would see the same
+    request.
+    """
+    canonical = json.dumps(request_body, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class CompletionCache:
+    """
+    Redis-backed cache of successful vendor completions keyed by prompt hash.
+
+    Retries, resumed jobs and duplicate leads that produce an identical prompt
+    reuse the stored completion instead of paying for a new one. Only
+    responses with 'choices' are stored; errors are never cached. All Redis
+    failures degrade to a cache miss.
+    """
+
+    KEY_PREFIX = "completion_cache"
+
+    def __init__(self, redis_client: Redis, ttl_seconds: Optional[int] = None):
+        """
+        Initialize the CompletionCache.
+
+        Args:
+            redis_client: Redis client instance
+            ttl_seconds: Entry TTL, defaults to settings.COMPLETION_CACHE_TTL_SECONDS
+        """
+        self.redis = redis_client
+        self.ttl_seconds = ttl_seconds or settings.COMPLETION_CACHE_TTL_SECONDS
+
+    def _key(self, vendor: str, request_body: Dict[str, Any]) -> str:
+        return f"{self.KEY_PREFIX}:{vendor}:{prompt_hash(request_body)}"
+
+    def get(self, vendor: str, request_body: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Get a cached completion for a request.
+
+        Returns:
+            Optional[Dict]: The stored vendor response, or None on miss
+        """
+        try:
+            cached = self.redis.get(self._key(vendor, request_body))
+            return json.loads(cached) if cached else None
+        except Exception as e:
+            logger.warning(
+                f"Error reading completion cache: {e}",
+                extra={'component': 'completion_cache', 'vendor': vendor}
+            )
+            return None
+
+    def set(self, vendor: str, request_body: Dict[str, Any], result: Dict[str, Any]) -> None:
+        """Store a successful completion for a request."""
+        if not isinstance(result, dict) or not result.get('choices'):
+            return
+        try:
+            self.redis.set(self._key(vendor, request_body), json.dumps(result), ex=self.ttl_seconds)
+        except Exception as e:
+            logger.warning(
+                f"Error writing completion cache: {e}",
+                extra={'component': 'completion_cache', 'vendor': vendor}
+            )
+
+
+def get_completion_cache(redis_client: Redis) -> Optional[CompletionCache]:
+    """Build the completion cache, or None if COMPLETION_CACHE_ENABLED is off."""
+    return CompletionCache(redis_client) if settings.COMPLETION_CACHE_ENABLED else None
@@ -0,0 +1,153 @@
+import json
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from redis import Redis
+
+from app.core.config import settings
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Well-known disposable mailbox providers. Extended at runtime with
+# settings.EMAIL_VERIFICATION_DISPOSABLE_DOMAINS and with domains the vendor
+# reports as disposable.
+KNOWN_DISPOSABLE_DOMAINS = frozenset({
+    '10minutemail.com', 'guerrillamail.com', 'guerrillamail.net', 'mailinator.com',
+    'maildrop.cc', 'sharklasers.com', 'temp-mail.org', 'tempmail.com',
+    'throwawaymail.com', 'trashmail.com', 'yopmail.com', 'getnada.com',
+    'dispostable.com', 'fakeinbox.com', 'mintemail.com', 'mohmal.com',
+})
+
+
+def get_email_domain(email: str) -> str:
+    """Return the lowercased domain part of an email address ('' if none)."""
+    if not email or '@' not in email:
+        return ''
+    return email.rsplit('@', 1)[1].strip().lower()
+
+
+class EmailVerificationCache:
+    """
+    Redis-backed cache for email verification results and domain facts.
+
+    Two layers are kept:
+    - per-email verification results (TTL settings.EMAIL_VERIFICATION_CACHE_TTL_SECONDS)
+    - per-domain facts learned from vendor responses: whether the domain has MX
+      records, is catch-all, or is disposable
+      (TTL settings.EMAIL_VERIFICATION_DOMAIN_CACHE_TTL_SECONDS)
+
+    Only definitive vendor results are cached; errors and rate-limit responses are
+    never stored. All Redis failures degrade to a cache miss.
+    """
+
+    EMAIL_KEY_PREFIX = "email_verification:email"
+    DOMAIN_KEY_PREFIX = "email_verification:domain"
+
+    # Vendor result values that are final and safe to cache
+    CACHEABLE_RESULTS = {'ok', 'deliverable', 'catch_all', 'invalid', 'disposable', 'unknown'}
+
+    def __init__(
+        self,
+        redis_client: Redis,
+        email_ttl_seconds: Optional[int] = None,
+        domain_ttl_seconds: Optional[int] = None
+    ):
+        """
+        Initialize the EmailVerificationCache.
+
+        Args:
+            redis_client: Redis client instance
+            email_ttl_seconds: Per-email TTL, defaults to settings
+            domain_ttl_seconds: Per-domain TTL, defaults to settings
+        """
+        self.redis = redis_client
+        self.email_ttl_seconds = email_ttl_seconds or settings.EMAIL_VERIFICATION_CACHE_TTL_SECONDS
+        self.domain_ttl_seconds = domain_ttl_seconds or settings.EMAIL_VERIFICATION_DOMAIN_CACHE_TTL_SECONDS
+        extra = {
+            d.strip().lower()
+            for d in settings.EMAIL_VERIFICATION_DISPOSABLE_DOMAINS.split(',')
+            if d.strip()
+        }
+        self.disposable_domains = KNOWN_DISPOSABLE_DOMAINS | extra
+
+    def _email_key(self, email: str) -> str:
+        return f"{self.EMAIL_KEY_PREFIX}:{email.strip().lower()}"
+
+    def _domain_key(self, domain: str) -> str:
+        return f"{self.DOMAIN_KEY_PREFIX}:{domain}"
+
+    def get_email_result(self, email: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a cached verification result for an email.
+
+        Returns:
+            Optional[Dict]: Cached vendor result, or None on miss
+        """
+        try:
+            cached = self.redis.get(self._email_key(email))
+            return json.loads(cached) if cached else None
+        except Exception as e:
+            logger.warning(
+                f"Error reading email verification cache: {e}",
+                extra={'component': 'email_verifier'}
+            )
+            return None
+
+    def get_domain_facts(self, domain: str) -> Dict[str, Any]:
+        """
+        Get known facts about a domain.
+
+        Returns:
+            Dict: Any of 'mx_found', 'catch_all', 'disposable' (bools) plus
+                  'updated_at'. Static disposable domains are always reported.
+        """
+        facts: Dict[str, Any] = {}
+        if not domain:
+            return facts
+        try:
+            cached = self.redis.get(self._domain_key(domain))
+            if cached:
+                facts = json.loads(cached)
+        except Exception as e:
+            logger.warning(
+                f"Error reading email domain cache for {domain}: {e}",
+                extra={'component': 'email_verifier'}
+            )
+        if domain in self.disposable_domains:
+            facts['disposable'] = True
+        return facts
+
+    def record_result(self, email: str, result: Dict[str, Any]) -> None:
+        """
+        Cache a vendor verification result and learn domain facts from it.
+
+        Args:
+            email: The verified email address
+            result: Vendor response as returned by EmailVerifierService
+        """
+        if not result or result.get('status') in ('error', 'rate_limited'):
+            return
+        if result.get('result') not in self.CACHEABLE_RESULTS:
+            return
+
+        try:
+            self.redis.setex(self._email_key(email), self.email_ttl_seconds, json.dumps(result))
+
+            domain = get_email_domain(email)
+            if not domain:
+                return
+            facts = self.get_domain_facts(domain)
+            if 'is_mx_found' in result:
+                facts['mx_found'] = bool(result['is_mx_found'])
+            if 'is_catch_all' in result:
+                facts['catch_all'] = bool(result['is_catch_all'])
+            if result.get('is_disposable') or result.get('result') == 'disposable':
+                facts['disposable'] = True
+            facts['updated_at'] = datetime.utcnow().isoformat()
+            self.redis.setex(self._domain_key(domain), self.domain_ttl_seconds, json.dumps(facts))
+        except Exception as e:
+            logger.warning(
+                f"Error writing email verification cache: {e}",
+                extra={'component': 'email_verifier'}
+            )
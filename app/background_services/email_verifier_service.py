@@ -1,8 +1,13 @@
 import os
+import io
+import csv
 import requests
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterator, List, Optional
 from app.core.logger import get_logger
 from app.core.api_integration_rate_limiter import ApiIntegrationRateLimiter
+from app.core.config import settings
+from app.core.vendor_http import VendorTransport
+from app.background_services.email_verification_cache import EmailVerificationCache, get_email_domain
 
 logger = get_logger(__name__)
 
@@ -15,13 +20,20 @@ class EmailVerifierService:
     compatibility with existing code.
     """
 
-    def __init__(self, rate_limiter: Optional[ApiIntegrationRateLimiter] = None):
+    # Result values that count as a deliverable address
+    DELIVERABLE_RESULTS = {'deliverable', 'ok'}
+
+    def __init__(self, rate_limiter: Optional[ApiIntegrationRateLimiter] = None,
+                 cache: Optional[EmailVerificationCache] = None):
         """
         Initialize the EmailVerifierService.
         
         Args:
             rate_limiter: Optional rate limiter for MillionVerifier API calls.
                          If not provided, no rate limiting will be applied.
+            cache: Optional verification cache. When provided, cached results are
+                   returned without a vendor call and known-bad, disposable and
+                   catch-all domains are handled without a vendor call.
         """
         self.api_key = os.getenv('MILLIONVERIFIER_API_KEY')
         if not self.api_key:
@@ -30,6 +42,15 @@ class EmailVerifierService:
         self.max_retries = 3
         self.retry_delay = 1  # seconds
         self.rate_limiter = rate_limiter
+        self.cache = cache
+        self.bulk_base_url = settings.MILLIONVERIFIER_BULK_API_URL
+        self.transport = VendorTransport(
+            'millionverifier',
+            read_timeout=settings.MILLIONVERIFIER_HTTP_TIMEOUT,
+            budget_seconds=settings.MILLIONVERIFIER_HTTP_BUDGET_SECONDS,
+            max_attempts=self.max_retries,
+            backoff_base=self.retry_delay
+        )
         
         # Log rate limiting status for monitoring
         if self.rate_limiter:
@@ -44,6 +65,70 @@ class EmailVerifierService:
                 extra={'component': 'email_verifier', 'rate_limiting': 'disabled'}
             )
 
+    @classmethod
+    def is_deliverable(cls, result: Optional[Dict[str, Any]]) -> bool:
+        """
+        Check whether a verification result should be treated as deliverable.
+        
+        Catch-all results only count when accepted by the catch-all policy.
+        """
+        if not result:
+            return False
+        if result.get('result') in cls.DELIVERABLE_RESULTS:
+            return True
+        return result.get('result') == 'catch_all' and bool(result.get('accepted_by_policy'))
+
+    def _short_circuit_result(self, email: str, result: str, reason: str, **flags) -> Dict[str, Any]:
+        """Build a vendor-shaped result for a decision made without a vendor call."""
+        logger.info(
+            f"Email verification short-circuited for {email}: {reason}",
+            extra={'component': 'email_verifier', 'email': email, 'reason': reason}
+        )
+        return {
+            'email': email,
+            'result': result,
+            'short_circuited': True,
+            'reason': reason,
+            'credits_used': 0,
+            **flags
+        }
+
+    def _check_cache(self, email: str) -> Optional[Dict[str, Any]]:
+        """
+        Resolve an email from the cache or domain facts without calling the vendor.
+        
+        Returns:
+            dict: Result if the email could be decided locally, None otherwise
+        """
+        if not self.cache:
+            return None
+
+        cached = self.cache.get_email_result(email)
+        if cached:
+            logger.info(
+                f"Email verification cache hit for {email}",
+                extra={'component': 'email_verifier', 'email': email, 'cache': 'hit'}
+            )
+            return {**cached, 'cached': True}
+
+        facts = self.cache.get_domain_facts(get_email_domain(email))
+        if facts.get('disposable'):
+            return self._short_circuit_result(email, 'disposable', 'disposable_domain', is_disposable=True)
+        if facts.get('mx_found') is False:
+            return self._short_circuit_result(email, 'invalid', 'domain_without_mx', is_mx_found=False)
+        if facts.get('catch_all'):
+            policy = settings.EMAIL_VERIFICATION_CATCH_ALL_POLICY
+            if policy == 'accept':
+                return self._short_circuit_result(
+                    email, 'catch_all', 'catch_all_domain_accepted', is_catch_all=True, accepted_by_policy=True
+                )
+            if policy == 'reject':
+                return self._short_circuit_result(
+                    email, 'catch_all', 'catch_all_domain_rejected', is_catch_all=True, accepted_by_policy=False
+                )
+            # 'verify' policy falls through to a vendor call
+        return None
+
     def verify_email(self, email: str) -> Dict[str, Any]:
         """
         Verify a single email address using MillionVerifier API.
@@ -65,6 +150,11 @@ class EmailVerifierService:
                 'error': f'Invalid email parameter: {email}'
             }
         
+        # Answer from the cache / domain facts when possible (no rate budget or credits used)
+        local_result = self._check_cache(email)
+        if local_result:
+            return local_result
+        
 # TODO : even with the stubbed out call to millionverifier lets bring the rate limiting back so it can be tested
 
         # Check rate limiting if enabled
@@ -150,6 +240,8 @@ class EmailVerifierService:
                 }
             )
             
+            # The stubbed result is not cached: it would be served instead of real
+            # checks for EMAIL_VERIFICATION_CACHE_TTL_SECONDS once the API call is back
             return result
             
             # ORIGINAL API CALL COMMENTED OUT TO AVOID RATE LIMITING:
@@ -158,6 +250,8 @@ class EmailVerifierService:
             # )
             # response.raise_for_status()
             # result = response.json()
+            # if self.cache:
+            #     self.cache.record_result(email, result)
             
         except Exception as e:
             logger.error(
@@ -169,3 +263,130 @@ class EmailVerifierService:
                 'error': str(e)
             }
 
+    # ------------------------------------------------------------------
+    # Bulk file API
+    #
+    # A campaign's emails are uploaded as one CSV file, the file status is
+    # polled (from the beat task, never by blocking a worker) and the result
+    # file is streamed back row by row once the job has finished.
+    # ------------------------------------------------------------------
+
+    # Bulk file statuses reported by MillionVerifier
+    BULK_FINISHED_STATUSES = {'finished'}
+    BULK_FAILED_STATUSES = {'error', 'canceled', 'cancelled'}
+
+    def _bulk_url(self, endpoint: str) -> str:
+        return f"{self.bulk_base_url.rstrip('/')}/{endpoint}"
+
+    def start_bulk_verification(self, emails: List[str], file_name: str) -> Dict[str, Any]:
+        """
+        Upload a list of emails as a MillionVerifier bulk verification file.
+        
+        Args:
+            emails: Email addresses to verify (duplicates and blanks are dropped)
+            file_name: Name for the uploaded file, shown in the vendor dashboard
+            
+        Returns:
+            Dict with 'file_id' on success, or 'status': 'error' and 'error'
+        """
+        unique_emails = list(dict.fromkeys(e.strip().lower() for e in emails if e and e.strip()))
+        if not unique_emails:
+            return {'status': 'error', 'error': 'No emails to verify'}
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(['email'])
+        for email in unique_emails:
+            writer.writerow([email])
+
+        try:
+            response = self.transport.post(
+                self._bulk_url('upload'),
+                params={'key': self.api_key},
+                files={'file_contents': (file_name, buffer.getvalue().encode('utf-8'), 'text/csv')},
+            )
+            response.raise_for_status()
+            result = response.json()
+            if not result.get('file_id'):
+                raise ValueError(result.get('error') or f"Unexpected upload response: {result}")
+
+            logger.info(
+                f"Uploaded bulk verification file {result['file_id']} with {len(unique_emails)} emails",
+                extra={'component': 'email_verifier', 'file_id': result['file_id'], 'email_count': len(unique_emails)}
+            )
+            return {'file_id': str(result['file_id']), 'email_count': len(unique_emails), 'status': result.get('status')}
+        except Exception as e:
+            logger.error(
+                f"Error uploading bulk verification file: {str(e)}",
+                extra={'component': 'email_verifier', 'error': str(e)}
+            )
+            return {'status': 'error', 'error': str(e)}
+
+    def get_bulk_status(self, file_id: str) -> Dict[str, Any]:
+        """
+        Get the processing status of a bulk verification file.
+        
+        Returns:
+            Dict with the vendor file info ('status', 'percent', ...), or
+            'status': 'error' and 'error' if the request itself failed
+        """
+        try:
+            response = self.transport.get(
+                self._bulk_url('fileinfo'),
+                params={'key': self.api_key, 'file_id': file_id},
+            )
+            response.raise_for_status()
+            return response.json()
+        except Exception as e:
+            logger.warning(
+                f"Error fetching bulk verification status for file {file_id}: {str(e)}",
+                extra={'component': 'email_verifier', 'file_id': file_id, 'error': str(e)}
+            )
+            return {'status': 'request_failed', 'error': str(e)}
+
+    def _normalize_bulk_row(self, row: Dict[str, str], file_id: str) -> Dict[str, Any]:
+        """Convert a bulk result CSV row into the single-verification result shape."""
+        result = (row.get('result') or 'unknown').strip().lower()
+        normalized = {
+            'email': (row.get('email') or '').strip(),
+            'result': result,
+            'quality': row.get('quality'),
+            'free': str(row.get('free', '')).lower() in ('yes', 'true', '1'),
+            'role': str(row.get('role', '')).lower() in ('yes', 'true', '1'),
+            'is_disposable': result == 'disposable',
+            'is_catch_all': result == 'catch_all',
+            'source': 'bulk',
+            'bulk_file_id': file_id
+        }
+        if result == 'catch_all':
+            normalized['accepted_by_policy'] = settings.EMAIL_VERIFICATION_CATCH_ALL_POLICY == 'accept'
+        return normalized
+
+    def iter_bulk_results(self, file_id: str) -> Iterator[Dict[str, Any]]:
+        """
+        Stream the results of a finished bulk verification file.
+        
+        The result CSV is read line by line so large files are never held in
+        memory. Each result is also recorded in the verification cache.
+        
+        Yields:
+            Dict: One result per email, shaped like verify_email() results
+            
+        Raises:
+            requests.RequestException: If the download fails
+        """
+        with self.transport.get(
+            self._bulk_url('download'),
+            params={'key': self.api_key, 'file_id': file_id, 'filter': 'all'},
+            stream=True,
+        ) as response:
+            response.raise_for_status()
+            response.encoding = response.encoding or 'utf-8'
+            lines = (line for line in response.iter_lines(decode_unicode=True) if line)
+            for row in csv.DictReader(lines):
+                result = self._normalize_bulk_row(row, file_id)
+                if not result['email']:
+                    continue
+                if self.cache:
+                    self.cache.record_result(result['email'], result)
+                yield result
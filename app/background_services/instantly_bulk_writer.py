@@ -0,0 +1,260 @@
+import json
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from redis import Redis
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.logger import get_logger
+from app.models.lead_artifact import bulk_update_lead_artifacts
+from app.background_services.instantly_service import InstantlyService
+
+logger = get_logger(__name__)
+
+
+class InstantlyBulkWriter:
+    """
+    Redis-backed buffer that pushes ready leads to Instantly in bulk.
+
+    Enrichment tasks enqueue leads per instantly_campaign_id instead of calling
+    InstantlyService.create_lead() one at a time. A buffer is flushed with a
+    single bulk request when it reaches the batch size, or by the beat task
+    once its oldest item has waited long enough. Per-item results are written
+    back to Lead.instantly_lead_record. Leads Instantly did not create are
+    re-queued until INSTANTLY_BULK_MAX_ATTEMPTS is reached.
+
+    The buffer lives in Redis so every worker process shares it. A per-campaign
+    lock ensures only one flush of a buffer runs at a time. A batch is put back
+    at the head of the buffer if the bulk request or the database write raises,
+    so a failed flush loses no leads.
+    """
+
+    BUFFER_KEY_PREFIX = "instantly_buffer"
+    PENDING_KEY = "instantly_buffer:pending"  # zset: instantly_campaign_id -> oldest enqueue time
+    LOCK_TIMEOUT = 120  # seconds
+
+    # Drop the campaign from the pending zset only if its buffer is still empty,
+    # atomically, so a lead enqueued in between keeps its pending entry.
+    # KEYS: buffer, pending zset; ARGV: instantly_campaign_id, now
+    UPDATE_PENDING_SCRIPT = """
+    if redis.call('LLEN', KEYS[1]) == 0 then
+        return redis.call('ZREM', KEYS[2], ARGV[1])
+    end
+    redis.call('ZADD', KEYS[2], ARGV[2], ARGV[1])
+    return 0
+    """
+
+    def __init__(
+        self,
+        redis_client: Redis,
+        instantly_service=None,
+        batch_size: Optional[int] = None,
+        max_attempts: Optional[int] = None,
+        circuit_breaker=None
+    ):
+        """
+        Initialize the InstantlyBulkWriter.
+
+        Args:
+            redis_client: Redis client instance
+            instantly_service: InstantlyService used to flush (not needed to enqueue)
+            batch_size: Leads per bulk request, defaults to settings
+            max_attempts: Attempts per lead before giving up, defaults to settings
+            circuit_breaker: Optional circuit breaker to report vendor health to
+        """
+        self.redis = redis_client
+        self.instantly_service = instantly_service
+        self.batch_size = min(batch_size or settings.INSTANTLY_BULK_BATCH_SIZE, InstantlyService.MAX_BULK_LEADS)
+        self.max_attempts = max_attempts or settings.INSTANTLY_BULK_MAX_ATTEMPTS
+        self.circuit_breaker = circuit_breaker
+        self._update_pending_script = redis_client.register_script(self.UPDATE_PENDING_SCRIPT)
+
+    def _buffer_key(self, instantly_campaign_id: str) -> str:
+        return f"{self.BUFFER_KEY_PREFIX}:{instantly_campaign_id}"
+
+    def _lock_key(self, instantly_campaign_id: str) -> str:
+        return f"{self.BUFFER_KEY_PREFIX}:lock:{instantly_campaign_id}"
+
+    def enqueue(
+        self,
+        instantly_campaign_id: str,
+        lead_id: str,
+        email: str,
+        first_name: str,
+        personalization: str,
+        attempts: int = 0
+    ) -> int:
+        """
+        Add a ready lead to its campaign's buffer.
+
+        Returns:
+            int: Buffer length after the push; callers flush when it reaches batch_size
+        """
+        item = {
+            'lead_id': lead_id,
+            'email': email,
+            'first_name': first_name,
+            'personalization': personalization,
+            'attempts': attempts
+        }
+        pipe = self.redis.pipeline()
+        pipe.rpush(self._buffer_key(instantly_campaign_id), json.dumps(item))
+        pipe.zadd(self.PENDING_KEY, {instantly_campaign_id: time.time()}, nx=True)
+        length, _ = pipe.execute()
+        return length
+
+    def is_full(self, buffer_length: int) -> bool:
+        return buffer_length >= self.batch_size
+
+    def due_campaigns(self, max_wait_seconds: Optional[int] = None) -> List[str]:
+        """
+        Get campaigns whose oldest buffered lead has waited at least max_wait_seconds.
+        """
+        if max_wait_seconds is None:
+            max_wait_seconds = settings.INSTANTLY_BULK_MAX_WAIT_SECONDS
+        return list(self.redis.zrangebyscore(self.PENDING_KEY, '-inf', time.time() - max_wait_seconds))
+
+    def _pop_batch(self, instantly_campaign_id: str) -> List[Dict[str, Any]]:
+        key = self._buffer_key(instantly_campaign_id)
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.lrange(key, 0, self.batch_size - 1)
+        pipe.ltrim(key, self.batch_size, -1)
+        raw_items, _ = pipe.execute()
+        return [json.loads(raw) for raw in raw_items]
+
+    def _requeue_front(self, instantly_campaign_id: str, items: List[Dict[str, Any]]) -> None:
+        """Put a batch back at the head of the buffer, preserving order."""
+        if items:
+            self.redis.lpush(
+                self._buffer_key(instantly_campaign_id),
+                *[json.dumps(item) for item in reversed(items)]
+            )
+
+    def _update_pending(self, instantly_campaign_id: str) -> None:
+        self._update_pending_script(
+            keys=[self._buffer_key(instantly_campaign_id), self.PENDING_KEY],
+            args=[instantly_campaign_id, time.time()]
+        )
+
+    def flush(self, instantly_campaign_id: str, db: Session) -> Dict[str, Any]:
+        """
+        Send one batch of a campaign's buffer to Instantly and record the results.
+
+        Args:
+            instantly_campaign_id: The Instantly campaign whose buffer to flush
+            db: Database session used to update the leads' instantly_lead_record
+
+        Returns:
+            dict: Summary with 'status' and counts of created, retried and failed leads
+        """
+        if not self.instantly_service:
+            raise ValueError("InstantlyBulkWriter needs an instantly_service to flush")
+
+        token = str(uuid.uuid4())
+        lock_key = self._lock_key(instantly_campaign_id)
+        if not self.redis.set(lock_key, token, nx=True, ex=self.LOCK_TIMEOUT):
+            return {'status': 'locked', 'created': 0, 'retried': 0, 'failed': 0}
+
+        try:
+            items = self._pop_batch(instantly_campaign_id)
+            if not items:
+                self._update_pending(instantly_campaign_id)
+                return {'status': 'empty', 'created': 0, 'retried': 0, 'failed': 0}
+
+            try:
+                response = self.instantly_service.create_leads_bulk(instantly_campaign_id, items)
+            except Exception as e:
+                self._requeue_front(instantly_campaign_id, items)
+                if self.circuit_breaker:
+                    self.circuit_breaker.record_failure(f"Instantly bulk error: {str(e)}", 'exception')
+                raise
+
+            if response.get('status') == 'rate_limited':
+                # Not an item failure: put the batch back untouched for the next flush
+                self._requeue_front(instantly_campaign_id, items)
+                if self.circuit_breaker:
+                    self.circuit_breaker.record_failure(
+                        f"Instantly rate limit: {response.get('error', 'Rate limited')}", 'rate_limit'
+                    )
+                return {'status': 'rate_limited', 'created': 0, 'retried': len(items), 'failed': 0}
+
+            if 'results' not in response:
+                if self.circuit_breaker:
+                    self.circuit_breaker.record_failure(
+                        f"Instantly bulk error: {response.get('error', 'unknown error')}", 'exception'
+                    )
+                results = [{'error': response.get('error', 'Instantly bulk request failed')}] * len(items)
+            else:
+                if self.circuit_breaker:
+                    self.circuit_breaker.record_success()
+                results = response['results']
+
+            try:
+                summary, retries = self._record_results(items, results, db)
+            except Exception:
+                # The results were not saved; re-sending the batch beats leaving
+                # its leads without an Instantly record
+                db.rollback()
+                self._requeue_front(instantly_campaign_id, items)
+                raise
+            for item in retries:
+                self.enqueue(instantly_campaign_id, **item)
+            self._update_pending(instantly_campaign_id)
+            logger.info(
+                f"Flushed {len(items)} leads to Instantly campaign {instantly_campaign_id}: {summary}",
+                extra={
+                    'component': 'instantly_service', 'campaign_id': instantly_campaign_id,
+                    # 'created' is a LogRecord attribute
+                    **{f'{key}_count': count for key, count in summary.items()}
+                }
+            )
+            return {'status': 'flushed', **summary}
+        finally:
+            if self.redis.get(lock_key) == token:
+                self.redis.delete(lock_key)
+
+    def _record_results(
+        self,
+        items: List[Dict[str, Any]],
+        results: List[Dict[str, Any]],
+        db: Session
+    ) -> Tuple[Dict[str, int], List[Dict[str, Any]]]:
+        """
+        Write per-item results to leads and commit.
+
+        Returns:
+            tuple: The counts, and the items to re-queue once the commit succeeded
+        """
+        mappings = []
+        retries = []
+        created = retried = failed = 0
+        for item, result in zip(items, results):
+            if 'error' not in result:
+                created += 1
+                mappings.append({'id': item['lead_id'], 'instantly_lead_record': result})
+                continue
+
+            attempts = item.get('attempts', 0) + 1
+            if attempts < self.max_attempts:
+                retried += 1
+                retries.append({**item, 'attempts': attempts})
+                mappings.append({'id': item['lead_id'], 'instantly_lead_record': {
+                    'status': 'queued',
+                    'attempts': attempts,
+                    'last_error': result['error'],
+                    'queued_at': datetime.utcnow().isoformat()
+                }})
+            else:
+                failed += 1
+                mappings.append({'id': item['lead_id'], 'instantly_lead_record': {
+                    'error': result['error'],
+                    'attempts': attempts
+                }})
+
+        if mappings:
+            bulk_update_lead_artifacts(db, mappings)
+            db.commit()
+        return {'created': created, 'retried': retried, 'failed': failed}, retries
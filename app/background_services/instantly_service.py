@@ -1,9 +1,11 @@
 import os
 import requests
-from typing import Optional
+from typing import Any, Dict, List, Optional
 
 from app.core.logger import get_logger
 from app.core.api_integration_rate_limiter import ApiIntegrationRateLimiter
+from app.core.config import settings
+from app.core.vendor_http import VendorTransport
 
 logger = get_logger(__name__)
 
@@ -16,6 +18,8 @@ class InstantlyService:
     compatibility with existing code.
     """
     API_URL = "https://api.instantly.ai/api/v2/leads"
+    API_BULK_LEADS_URL = "https://api.instantly.ai/api/v2/leads/add"
+    MAX_BULK_LEADS = 1000  # Instantly accepts at most 1000 leads per bulk request
     API_CAMPAIGN_URL = "https://api.instantly.ai/api/v2/campaigns"
 
     def __init__(self, rate_limiter: Optional[ApiIntegrationRateLimiter] = None):
@@ -29,11 +33,21 @@ class InstantlyService:
         self.api_key = os.getenv("INSTANTLY_API_KEY")
         if not self.api_key:
             raise ValueError("INSTANTLY_API_KEY environment variable is not set")
+        if settings.INSTANTLY_BASE_URL:
+            base_url = settings.INSTANTLY_BASE_URL.rstrip('/')
+            self.API_URL = f"{base_url}/leads"
+            self.API_BULK_LEADS_URL = f"{base_url}/leads/add"
+            self.API_CAMPAIGN_URL = f"{base_url}/campaigns"
         self.headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
         }
         self.rate_limiter = rate_limiter
+        self.transport = VendorTransport(
+            'instantly',
+            read_timeout=settings.INSTANTLY_HTTP_TIMEOUT,
+            budget_seconds=settings.INSTANTLY_HTTP_BUDGET_SECONDS
+        )
         
         # Log rate limiting status for monitoring
         if self.rate_limiter:
@@ -115,7 +129,7 @@ class InstantlyService:
                 extra={'component': 'instantly_service', 'email': email, 'campaign_id': campaign_id}
             )
             
-            response = requests.post(self.API_URL, json=payload, headers=self.headers, timeout=30)
+            response = self.transport.post(self.API_URL, json=payload, headers=self.headers)
             response.raise_for_status()
             result = response.json()
             
@@ -146,6 +160,90 @@ class InstantlyService:
             )
             return {"error": str(e), "payload": payload}
 
+    def create_leads_bulk(self, campaign_id: str, leads: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Create many leads in an Instantly campaign with a single bulk request.
+        
+        One bulk call costs one request against the rate limiter regardless of
+        how many leads it carries.
+        
+        Args:
+            campaign_id: The Instantly campaign ID
+            leads: Lead payloads with 'email', 'first_name' and 'personalization'
+            
+        Returns:
+            dict: On success, {'results': [...]} with one entry per input lead in
+                  the same order. Each entry is either the created lead record
+                  or {'error': ...}. On failure, the same rate-limited or error
+                  response shape as create_lead().
+        """
+        if len(leads) > self.MAX_BULK_LEADS:
+            raise ValueError(f"At most {self.MAX_BULK_LEADS} leads can be created per bulk request")
+
+        rate_limit_error = self._check_rate_limit(f"create_leads_bulk for {len(leads)} leads")
+        if rate_limit_error:
+            return rate_limit_error
+
+        payload = {
+            "campaign_id": campaign_id,
+            "leads": [
+                {
+                    "email": lead["email"],
+                    "first_name": lead.get("first_name"),
+                    "personalization": lead.get("personalization")
+                }
+                for lead in leads
+            ]
+        }
+        try:
+            logger.info(
+                f"Creating {len(leads)} Instantly leads in campaign {campaign_id}",
+                extra={'component': 'instantly_service', 'campaign_id': campaign_id, 'lead_count': len(leads)}
+            )
+
+            response = self.transport.post(
+                self.API_BULK_LEADS_URL, json=payload, headers=self.headers,
+                timeout=(settings.VENDOR_HTTP_CONNECT_TIMEOUT, 60)
+            )
+            response.raise_for_status()
+            result = response.json()
+        except requests.RequestException as e:
+            logger.error(
+                f"Error creating {len(leads)} Instantly leads in campaign {campaign_id}: {str(e)}",
+                extra={'component': 'instantly_service', 'campaign_id': campaign_id, 'error': str(e)}
+            )
+            return {"error": str(e)}
+
+        # Map created leads back to input positions (by index, falling back to email)
+        created_by_index = {}
+        created_by_email = {}
+        for created in result.get('created_leads') or []:
+            if created.get('index') is not None:
+                created_by_index[int(created['index'])] = created
+            if created.get('email'):
+                created_by_email[created['email'].lower()] = created
+
+        results = []
+        for index, lead in enumerate(leads):
+            created = created_by_index.get(index) or created_by_email.get(lead["email"].lower())
+            if created:
+                results.append({**created, 'campaign': campaign_id})
+            else:
+                results.append({'error': 'Lead was not created by Instantly bulk request'})
+
+        created_count = sum(1 for r in results if 'error' not in r)
+        logger.info(
+            f"Instantly bulk request created {created_count}/{len(leads)} leads in campaign {campaign_id}",
+            extra={
+                'component': 'instantly_service',
+                'campaign_id': campaign_id,
+                'created_count': created_count,
+                'skipped_count': result.get('skipped_count'),
+                'duplicated_leads': result.get('duplicated_leads')
+            }
+        )
+        return {'results': results, 'summary': {k: v for k, v in result.items() if k != 'created_leads'}}
+
     def create_campaign(self, name, schedule_name="My Schedule", timing_from="09:00", timing_to="17:00", days=None, timezone="Etc/GMT+12"):
         """
         Create a new campaign in Instantly.
@@ -182,7 +280,7 @@ class InstantlyService:
                 extra={'component': 'instantly_service', 'campaign_name': name}
             )
             
-            response = requests.post(self.API_CAMPAIGN_URL, json=payload, headers=self.headers, timeout=30)
+            response = self.transport.post(self.API_CAMPAIGN_URL, json=payload, headers=self.headers)
             response.raise_for_status()
             result = response.json()
             
@@ -232,7 +330,7 @@ class InstantlyService:
         if rate_limit_error:
             return rate_limit_error
         
-        url = "https://api.instantly.ai/api/v2/campaigns/analytics/overview"
+        url = f"{self.API_CAMPAIGN_URL}/analytics/overview"
         query = {
             "id": campaign_id,
         }
@@ -249,7 +347,7 @@ class InstantlyService:
                 extra={'component': 'instantly_service', 'campaign_id': campaign_id}
             )
             
-            response = requests.get(url, headers=self.headers, params=query, timeout=30)
+            response = self.transport.get(url, headers=self.headers, params=query)
             response.raise_for_status()
             result = response.json()
             
@@ -1,13 +1,37 @@
-import os
-from typing import Optional, Dict, Any
-from openai import OpenAI
+import json
+import time
+from typing import Optional, Dict, Any, Iterator, List
+import httpx
+from openai import OpenAI, APITimeoutError
+from app.core.config import settings
 from app.core.api_integration_rate_limiter import ApiIntegrationRateLimiter
 from app.core.logger import get_logger
 from app.models import Lead
 from app.core.circuit_breaker import CircuitBreakerService
+from app.core.credential_pool import CredentialPool, get_vendor_credentials
+from app.core.metrics import observe_vendor_request, vendor_outcome
+from app.background_services.prompt_templates import PromptTemplateRegistry
+from app.background_services.completion_cache import CompletionCache
 
 logger = get_logger(__name__)
 
+
+class CompletionDeadlineExceeded(Exception):
+    """A streamed completion was cancelled because it ran past a deadline."""
+
+    def __init__(self, phase: str, elapsed: float, partial_content: str = ""):
+        """
+        Args:
+            phase: 'first_token', 'between_tokens' or 'total'
+            elapsed: Seconds since the request was sent
+            partial_content: Text received before the stream was cancelled
+        """
+        super().__init__(f"OpenAI {phase.replace('_', ' ')} deadline exceeded after {elapsed:.1f}s")
+        self.phase = phase
+        self.elapsed = elapsed
+        self.partial_content = partial_content
+
+
 class OpenAIService:
     """
     Service for generating email copy using OpenAI's API.
@@ -17,7 +41,8 @@ class OpenAIService:
     compatibility with existing code.
     """
 
-    def __init__(self, rate_limiter: Optional[ApiIntegrationRateLimiter] = None, circuit_breaker: Optional[CircuitBreakerService] = None):
+    def __init__(self, rate_limiter: Optional[ApiIntegrationRateLimiter] = None, circuit_breaker: Optional[CircuitBreakerService] = None,
+                 prompt_templates: Optional[PromptTemplateRegistry] = None, completion_cache: Optional[CompletionCache] = None):
         """
         Initialize the OpenAIService.
         
@@ -26,13 +51,23 @@ class OpenAIService:
                          If not provided, no rate limiting will be applied.
             circuit_breaker: Optional circuit breaker for OpenAI API calls.
                            If not provided, no circuit breaking will be applied.
+            prompt_templates: Optional registry for per-campaign prompt overrides.
+                           If not provided, the built-in prompts are used.
+            completion_cache: Optional cache of completions by prompt hash.
+                           If not provided, every prompt is sent to the API.
         """
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
+        api_keys = get_vendor_credentials("OPENAI_API_KEYS", "OPENAI_API_KEY")
+        if not api_keys:
             raise ValueError("OPENAI_API_KEY environment variable is not set")
-        self.client = OpenAI(api_key=api_key)
+        # Batch files and batches belong to an account, so batch calls always use the first key
+        api_key = api_keys[0]
+        # OPENAI_BASE_URL points the client at a local fake server in tests.
+        # Completions set OPENAI_TOTAL_TIMEOUT per call; batch files use OPENAI_FILE_TIMEOUT.
+        self.client = OpenAI(api_key=api_key, base_url=settings.OPENAI_BASE_URL or None)
         self.rate_limiter = rate_limiter
         self.circuit_breaker = circuit_breaker
+        self.prompt_templates = prompt_templates or PromptTemplateRegistry()
+        self.completion_cache = completion_cache
         
         # Log rate limiting status for monitoring
         if self.rate_limiter:
@@ -156,6 +191,83 @@ class OpenAIService:
         
         return details
 
+    def build_email_copy_request(self, lead: Lead, enrichment_data: Dict[str, Any]) -> dict:
+        """
+        Build the chat completion request body for a lead's email copy.
+        
+        The same body is sent directly by generate_email_copy() and written as
+        one line of a Batch API input file by submit_email_copy_batch().
+        
+        Args:
+            lead: The lead to generate email copy for
+            enrichment_data: Additional data about the lead
+        Returns:
+            dict: Request body, or {'status': 'error', 'error': ...} if the lead
+                  is missing required prompt variables
+        """
+        # Extract and log prompt variables
+        first_name = getattr(lead, 'first_name', '')
+        last_name = getattr(lead, 'last_name', '')
+        company_name = getattr(lead, 'company_name', None) or getattr(lead, 'company', '')
+        full_name = f"{first_name} {last_name}".strip()
+        
+        logger.info(
+            f"Email copy prompt vars for lead {getattr(lead, 'id', None)}: first_name='{first_name}', last_name='{last_name}', company_name='{company_name}'", 
+            extra={'component': 'openai_service', 'lead_id': getattr(lead, 'id', None)}
+        )
+
+        # Validate required fields
+        missing = []
+        if not first_name:
+            missing.append('first_name')
+        if not last_name:
+            missing.append('last_name')
+        if not company_name:
+            missing.append('company_name')
+        if missing:
+            error_msg = f"Missing required prompt variables for email copy: {', '.join(missing)} for lead {getattr(lead, 'id', None)}"
+            logger.error(
+                error_msg, 
+                extra={'component': 'openai_service', 'lead_id': getattr(lead, 'id', None), 'missing_fields': missing}
+            )
+            return {
+                'status': 'error',
+                'error': error_msg
+            }
+
+        # Extract enrichment content
+        enrichment_content = ""
+        if enrichment_data and 'choices' in enrichment_data:
+            enrichment_content = enrichment_data['choices'][0]['message']['content']
+            if enrichment_data.get('company_context'):
+                # Shared company research (CompanyEnrichmentService) the person lookup built on
+                enrichment_content += f"\n\nCompany: {enrichment_data['company_context']}"
+
+        template = self.prompt_templates.get('email_copy', getattr(lead, 'campaign_id', None))
+        try:
+            prompt = template.render({
+                'first_name': first_name,
+                'last_name': last_name,
+                'full_name': full_name,
+                'company_name': company_name,
+                'enrichment_content': enrichment_content,
+                'title': getattr(lead, 'title', 'Unknown')
+            })
+        except ValueError as e:
+            # An override template uses a placeholder the lead cannot fill
+            logger.error(str(e), extra={'component': 'openai_service', 'lead_id': getattr(lead, 'id', None)})
+            return {
+                'status': 'error',
+                'error': str(e)
+            }
+
+        logger.info(
+            f"Built email copy prompt for lead {getattr(lead, 'id', None)}", 
+            extra={'component': 'openai_service', 'lead_id': getattr(lead, 'id', None)}
+        )
+
+        return template.build_request(prompt)
+
     def generate_email_copy(self, lead: Lead, enrichment_data: Dict[str, Any]) -> dict:
         """
         Generate personalized email copy for a lead.
@@ -172,6 +284,20 @@ class OpenAIService:
         """
         operation = f"generate_email_copy for lead {getattr(lead, 'id', None)}"
         
+        request_body = self.build_email_copy_request(lead, enrichment_data)
+        if request_body.get('status') == 'error':
+            return request_body
+
+        # An identical prompt was already paid for: no rate limit slot needed
+        if self.completion_cache:
+            cached = self.completion_cache.get('openai', request_body)
+            if cached is not None:
+                logger.info(
+                    f"Using cached email copy completion for lead {getattr(lead, 'id', None)}",
+                    extra={'component': 'openai_service', 'lead_id': getattr(lead, 'id', None), 'completion_cache': 'hit'}
+                )
+                return cached
+
         # Check circuit breaker if enabled
         circuit_error = self._check_circuit_breaker(operation)
         if circuit_error:
@@ -188,77 +314,22 @@ class OpenAIService:
                 )
             return rate_limit_error
         
+        started = time.monotonic()
         try:
-            # Extract and log prompt variables
-            first_name = getattr(lead, 'first_name', '')
-            last_name = getattr(lead, 'last_name', '')
-            company_name = getattr(lead, 'company_name', None) or getattr(lead, 'company', '')
-            full_name = f"{first_name} {last_name}".strip()
-            
-            logger.info(
-                f"Email copy prompt vars for lead {getattr(lead, 'id', None)}: first_name='{first_name}', last_name='{last_name}', company_name='{company_name}'", 
-                extra={'component': 'openai_service', 'lead_id': getattr(lead, 'id', None)}
-            )
-
-            # Validate required fields
-            missing = []
-            if not first_name:
-                missing.append('first_name')
-            if not last_name:
-                missing.append('last_name')
-            if not company_name:
-                missing.append('company_name')
-            if missing:
-                error_msg = f"Missing required prompt variables for email copy: {', '.join(missing)} for lead {getattr(lead, 'id', None)}"
-                logger.error(
-                    error_msg, 
-                    extra={'component': 'openai_service', 'lead_id': getattr(lead, 'id', None), 'missing_fields': missing}
-                )
-                return {
-                    'status': 'error',
-                    'error': error_msg
-                }
-
-            # Extract enrichment content
-            enrichment_content = ""
-            if enrichment_data and 'choices' in enrichment_data:
-                enrichment_content = enrichment_data['choices'][0]['message']['content']
-
-            prompt = f"""Write a personalized email to {full_name} at {company_name}.
-
-Enrichment Information:
-{enrichment_content}
-
-Lead Information:
-- Name: {full_name}
-- Company: {company_name}
-- Role: {getattr(lead, 'title', 'Unknown')}
-
-Write a professional, personalized email that:
-1. Shows understanding of their business
-2. Offers specific value
-3. Has a clear call to action
-4. Is concise and engaging
-
-Email:"""
-
-            logger.info(
-                f"Built email copy prompt for lead {getattr(lead, 'id', None)}", 
-                extra={'component': 'openai_service', 'lead_id': getattr(lead, 'id', None)}
-            )
-
-            # Call OpenAI API (openai>=1.0.0 interface)
-            response = self.client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": "You are a professional email copywriter."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=500
-            )
+            if settings.OPENAI_STREAMING_ENABLED:
+                result = self._stream_completion(request_body, getattr(lead, 'id', None))
+            else:
+                # Call OpenAI API (openai>=1.0.0 interface). SDK retries would each get
+                # the full timeout, so they are off to keep OPENAI_TOTAL_TIMEOUT a total
+                response = self._request_client().with_options(
+                    timeout=settings.OPENAI_TOTAL_TIMEOUT,
+                    max_retries=0
+                ).chat.completions.create(**request_body)
+                result = response.model_dump()
+            observe_vendor_request('openai', started, 'ok')
 
-            result = response.model_dump()
+            if self.completion_cache:
+                self.completion_cache.set('openai', request_body, result)
             
             # Record success in circuit breaker
             if self.circuit_breaker:
@@ -283,12 +354,44 @@ Email:"""
             
             return result
             
+        except (CompletionDeadlineExceeded, APITimeoutError) as e:
+            # APITimeoutError only escapes from non-streamed calls (client timeout)
+            phase = e.phase if isinstance(e, CompletionDeadlineExceeded) else 'total'
+            observe_vendor_request('openai', started, 'timeout')
+            logger.warning(
+                f"Email copy generation for lead {getattr(lead, 'id', None)} timed out ({phase}): {str(e)}",
+                extra={
+                    'component': 'openai_service',
+                    'lead_id': getattr(lead, 'id', None),
+                    'error_type': 'timeout',
+                    'timeout_phase': phase
+                }
+            )
+            if self.circuit_breaker:
+                self.circuit_breaker.record_failure(f"OpenAI timeout: {str(e)}", 'timeout')
+            return {
+                'status': 'error',
+                'error': str(e),
+                'error_type': 'timeout',
+                'timeout_phase': phase,
+                'partial_content': getattr(e, 'partial_content', '')
+            }
+
         except Exception as e:
+            observe_vendor_request('openai', started, vendor_outcome(getattr(e, 'status_code', None)))
             error_msg = f"Error generating email copy for lead {getattr(lead, 'id', None)}: {str(e)}"
             logger.error(
                 error_msg, 
                 extra={'component': 'openai_service', 'lead_id': getattr(lead, 'id', None), 'error': str(e)}
             )
+
+            # A pooled key that hit its quota or an auth error is quarantined. The
+            # circuit breaker only opens when no other key is left to take over.
+            other_keys_available = False
+            if isinstance(self.rate_limiter, CredentialPool):
+                error_response = getattr(e, 'response', None)
+                if self.rate_limiter.report_status(getattr(e, 'status_code', None), getattr(error_response, 'headers', None)):
+                    other_keys_available = self.rate_limiter.is_allowed()
             
             # Check if this is a rate limit error and handle appropriately
             if self._is_rate_limit_error(e):
@@ -305,7 +408,7 @@ Email:"""
                 )
                 
                 # Record rate limit failure in circuit breaker with detailed info
-                if self.circuit_breaker:
+                if self.circuit_breaker and not other_keys_available:
                     error_context = f"OpenAI {rate_limit_details.get('error_type', 'rate_limit')}: {str(e)}"
                     self.circuit_breaker.record_failure(error_context, 'rate_limit')
                 
@@ -318,11 +421,225 @@ Email:"""
                 }
             else:
                 # Record general failure in circuit breaker
-                if self.circuit_breaker:
+                if self.circuit_breaker and not other_keys_available:
                     self.circuit_breaker.record_failure(f"OpenAI service error: {str(e)}", 'exception')
                 
                 # Return generic error
                 return {
                     'status': 'error',
                     'error': str(e)
-                } 
\ No newline at end of file
+                }
+
+    def _request_client(self) -> OpenAI:
+        """Client for a realtime call: uses the pooled key the rate limit slot was taken on, if any."""
+        if isinstance(self.rate_limiter, CredentialPool) and self.rate_limiter.credential:
+            return self.client.with_options(api_key=self.rate_limiter.credential)
+        return self.client
+
+    def _stream_completion(self, request_body: Dict[str, Any], lead_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Run a chat completion as a stream and assemble the response.
+        
+        The stream is closed (cancelling the request) as soon as the first
+        token or the whole completion runs past its deadline. A stalled
+        connection is bounded by the read timeout, which is the first-token
+        deadline, so no call outlives OPENAI_TOTAL_TIMEOUT by more than that.
+        Time to first token and tokens per second are logged and returned
+        under 'metrics'.
+        
+        Args:
+            request_body: Chat completion request from build_email_copy_request()
+            lead_id: Lead ID for logging
+            
+        Returns:
+            dict: Response in the non-streamed chat completion shape plus 'metrics'
+            
+        Raises:
+            CompletionDeadlineExceeded: A deadline passed while streaming
+        """
+        first_token_timeout = settings.OPENAI_FIRST_TOKEN_TIMEOUT
+        total_timeout = settings.OPENAI_TOTAL_TIMEOUT
+        # No SDK retries: a retried stream would restart the deadlines
+        client = self._request_client().with_options(
+            timeout=httpx.Timeout(total_timeout, read=first_token_timeout),
+            max_retries=0
+        )
+
+        started = time.monotonic()
+        try:
+            stream = client.chat.completions.create(
+                **request_body,
+                stream=True,
+                stream_options={'include_usage': True}
+            )
+        except APITimeoutError:
+            raise CompletionDeadlineExceeded('first_token', time.monotonic() - started)
+
+        parts: List[str] = []
+        first_token_at = None
+        finish_reason = None
+        usage = None
+        chunk_count = 0
+        response_id, model, created = None, request_body.get('model'), None
+        try:
+            for chunk in stream:
+                now = time.monotonic()
+                response_id, model, created = chunk.id, chunk.model, chunk.created
+                if chunk.choices:
+                    choice = chunk.choices[0]
+                    if choice.delta and choice.delta.content:
+                        if first_token_at is None:
+                            first_token_at = now
+                        parts.append(choice.delta.content)
+                        chunk_count += 1
+                    if choice.finish_reason:
+                        finish_reason = choice.finish_reason
+                if chunk.usage:
+                    usage = chunk.usage.model_dump()
+
+                if first_token_at is None and now - started > first_token_timeout:
+                    raise CompletionDeadlineExceeded('first_token', now - started)
+                if now - started > total_timeout:
+                    raise CompletionDeadlineExceeded('total', now - started, ''.join(parts))
+        except httpx.TimeoutException:
+            # Read timeout while iterating: the vendor went quiet mid-stream
+            phase = 'first_token' if first_token_at is None else 'between_tokens'
+            raise CompletionDeadlineExceeded(phase, time.monotonic() - started, ''.join(parts))
+        finally:
+            stream.close()
+
+        finished = time.monotonic()
+        completion_tokens = (usage or {}).get('completion_tokens') or chunk_count
+        generation_seconds = finished - first_token_at if first_token_at is not None else 0.0
+        metrics = {
+            'streamed': True,
+            'ttft_seconds': round(first_token_at - started, 3) if first_token_at is not None else None,
+            'total_seconds': round(finished - started, 3),
+            'completion_tokens': completion_tokens,
+            'tokens_per_second': round(completion_tokens / generation_seconds, 1) if generation_seconds > 0 else None
+        }
+        logger.info(
+            f"Streamed email copy completion for lead {lead_id}: "
+            f"ttft={metrics['ttft_seconds']}s total={metrics['total_seconds']}s "
+            f"tokens={completion_tokens} tokens/s={metrics['tokens_per_second']}",
+            extra={'component': 'openai_service', 'lead_id': lead_id, **metrics}
+        )
+
+        return {
+            'id': response_id,
+            'object': 'chat.completion',
+            'created': created,
+            'model': model,
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': ''.join(parts)},
+                'finish_reason': finish_reason
+            }],
+            'usage': usage,
+            'metrics': metrics
+        }
+
+    # ------------------------------------------------------------------
+    # Batch API
+    #
+    # Campaigns in 'batch' email copy mode send their requests as one JSONL
+    # input file. The batch is polled from the beat task and the output file
+    # is streamed back line by line once it has completed. Batch requests
+    # have their own quota, so they do not go through the rate limiter.
+    # ------------------------------------------------------------------
+
+    BATCH_ENDPOINT = "/v1/chat/completions"
+    BATCH_FINISHED_STATUSES = {'completed'}
+    BATCH_FAILED_STATUSES = {'failed', 'expired', 'cancelled'}
+
+    def submit_email_copy_batch(self, batch_requests: List[Dict[str, Any]], file_name: str) -> Dict[str, Any]:
+        """
+        Upload email copy requests as a JSONL file and create a batch for them.
+        
+        Args:
+            batch_requests: Items with 'custom_id' (the lead ID) and 'body' (from
+                      build_email_copy_request())
+            file_name: Name for the uploaded input file
+            
+        Returns:
+            Dict with 'batch_id', 'input_file_id' and 'request_count' on success,
+            or 'status': 'error' and 'error'
+        """
+        if not batch_requests:
+            return {'status': 'error', 'error': 'No requests to submit'}
+
+        lines = [
+            json.dumps({
+                'custom_id': item['custom_id'],
+                'method': 'POST',
+                'url': self.BATCH_ENDPOINT,
+                'body': item['body']
+            })
+            for item in batch_requests
+        ]
+        try:
+            input_file = self._file_client().files.create(
+                file=(file_name, ('\n'.join(lines) + '\n').encode('utf-8')),
+                purpose='batch'
+            )
+            batch = self.client.batches.create(
+                input_file_id=input_file.id,
+                endpoint=self.BATCH_ENDPOINT,
+                completion_window=settings.OPENAI_BATCH_COMPLETION_WINDOW
+            )
+            logger.info(
+                f"Submitted OpenAI batch {batch.id} with {len(batch_requests)} email copy requests",
+                extra={'component': 'openai_service', 'batch_id': batch.id, 'request_count': len(batch_requests)}
+            )
+            return {'batch_id': batch.id, 'input_file_id': input_file.id, 'request_count': len(batch_requests)}
+        except Exception as e:
+            logger.error(
+                f"Error submitting OpenAI batch: {str(e)}",
+                extra={'component': 'openai_service', 'error': str(e)}
+            )
+            return {'status': 'error', 'error': str(e)}
+
+    def _file_client(self) -> OpenAI:
+        """Client for batch file uploads and downloads, which can take far longer than a completion."""
+        return self.client.with_options(timeout=settings.OPENAI_FILE_TIMEOUT)
+
+    def get_batch_status(self, batch_id: str) -> Dict[str, Any]:
+        """
+        Get a batch's status and output file IDs.
+        
+        Returns:
+            Dict with the batch object fields ('status', 'output_file_id',
+            'error_file_id', 'request_counts', ...), or 'status':
+            'request_failed' and 'error' if the request itself failed
+        """
+        try:
+            return self.client.batches.retrieve(batch_id).model_dump()
+        except Exception as e:
+            logger.warning(
+                f"Error fetching OpenAI batch {batch_id}: {str(e)}",
+                extra={'component': 'openai_service', 'batch_id': batch_id, 'error': str(e)}
+            )
+            return {'status': 'request_failed', 'error': str(e)}
+
+    def iter_batch_results(self, file_id: str) -> Iterator[Dict[str, Any]]:
+        """
+        Stream a batch output or error file.
+        
+        The file is read line by line so large batches are never held in memory.
+        
+        Yields:
+            Dict: {'custom_id': ..., 'result': <chat completion dict>} for
+                  successful requests, {'custom_id': ..., 'error': ...} otherwise
+        """
+        with self._file_client().files.with_streaming_response.content(file_id) as response:
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                item = json.loads(line)
+                custom_id = item.get('custom_id')
+                response_data = item.get('response') or {}
+                if item.get('error') or response_data.get('status_code') != 200:
+                    error = item.get('error') or (response_data.get('body') or {}).get('error') or 'Request failed'
+                    yield {'custom_id': custom_id, 'error': error}
+                else:
+                    yield {'custom_id': custom_id, 'result': response_data.get('body')}
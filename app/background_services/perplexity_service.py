@@ -1,4 +1,3 @@
-import os
 import requests
 import time
 import uuid
@@ -6,7 +5,14 @@ from datetime import datetime
 from app.models.lead import Lead
 from typing import Dict, Any, List, Optional
 from app.core.logger import get_logger
+from app.core.logging_config import log_payload, should_sample
 from app.core.api_integration_rate_limiter import ApiIntegrationRateLimiter
+from app.core.config import settings
+from app.core.tracing import current_trace_id
+from app.core.vendor_http import VendorTransport
+from app.core.credential_pool import CredentialPool, get_vendor_credentials
+from app.background_services.prompt_templates import PromptTemplateRegistry
+from app.background_services.completion_cache import CompletionCache
 
 logger = get_logger(__name__)
 
@@ -24,24 +30,47 @@ class PerplexityService:
 
     API_URL = "https://api.perplexity.ai/chat/completions"
     MAX_RETRIES = 3
-    RETRY_DELAY = 1  # seconds
+    RETRY_DELAY = 1  # seconds, first backoff ceiling; doubled per retry with jitter
 
-    def __init__(self, rate_limiter: Optional[ApiIntegrationRateLimiter] = None):
+    def __init__(self, rate_limiter: Optional[ApiIntegrationRateLimiter] = None,
+                 rate_limit_wait_seconds: int = 0,
+                 prompt_templates: Optional[PromptTemplateRegistry] = None,
+                 completion_cache: Optional[CompletionCache] = None):
         """
         Initialize the PerplexityService.
         
         Args:
             rate_limiter: Optional rate limiter for Perplexity API calls.
                          If not provided, no rate limiting will be applied.
+            rate_limit_wait_seconds: How long to block waiting for a rate limit
+                         slot before reporting rate_limited. Defaults to 0
+                         (fail immediately, the historical behaviour).
+            prompt_templates: Optional registry for per-campaign prompt overrides.
+                         If not provided, the built-in prompts are used.
+            completion_cache: Optional cache of completions by prompt hash.
+                         If not provided, every prompt is sent to the API.
         """
-        self.token = os.getenv("PERPLEXITY_TOKEN")
-        if not self.token:
+        tokens = get_vendor_credentials("PERPLEXITY_TOKENS", "PERPLEXITY_TOKEN")
+        if not tokens:
             raise RuntimeError("PERPLEXITY_TOKEN environment variable is not set")
+        self.token = tokens[0]
+        if settings.PERPLEXITY_BASE_URL:
+            self.API_URL = f"{settings.PERPLEXITY_BASE_URL.rstrip('/')}/chat/completions"
         self.headers = {
             "Authorization": f"Bearer {self.token}",
             "Content-Type": "application/json"
         }
         self.rate_limiter = rate_limiter
+        self.rate_limit_wait_seconds = rate_limit_wait_seconds
+        self.prompt_templates = prompt_templates or PromptTemplateRegistry()
+        self.completion_cache = completion_cache
+        self.transport = VendorTransport(
+            'perplexity',
+            read_timeout=settings.PERPLEXITY_HTTP_TIMEOUT,
+            budget_seconds=settings.PERPLEXITY_HTTP_BUDGET_SECONDS,
+            max_attempts=self.MAX_RETRIES,
+            backoff_base=self.RETRY_DELAY
+        )
         
         # Log rate limiting status for monitoring
         if self.rate_limiter:
@@ -145,8 +174,11 @@ class PerplexityService:
                 # Get timing information before checking rate limit
                 time_since_last_request = self.rate_limiter.get_time_since_last_request()
                 
-                # Check if request is allowed
-                is_allowed = self.rate_limiter.acquire()
+                # Check if request is allowed (optionally waiting for a free slot)
+                if self.rate_limit_wait_seconds > 0:
+                    is_allowed = self.rate_limiter.acquire(block=True, timeout=self.rate_limit_wait_seconds)
+                else:
+                    is_allowed = self.rate_limiter.acquire()
                 remaining = self.rate_limiter.get_remaining()
                 
                 # Log the attempt with timing information
@@ -226,11 +258,15 @@ class PerplexityService:
             
         return None
 
-    def build_prompt(self, lead: Lead) -> Dict[str, Any]:
+    def build_prompt(self, lead: Lead, company_context: Optional[str] = None) -> Dict[str, Any]:
         """
         Build a prompt for Perplexity enrichment using lead details.
         Args:
             lead: Lead object
+            company_context: Optional company-level enrichment text shared by all
+                leads at the same company. When present it is merged into the
+                slimmer perplexity_lead_focused prompt, which only researches the
+                person.
         Returns:
             dict: The prompt JSON with lead details filled in.
         Raises:
@@ -270,28 +306,70 @@ class PerplexityService:
             logger.error(error_msg, extra={'component': 'perplexity_service'})
             raise ValueError(error_msg)
 
-        prompt = {
-            "model": "llama-3.1-sonar-small-128k-online",
-            "messages": [
-                {"role": "system", "content": "Be precise and concise."},
-                {"role": "user", "content": f"{first_name} {last_name} who is the {headline} at {company_name}"}
-            ],
-            "temperature": 0.2,
-            "top_p": 0.9,
-            "search_domain_filter": ["perplexity.ai"],
-            "return_images": False,
-            "return_related_questions": False,
-            "search_recency_filter": "month",
-            "top_k": 0,
-            "stream": False,
-            "presence_penalty": 0,
-            "frequency_penalty": 1
+        values = {
+            'first_name': first_name,
+            'last_name': last_name,
+            'headline': headline,
+            'title': getattr(lead, 'title', '') or '',
+            'company_name': company_name
         }
-        # Log the built prompt
-        logger.info(f"Built Perplexity prompt for lead {getattr(lead, 'id', None)}: {prompt}", extra={'component': 'perplexity_service'})
+        campaign_id = getattr(lead, 'campaign_id', None)
+        if company_context:
+            template = self.prompt_templates.get('perplexity_lead_focused', campaign_id)
+            values = {**values, 'company_context': company_context}
+        else:
+            template = self.prompt_templates.get('perplexity_lead', campaign_id)
+        prompt = template.build_request(template.render(values))
+        if should_sample('prompt'):
+            logger.info(f"Built Perplexity prompt for lead {getattr(lead, 'id', None)}: {log_payload(prompt)}", extra={'component': 'perplexity_service'})
         return prompt
 
-    def enrich_lead(self, lead: Lead) -> Dict[str, Any]:
+    def build_company_prompt(self, company_name: str) -> Dict[str, Any]:
+        """
+        Build a company-level prompt for Perplexity enrichment.
+        Args:
+            company_name: Company name as found on the lead
+        Returns:
+            dict: The prompt JSON for the company lookup.
+        Raises:
+            ValueError: If the company name is missing.
+        """
+        if not company_name:
+            raise ValueError("Company name is required")
+
+        # Company context is shared across campaigns, so only global overrides apply
+        template = self.prompt_templates.get('perplexity_company')
+        return template.build_request(template.render({'company_name': company_name}))
+
+    def enrich_company(self, company_name: str) -> Dict[str, Any]:
+        """
+        Enrich a company using Perplexity API.
+        
+        Company results are meant to be cached and shared across every lead at
+        the company (see CompanyEnrichmentService), so this is called at most
+        once per company per cache window.
+        
+        Args:
+            company_name: Company name to enrich
+        Returns:
+            dict: Enrichment results or error response
+        """
+        correlation_id = current_trace_id() or str(uuid.uuid4())
+        subject_id = f"company:{company_name}"
+        
+        logger.info(
+            f"Starting company enrichment for '{company_name}' with correlation_id {correlation_id}",
+            extra={
+                'component': 'perplexity_service',
+                'correlation_id': correlation_id,
+                'company_name': company_name
+            }
+        )
+
+        prompt = self.build_company_prompt(company_name)
+        return self._request_completion(prompt, subject_id, correlation_id)
+
+    def enrich_lead(self, lead: Lead, company_context: Optional[str] = None) -> Dict[str, Any]:
         """
         Enrich a single lead using Perplexity API with comprehensive timing logging.
         
@@ -300,14 +378,17 @@ class PerplexityService:
         
         Args:
             lead: Lead object to enrich
+            company_context: Optional shared company context, merged into the
+                prompt. The result also carries it as 'company_context' for the
+                email copy.
         Returns:
             dict: Enrichment results or error response
         """
         if not lead:
             raise ValueError("Lead is required")
 
-        # Generate correlation ID for tracking this request across logs
-        correlation_id = str(uuid.uuid4())
+        # Correlation ID for tracking this request across logs: the trace id when tracing is on
+        correlation_id = current_trace_id() or str(uuid.uuid4())
         lead_id = str(getattr(lead, 'id', 'unknown'))
         
         logger.info(
@@ -319,137 +400,174 @@ class PerplexityService:
             }
         )
 
-        prompt = self.build_prompt(lead)
-        
-        for attempt in range(self.MAX_RETRIES):
-            attempt_number = attempt + 1
-            
-            # Check rate limiting with comprehensive logging
-            rate_limit_error = self._check_rate_limit(
-                f"enrich_lead for lead {lead_id}", 
-                lead_id, 
-                correlation_id, 
-                attempt_number
-            )
-            if rate_limit_error:
-                return rate_limit_error
+        prompt = self.build_prompt(lead, company_context=company_context)
+        result = self._request_completion(prompt, lead_id, correlation_id)
+        if company_context and result and 'choices' in result:
+            # A copy, as the result may be the completion cache's entry
+            result = {**result, 'company_context': company_context}
+        return result
 
-            try:
+    def _request_completion(self, prompt: Dict[str, Any], lead_id: str, correlation_id: str) -> Dict[str, Any]:
+        """
+        Send a prompt to the Perplexity API with rate limiting, retries and timing logs.
+        
+        Args:
+            prompt: Request JSON built by build_prompt/build_company_prompt
+            lead_id: ID of the lead (or company subject) used for logging
+            correlation_id: Correlation ID for tracking this request
+        Returns:
+            dict: API response or error response
+        """
+        if self.completion_cache:
+            cached = self.completion_cache.get('perplexity', prompt)
+            if cached is not None:
                 logger.info(
-                    f"Making Perplexity API request for lead {lead_id} "
-                    f"(attempt {attempt_number}/{self.MAX_RETRIES}, correlation_id: {correlation_id})",
+                    f"Using cached Perplexity completion for {lead_id} (correlation_id: {correlation_id})",
                     extra={
                         'component': 'perplexity_service',
                         'correlation_id': correlation_id,
                         'lead_id': lead_id,
-                        'attempt_number': attempt_number
+                        'completion_cache': 'hit'
                     }
                 )
-                
-                # Record start time for response timing
-                request_start_time = time.time()
-                
-                response = requests.post(self.API_URL, json=prompt, headers=self.headers, timeout=30)
-                
-                # Calculate response time
-                response_time_ms = (time.time() - request_start_time) * 1000
-                
-                response.raise_for_status()
-                result = response.json()
-                
-                # Log successful response
-                self._log_request_response(
-                    correlation_id=correlation_id,
-                    response_status="success",
-                    response_time_ms=response_time_ms,
-                    api_response_code=response.status_code
-                )
-                
-                # Log rate limiting status for monitoring
-                if self.rate_limiter:
-                    remaining = self.rate_limiter.get_remaining()
-                    logger.info(
-                        f"Lead enrichment successful for lead {lead_id}. "
-                        f"Rate limiter remaining: {remaining}, correlation_id: {correlation_id}",
-                        extra={
-                            'component': 'perplexity_service',
-                            'lead_id': lead_id,
-                            'rate_limiter_remaining': remaining,
-                            'correlation_id': correlation_id,
-                            'response_time_ms': response_time_ms
-                        }
-                    )
-                else:
-                    logger.info(
-                        f"Lead enrichment successful for lead {lead_id}, correlation_id: {correlation_id}",
-                        extra={
-                            'component': 'perplexity_service',
-                            'lead_id': lead_id,
-                            'correlation_id': correlation_id,
-                            'response_time_ms': response_time_ms
-                        }
-                    )
-                
-                return result
-                
-            except requests.RequestException as e:
-                # Calculate response time even for failed requests
-                response_time_ms = (time.time() - request_start_time) * 1000 if 'request_start_time' in locals() else 0.0
-                
-                error_msg = f"Perplexity API request failed for lead {lead_id}: {str(e)}"
-                
-                # Extract status code if available
-                api_response_code = None
-                if hasattr(e, 'response') and e.response is not None:
-                    api_response_code = e.response.status_code
-                
-                # Log failed response
-                self._log_request_response(
-                    correlation_id=correlation_id,
-                    response_status="error",
-                    response_time_ms=response_time_ms,
-                    api_response_code=api_response_code,
-                    error_details=str(e)
-                )
-                
-                logger.error(
-                    f"{error_msg} (correlation_id: {correlation_id}, attempt: {attempt_number})",
+                return cached
+
+        # Retries (with backoff) happen inside the transport, so a call takes
+        # one rate limiter slot however many attempts it needs
+        attempt_number = 1
+        
+        # Check rate limiting with comprehensive logging
+        rate_limit_error = self._check_rate_limit(
+            f"enrich_lead for lead {lead_id}", 
+            lead_id, 
+            correlation_id, 
+            attempt_number
+        )
+        if rate_limit_error:
+            return rate_limit_error
+
+        try:
+            logger.info(
+                f"Making Perplexity API request for lead {lead_id} "
+                f"(correlation_id: {correlation_id})",
+                extra={
+                    'component': 'perplexity_service',
+                    'correlation_id': correlation_id,
+                    'lead_id': lead_id
+                }
+            )
+            
+            # Record start time for response timing
+            request_start_time = time.time()
+            
+            # With a credential pool, the call uses the token the limiter slot was taken on
+            headers = self.headers
+            pool = self.rate_limiter if isinstance(self.rate_limiter, CredentialPool) else None
+            if pool and pool.credential:
+                headers = {**self.headers, "Authorization": f"Bearer {pool.credential}"}
+
+            # Completions have no side effects, so read failures are retried too
+            response = self.transport.post(self.API_URL, idempotent=True, json=prompt, headers=headers)
+            
+            # Calculate response time
+            response_time_ms = (time.time() - request_start_time) * 1000
+
+            if pool:
+                pool.report_status(response.status_code, response.headers)
+            
+            response.raise_for_status()
+            result = response.json()
+            
+            # Log successful response
+            self._log_request_response(
+                correlation_id=correlation_id,
+                response_status="success",
+                response_time_ms=response_time_ms,
+                api_response_code=response.status_code
+            )
+            
+            # Log rate limiting status for monitoring
+            if self.rate_limiter:
+                remaining = self.rate_limiter.get_remaining()
+                logger.info(
+                    f"Lead enrichment successful for lead {lead_id}. "
+                    f"Rate limiter remaining: {remaining}, correlation_id: {correlation_id}",
                     extra={
                         'component': 'perplexity_service',
-                        'correlation_id': correlation_id,
                         'lead_id': lead_id,
-                        'attempt_number': attempt_number,
-                        'api_response_code': api_response_code,
+                        'rate_limiter_remaining': remaining,
+                        'correlation_id': correlation_id,
                         'response_time_ms': response_time_ms
                     }
                 )
-                
-                if attempt < self.MAX_RETRIES - 1:
-                    continue
-                return {'error': error_msg}
-                
-            except Exception as e:
-                # Calculate response time even for unexpected errors
-                response_time_ms = (time.time() - request_start_time) * 1000 if 'request_start_time' in locals() else 0.0
-                
-                error_msg = f"Unexpected error enriching lead {lead_id}: {str(e)}"
-                
-                # Log unexpected error
-                self._log_request_response(
-                    correlation_id=correlation_id,
-                    response_status="error",
-                    response_time_ms=response_time_ms,
-                    error_details=str(e)
-                )
-                
-                logger.error(
-                    f"{error_msg} (correlation_id: {correlation_id}, attempt: {attempt_number})",
+            else:
+                logger.info(
+                    f"Lead enrichment successful for lead {lead_id}, correlation_id: {correlation_id}",
                     extra={
                         'component': 'perplexity_service',
-                        'correlation_id': correlation_id,
                         'lead_id': lead_id,
-                        'attempt_number': attempt_number,
+                        'correlation_id': correlation_id,
                         'response_time_ms': response_time_ms
                     }
                 )
-                return {'error': error_msg} 
\ No newline at end of file
+            
+            if self.completion_cache:
+                self.completion_cache.set('perplexity', prompt, result)
+            return result
+            
+        except requests.RequestException as e:
+            # Calculate response time even for failed requests
+            response_time_ms = (time.time() - request_start_time) * 1000 if 'request_start_time' in locals() else 0.0
+            
+            error_msg = f"Perplexity API request failed for lead {lead_id}: {str(e)}"
+            
+            # Extract status code if available
+            api_response_code = None
+            if hasattr(e, 'response') and e.response is not None:
+                api_response_code = e.response.status_code
+            
+            # Log failed response
+            self._log_request_response(
+                correlation_id=correlation_id,
+                response_status="error",
+                response_time_ms=response_time_ms,
+                api_response_code=api_response_code,
+                error_details=str(e)
+            )
+            
+            logger.error(
+                f"{error_msg} (correlation_id: {correlation_id})",
+                extra={
+                    'component': 'perplexity_service',
+                    'correlation_id': correlation_id,
+                    'lead_id': lead_id,
+                    'api_response_code': api_response_code,
+                    'response_time_ms': response_time_ms
+                }
+            )
+            return {'error': error_msg}
+            
+        except Exception as e:
+            # Calculate response time even for unexpected errors
+            response_time_ms = (time.time() - request_start_time) * 1000 if 'request_start_time' in locals() else 0.0
+            
+            error_msg = f"Unexpected error enriching lead {lead_id}: {str(e)}"
+            
+            # Log unexpected error
+            self._log_request_response(
+                correlation_id=correlation_id,
+                response_status="error",
+                response_time_ms=response_time_ms,
+                error_details=str(e)
+            )
+            
+            logger.error(
+                f"{error_msg} (correlation_id: {correlation_id})",
+                extra={
+                    'component': 'perplexity_service',
+                    'correlation_id': correlation_id,
+                    'lead_id': lead_id,
+                    'response_time_ms': response_time_ms
+                }
+            )
+            return {'error': error_msg} 
\ No newline at end of file
@@ -0,0 +1,291 @@
+import json
+import string
+import time
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Built-in prompts. A row in prompt_templates with the same name overrides one
+# for a campaign, an organization or globally. User templates use
+# str.format-style {field} placeholders; literal braces are written {{ }}.
+DEFAULT_TEMPLATES: Dict[str, Dict[str, Any]] = {
+    'perplexity_lead': {
+        'model': "llama-3.1-sonar-small-128k-online",
+        'system_prompt': "Be precise and concise.",
+        'user_template': "{first_name} {last_name} who is the {headline} at {company_name}",
+        'parameters': {
+            "temperature": 0.2,
+            "top_p": 0.9,
+            "search_domain_filter": ["perplexity.ai"],
+            "return_images": False,
+            "return_related_questions": False,
+            "search_recency_filter": "month",
+            "top_k": 0,
+            "stream": False,
+            "presence_penalty": 0,
+            "frequency_penalty": 1
+        }
+    },
+    # Used instead of perplexity_lead when the company is already researched
+    # (CompanyEnrichmentService): the known company context is given, so only
+    # the person is researched and the answer is shorter
+    'perplexity_lead_focused': {
+        'model': "llama-3.1-sonar-small-128k-online",
+        'system_prompt': "Be precise and concise.",
+        'user_template': (
+            "{first_name} {last_name} who is the {headline} at {company_name}\n\n"
+            "Known context about {company_name}:\n{company_context}\n\n"
+            "The company context above is already known; only describe {first_name} {last_name}: "
+            "their role, background and recent activity."
+        ),
+        'parameters': {
+            "temperature": 0.2,
+            "top_p": 0.9,
+            "max_tokens": 300,
+            "search_domain_filter": ["perplexity.ai"],
+            "return_images": False,
+            "return_related_questions": False,
+            "search_recency_filter": "month",
+            "top_k": 0,
+            "stream": False,
+            "presence_penalty": 0,
+            "frequency_penalty": 1
+        }
+    },
+    'perplexity_company': {
+        'model': "llama-3.1-sonar-small-128k-online",
+        'system_prompt': "Be precise and concise.",
+        'user_template': (
+            "Give a concise overview of the company {company_name}: what it does, "
+            "who its customers are, its approximate size, and any notable recent news."
+        ),
+        'parameters': {
+            "temperature": 0.2,
+            "top_p": 0.9,
+            "search_domain_filter": ["perplexity.ai"],
+            "return_images": False,
+            "return_related_questions": False,
+            "search_recency_filter": "month",
+            "top_k": 0,
+            "stream": False,
+            "presence_penalty": 0,
+            "frequency_penalty": 1
+        }
+    },
+    'email_copy': {
+        'model': "gpt-4",
+        'system_prompt': "You are a professional email copywriter.",
+        'user_template': """Write a personalized email to {full_name} at {company_name}.
+
+Enrichment Information:
+{enrichment_content}
+
+Lead Information:
+- Name: {full_name}
+- Company: {company_name}
+- Role: {title}
+
+Write a professional, personalized email that:
+1. Shows understanding of their business
+2. Offers specific value
+3. Has a clear call to action
+4. Is concise and engaging
+
+Email:""",
+        'parameters': {
+            'temperature': 0.7,
+            'max_tokens': 500
+        }
+    },
+}
+
+
+class CompiledPrompt:
+    """
+    A prompt template parsed once into literal text and field segments.
+
+    Rendering only substitutes named fields from the given values, so a
+    template stored in the database cannot reach attributes or indexes the
+    way str.format() can.
+    """
+
+    def __init__(self, name: str, model: str, system_prompt: str, user_template: str,
+                 parameters: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            name: Template name, e.g. 'email_copy'
+            model: Vendor model name sent with the request
+            system_prompt: System message content
+            user_template: User message template with {field} placeholders
+            parameters: Extra request parameters (temperature, max_tokens, ...)
+
+        Raises:
+            ValueError: If the template has an invalid or non-simple placeholder
+        """
+        self.name = name
+        self.model = model
+        self.system_prompt = system_prompt
+        self.parameters = dict(parameters or {})
+        self._segments = self._parse(user_template)
+        self.fields = frozenset(field for _, field in self._segments if field)
+
+    def _parse(self, user_template: str) -> List[Tuple[str, Optional[str]]]:
+        segments = []
+        for literal, field, format_spec, conversion in string.Formatter().parse(user_template):
+            if field is not None and (not field.isidentifier() or format_spec or conversion):
+                raise ValueError(f"Invalid placeholder '{{{field}}}' in prompt template '{self.name}'")
+            segments.append((literal, field))
+        return segments
+
+    def render(self, values: Dict[str, Any]) -> str:
+        """
+        Render the user message.
+
+        Raises:
+            ValueError: If a placeholder has no value
+        """
+        missing = self.fields - values.keys()
+        if missing:
+            raise ValueError(
+                f"Missing values for prompt template '{self.name}': {', '.join(sorted(missing))}"
+            )
+        return ''.join(
+            literal + ('' if field is None else str(values[field]))
+            for literal, field in self._segments
+        )
+
+    def build_request(self, user_content: str) -> Dict[str, Any]:
+        """Wrap a rendered user message in a chat completion request body."""
+        return {
+            'model': self.model,
+            'messages': [
+                {"role": "system", "content": self.system_prompt},
+                {"role": "user", "content": user_content}
+            ],
+            **self.parameters
+        }
+
+
+@lru_cache(maxsize=256)
+def compile_prompt(name: str, model: str, system_prompt: str, user_template: str,
+                   parameters_json: str = "{}") -> CompiledPrompt:
+    """
+    Compile a template once per process.
+
+    Identical template text always returns the same CompiledPrompt.
+    Parameters are passed as a JSON string so they can be part of the cache key.
+    """
+    return CompiledPrompt(name, model, system_prompt, user_template, json.loads(parameters_json))
+
+
+def get_default_prompt(name: str) -> CompiledPrompt:
+    """
+    Get a built-in prompt.
+
+    Raises:
+        KeyError: If there is no built-in prompt with this name
+    """
+    template = DEFAULT_TEMPLATES[name]
+    return compile_prompt(
+        name, template['model'], template['system_prompt'], template['user_template'],
+        json.dumps(template['parameters'], sort_keys=True)
+    )
+
+
+# (name, campaign_id) -> (expires_at, prompt), shared by every registry in the process
+_resolved: Dict[Tuple[str, Optional[str]], Tuple[float, CompiledPrompt]] = {}
+
+
+class PromptTemplateRegistry:
+    """
+    Resolves which prompt a vendor service should use for a campaign.
+
+    Resolution order: campaign template, organization template, global
+    template (a row with neither set), built-in default. Resolved prompts are
+    kept in-process for PROMPT_TEMPLATE_CACHE_SECONDS, so template edits take
+    effect within that window without a query per lead. Without a database
+    session only the built-in defaults are used.
+    """
+
+    def __init__(self, db: Optional[Session] = None, cache_seconds: Optional[int] = None):
+        """
+        Initialize the PromptTemplateRegistry.
+
+        Args:
+            db: Database session for template overrides
+            cache_seconds: In-process cache window, defaults to settings
+        """
+        self.db = db
+        self.cache_seconds = settings.PROMPT_TEMPLATE_CACHE_SECONDS if cache_seconds is None else cache_seconds
+
+    def get(self, name: str, campaign_id: Optional[str] = None) -> CompiledPrompt:
+        """
+        Get the prompt to use.
+
+        Args:
+            name: Template name, e.g. 'perplexity_lead'
+            campaign_id: Campaign the prompt is for, None for shared prompts
+
+        Returns:
+            CompiledPrompt: The most specific template available
+
+        Raises:
+            KeyError: If the name has neither an override nor a built-in default
+        """
+        if self.db is None:
+            return get_default_prompt(name)
+
+        key = (name, campaign_id)
+        cached = _resolved.get(key)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+
+        prompt = None
+        try:
+            override = self._find_override(name, campaign_id)
+            if override:
+                prompt = compile_prompt(
+                    name, override.model, override.system_prompt, override.user_template,
+                    json.dumps(override.parameters or {}, sort_keys=True)
+                )
+        except Exception as e:
+            # A broken override must not stop enrichment; fall back to the built-in prompt
+            logger.warning(
+                f"Error loading prompt template '{name}' for campaign {campaign_id}: {e}",
+                extra={'component': 'prompt_templates', 'template_name': name, 'campaign_id': campaign_id}
+            )
+        if prompt is None:
+            prompt = get_default_prompt(name)
+
+        _resolved[key] = (time.monotonic() + self.cache_seconds, prompt)
+        return prompt
+
+    def _find_override(self, name: str, campaign_id: Optional[str]):
+        from app.models.campaign import Campaign
+        from app.models.prompt_template import PromptTemplate
+
+        organization_id = None
+        if campaign_id:
+            organization_id = self.db.query(Campaign.organization_id).filter(Campaign.id == campaign_id).scalar()
+
+        rows = self.db.query(PromptTemplate).filter(
+            PromptTemplate.name == name,
+            or_(PromptTemplate.campaign_id.is_(None), PromptTemplate.campaign_id == campaign_id),
+            or_(PromptTemplate.organization_id.is_(None), PromptTemplate.organization_id == organization_id)
+        ).all()
+        if not rows:
+            return None
+        # Most specific scope wins
+        return min(rows, key=lambda row: 0 if row.campaign_id else 1 if row.organization_id else 2)
+
+
+def clear_prompt_cache() -> None:
+    """Drop resolved prompts so the next lookup reads the database again."""
+    _resolved.clear()
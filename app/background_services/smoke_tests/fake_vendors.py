@@ -0,0 +1,288 @@
+"""
+Local stand-ins for the vendor APIs used by the lead pipeline.
+
+One in-process HTTP server answers for every vendor. The first path segment
+selects the vendor:
+
+    POST /perplexity/chat/completions            Perplexity chat completion
+    POST /openai/v1/chat/completions             OpenAI chat completion, streamed (SSE) when "stream" is set
+    POST /instantly/api/v2/leads                 Instantly lead
+    POST /instantly/api/v2/leads/add             Instantly bulk leads
+    POST /instantly/api/v2/campaigns             Instantly campaign
+    POST /millionverifier/bulkapi/v2/upload      MillionVerifier bulk file upload
+    GET  /millionverifier/bulkapi/v2/fileinfo    MillionVerifier bulk file status (finished straight away)
+    GET  /millionverifier/bulkapi/v2/download    MillionVerifier bulk results (every email 'ok')
+
+Each vendor has a VendorProfile. It sets a latency distribution and the
+share of requests answered with a 500 or a 429. Every vendor draws from its
+own seeded random generator, so a run with the same seed produces the same
+sequence of latencies and failures for each vendor.
+
+Usage:
+    server = FakeVendorServer({'perplexity': VendorProfile.parse('latency=0.8,429=0.05')}, seed=1).start()
+    with patch.object(settings, 'PERPLEXITY_BASE_URL', server.url('perplexity')):
+        ...
+    server.stop()
+"""
+import csv
+import io
+import itertools
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from email.parser import BytesParser
+from email.policy import default as default_policy
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlparse
+
+VENDORS = ('perplexity', 'openai', 'instantly', 'millionverifier')
+
+
+class VendorProfile:
+    """
+    Latency and failure distribution of one fake vendor.
+
+    Args:
+        latency: Median response time in seconds
+        jitter: Log-normal sigma around the median (0 for a fixed latency)
+        error_rate: Share of requests answered with HTTP 500
+        rate_limit_rate: Share of requests answered with HTTP 429
+        retry_after: Retry-After seconds sent with a 429
+    """
+
+    def __init__(self, latency: float = 0.2, jitter: float = 0.3, error_rate: float = 0.0,
+                 rate_limit_rate: float = 0.0, retry_after: int = 1):
+        if error_rate + rate_limit_rate > 1:
+            raise ValueError("error_rate + rate_limit_rate can't exceed 1")
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+
+    @classmethod
+    def parse(cls, spec: str) -> "VendorProfile":
+        """Build a profile from 'latency=0.8,jitter=0.3,errors=0.02,429=0.05,retry_after=2'."""
+        names = {'latency': 'latency', 'jitter': 'jitter', 'errors': 'error_rate',
+                 '429': 'rate_limit_rate', 'retry_after': 'retry_after'}
+        kwargs = {}
+        for item in filter(None, (part.strip() for part in spec.split(','))):
+            key, _, value = item.partition('=')
+            if key not in names:
+                raise ValueError(f"Unknown profile field '{key}', expected one of {', '.join(names)}")
+            kwargs[names[key]] = int(value) if key == 'retry_after' else float(value)
+        return cls(**kwargs)
+
+    def sample(self, rng: random.Random):
+        """Draw (delay_seconds, status) for one request."""
+        delay = self.latency * math.exp(rng.gauss(0, self.jitter)) if self.jitter else self.latency
+        roll = rng.random()
+        if roll < self.rate_limit_rate:
+            return delay, 429
+        if roll < self.rate_limit_rate + self.error_rate:
+            return delay, 500
+        return delay, 200
+
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            'latency': self.latency,
+            'jitter': self.jitter,
+            'error_rate': self.error_rate,
+            'rate_limit_rate': self.rate_limit_rate,
+            'retry_after': self.retry_after
+        }
+
+
+class FakeVendorServer:
+    """In-process HTTP server answering for Perplexity, OpenAI, Instantly and MillionVerifier."""
+
+    def __init__(self, profiles: Optional[Dict[str, VendorProfile]] = None, seed: int = 0):
+        profiles = profiles or {}
+        self.profiles = {vendor: profiles.get(vendor) or VendorProfile() for vendor in VENDORS}
+        self._rngs = {vendor: random.Random(f"{seed}:{vendor}") for vendor in VENDORS}
+        self._lock = threading.Lock()
+        self.stats = {vendor: {'requests': 0, 'ok': 0, 'rate_limited': 0, 'errors': 0} for vendor in VENDORS}
+        self.files: Dict[str, list] = {}
+        self._ids = itertools.count(1)
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    def url(self, vendor: str) -> str:
+        """Base URL to configure for a vendor (PERPLEXITY_BASE_URL, OPENAI_BASE_URL, ...)."""
+        host, port = self._server.server_address[:2]
+        suffix = {'openai': '/v1', 'instantly': '/api/v2', 'millionverifier': '/bulkapi/v2/'}.get(vendor, '')
+        return f"http://{host}:{port}/{vendor}{suffix}"
+
+    def start(self) -> "FakeVendorServer":
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def _draw(self, vendor: str):
+        with self._lock:
+            delay, status = self.profiles[vendor].sample(self._rngs[vendor])
+            stats = self.stats[vendor]
+            stats['requests'] += 1
+            stats[{200: 'ok', 429: 'rate_limited'}.get(status, 'errors')] += 1
+        return delay, status
+
+    def _completion(self, model: str, content: str) -> Dict:
+        return {
+            'id': f"chatcmpl-{uuid.uuid4().hex[:12]}",
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': model,
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': content},
+                'finish_reason': 'stop'
+            }],
+            'usage': {'prompt_tokens': 200, 'completion_tokens': 60, 'total_tokens': 260}
+        }
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status: int, body: bytes, content_type: str = "application/json", headers=None):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _json(self, payload, status: int = 200, headers=None):
+                self._send(status, json.dumps(payload).encode("utf-8"), headers=headers)
+
+            def _handle(self, method: str):
+                parsed = urlparse(self.path)
+                parts = parsed.path.strip("/").split("/")
+                vendor, route = parts[0], "/".join(parts[1:])
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0) or 0))
+                if vendor not in VENDORS:
+                    self._json({"error": "Not found"}, status=404)
+                    return
+
+                delay, status = server._draw(vendor)
+                time.sleep(delay)
+                if status == 429:
+                    retry_after = str(server.profiles[vendor].retry_after)
+                    self._json({"error": {"message": "Rate limit exceeded"}}, status=429,
+                               headers={"Retry-After": retry_after})
+                    return
+                if status != 200:
+                    self._json({"error": {"message": "Internal server error"}}, status=status)
+                    return
+
+                params = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+                getattr(self, f"_{vendor}")(method, route, body, params)
+
+            def _perplexity(self, method, route, body, params):
+                request = json.loads(body or b"{}")
+                self._json(server._completion(
+                    request.get('model', 'sonar'),
+                    "Works at a fast-growing company and recently expanded the sales team."
+                ))
+
+            def _openai(self, method, route, body, params):
+                request = json.loads(body or b"{}")
+                completion = server._completion(
+                    request.get('model', 'gpt-4o-mini'),
+                    "Hi there, I noticed your team is growing quickly and wanted to reach out."
+                )
+                if not request.get('stream'):
+                    self._json(completion)
+                    return
+
+                chunks = []
+                for word in completion['choices'][0]['message']['content'].split(' '):
+                    chunks.append({
+                        'id': completion['id'], 'object': 'chat.completion.chunk',
+                        'created': completion['created'], 'model': completion['model'],
+                        'choices': [{'index': 0, 'delta': {'content': word + ' '}, 'finish_reason': None}]
+                    })
+                chunks.append({
+                    'id': completion['id'], 'object': 'chat.completion.chunk',
+                    'created': completion['created'], 'model': completion['model'],
+                    'choices': [{'index': 0, 'delta': {}, 'finish_reason': 'stop'}]
+                })
+                chunks.append({
+                    'id': completion['id'], 'object': 'chat.completion.chunk',
+                    'created': completion['created'], 'model': completion['model'],
+                    'choices': [], 'usage': completion['usage']
+                })
+                events = "".join(f"data: {json.dumps(chunk)}\n\n" for chunk in chunks) + "data: [DONE]\n\n"
+                self._send(200, events.encode("utf-8"), content_type="text/event-stream")
+
+            def _instantly(self, method, route, body, params):
+                request = json.loads(body or b"{}")
+                if route == "api/v2/leads/add":
+                    created = [
+                        {'id': str(uuid.uuid4()), 'index': index, 'email': lead.get('email')}
+                        for index, lead in enumerate(request.get('leads', []))
+                    ]
+                    self._json({'status': 'success', 'created_leads': created, 'leads_uploaded': len(created)})
+                elif route == "api/v2/leads":
+                    self._json({'id': str(uuid.uuid4()), 'email': request.get('email'),
+                                'campaign': request.get('campaign')})
+                elif route == "api/v2/campaigns":
+                    self._json({'id': str(uuid.uuid4()), 'name': request.get('name')})
+                else:
+                    self._json({"error": "Not found"}, status=404)
+
+            def _millionverifier(self, method, route, body, params):
+                endpoint = route.rsplit("/", 1)[-1]
+                if endpoint == "upload":
+                    message = BytesParser(policy=default_policy).parsebytes(
+                        f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode("utf-8") + body
+                    )
+                    emails = []
+                    for part in message.iter_parts():
+                        if part.get_param("name", header="content-disposition") == "file_contents":
+                            text = part.get_payload(decode=True).decode("utf-8")
+                            emails = [row["email"] for row in csv.DictReader(io.StringIO(text))]
+                    file_id = str(next(server._ids))
+                    server.files[file_id] = emails
+                    self._json({"file_id": file_id, "status": "in_progress", "total_rows": len(emails)})
+                    return
+
+                emails = server.files.get(params.get("file_id", ""))
+                if emails is None:
+                    self._json({"error": "File not found"}, status=404)
+                elif endpoint == "fileinfo":
+                    self._json({"file_id": params["file_id"], "status": "finished", "percent": 100,
+                                "total_rows": len(emails)})
+                elif endpoint == "download":
+                    buffer = io.StringIO()
+                    writer = csv.writer(buffer)
+                    writer.writerow(["email", "quality", "result", "free", "role"])
+                    for email in emails:
+                        writer.writerow([email, "good", "ok", "no", "no"])
+                    self._send(200, buffer.getvalue().encode("utf-8"), content_type="text/csv")
+                else:
+                    self._json({"error": "Not found"}, status=404)
+
+            def do_GET(self):
+                self._handle("GET")
+
+            def do_POST(self):
+                self._handle("POST")
+
+        return Handler
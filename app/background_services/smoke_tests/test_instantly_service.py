@@ -54,7 +54,7 @@ class TestInstantlyService:
             with pytest.raises(ValueError, match="INSTANTLY_API_KEY environment variable is not set"):
                 InstantlyService()
 
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_create_lead_success_without_rate_limiter(self, mock_post):
         """Test successful lead creation without rate limiter."""
         # Setup mock response
@@ -84,10 +84,10 @@ class TestInstantlyService:
                 "personalization": 'Test personalization'
             },
             headers=service.headers,
-            timeout=30
+            timeout=service.transport.timeout
         )
 
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_create_lead_success_with_rate_limiter(self, mock_post):
         """Test successful lead creation with rate limiter."""
         # Setup mock response
@@ -139,7 +139,7 @@ class TestInstantlyService:
         assert 'remaining_requests' in result
         assert result['retry_after_seconds'] == 60
 
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_create_lead_api_error(self, mock_post):
         """Test lead creation with API error."""
         # Setup mock to raise exception
@@ -154,7 +154,7 @@ class TestInstantlyService:
         assert 'API Error' in result['error']
         assert 'payload' in result
 
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_create_campaign_success_without_rate_limiter(self, mock_post):
         """Test successful campaign creation without rate limiter."""
         # Setup mock response
@@ -193,10 +193,10 @@ class TestInstantlyService:
                 }
             },
             headers=service.headers,
-            timeout=30
+            timeout=service.transport.timeout
         )
 
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_create_campaign_success_with_rate_limiter(self, mock_post):
         """Test successful campaign creation with rate limiter."""
         # Setup mock response
@@ -248,7 +248,7 @@ class TestInstantlyService:
         assert 'remaining_requests' in result
         assert result['retry_after_seconds'] == 60
 
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_get_campaign_analytics_success_without_rate_limiter(self, mock_get):
         """Test successful campaign analytics retrieval without rate limiter."""
         # Setup mock response
@@ -273,10 +273,10 @@ class TestInstantlyService:
             "https://api.instantly.ai/api/v2/campaigns/analytics/overview",
             headers=service.headers,
             params={'id': 'camp-123'},
-            timeout=30
+            timeout=service.transport.timeout
         )
 
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_get_campaign_analytics_success_with_rate_limiter(self, mock_get):
         """Test successful campaign analytics retrieval with rate limiter."""
         # Setup mock response
@@ -335,7 +335,7 @@ class TestInstantlyService:
         
         rate_limiter = ApiIntegrationRateLimiter(mock_redis, 'Instantly', 100, 60)
         
-        with patch('requests.post') as mock_post:
+        with patch('requests.Session.post') as mock_post:
             # Setup successful API response
             mock_response = Mock()
             mock_response.json.return_value = {'id': 'lead-123', 'email': 'test@example.com'}
@@ -373,7 +373,7 @@ class TestInstantlyService:
         rate_limiter = ApiIntegrationRateLimiter(mock_redis, 'Instantly', 1, 60)
         service = InstantlyService(rate_limiter=rate_limiter)
         
-        with patch('requests.post') as mock_post:
+        with patch('requests.Session.post') as mock_post:
             mock_response = Mock()
             mock_response.json.return_value = {'id': 'lead-123'}
             mock_response.raise_for_status.return_value = None
@@ -10,7 +10,9 @@ This test suite validates the OpenAIService functionality including:
 
 import os
 import pytest
+from types import SimpleNamespace
 from unittest.mock import Mock, patch, MagicMock
+import httpx
 from app.background_services.openai_service import OpenAIService
 from app.core.api_integration_rate_limiter import ApiIntegrationRateLimiter
 from app.models import Lead
@@ -35,7 +37,9 @@ class TestOpenAIService:
             service = OpenAIService()
             
             assert service.rate_limiter is None
-            mock_openai.assert_called_once_with(api_key='test-api-key')
+            mock_openai.assert_called_once()
+            assert mock_openai.call_args.kwargs['api_key'] == 'test-api-key'
+            assert mock_openai.call_args.kwargs['timeout'] == settings.OPENAI_TOTAL_TIMEOUT
         
     def test_rate_limiter_initialization(self):
         """Test that OpenAIService can be initialized with rate limiter."""
@@ -51,7 +55,9 @@ class TestOpenAIService:
             service = OpenAIService(rate_limiter=rate_limiter)
             
             assert service.rate_limiter is rate_limiter
-            mock_openai.assert_called_once_with(api_key='test-api-key')
+            mock_openai.assert_called_once()
+            assert mock_openai.call_args.kwargs['api_key'] == 'test-api-key'
+            assert mock_openai.call_args.kwargs['timeout'] == settings.OPENAI_TOTAL_TIMEOUT
         
     def test_missing_api_key_raises_error(self):
         """Test that missing API key raises ValueError."""
@@ -362,6 +368,95 @@ class TestOpenAIService:
             assert 'id' in result
             mock_client.chat.completions.create.assert_called_once()
 
+def _chunk(content=None, finish_reason=None, usage=None):
+    """Build a streamed chat completion chunk."""
+    choices = []
+    if content is not None or finish_reason:
+        choices = [SimpleNamespace(delta=SimpleNamespace(content=content), finish_reason=finish_reason)]
+    return SimpleNamespace(
+        id='chatcmpl-stream', model='gpt-4', created=1700000000, choices=choices,
+        usage=SimpleNamespace(model_dump=lambda: usage) if usage else None
+    )
+
+
+class TestOpenAIServiceStreaming:
+    """Test streamed email copy generation with deadlines and metrics."""
+
+    @pytest.fixture(autouse=True)
+    def streaming_service(self):
+        with patch.dict('os.environ', {'OPENAI_API_KEY': 'test-api-key'}), \
+             patch.object(settings, 'OPENAI_STREAMING_ENABLED', True), \
+             patch.object(settings, 'OPENAI_FIRST_TOKEN_TIMEOUT', 5.0), \
+             patch.object(settings, 'OPENAI_TOTAL_TIMEOUT', 20.0), \
+             patch('app.background_services.openai_service.OpenAI') as mock_openai_class:
+            self.stream_client = Mock()
+            mock_openai_class.return_value.with_options.return_value = self.stream_client
+            self.circuit_breaker = Mock()
+            self.service = OpenAIService(circuit_breaker=self.circuit_breaker)
+            yield
+
+    def _generate(self, chunks, clock):
+        stream = MagicMock()
+        stream.__iter__.return_value = iter(chunks)
+        self.stream_client.chat.completions.create.return_value = stream
+        lead = TestOpenAIService().create_mock_lead()
+        with patch('app.background_services.openai_service.time.monotonic', side_effect=clock):
+            result = self.service.generate_email_copy(lead, {})
+        return result, stream
+
+    def test_stream_is_assembled_with_metrics(self):
+        chunks = [
+            _chunk(content=''),
+            _chunk(content='Hi John, '),
+            _chunk(content='great to meet you.', finish_reason='stop'),
+            _chunk(usage={'prompt_tokens': 100, 'completion_tokens': 8, 'total_tokens': 108})
+        ]
+        # started, one tick per chunk, finished
+        result, stream = self._generate(chunks, [0.0, 0.5, 1.0, 2.0, 2.0, 3.0])
+
+        assert result['choices'][0]['message']['content'] == 'Hi John, great to meet you.'
+        assert result['choices'][0]['finish_reason'] == 'stop'
+        assert result['usage']['completion_tokens'] == 8
+        assert result['metrics']['ttft_seconds'] == 1.0
+        assert result['metrics']['total_seconds'] == 3.0
+        assert result['metrics']['tokens_per_second'] == 4.0
+        call_kwargs = self.stream_client.chat.completions.create.call_args.kwargs
+        assert call_kwargs['stream'] is True
+        assert call_kwargs['stream_options'] == {'include_usage': True}
+        stream.close.assert_called_once()
+
+    def test_first_token_deadline_cancels_stream(self):
+        chunks = [_chunk(content=''), _chunk(content=''), _chunk(content='late')]
+        result, stream = self._generate(chunks, [0.0, 1.0, 6.0, 7.0])
+
+        assert result['status'] == 'error'
+        assert result['error_type'] == 'timeout'
+        assert result['timeout_phase'] == 'first_token'
+        stream.close.assert_called_once()
+        self.circuit_breaker.record_failure.assert_called_once()
+        assert self.circuit_breaker.record_failure.call_args.args[1] == 'timeout'
+
+    def test_total_deadline_keeps_partial_content(self):
+        chunks = [_chunk(content='Hi John, '), _chunk(content='this is '), _chunk(content='slow')]
+        result, stream = self._generate(chunks, [0.0, 1.0, 10.0, 21.0])
+
+        assert result['timeout_phase'] == 'total'
+        assert result['partial_content'] == 'Hi John, this is slow'
+        stream.close.assert_called_once()
+
+    def test_read_timeout_mid_stream_is_reported(self):
+        stream = MagicMock()
+        stream.__iter__.side_effect = httpx.ReadTimeout("timed out")
+        self.stream_client.chat.completions.create.return_value = stream
+        lead = TestOpenAIService().create_mock_lead()
+
+        result = self.service.generate_email_copy(lead, {})
+
+        assert result['error_type'] == 'timeout'
+        assert result['timeout_phase'] == 'first_token'
+        stream.close.assert_called_once()
+
+
 # Integration tests that could be run with actual services (when available)
 class TestOpenAIServiceIntegration:
     """Integration tests for OpenAIService (require external services)."""
@@ -142,7 +142,7 @@ class TestPerplexityService:
         with pytest.raises(ValueError, match="Lead is required"):
             service.build_prompt(None)
 
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_enrich_lead_success_without_rate_limiter(self, mock_post):
         """Test successful lead enrichment without rate limiter."""
         # Mock successful API response
@@ -158,7 +158,7 @@ class TestPerplexityService:
         assert result == {'choices': [{'message': {'content': 'Test enrichment'}}]}
         mock_post.assert_called_once()
 
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_enrich_lead_success_with_rate_limiter(self, mock_post):
         """Test successful lead enrichment with rate limiter."""
         # Mock successful API response
@@ -198,7 +198,7 @@ class TestPerplexityService:
         self.mock_rate_limiter.acquire.side_effect = Exception("Redis connection failed")
         self.mock_rate_limiter.get_time_since_last_request.side_effect = Exception("Redis connection failed")
         
-        with patch('requests.post') as mock_post:
+        with patch('requests.Session.post') as mock_post:
             mock_response = Mock()
             mock_response.json.return_value = {'choices': [{'message': {'content': 'Test enrichment'}}]}
             mock_response.raise_for_status.return_value = None
@@ -212,8 +212,9 @@ class TestPerplexityService:
             assert result == {'choices': [{'message': {'content': 'Test enrichment'}}]}
             mock_post.assert_called_once()
 
-    @patch('requests.post')
-    def test_enrich_lead_api_error_with_retries(self, mock_post):
+    @patch('app.core.vendor_http.time.sleep')
+    @patch('requests.Session.post')
+    def test_enrich_lead_api_error_with_retries(self, mock_post, mock_sleep):
         """Test lead enrichment with API errors and retries."""
         # First two calls fail, third succeeds
         successful_response = Mock()
@@ -222,8 +223,8 @@ class TestPerplexityService:
         successful_response.status_code = 200
         
         mock_post.side_effect = [
-            requests.RequestException("Connection error"),
-            requests.RequestException("Timeout error"),
+            requests.ConnectionError("Connection error"),
+            requests.Timeout("Timeout error"),
             successful_response
         ]
         
@@ -232,11 +233,13 @@ class TestPerplexityService:
         
         assert result == {'choices': [{'message': {'content': 'Success after retries'}}]}
         assert mock_post.call_count == 3
+        assert mock_sleep.call_count == 2  # backoff between attempts
 
-    @patch('requests.post')
-    def test_enrich_lead_all_retries_fail(self, mock_post):
+    @patch('app.core.vendor_http.time.sleep')
+    @patch('requests.Session.post')
+    def test_enrich_lead_all_retries_fail(self, mock_post, mock_sleep):
         """Test lead enrichment when all retries fail."""
-        mock_post.side_effect = requests.RequestException("Persistent error")
+        mock_post.side_effect = requests.ConnectionError("Persistent error")
         
         service = PerplexityService()
         result = service.enrich_lead(self.test_lead)
@@ -245,7 +248,18 @@ class TestPerplexityService:
         assert 'Perplexity API request failed' in result['error']
         assert mock_post.call_count == 3  # MAX_RETRIES
 
-    @patch('requests.post')
+    @patch('requests.Session.post')
+    def test_enrich_lead_non_retryable_error(self, mock_post):
+        """Test that errors which are not safe to repeat are not retried."""
+        mock_post.side_effect = requests.exceptions.InvalidURL("Bad URL")
+        
+        service = PerplexityService()
+        result = service.enrich_lead(self.test_lead)
+        
+        assert 'Perplexity API request failed' in result['error']
+        mock_post.assert_called_once()
+
+    @patch('requests.Session.post')
     def test_enrich_lead_unexpected_error(self, mock_post):
         """Test lead enrichment with unexpected error."""
         mock_post.side_effect = Exception("Unexpected error")
@@ -298,7 +312,7 @@ class TestPerplexityService:
 
     def test_timing_logging_functionality(self):
         """Test the new timing and logging functionality works correctly."""
-        with patch('requests.post') as mock_post:
+        with patch('requests.Session.post') as mock_post:
             # Mock successful API response
             mock_response = Mock()
             mock_response.json.return_value = {'choices': [{'message': {'content': 'Test enrichment'}}]}
@@ -354,7 +368,7 @@ class TestPerplexityService:
 
     def test_timing_logging_without_rate_limiter(self):
         """Test timing logging works correctly without rate limiter."""
-        with patch('requests.post') as mock_post:
+        with patch('requests.Session.post') as mock_post:
             # Mock successful API response
             mock_response = Mock()
             mock_response.json.return_value = {'choices': [{'message': {'content': 'Test enrichment'}}]}
@@ -433,7 +447,7 @@ class TestPerplexityService:
 
     def test_correlation_id_consistency(self):
         """Test that correlation ID is consistent across all logs for a single request."""
-        with patch('requests.post') as mock_post:
+        with patch('requests.Session.post') as mock_post:
             # Mock successful API response
             mock_response = Mock()
             mock_response.json.return_value = {'choices': [{'message': {'content': 'Test enrichment'}}]}
@@ -473,7 +487,7 @@ class TestPerplexityService:
 
     def test_request_timing_accuracy(self):
         """Test that request timing measurements are reasonable."""
-        with patch('requests.post') as mock_post:
+        with patch('requests.Session.post') as mock_post:
             # Mock API response with delay
             def delayed_response(*args, **kwargs):
                 import time
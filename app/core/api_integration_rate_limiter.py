@@ -2,6 +2,8 @@ import time
 from typing import Optional
 from redis import Redis
 
+from app.core.metrics import observe_limiter_wait
+
 def get_api_rate_limits():
     """
     Get API rate limits from application configuration.
@@ -70,6 +72,8 @@ class ApiIntegrationRateLimiter:
         self.key = f"ratelimit:{api_name}"
         # Key for tracking last request timestamp
         self.last_request_key = f"ratelimit:{api_name}:last_request"
+        # Disabled for limiters that are part of a CredentialPool (the pool records its own)
+        self.record_metrics = True
 
     def is_allowed(self) -> bool:
         """
@@ -103,25 +107,38 @@ class ApiIntegrationRateLimiter:
             try:
                 pipe = self.redis.pipeline()
                 pipe.incr(self.key, 1)
-                pipe.expire(self.key, self.period_seconds)
+                # NX only starts the window on the first hit of a period, so denied
+                # attempts (including blocking waiters) do not keep pushing the window
+                # reset further into the future. Both run in one MULTI, so a counter
+                # is never left without an expiry
+                pipe.expire(self.key, self.period_seconds, nx=True)
                 count, _ = pipe.execute()
                 if count <= self.max_requests:
                     # Record the timestamp of this successful request
                     self._record_request_timestamp()
+                    self._observe_wait(start, True)
                     return True
             except Exception:
                 # If Redis is unavailable, allow the request (graceful degradation)
                 # Still record timestamp for timing analysis
                 self._record_request_timestamp()
+                self._observe_wait(start, True)
                 return True
                 
             if not block:
+                self._observe_wait(start, False)
                 return False
             if timeout is not None and (time.time() - start) > timeout:
+                self._observe_wait(start, False)
                 return False
             # Wait a bit before retrying
             time.sleep(1)
 
+    def _observe_wait(self, start: float, acquired: bool) -> None:
+        """Record how long acquire() took for the metrics endpoint."""
+        if self.record_metrics:
+            observe_limiter_wait(self.api_name, time.time() - start, acquired)
+
     def get_remaining(self) -> int:
         """
         Return the number of requests remaining in the current window.
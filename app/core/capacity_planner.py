@@ -0,0 +1,701 @@
+"""
+Capacity Planner
+
+Models the lead pipeline (Apollo -> email verification -> Perplexity ->
+OpenAI -> Instantly) from the live rate limit, credential and worker
+settings, and runs a discrete-event simulation of it for a monthly sending
+target. It reports throughput, the bottleneck stage, queue growth and the
+time needed to send the target, plus the accounts and workers needed to
+meet it.
+
+The simulation follows how the workers actually run:
+- One fetch task per Apify actor run holds a worker slot for the run and
+  queues the saved leads.
+- One enrichment task per lead holds a worker slot through verification,
+  Perplexity, OpenAI and Instantly. Waiting for a rate limiter slot keeps
+  the worker slot busy.
+- Every vendor limiter is a fixed window of max_requests per period per
+  account, like ApiIntegrationRateLimiter and CredentialPool.
+- A lead leaves the pipeline at the first stage it does not pass.
+
+Usage:
+    python scripts/capacity_plan.py --target 80000
+"""
+import heapq
+import math
+import random
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.credential_pool import get_vendor_credentials
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+SECONDS_PER_DAY = 86400
+DAYS_PER_MONTH = 30
+
+# Accounts and workers are sized to run at this fraction of their capacity
+TARGET_UTILIZATION = 0.8
+
+# Apify actor runs (apollo-io-scraper): 500 leads per run, ~5 min, $0.60
+APOLLO_LEADS_PER_RUN = 500
+APOLLO_COST_PER_RUN = 0.6
+
+STAGE_ORDER = ['apollo', 'email_verification', 'perplexity', 'openai', 'instantly']
+
+# Fraction of leads that go on to the next stage. fit_pass_rates() derives these
+# from stored leads.
+DEFAULT_PASS_RATES: Dict[str, float] = {
+    'apollo': 0.90,
+    'email_verification': 0.95,
+    'perplexity': 0.95,
+    'openai': 1.0,
+    'instantly': 1.0
+}
+
+# Seconds per vendor call (the Apollo value is one actor run)
+DEFAULT_LATENCY_SECONDS: Dict[str, float] = {
+    'apollo': 300.0,
+    'email_verification': 1.0,
+    'perplexity': 8.0,
+    'openai': 6.0,
+    'instantly': 1.0
+}
+
+
+class StageSpec:
+    """One vendor stage: its limiter, accounts, latency and pass rate."""
+
+    def __init__(
+        self,
+        name: str,
+        max_requests: int,
+        period_seconds: int,
+        latency_seconds: float,
+        pass_rate: float,
+        accounts: int = 1,
+        items_per_call: int = 1,
+        calls_per_item: float = 1.0,
+        rate_limited: bool = True
+    ):
+        """
+        Args:
+            name: Stage name, one of STAGE_ORDER
+            max_requests: Requests per period per account
+            period_seconds: Limiter window in seconds
+            latency_seconds: Duration of one vendor call
+            pass_rate: Fraction of items that go on to the next stage
+            accounts: Vendor accounts, each with its own limiter window
+            items_per_call: Items carried by one call (bulk endpoints)
+            calls_per_item: Calls made per item (e.g. company lookups)
+            rate_limited: False when the stage runs outside the per-lead limiter
+                (bulk verification, OpenAI batches)
+        """
+        if not 0 <= pass_rate <= 1:
+            raise ValueError(f"Pass rate for {name} must be between 0 and 1, got: {pass_rate}")
+        self.name = name
+        self.max_requests = max_requests
+        self.period_seconds = period_seconds
+        self.latency_seconds = latency_seconds
+        self.pass_rate = pass_rate
+        self.accounts = max(1, accounts)
+        self.items_per_call = max(1, items_per_call)
+        self.calls_per_item = calls_per_item
+        self.rate_limited = rate_limited
+
+    @property
+    def calls_per_second(self) -> float:
+        """Aggregate call capacity of the stage."""
+        if not self.rate_limited:
+            return math.inf
+        return self.max_requests * self.accounts / self.period_seconds
+
+    @property
+    def items_per_second(self) -> float:
+        """Items the stage can take per second at full limiter use."""
+        return self.calls_per_second * self.items_per_call / self.calls_per_item
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'max_requests': self.max_requests,
+            'period_seconds': self.period_seconds,
+            'latency_seconds': self.latency_seconds,
+            'pass_rate': self.pass_rate,
+            'accounts': self.accounts,
+            'items_per_call': self.items_per_call,
+            'calls_per_item': self.calls_per_item,
+            'rate_limited': self.rate_limited
+        }
+
+
+class PipelineModel:
+    """Stages in pipeline order plus the worker fleet that runs them."""
+
+    def __init__(
+        self,
+        stages: List[StageSpec],
+        worker_replicas: int,
+        worker_concurrency: int,
+        leads_per_run: int = APOLLO_LEADS_PER_RUN,
+        cost_per_run: float = APOLLO_COST_PER_RUN,
+        http_pool_size: Optional[int] = None
+    ):
+        self.stages = stages
+        self.worker_replicas = worker_replicas
+        self.worker_concurrency = worker_concurrency
+        self.leads_per_run = leads_per_run
+        self.cost_per_run = cost_per_run
+        self.http_pool_size = http_pool_size or settings.VENDOR_HTTP_POOL_SIZE
+
+    @property
+    def worker_slots(self) -> int:
+        return self.worker_replicas * self.worker_concurrency
+
+    def stage(self, name: str) -> StageSpec:
+        for stage in self.stages:
+            if stage.name == name:
+                return stage
+        raise KeyError(name)
+
+    @property
+    def combined_pass_rate(self) -> float:
+        return math.prod(stage.pass_rate for stage in self.stages)
+
+
+def build_pipeline_model(
+    pass_rates: Optional[Dict[str, float]] = None,
+    latencies: Optional[Dict[str, float]] = None,
+    accounts: Optional[Dict[str, int]] = None,
+    worker_replicas: Optional[int] = None,
+    worker_concurrency: Optional[int] = None,
+    company_lookup_ratio: float = 1.0,
+    openai_batch: bool = False
+) -> PipelineModel:
+    """
+    Build the pipeline model from the live settings.
+
+    Args:
+        pass_rates: Per-stage overrides of DEFAULT_PASS_RATES
+        latencies: Per-stage overrides of DEFAULT_LATENCY_SECONDS
+        accounts: Per-stage account counts. Perplexity and OpenAI default to the
+            number of configured credentials (PERPLEXITY_TOKENS, OPENAI_API_KEYS)
+        worker_replicas: Defaults to settings.WORKER_REPLICAS
+        worker_concurrency: Defaults to settings.WORKER_CONCURRENCY
+        company_lookup_ratio: Company-context Perplexity calls per lead (1.0 when
+            every lead is at a new company) when company enrichment is enabled
+        openai_batch: Model campaigns with email_copy_mode='batch'
+
+    Returns:
+        PipelineModel: Stages in STAGE_ORDER
+    """
+    rates = {**DEFAULT_PASS_RATES, **(pass_rates or {})}
+    latency = {**DEFAULT_LATENCY_SECONDS, **(latencies or {})}
+    account_counts = {
+        'perplexity': len(get_vendor_credentials('PERPLEXITY_TOKENS', 'PERPLEXITY_TOKEN')) or 1,
+        'openai': len(get_vendor_credentials('OPENAI_API_KEYS', 'OPENAI_API_KEY')) or 1,
+        **(accounts or {})
+    }
+
+    stages = [
+        StageSpec(
+            'apollo', settings.APOLLO_RATE_LIMIT_REQUESTS, settings.APOLLO_RATE_LIMIT_PERIOD,
+            latency['apollo'], rates['apollo'], accounts=account_counts.get('apollo', 1),
+            items_per_call=APOLLO_LEADS_PER_RUN
+        ),
+        StageSpec(
+            # Bulk-verified leads arrive at the enrichment task already verified
+            'email_verification', settings.MILLIONVERIFIER_RATE_LIMIT_REQUESTS,
+            settings.MILLIONVERIFIER_RATE_LIMIT_PERIOD,
+            0.0 if settings.EMAIL_VERIFICATION_BULK_ENABLED else latency['email_verification'],
+            rates['email_verification'], accounts=account_counts.get('email_verification', 1),
+            rate_limited=not settings.EMAIL_VERIFICATION_BULK_ENABLED
+        ),
+        StageSpec(
+            'perplexity', settings.PERPLEXITY_RATE_LIMIT_REQUESTS, settings.PERPLEXITY_RATE_LIMIT_PERIOD,
+            latency['perplexity'], rates['perplexity'], accounts=account_counts['perplexity'],
+            calls_per_item=1.0 + (company_lookup_ratio if settings.COMPANY_ENRICHMENT_ENABLED else 0.0)
+        ),
+        StageSpec(
+            # Batch campaigns only mark the lead pending inside the task
+            'openai', settings.OPENAI_RATE_LIMIT_REQUESTS, settings.OPENAI_RATE_LIMIT_PERIOD,
+            0.0 if openai_batch else latency['openai'], rates['openai'],
+            accounts=account_counts['openai'], rate_limited=not openai_batch
+        ),
+        StageSpec(
+            'instantly', settings.INSTANTLY_RATE_LIMIT_REQUESTS, settings.INSTANTLY_RATE_LIMIT_PERIOD,
+            latency['instantly'], rates['instantly'], accounts=account_counts.get('instantly', 1),
+            items_per_call=settings.INSTANTLY_BULK_BATCH_SIZE if settings.INSTANTLY_BULK_ENABLED else 1
+        )
+    ]
+    return PipelineModel(
+        stages,
+        worker_replicas=worker_replicas or settings.WORKER_REPLICAS,
+        worker_concurrency=worker_concurrency or settings.WORKER_CONCURRENCY
+    )
+
+
+class _WindowLimiter:
+    """
+    Fixed-window limiter for the simulation.
+
+    Reservations must be made in non-decreasing time order, which the event
+    loop guarantees, so only the latest window has to be tracked.
+    """
+
+    def __init__(self, capacity: int, period_seconds: float):
+        self.capacity = capacity
+        self.period = period_seconds
+        self.window = -1
+        self.used = 0
+
+    def reserve(self, now: float) -> float:
+        """Take the next free slot at or after `now` and return its start time."""
+        window = max(int(now // self.period), self.window)
+        if window != self.window:
+            self.window, self.used = window, 0
+        if self.used >= self.capacity:
+            self.window, self.used = self.window + 1, 0
+        self.used += 1
+        return max(now, self.window * self.period)
+
+
+class _StageStats:
+    def __init__(self):
+        self.items = 0
+        self.passed = 0
+        self.calls = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.waiting = 0
+        self.max_waiting = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+
+class SimulationResult:
+    """Outcome of a simulation run. All rates are per 30-day month."""
+
+    def __init__(self, model: PipelineModel, monthly_target: int, days: float):
+        self.model = model
+        self.monthly_target = monthly_target
+        self.days = days
+        self.required_leads = 0
+        self.actor_runs = 0
+        self.sent = 0
+        self.sent_within_window = 0
+        self.completion_seconds = 0.0
+        self.worker_busy_seconds = 0.0
+        # Part of worker_busy_seconds spent waiting for a limiter slot
+        self.worker_wait_seconds = 0.0
+        self.max_worker_queue = 0
+        self.stage_stats: Dict[str, _StageStats] = {stage.name: _StageStats() for stage in model.stages}
+        # (seconds, leads waiting for a worker, {stage: leads waiting for its limiter})
+        self.samples: List[tuple] = []
+
+    @property
+    def time_to_complete_days(self) -> float:
+        return self.completion_seconds / SECONDS_PER_DAY
+
+    @property
+    def meets_target(self) -> bool:
+        """True when every scraped lead left the pipeline inside the window."""
+        return self.completion_seconds <= self.days * SECONDS_PER_DAY
+
+    @property
+    def throughput_per_month(self) -> float:
+        """Emails sent per month at the pace the simulation sustained."""
+        if not self.completion_seconds:
+            return 0.0
+        return self.sent / self.completion_seconds * DAYS_PER_MONTH * SECONDS_PER_DAY
+
+    def stage_utilization(self) -> Dict[str, float]:
+        """
+        Fraction of each stage's limiter capacity in use, and of worker slot time
+        spent doing work. Slots held while waiting for a limiter count against
+        that stage, not the workers.
+        """
+        duration = self.completion_seconds or 1.0
+        utilization = {}
+        for stage in self.model.stages:
+            if stage.rate_limited:
+                utilization[stage.name] = self.stage_stats[stage.name].calls / (stage.calls_per_second * duration)
+        work_seconds = self.worker_busy_seconds - self.worker_wait_seconds
+        utilization['workers'] = work_seconds / (self.model.worker_slots * duration)
+        return utilization
+
+    @property
+    def bottleneck(self) -> str:
+        utilization = self.stage_utilization()
+        return max(utilization, key=utilization.get)
+
+    def queue_growth_per_hour(self) -> Dict[str, float]:
+        """Least-squares slope of each backlog (leads/hour) while leads are still arriving."""
+        window_end = self.days * SECONDS_PER_DAY
+        samples = [s for s in self.samples if s[0] <= window_end]
+        series = {'workers': [(t, queued) for t, queued, _ in samples]}
+        for stage in self.model.stages:
+            series[stage.name] = [(t, waiting[stage.name]) for t, _, waiting in samples]
+        return {name: _slope(points) * 3600 for name, points in series.items()}
+
+    def recommendations(self) -> Dict[str, Any]:
+        """
+        Steady-state lower bound on accounts per stage and worker replicas for the
+        target at TARGET_UTILIZATION. Limiter waits are not included; plan_capacity()
+        sizes against the simulation instead.
+        """
+        seconds = self.days * SECONDS_PER_DAY
+        items = self.required_leads
+        accounts = {}
+        busy_per_lead = 0.0
+        for stage in self.model.stages:
+            calls = items * stage.calls_per_item / stage.items_per_call
+            if stage.rate_limited:
+                per_account = stage.max_requests / stage.period_seconds
+                accounts[stage.name] = max(1, math.ceil(calls / seconds / (per_account * TARGET_UTILIZATION)))
+            if stage.name != 'apollo':
+                busy_per_lead += stage.latency_seconds * stage.calls_per_item / stage.items_per_call * items
+            items *= stage.pass_rate
+        busy = busy_per_lead + self.actor_runs * self.model.stage('apollo').latency_seconds
+        slots = max(1, math.ceil(busy / seconds / TARGET_UTILIZATION))
+        return {
+            'accounts': accounts,
+            'worker_slots': slots,
+            'worker_replicas': math.ceil(slots / self.model.worker_concurrency)
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'monthly_target': self.monthly_target,
+            'days': self.days,
+            'required_leads': self.required_leads,
+            'actor_runs': self.actor_runs,
+            'actor_cost': round(self.actor_runs * self.model.cost_per_run, 2),
+            'sent': self.sent,
+            'sent_within_window': self.sent_within_window,
+            'meets_target': self.meets_target,
+            'throughput_per_month': round(self.throughput_per_month),
+            'time_to_complete_days': round(self.time_to_complete_days, 2),
+            'bottleneck': self.bottleneck,
+            'utilization': {k: round(v, 3) for k, v in self.stage_utilization().items()},
+            'queue_growth_per_hour': {k: round(v, 1) for k, v in self.queue_growth_per_hour().items()},
+            'max_worker_queue': self.max_worker_queue,
+            'stages': {
+                stage.name: {
+                    **stage.to_dict(),
+                    'items': self.stage_stats[stage.name].items,
+                    'passed': self.stage_stats[stage.name].passed,
+                    'calls': self.stage_stats[stage.name].calls,
+                    'mean_wait_seconds': round(
+                        self.stage_stats[stage.name].wait_seconds / max(1, self.stage_stats[stage.name].calls), 2
+                    ),
+                    'max_wait_seconds': round(self.stage_stats[stage.name].max_wait_seconds, 2),
+                    'max_waiting': self.stage_stats[stage.name].max_waiting,
+                    'max_in_flight': self.stage_stats[stage.name].max_in_flight,
+                    'http_pool_exceeded': (
+                        self.stage_stats[stage.name].max_in_flight > self.model.http_pool_size * self.model.worker_slots
+                    )
+                }
+                for stage in self.model.stages
+            },
+            'recommendations': self.recommendations()
+        }
+
+
+def _slope(points: List[tuple]) -> float:
+    if len(points) < 2:
+        return 0.0
+    n = len(points)
+    mean_t = sum(t for t, _ in points) / n
+    mean_v = sum(v for _, v in points) / n
+    var = sum((t - mean_t) ** 2 for t, _ in points)
+    if not var:
+        return 0.0
+    return sum((t - mean_t) * (v - mean_v) for t, v in points) / var
+
+
+def simulate(
+    model: PipelineModel,
+    monthly_target: int,
+    days: float = DAYS_PER_MONTH,
+    seed: int = 0,
+    sample_seconds: float = 3600
+) -> SimulationResult:
+    """
+    Simulate sending `monthly_target` emails over `days`.
+
+    Enough leads are scraped to cover the combined pass rate. Actor runs are
+    spread evenly over the window, and the simulation runs until the last
+    lead has left the pipeline.
+
+    Args:
+        model: Pipeline to simulate
+        monthly_target: Emails to send per 30-day month
+        days: Length of the arrival window (the target is scaled to it)
+        seed: Random seed for pass/fail draws
+        sample_seconds: Interval of the queue length samples
+
+    Returns:
+        SimulationResult: Throughput, bottleneck, queue and timing figures
+    """
+    if model.combined_pass_rate <= 0:
+        raise ValueError("Combined pass rate is 0; no lead can reach Instantly")
+
+    rng = random.Random(seed)
+    result = SimulationResult(model, monthly_target, days)
+    window_seconds = days * SECONDS_PER_DAY
+    target = monthly_target * days / DAYS_PER_MONTH
+    result.required_leads = math.ceil(target / model.combined_pass_rate)
+    result.actor_runs = math.ceil(result.required_leads / model.leads_per_run)
+
+    apollo, lead_stages = model.stages[0], model.stages[1:]
+    limiters = {
+        stage.name: _WindowLimiter(stage.max_requests * stage.accounts, stage.period_seconds)
+        for stage in model.stages if stage.rate_limited
+    }
+    # Leads still to join the current bulk call, per stage
+    batch_room = {stage.name: 0 for stage in model.stages}
+    stats = result.stage_stats
+
+    events: List[tuple] = []
+    seq = 0
+
+    def push(at: float, kind: str, payload: Any) -> None:
+        nonlocal seq
+        seq += 1
+        heapq.heappush(events, (at, seq, kind, payload))
+
+    worker_queue: deque = deque()
+    free_slots = model.worker_slots
+    slot_started: Dict[int, float] = {}
+    next_sample = 0.0
+
+    def start_call(stage: StageSpec, task_id: int, now: float, batched: bool = True) -> None:
+        """
+        Reserve a limiter slot for one call of `stage` and schedule its end.
+
+        With a bulk stage (items_per_call > 1) the first lead pays for the call and
+        the next items_per_call - 1 leads ride along on it.
+        """
+        stage_stats = stats[stage.name]
+        start = now
+        joins_batch = batched and batch_room[stage.name] > 0
+        if joins_batch:
+            batch_room[stage.name] -= 1
+        elif stage.rate_limited:
+            start = limiters[stage.name].reserve(now)
+            stage_stats.calls += 1
+            if batched:
+                batch_room[stage.name] = stage.items_per_call - 1
+        wait = start - now
+        stage_stats.wait_seconds += wait
+        result.worker_wait_seconds += wait
+        stage_stats.max_wait_seconds = max(stage_stats.max_wait_seconds, wait)
+        if wait > 0:
+            stage_stats.waiting += 1
+            stage_stats.max_waiting = max(stage_stats.max_waiting, stage_stats.waiting)
+            push(start, 'call_start', stage.name)
+        stage_stats.in_flight += 1
+        stage_stats.max_in_flight = max(stage_stats.max_in_flight, stage_stats.in_flight)
+        latency = 0.0 if joins_batch else stage.latency_seconds
+        push(start + latency, 'call_end', task_id)
+
+    # Task state: task_id -> [kind, stage index, calls left at stage, leads from run]
+    tasks: Dict[int, list] = {}
+    next_task_id = 0
+
+    def calls_for(stage: StageSpec) -> int:
+        whole = int(stage.calls_per_item)
+        return whole + (1 if rng.random() < stage.calls_per_item - whole else 0)
+
+    def dispatch(now: float) -> None:
+        nonlocal free_slots
+        while free_slots and worker_queue:
+            task_id = worker_queue.popleft()
+            free_slots -= 1
+            slot_started[task_id] = now
+            task = tasks[task_id]
+            if task[0] == 'fetch':
+                stats['apollo'].items += task[3]
+                start_call(apollo, task_id, now, batched=False)
+            else:
+                stage = lead_stages[0]
+                stats[stage.name].items += 1
+                task[2] = calls_for(stage)
+                start_call(stage, task_id, now)
+
+    def release(task_id: int, now: float) -> None:
+        nonlocal free_slots
+        result.worker_busy_seconds += now - slot_started.pop(task_id)
+        del tasks[task_id]
+        free_slots += 1
+
+    run_interval = window_seconds / result.actor_runs
+    remaining = result.required_leads
+    for run in range(result.actor_runs):
+        size = min(model.leads_per_run, remaining)
+        remaining -= size
+        tasks[next_task_id] = ['fetch', 0, 0, size]
+        push(run * run_interval, 'enqueue', next_task_id)
+        next_task_id += 1
+
+    while events:
+        now, _, kind, payload = heapq.heappop(events)
+        while next_sample <= now:
+            result.samples.append((
+                next_sample, len(worker_queue), {name: s.waiting for name, s in stats.items()}
+            ))
+            next_sample += sample_seconds
+
+        if kind == 'enqueue':
+            worker_queue.append(payload)
+            result.max_worker_queue = max(result.max_worker_queue, len(worker_queue))
+        elif kind == 'call_start':
+            stats[payload].waiting -= 1
+        elif kind == 'call_end':
+            task_id = payload
+            task = tasks[task_id]
+            if task[0] == 'fetch':
+                stats['apollo'].in_flight -= 1
+                saved = sum(1 for _ in range(task[3]) if rng.random() < apollo.pass_rate)
+                stats['apollo'].passed += saved
+                release(task_id, now)
+                for _ in range(saved):
+                    tasks[next_task_id] = ['lead', 0, 0, 0]
+                    worker_queue.append(next_task_id)
+                    next_task_id += 1
+                result.max_worker_queue = max(result.max_worker_queue, len(worker_queue))
+            else:
+                stage = lead_stages[task[1]]
+                stats[stage.name].in_flight -= 1
+                task[2] -= 1
+                if task[2] > 0:
+                    # Company lookup done, the person lookup follows
+                    start_call(stage, task_id, now)
+                elif rng.random() >= stage.pass_rate:
+                    release(task_id, now)
+                else:
+                    stats[stage.name].passed += 1
+                    task[1] += 1
+                    if task[1] == len(lead_stages):
+                        result.sent += 1
+                        if now <= window_seconds:
+                            result.sent_within_window += 1
+                        result.completion_seconds = max(result.completion_seconds, now)
+                        release(task_id, now)
+                    else:
+                        next_stage = lead_stages[task[1]]
+                        stats[next_stage.name].items += 1
+                        task[2] = calls_for(next_stage)
+                        start_call(next_stage, task_id, now)
+        dispatch(now)
+        result.completion_seconds = max(result.completion_seconds, now)
+
+    logger.info(
+        f"Capacity simulation: {result.sent} sent in {result.time_to_complete_days:.1f} days, "
+        f"bottleneck {result.bottleneck}",
+        extra={'component': 'capacity_planner', 'monthly_target': monthly_target, 'sent': result.sent}
+    )
+    return result
+
+
+def fit_pass_rates(db, min_samples: int = 20) -> Dict[str, float]:
+    """
+    Estimate stage pass rates from stored campaigns and leads.
+
+    - apollo: saved leads / requested records, over campaigns that have leads
+    - email_verification: deliverable results / verified leads
+    - perplexity, openai, instantly: successful results / finished attempts
+
+    Stages with fewer than `min_samples` finished attempts are left out, so the
+    caller keeps its defaults for them.
+
+    Args:
+        db: Database session
+        min_samples: Minimum attempts for a stage to be fitted
+
+    Returns:
+        Dict[str, float]: Fitted pass rates by stage name
+    """
+    from sqlalchemy import func
+    from app.background_services.email_verifier_service import EmailVerifierService
+    from app.models.campaign import Campaign
+    from app.models.lead import Lead
+    from app.models.lead_artifact import LeadArtifact
+
+    counts = {name: [0, 0] for name in STAGE_ORDER}  # [attempts, passed]
+
+    campaign_rows = (
+        db.query(Campaign.totalRecords, func.count(Lead.id))
+        .join(Lead, Lead.campaign_id == Campaign.id)
+        .filter(Campaign.totalRecords > 0)
+        .group_by(Campaign.id, Campaign.totalRecords)
+        .all()
+    )
+    for requested, saved in campaign_rows:
+        counts['apollo'][0] += requested
+        counts['apollo'][1] += min(saved, requested)
+
+    rows = db.query(
+        LeadArtifact.email_verification, LeadArtifact.enrichment_results,
+        LeadArtifact.email_copy_gen_results, LeadArtifact.instantly_lead_record
+    ).yield_per(1000)
+    for verification, enrichment, email_copy, instantly in rows:
+        if verification:
+            counts['email_verification'][0] += 1
+            counts['email_verification'][1] += EmailVerifierService.is_deliverable(verification)
+        if enrichment and enrichment.get('status') != 'rate_limited':
+            counts['perplexity'][0] += 1
+            counts['perplexity'][1] += 'error' not in enrichment
+        if email_copy and email_copy.get('status') not in ('batch_pending', 'batch_submitted'):
+            counts['openai'][0] += 1
+            counts['openai'][1] += 'choices' in email_copy
+        if instantly:
+            counts['instantly'][0] += 1
+            counts['instantly'][1] += 'error' not in instantly
+
+    return {
+        name: passed / attempts
+        for name, (attempts, passed) in counts.items()
+        if attempts >= min_samples
+    }
+
+
+def plan_capacity(
+    model: PipelineModel,
+    monthly_target: int,
+    days: float = DAYS_PER_MONTH,
+    seed: int = 0,
+    max_steps: int = 20
+) -> tuple:
+    """
+    Grow the model until the simulation meets the target.
+
+    Each step adds one account to the bottleneck stage, or one worker replica
+    when the workers are the bottleneck, and simulates again.
+
+    Args:
+        model: Starting pipeline (changed in place)
+        monthly_target: Emails to send per 30-day month
+        days: Length of the arrival window
+        seed: Random seed for pass/fail draws
+        max_steps: Maximum number of additions
+
+    Returns:
+        tuple: (SimulationResult of the last run, {stage or 'workers': added})
+    """
+    added: Dict[str, int] = {}
+    result = simulate(model, monthly_target, days=days, seed=seed)
+    for _ in range(max_steps):
+        if result.meets_target:
+            break
+        bottleneck = result.bottleneck
+        if bottleneck == 'workers':
+            model.worker_replicas += 1
+        else:
+            model.stage(bottleneck).accounts += 1
+        added[bottleneck] = added.get(bottleneck, 0) + 1
+        result = simulate(model, monthly_target, days=days, seed=seed)
+    return result, added
@@ -10,6 +10,13 @@ class Settings(BaseSettings):
     
     # Security
     SECRET_KEY: str = "your-secret-key-here"  # Should be from environment
+    # The auth middleware checks the JWT without the database and takes the user from
+    # an in-process cache (app/core/user_cache.py), loading it on a miss. Entries live
+    # AUTH_USER_CACHE_SECONDS and are dropped when the user row changes in this process;
+    # other API processes see a change (e.g. a deleted user) after at most the TTL.
+    # AUTH_USER_CACHE_SIZE=0 disables the cache
+    AUTH_USER_CACHE_SECONDS: int = 60
+    AUTH_USER_CACHE_SIZE: int = 1024
     
     # CORS
     BACKEND_CORS_ORIGINS: List[str]
@@ -47,6 +54,27 @@ class Settings(BaseSettings):
         postgres_password = values.data.get("POSTGRES_PASSWORD")
         postgres_db = values.data.get("POSTGRES_DB")
         return f"postgresql://{postgres_user}:{postgres_password}@{postgres_server}/{postgres_db}"
+
+    # Database Pools
+    # Pools are sized per process for its role (app/core/database.py): "api" (uvicorn
+    # worker), "worker" (one Celery pool child) or "script" (beat, flower, scripts).
+    # DB_PROCESS_ROLE picks it; empty detects it from the command line. A process can
+    # hold up to size + overflow connections per engine; the API has two engines
+    # (sync and asyncpg), workers only use the sync one. Celery children drop the
+    # pool inherited from the parent on fork. With DB_PGBOUNCER_MODE (PgBouncer in
+    # transaction pooling mode) there is no client-side pool and asyncpg does not
+    # cache prepared statements.
+    DB_PROCESS_ROLE: str = ""
+    DB_POOL_SIZE_API: int = 10
+    DB_MAX_OVERFLOW_API: int = 10
+    DB_POOL_SIZE_WORKER: int = 2
+    DB_MAX_OVERFLOW_WORKER: int = 3
+    DB_POOL_SIZE_SCRIPT: int = 1
+    DB_MAX_OVERFLOW_SCRIPT: int = 2
+    DB_POOL_TIMEOUT_SECONDS: int = 30  # wait for a free connection before failing
+    DB_POOL_RECYCLE_SECONDS: int = 1800  # reconnect connections older than this (-1 = never)
+    DB_POOL_PRE_PING: bool = True
+    DB_PGBOUNCER_MODE: bool = False
     
     # Redis
     REDIS_HOST: str = "localhost"
@@ -102,6 +130,141 @@ class Settings(BaseSettings):
     PERPLEXITY_RATE_LIMIT_REQUESTS: int = 1
     PERPLEXITY_RATE_LIMIT_PERIOD: int = 5
 
+    # Company Enrichment Configuration
+    # Company-level Perplexity context is fetched once per normalized company name
+    # and shared by every lead at that company for the TTL window. It is merged into
+    # a shorter person prompt, which saves tokens but not calls: each company adds
+    # one call on top of the person call of every lead, so it is off by default
+    COMPANY_ENRICHMENT_ENABLED: bool = False
+    COMPANY_ENRICHMENT_TTL_SECONDS: int = 604800  # 7 days
+    COMPANY_ENRICHMENT_LOCK_TIMEOUT: int = 60  # seconds a single-flight lock is held at most
+    COMPANY_ENRICHMENT_WAIT_TIMEOUT: int = 30  # seconds a follower waits for the leader's result
+    # A company is only looked up when at least this many leads of the campaign work
+    # there, so the lookup replaces company research in several person prompts. A
+    # company already in the cache is used for any lead
+    COMPANY_ENRICHMENT_MIN_LEADS: int = 2
+    # After its own company lookup a task waits at most this long (and never more than
+    # PERPLEXITY_RATE_LIMIT_PERIOD) for the person call's limiter slot
+    COMPANY_ENRICHMENT_RATE_LIMIT_WAIT_SECONDS: int = 5
+
+    # Prompt Templates and Completion Cache
+    # Vendor prompts come from app/background_services/prompt_templates.py and can be
+    # overridden per campaign or organization (prompt_templates table). Successful
+    # completions are cached in Redis by a hash of the full request body, so an identical
+    # prompt (retry, resume, duplicate lead) is paid for once per TTL window
+    PROMPT_TEMPLATE_CACHE_SECONDS: int = 60  # how long a process reuses a resolved template
+    COMPLETION_CACHE_ENABLED: bool = True
+    COMPLETION_CACHE_TTL_SECONDS: int = 604800  # 7 days
+
+    # Vendor Credential Pools
+    # PERPLEXITY_TOKENS / OPENAI_API_KEYS (comma-separated env vars) spread calls over
+    # several vendor accounts, each with its own rate limit window, so throughput scales
+    # with the number of accounts. The least-loaded key is used; keys that hit 429 or
+    # auth errors are quarantined. When unset, the single PERPLEXITY_TOKEN / OPENAI_API_KEY is used
+    CREDENTIAL_QUARANTINE_SECONDS: int = 60  # after a 429 without Retry-After
+    CREDENTIAL_AUTH_QUARANTINE_SECONDS: int = 3600  # after a 401 / 402 / 403
+
+    # Email Verification Cache Configuration
+    # Per-email results and per-domain facts (MX / catch-all / disposable) are cached
+    # in Redis so repeat addresses and known-bad domains never reach MillionVerifier
+    EMAIL_VERIFICATION_CACHE_TTL_SECONDS: int = 2592000  # 30 days
+    EMAIL_VERIFICATION_DOMAIN_CACHE_TTL_SECONDS: int = 604800  # 7 days
+    EMAIL_VERIFICATION_CATCH_ALL_POLICY: str = "verify"  # accept | reject | verify
+    EMAIL_VERIFICATION_DISPOSABLE_DOMAINS: str = ""  # extra comma-separated disposable domains
+
+    @field_validator("EMAIL_VERIFICATION_CATCH_ALL_POLICY", mode="before")
+    def validate_catch_all_policy(cls, v):
+        """Validate the catch-all domain handling policy."""
+        value = str(v).split('#')[0].strip().lower()
+        if value not in ("accept", "reject", "verify"):
+            raise ValueError(f"EMAIL_VERIFICATION_CATCH_ALL_POLICY must be accept, reject or verify, got: {v}")
+        return value
+
+    # Email Verification Bulk Mode
+    # Campaigns with at least EMAIL_VERIFICATION_BULK_MIN_LEADS leads are verified with a
+    # single MillionVerifier bulk file job, polled by celery beat, instead of one call per lead
+    EMAIL_VERIFICATION_BULK_ENABLED: bool = False
+    EMAIL_VERIFICATION_BULK_MIN_LEADS: int = 50
+    EMAIL_VERIFICATION_BULK_POLL_INTERVAL: int = 30  # seconds between beat polls
+    EMAIL_VERIFICATION_BULK_TIMEOUT_SECONDS: int = 3600  # give up and fall back to per-lead checks
+    EMAIL_VERIFICATION_BULK_UPDATE_BATCH_SIZE: int = 500  # leads updated per commit
+    MILLIONVERIFIER_BULK_API_URL: str = "https://bulkapi.millionverifier.com/bulkapi/v2/"
+
+    # Instantly Bulk Writer
+    # Ready leads are buffered per instantly_campaign_id in Redis and pushed with the
+    # bulk lead-add endpoint when a buffer reaches INSTANTLY_BULK_BATCH_SIZE or its oldest
+    # item has waited INSTANTLY_BULK_MAX_WAIT_SECONDS (checked by celery beat)
+    INSTANTLY_BULK_ENABLED: bool = False
+    INSTANTLY_BULK_BATCH_SIZE: int = 100  # max 1000 per Instantly request
+    INSTANTLY_BULK_MAX_WAIT_SECONDS: int = 30
+    INSTANTLY_BULK_FLUSH_INTERVAL: int = 10  # seconds between beat checks
+    INSTANTLY_BULK_MAX_ATTEMPTS: int = 3  # per lead, before the failure is recorded
+
+    # OpenAI Batch Mode
+    # Campaigns with email_copy_mode='batch' defer email copy generation: leads are
+    # marked pending and the beat task submits them as one OpenAI Batch API job once
+    # OPENAI_BATCH_MIN_REQUESTS are waiting or the oldest has waited
+    # OPENAI_BATCH_MAX_WAIT_SECONDS, then polls it and streams the results back
+    OPENAI_BASE_URL: str = ""  # empty uses the SDK default; set for a local fake server
+    OPENAI_BATCH_MIN_REQUESTS: int = 100
+    OPENAI_BATCH_MAX_REQUESTS: int = 5000  # per batch input file (vendor max 50,000)
+    OPENAI_BATCH_MAX_WAIT_SECONDS: int = 300
+    OPENAI_BATCH_POLL_INTERVAL: int = 60  # seconds between beat runs
+    OPENAI_BATCH_COMPLETION_WINDOW: str = "24h"
+    OPENAI_BATCH_UPDATE_BATCH_SIZE: int = 500  # leads updated per commit
+
+    # OpenAI Streaming
+    # Every email copy completion is bounded by OPENAI_TOTAL_TIMEOUT (without SDK retries). With streaming enabled, email
+    # copy is consumed token by token: the call is cancelled if no token arrives within
+    # OPENAI_FIRST_TOKEN_TIMEOUT (also the longest allowed gap between chunks) or the
+    # completion runs past OPENAI_TOTAL_TIMEOUT, and TTFT / tokens per second are recorded
+    OPENAI_STREAMING_ENABLED: bool = False
+    OPENAI_FIRST_TOKEN_TIMEOUT: float = 15.0  # seconds
+    OPENAI_TOTAL_TIMEOUT: float = 60.0  # seconds
+    OPENAI_FILE_TIMEOUT: float = 600.0  # seconds per batch input upload / output download
+
+    # Vendor HTTP Transport
+    # Vendor services share pooled keep-alive sessions and retry safe failures with
+    # exponential backoff and jitter (Retry-After wins). Each request, retries
+    # included, must finish within the vendor's budget.
+    VENDOR_HTTP_CONNECT_TIMEOUT: float = 5.0
+    VENDOR_HTTP_MAX_ATTEMPTS: int = 3
+    VENDOR_HTTP_BACKOFF_BASE: float = 1.0  # seconds, doubled per attempt
+    VENDOR_HTTP_BACKOFF_MAX: float = 30.0
+    VENDOR_HTTP_POOL_SIZE: int = 10  # connections kept alive per vendor per process
+    PERPLEXITY_HTTP_TIMEOUT: float = 30.0  # read timeout per attempt
+    PERPLEXITY_HTTP_BUDGET_SECONDS: float = 90.0
+    INSTANTLY_HTTP_TIMEOUT: float = 30.0
+    INSTANTLY_HTTP_BUDGET_SECONDS: float = 60.0
+    MILLIONVERIFIER_HTTP_TIMEOUT: float = 30.0
+    MILLIONVERIFIER_HTTP_BUDGET_SECONDS: float = 60.0
+    PERPLEXITY_BASE_URL: str = ""  # empty uses https://api.perplexity.ai; set for a local fake server
+    INSTANTLY_BASE_URL: str = ""  # empty uses https://api.instantly.ai/api/v2; set for a local fake server
+
+    # Metrics
+    # Prometheus metrics (app/core/metrics.py) are served on /metrics by the API and on
+    # METRICS_WORKER_PORT by each worker container. Set PROMETHEUS_MULTIPROC_DIR in the
+    # environment so gunicorn workers and celery pool children are aggregated
+    METRICS_ENABLED: bool = True
+    METRICS_WORKER_PORT: int = 9100
+    METRICS_CELERY_QUEUES: str = "celery"  # comma-separated queues reported by celery_queue_length
+
+    # Tracing
+    # OpenTelemetry spans for API, Celery, SQLAlchemy, Redis and vendor HTTP (app/core/tracing.py).
+    # The ratio applies to root spans only; a started campaign is sampled as a whole
+    TRACING_ENABLED: bool = False
+    TRACING_SERVICE_NAME: str = "lead-pipeline"  # suffixed with -api / -worker
+    TRACING_EXPORTER: str = "otlp"  # otlp, file or console
+    TRACING_OTLP_ENDPOINT: str = "http://localhost:4317"
+    TRACING_FILE_PATH: str = "logs/traces.jsonl"
+    TRACING_SAMPLE_RATIO: float = 0.05
+
+    # Capacity Planning
+    # Worker fleet size used by app/core/capacity_planner.py. Keep these in line with
+    # deploy.replicas of the worker service and its celery --concurrency
+    WORKER_REPLICAS: int = 8
+    WORKER_CONCURRENCY: int = 2
+
     # External API Tokens
     # Added to fix critical configuration management failure where ApolloService
     # was refactored to use settings object but this field was never added
@@ -134,11 +297,49 @@ class Settings(BaseSettings):
     LOG_LEVEL: str = "INFO"
     LOG_ROTATION_SIZE: int = 10485760  # 10MB
     LOG_BACKUP_COUNT: int = 5
+    # Each process writes LOG_DIR/combined-<hostname>-<pid>.log (scripts/logs.py merges
+    # them). A file rolls over at LOG_ROTATION_SIZE or after LOG_ROTATION_SECONDS
+    # (0 = size only); rotated segments are compressed with LOG_COMPRESSION
+    # ("zstd", "gzip" or empty for none)
+    LOG_ROTATION_SECONDS: int = 86400
+    LOG_COMPRESSION: str = ""
+    # Files of other processes not written to for LOG_RETENTION_SECONDS are removed
+    # at startup and rollover (default 7 days, 0 = keep)
+    LOG_RETENTION_SECONDS: int = 604800
     LOG_SERVICE_HOST: str = "localhost"
     LOG_SERVICE_PORT: int = 8765
-    LOG_BUFFER_SIZE: int = 1000
+    LOG_BUFFER_SIZE: int = 1000  # records the log queue holds before it starts dropping
+    # Log calls only put the record on a queue; a writer thread per process formats
+    # and writes it. When the queue is full, INFO/DEBUG are dropped and counted,
+    # WARNING and above wait up to LOG_QUEUE_BLOCK_SECONDS for room.
+    LOG_QUEUE_ENABLED: bool = True
+    LOG_QUEUE_BLOCK_SECONDS: float = 0.05
+    # Per-logger levels as comma-separated name=LEVEL pairs, applied on top of LOG_LEVEL,
+    # e.g. "app.workers.campaign_tasks=WARNING,app.background_services=INFO".
+    # High-volume per-lead success logs keep 1 in N per message kind (LOG_SAMPLE_RATES,
+    # kind=N pairs, 1 logs everything); warnings and errors are never sampled.
+    # Result dicts and prompts longer than LOG_PAYLOAD_MAX_CHARS are cut and hashed.
+    LOG_LEVELS: str = ""
+    LOG_SAMPLE_RATES: str = "lead_created=100,lead_result=10,prompt=10"
+    LOG_PAYLOAD_MAX_CHARS: int = 500
 
-    @field_validator("LOG_ROTATION_SIZE", "LOG_BACKUP_COUNT", "LOG_SERVICE_PORT", "LOG_BUFFER_SIZE", mode="before")
+    @field_validator(
+        "LOG_ROTATION_SIZE", "LOG_BACKUP_COUNT", "LOG_SERVICE_PORT", "LOG_BUFFER_SIZE",
+        "LOG_PAYLOAD_MAX_CHARS", "LOG_ROTATION_SECONDS", "LOG_RETENTION_SECONDS",
+        "EMAIL_VERIFICATION_BULK_MIN_LEADS", "EMAIL_VERIFICATION_BULK_POLL_INTERVAL",
+        "EMAIL_VERIFICATION_BULK_TIMEOUT_SECONDS", "EMAIL_VERIFICATION_BULK_UPDATE_BATCH_SIZE",
+        "INSTANTLY_BULK_BATCH_SIZE", "INSTANTLY_BULK_MAX_WAIT_SECONDS", "INSTANTLY_BULK_FLUSH_INTERVAL",
+        "INSTANTLY_BULK_MAX_ATTEMPTS", "VENDOR_HTTP_MAX_ATTEMPTS", "VENDOR_HTTP_POOL_SIZE",
+        "OPENAI_BATCH_MIN_REQUESTS", "OPENAI_BATCH_MAX_REQUESTS", "OPENAI_BATCH_MAX_WAIT_SECONDS",
+        "OPENAI_BATCH_POLL_INTERVAL", "OPENAI_BATCH_UPDATE_BATCH_SIZE",
+        "PROMPT_TEMPLATE_CACHE_SECONDS", "COMPLETION_CACHE_TTL_SECONDS",
+        "CREDENTIAL_QUARANTINE_SECONDS", "CREDENTIAL_AUTH_QUARANTINE_SECONDS",
+        "WORKER_REPLICAS", "WORKER_CONCURRENCY", "METRICS_WORKER_PORT",
+        "AUTH_USER_CACHE_SECONDS", "AUTH_USER_CACHE_SIZE",
+        "DB_POOL_SIZE_API", "DB_MAX_OVERFLOW_API", "DB_POOL_SIZE_WORKER", "DB_MAX_OVERFLOW_WORKER",
+        "DB_POOL_SIZE_SCRIPT", "DB_MAX_OVERFLOW_SCRIPT", "DB_POOL_TIMEOUT_SECONDS", "DB_POOL_RECYCLE_SECONDS",
+        mode="before"
+    )
     def validate_integers(cls, v):
         if isinstance(v, str):
             # Handle comments in env values (e.g., "10485760  # 10MB")
@@ -0,0 +1,217 @@
+import hashlib
+import os
+import time
+from typing import Dict, List, Mapping, Optional
+
+from redis import Redis
+
+from app.core.api_integration_rate_limiter import ApiIntegrationRateLimiter
+from app.core.config import settings
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def get_vendor_credentials(pool_env: str, single_env: str) -> List[str]:
+    """
+    Read a vendor's credentials from the environment.
+
+    Args:
+        pool_env: Comma-separated list of keys, e.g. 'PERPLEXITY_TOKENS'
+        single_env: Single key used when the list is not set, e.g. 'PERPLEXITY_TOKEN'
+
+    Returns:
+        List[str]: Distinct credentials in configured order (empty if none set)
+    """
+    pooled = [c.strip() for c in os.getenv(pool_env, "").split(",") if c.strip()]
+    if not pooled and os.getenv(single_env):
+        pooled = [os.getenv(single_env)]
+    return list(dict.fromkeys(pooled))
+
+
+def credential_id(credential: str) -> str:
+    """Short stable ID for a credential, safe to use in Redis keys and logs."""
+    return hashlib.sha256(credential.encode("utf-8")).hexdigest()[:12]
+
+
+class CredentialPool(ApiIntegrationRateLimiter):
+    """
+    Rate limiter spread over several accounts of one vendor.
+
+    Every credential has its own limiter window (ratelimit:{api_name}:{id}),
+    so aggregate throughput is max_requests x number of credentials per
+    period. acquire() picks the least-loaded credential that is not
+    quarantined and exposes it as `credential` for the call that follows.
+
+    A credential is quarantined after a 429 (for Retry-After or
+    CREDENTIAL_QUARANTINE_SECONDS) or an auth/billing error (for
+    CREDENTIAL_AUTH_QUARANTINE_SECONDS). Quarantine is shared through Redis,
+    so every worker stops using the key. When all credentials are exhausted
+    or quarantined, acquire() fails like a plain limiter.
+
+    A pool instance tracks the credential of its last acquire(), so it is
+    meant to be used by one service instance at a time.
+    """
+
+    QUARANTINE_KEY_PREFIX = "credential_quarantine"
+    AUTH_FAILURE_STATUSES = {401, 402, 403}
+
+    def __init__(
+        self,
+        redis_client: Redis,
+        api_name: str,
+        credentials: List[str],
+        max_requests: int,
+        period_seconds: int
+    ):
+        """
+        Initialize the CredentialPool.
+
+        Args:
+            redis_client: Redis client instance
+            api_name: Vendor name, e.g. 'Perplexity'
+            credentials: API keys, one per account
+            max_requests: Requests allowed per credential per period
+            period_seconds: Rate limit window in seconds
+        """
+        if not credentials:
+            raise ValueError(f"No credentials configured for {api_name}")
+        super().__init__(redis_client, api_name, max_requests, period_seconds)
+        self.credentials = list(dict.fromkeys(credentials))
+        self.per_credential_max_requests = max_requests
+        # Aggregate capacity, as reported in service logs
+        self.max_requests = max_requests * len(self.credentials)
+        self.limiters: Dict[str, ApiIntegrationRateLimiter] = {
+            credential: ApiIntegrationRateLimiter(
+                redis_client, f"{api_name}:{credential_id(credential)}", max_requests, period_seconds
+            )
+            for credential in self.credentials
+        }
+        for limiter in self.limiters.values():
+            limiter.record_metrics = False
+        self.credential: Optional[str] = None
+
+    def _quarantine_key(self, credential: str) -> str:
+        return f"{self.QUARANTINE_KEY_PREFIX}:{self.api_name}:{credential_id(credential)}"
+
+    def _quarantined(self) -> set:
+        try:
+            flags = self.redis.mget([self._quarantine_key(c) for c in self.credentials])
+        except Exception:
+            # If Redis is unavailable, no credential is quarantined (graceful degradation)
+            return set()
+        return {credential for credential, flag in zip(self.credentials, flags) if flag}
+
+    def _candidates(self) -> List[str]:
+        """Usable credentials, least loaded first (ties keep configured order)."""
+        quarantined = self._quarantined()
+        loads = [
+            (self.limiters[credential].get_remaining(), index, credential)
+            for index, credential in enumerate(self.credentials)
+            if credential not in quarantined
+        ]
+        loads.sort(key=lambda load: (-load[0], load[1]))
+        return [credential for remaining, _, credential in loads if remaining > 0]
+
+    def is_allowed(self) -> bool:
+        return bool(self._candidates())
+
+    def acquire(self, block: bool = False, timeout: Optional[int] = None) -> bool:
+        """
+        Acquire a rate limit slot on the least-loaded usable credential.
+
+        On success the chosen credential is stored in `credential`.
+
+        Args:
+            block (bool): If True, wait until a slot is available or timeout is reached
+            timeout (Optional[int]): Maximum time to wait in seconds (only used if block=True)
+
+        Returns:
+            bool: True if slot acquired, False otherwise
+        """
+        start = time.time()
+        while True:
+            for credential in self._candidates():
+                if self.limiters[credential].acquire():
+                    self.credential = credential
+                    self._record_request_timestamp()
+                    self._observe_wait(start, True)
+                    return True
+
+            if not block:
+                self._observe_wait(start, False)
+                return False
+            if timeout is not None and (time.time() - start) > timeout:
+                self._observe_wait(start, False)
+                return False
+            time.sleep(1)
+
+    def get_remaining(self) -> int:
+        """Requests remaining in the current window across usable credentials."""
+        quarantined = self._quarantined()
+        return sum(
+            limiter.get_remaining()
+            for credential, limiter in self.limiters.items()
+            if credential not in quarantined
+        )
+
+    def quarantine(self, credential: str, seconds: int, reason: str) -> None:
+        """Stop using a credential in every worker for the given time."""
+        try:
+            self.redis.set(self._quarantine_key(credential), reason, ex=max(1, int(seconds)))
+        except Exception:
+            pass
+        logger.warning(
+            f"Quarantined {self.api_name} credential {credential_id(credential)} for {seconds}s: {reason}",
+            extra={
+                'component': 'credential_pool',
+                'api_name': self.api_name,
+                'credential_id': credential_id(credential),
+                'quarantine_seconds': seconds,
+                'reason': reason
+            }
+        )
+
+    def report_status(self, status_code: Optional[int], headers: Optional[Mapping[str, str]] = None) -> bool:
+        """
+        Report the HTTP status of a call made with the last acquired credential.
+
+        Args:
+            status_code: Vendor response status
+            headers: Response headers, for Retry-After
+
+        Returns:
+            bool: True if the credential was quarantined
+        """
+        if not self.credential or status_code is None:
+            return False
+        if status_code in self.AUTH_FAILURE_STATUSES:
+            self.quarantine(self.credential, settings.CREDENTIAL_AUTH_QUARANTINE_SECONDS, f"HTTP {status_code}")
+            return True
+        if status_code == 429:
+            seconds = settings.CREDENTIAL_QUARANTINE_SECONDS
+            retry_after = (headers or {}).get("Retry-After")
+            if retry_after:
+                try:
+                    seconds = max(1, int(float(retry_after)))
+                except (TypeError, ValueError):
+                    pass
+            self.quarantine(self.credential, seconds, "HTTP 429")
+            return True
+        return False
+
+
+def build_rate_limiter(redis_client: Redis, api_name: str, credentials: List[str],
+                       max_requests: int, period_seconds: int) -> ApiIntegrationRateLimiter:
+    """
+    Build a vendor limiter: a CredentialPool when several credentials are
+    configured, otherwise the single-key ApiIntegrationRateLimiter.
+    """
+    if len(credentials) > 1:
+        return CredentialPool(redis_client, api_name, credentials, max_requests, period_seconds)
+    return ApiIntegrationRateLimiter(
+        redis_client=redis_client,
+        api_name=api_name,
+        max_requests=max_requests,
+        period_seconds=period_seconds
+    )
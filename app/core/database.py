@@ -1,12 +1,103 @@
+import os
+import sys
+import uuid
+from typing import Any, Dict, List, Optional
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 
 from app.core.config import settings
 
-engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
+PROCESS_ROLES = ("api", "worker", "script")
+
+
+def process_role(argv: Optional[List[str]] = None) -> str:
+    """Return DB_PROCESS_ROLE, or guess the role from the command line when it is empty."""
+    if settings.DB_PROCESS_ROLE:
+        role = settings.DB_PROCESS_ROLE.strip().lower()
+        if role not in PROCESS_ROLES:
+            raise ValueError(f"Unknown DB_PROCESS_ROLE {settings.DB_PROCESS_ROLE!r}, expected one of {PROCESS_ROLES}")
+        return role
+
+    argv = sys.argv if argv is None else argv
+    program = os.path.basename(argv[0]) if argv else ""
+    if program in ("__main__.py", "") and argv:
+        # python -m uvicorn / python -m celery
+        program = os.path.basename(os.path.dirname(argv[0]))
+    if program.startswith(("uvicorn", "gunicorn")):
+        return "api"
+    if program.startswith("celery") and "worker" in argv[1:]:
+        return "worker"
+    return "script"
+
+
+def engine_options(role: str, is_async: bool = False) -> Dict[str, Any]:
+    """Keyword arguments for create_engine / create_async_engine for a process role."""
+    if settings.DB_PGBOUNCER_MODE:
+        # PgBouncer pools the server connections; a transaction may land on any of
+        # them, so keep nothing open between checkouts and never reuse a prepared
+        # statement (asyncpg prepares every query by default; psycopg2 never does)
+        options: Dict[str, Any] = {"poolclass": NullPool}
+        if is_async:
+            options["connect_args"] = {
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+            }
+        return options
+
+    pool_size, max_overflow = {
+        "api": (settings.DB_POOL_SIZE_API, settings.DB_MAX_OVERFLOW_API),
+        "worker": (settings.DB_POOL_SIZE_WORKER, settings.DB_MAX_OVERFLOW_WORKER),
+        "script": (settings.DB_POOL_SIZE_SCRIPT, settings.DB_MAX_OVERFLOW_SCRIPT),
+    }[role]
+    return {
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+def async_database_url(url: str) -> str:
+    """Return the asyncpg form of a PostgreSQL URL (postgresql://, postgresql+psycopg2://, ...)."""
+    url = make_url(url)
+    if url.get_backend_name() == "postgresql":
+        url = url.set(drivername="postgresql+asyncpg")
+    return url.render_as_string(hide_password=False)
+
+
+DB_ROLE = process_role()
+
+# Sync engine: Celery workers, scripts, Alembic and the endpoints not yet moved to get_async_db
+engine = create_engine(settings.DATABASE_URL, **engine_options(DB_ROLE))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine: API endpoints. Nothing connects until the first request uses it,
+# so worker processes that never touch it hold no async connections.
+# expire_on_commit=False because expired attributes would need a lazy load after
+# commit, which an AsyncSession can't do implicitly.
+async_engine = create_async_engine(async_database_url(settings.DATABASE_URL), **engine_options(DB_ROLE, is_async=True))
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+
+def dispose_engines_after_fork() -> None:
+    """
+    Give a forked child its own empty pools.
+
+    The child inherits the parent's pooled connections (the same sockets); using
+    them from two processes corrupts both sessions. close=False leaves the sockets
+    to the parent instead of closing them from the child.
+    """
+    engine.dispose(close=False)
+    async_engine.sync_engine.dispose(close=False)
+
+
 Base = declarative_base()
 
 def get_db():
@@ -14,4 +105,8 @@ def get_db():
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -7,6 +7,7 @@ from redis import Redis
 from app.core.database import get_db
 from app.core.config import get_redis_connection
 from app.core.api_integration_rate_limiter import ApiIntegrationRateLimiter, get_api_rate_limits
+from app.core.credential_pool import build_rate_limiter, get_vendor_credentials
 from app.services.auth_service import AuthService
 from app.models.user import User
 
@@ -140,15 +141,17 @@ def get_openai_rate_limiter(redis_client: Redis) -> ApiIntegrationRateLimiter:
         redis_client: Redis client instance
         
     Returns:
-        ApiIntegrationRateLimiter: Rate limiter configured for OpenAI API
+        ApiIntegrationRateLimiter: Rate limiter configured for OpenAI API, a
+            CredentialPool when OPENAI_API_KEYS lists several keys
     """
     limits = get_api_rate_limits()
     config = limits['OpenAI']
-    return ApiIntegrationRateLimiter(
-        redis_client=redis_client,
-        api_name='OpenAI',
-        max_requests=config['max_requests'],
-        period_seconds=config['period_seconds']
+    return build_rate_limiter(
+        redis_client,
+        'OpenAI',
+        get_vendor_credentials('OPENAI_API_KEYS', 'OPENAI_API_KEY'),
+        config['max_requests'],
+        config['period_seconds']
     )
 
 def get_openai_rate_limiter_dependency(redis_client: Redis = Depends(get_redis_client)) -> ApiIntegrationRateLimiter:
@@ -172,15 +175,17 @@ def get_perplexity_rate_limiter(redis_client: Redis) -> ApiIntegrationRateLimite
         redis_client: Redis client instance
         
     Returns:
-        ApiIntegrationRateLimiter: Rate limiter configured for Perplexity API
+        ApiIntegrationRateLimiter: Rate limiter configured for Perplexity API, a
+            CredentialPool when PERPLEXITY_TOKENS lists several tokens
     """
     limits = get_api_rate_limits()
     config = limits['Perplexity']
-    return ApiIntegrationRateLimiter(
-        redis_client=redis_client,
-        api_name='Perplexity',
-        max_requests=config['max_requests'],
-        period_seconds=config['period_seconds']
+    return build_rate_limiter(
+        redis_client,
+        'Perplexity',
+        get_vendor_credentials('PERPLEXITY_TOKENS', 'PERPLEXITY_TOKEN'),
+        config['max_requests'],
+        config['period_seconds']
     )
 
 def get_perplexity_rate_limiter_dependency(redis_client: Redis = Depends(get_redis_client)) -> ApiIntegrationRateLimiter:
@@ -233,10 +238,18 @@ def get_rate_limiter_for_service(service_name: str, redis_client: Redis = Depend
 security = HTTPBearer()
 
 def get_current_user(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
 ) -> User:
-    """Dependency to get current authenticated user."""
+    """Dependency to get current authenticated user.
+
+    Reuses the user AuthenticationMiddleware already resolved for this request,
+    so the token is not decoded and the user not loaded a second time.
+    """
+    user = getattr(request.state, 'current_user', None)
+    if user is not None:
+        return user
     auth_service = AuthService()
     return auth_service.get_current_user(credentials.credentials, db)
 
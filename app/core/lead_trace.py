@@ -0,0 +1,251 @@
+"""
+Per-lead Pipeline Trace
+
+enrich_lead_task keeps a LeadPipelineTrace for each run. It holds when the task
+was queued, the start and duration of every stage, and the vendor, limiter and
+DB time spent inside each stage:
+
+- vendor attempts and limiter waits are reported by app/core/metrics.py
+- DB time is measured by a SQLAlchemy cursor hook
+
+Both report into the trace that is active in the current context. A worker
+runs one task at a time per process, so there is only ever one.
+
+Each stage is also an OpenTelemetry span when tracing is on
+(app/core/tracing.py), so vendor HTTP and SQL spans nest under their stage.
+
+The trace stays in memory until the task ends; save_lead_trace() then inserts
+a single lead_traces row. summarize_campaign_traces() computes the percentile
+breakdown for a campaign in SQL.
+"""
+import time
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event, func
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.core.logger import get_logger
+from app.core.tracing import end_span, start_span
+from app.models.lead_trace import LeadTrace
+
+logger = get_logger(__name__)
+
+TRACE_STAGES = ('email_verification', 'enrichment', 'email_copy', 'instantly')
+TRACE_PERCENTILES = (0.5, 0.95, 0.99)
+BREAKDOWN_COLUMNS = (
+    'queue_ms', 'total_ms', 'vendor_ms', 'limiter_wait_ms', 'db_ms',
+    'email_verification_ms', 'enrichment_ms', 'email_copy_ms', 'instantly_ms'
+)
+
+_current_trace: ContextVar[Optional["LeadPipelineTrace"]] = ContextVar('lead_pipeline_trace', default=None)
+
+
+def current_trace() -> Optional["LeadPipelineTrace"]:
+    """The trace of the lead being processed in this context, if any."""
+    return _current_trace.get()
+
+
+def _ms(seconds: float) -> int:
+    return int(round(seconds * 1000))
+
+
+class LeadPipelineTrace:
+    """
+    Timing collected for one enrich_lead_task run.
+
+    Args:
+        lead_id: Lead being processed
+        campaign_id: Campaign of the lead
+        enqueued_at: Unix time the task was published, if known
+        attempt: 1 for the first run, higher for Celery retries
+    """
+
+    def __init__(self, lead_id: str, campaign_id: str, enqueued_at: Optional[float] = None, attempt: int = 1):
+        self.lead_id = lead_id
+        self.campaign_id = campaign_id
+        self.enqueued_at = enqueued_at
+        self.attempt = attempt
+        self.started_at = time.time()
+        self._started = time.monotonic()
+        self.vendor_seconds = 0.0
+        self.limiter_wait_seconds = 0.0
+        self.db_seconds = 0.0
+        self.vendor_calls = 0
+        self.stages: Dict[str, list] = {}
+        self._stage = None
+        self._span = None
+        self._token = None
+
+    def activate(self) -> "LeadPipelineTrace":
+        """Make this the trace that vendor, limiter and DB timings report to."""
+        self._token = _current_trace.set(self)
+        return self
+
+    def deactivate(self) -> None:
+        # A stage left open by an exception still ends its span
+        end_span(self._span)
+        self._span = None
+        if self._token is not None:
+            _current_trace.reset(self._token)
+            self._token = None
+
+    def start_stage(self, stage: str) -> float:
+        """
+        Mark the start of a stage.
+
+        Returns:
+            float: time.monotonic() at the start, for record_stage()
+        """
+        end_span(self._span)
+        self._span = start_span(
+            f'lead.{stage}', **{'lead.id': self.lead_id, 'campaign.id': self.campaign_id}
+        )
+        started = time.monotonic()
+        self._stage = (stage, started, self.vendor_seconds, self.limiter_wait_seconds,
+                       self.db_seconds, self.vendor_calls)
+        return started
+
+    def end_stage(self, stage: str, outcome: str) -> None:
+        """Close the stage opened by start_stage(). Called from record_stage()."""
+        if not self._stage or self._stage[0] != stage:
+            return
+        _, started, vendor, wait, db, calls = self._stage
+        self.stages[stage] = [
+            _ms(started - self._started),
+            _ms(time.monotonic() - started),
+            _ms(self.vendor_seconds - vendor),
+            _ms(self.limiter_wait_seconds - wait),
+            _ms(self.db_seconds - db),
+            self.vendor_calls - calls,
+            outcome
+        ]
+        self._stage = None
+        end_span(self._span, outcome=outcome)
+        self._span = None
+
+    def add_vendor_request(self, seconds: float) -> None:
+        self.vendor_seconds += seconds
+        self.vendor_calls += 1
+
+    def add_limiter_wait(self, seconds: float) -> None:
+        self.limiter_wait_seconds += seconds
+
+    def add_db_time(self, seconds: float) -> None:
+        self.db_seconds += seconds
+
+    @property
+    def queue_ms(self) -> Optional[int]:
+        if self.enqueued_at is None:
+            return None
+        return max(0, _ms(self.started_at - self.enqueued_at))
+
+    def to_model(self, status: str, job_id: Optional[str] = None) -> LeadTrace:
+        """Build the lead_traces row for this run."""
+        return LeadTrace(
+            lead_id=self.lead_id,
+            campaign_id=self.campaign_id,
+            job_id=job_id,
+            status=status,
+            attempt=self.attempt,
+            enqueued_at=datetime.fromtimestamp(self.enqueued_at, tz=timezone.utc) if self.enqueued_at else None,
+            started_at=datetime.fromtimestamp(self.started_at, tz=timezone.utc),
+            queue_ms=self.queue_ms,
+            total_ms=_ms(time.monotonic() - self._started),
+            vendor_ms=_ms(self.vendor_seconds),
+            limiter_wait_ms=_ms(self.limiter_wait_seconds),
+            db_ms=_ms(self.db_seconds),
+            vendor_calls=self.vendor_calls,
+            stages=self.stages,
+            **{f'{stage}_ms': self.stages[stage][1] for stage in TRACE_STAGES if stage in self.stages}
+        )
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_trace.get() is not None:
+        conn.info.setdefault('lead_trace_query_started', []).append(time.monotonic())
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    trace = _current_trace.get()
+    started = conn.info.get('lead_trace_query_started')
+    if trace is not None and started:
+        trace.add_db_time(time.monotonic() - started.pop())
+
+
+def save_lead_trace(db: Session, trace: LeadPipelineTrace, job) -> bool:
+    """
+    Insert the trace of a finished run, with the final status of its
+    ENRICH_LEAD job. A failure is logged and never raised, so a trace can't
+    fail the task.
+
+    Returns:
+        bool: True if the row was written
+    """
+    trace.deactivate()
+    try:
+        db.add(trace.to_model(job.status.value.lower(), job.id))
+        db.commit()
+        return True
+    except Exception as e:
+        db.rollback()
+        logger.warning(f"Could not store pipeline trace for lead {trace.lead_id}: {str(e)}",
+                       extra={'component': 'lead_trace', 'lead_id': trace.lead_id})
+        return False
+
+
+def summarize_campaign_traces(db: Session, campaign_id: str) -> Dict[str, Any]:
+    """
+    Percentile breakdown of a campaign's traces.
+
+    Returns:
+        Dict with the number of traces, runs per status, p50/p95/p99 of each
+        timing column in milliseconds (None when no trace has it), and how
+        the summed end-to-end time splits into queue, vendor, limiter, DB and
+        other (worker) time
+    """
+    selects = [func.count(LeadTrace.id)]
+    for column in BREAKDOWN_COLUMNS:
+        for q in TRACE_PERCENTILES:
+            selects.append(func.percentile_cont(q).within_group(getattr(LeadTrace, column)))
+    sums = ('queue_ms', 'total_ms', 'vendor_ms', 'limiter_wait_ms', 'db_ms')
+    selects.extend(func.coalesce(func.sum(getattr(LeadTrace, column)), 0) for column in sums)
+
+    row = db.query(*selects).filter(LeadTrace.campaign_id == campaign_id).one()
+    count, values = row[0], list(row[1:])
+
+    breakdown = {}
+    for column in BREAKDOWN_COLUMNS:
+        breakdown[column] = {}
+        for q in TRACE_PERCENTILES:
+            value = values.pop(0)
+            breakdown[column][f'p{int(q * 100)}'] = round(value, 1) if value is not None else None
+
+    queue, total, vendor, wait, db_time = (int(v) for v in values)
+    elapsed = queue + total
+    share = {}
+    if elapsed:
+        other = max(0, total - vendor - wait - db_time)
+        share = {
+            name: round(part / elapsed, 4)
+            for name, part in (('queue', queue), ('vendor', vendor), ('limiter_wait', wait),
+                               ('db', db_time), ('other', other))
+        }
+
+    statuses = dict(
+        db.query(LeadTrace.status, func.count(LeadTrace.id))
+        .filter(LeadTrace.campaign_id == campaign_id)
+        .group_by(LeadTrace.status)
+        .all()
+    )
+    return {
+        'campaign_id': campaign_id,
+        'traces': count,
+        'statuses': statuses,
+        'percentiles_ms': breakdown,
+        'share': share
+    }
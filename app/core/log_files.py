@@ -0,0 +1,288 @@
+"""
+Per-process log files and the tools to read them back.
+
+Every process writes its own file, LOG_DIR/combined-<hostname>-<pid>.log, so a
+rollover never renames a file another process is still appending to. Rotated
+segments sit next to it as .log.1, .log.2, ... and may be compressed (.gz or
+.zst).
+
+Files of processes that have exited are removed once they have not been
+written to for LOG_RETENTION_SECONDS (prune_stale_logs).
+
+Reading goes the other way: segments of one process are read oldest first, and
+the processes are merged by timestamp into one stream (scripts/logs.py). This
+module does not import logging_config, so the CLI does not open a log file of
+its own.
+"""
+import glob
+import gzip
+import heapq
+import io
+import json
+import os
+import re
+import shutil
+import socket
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+LOG_FILE_PREFIX = "combined"
+
+COMPRESSION_SUFFIXES = {'gzip': '.gz', 'zstd': '.zst'}
+
+# A process stream (combined-<host>-<pid>.log, or the old shared combined.log),
+# optionally followed by a rotation index and a compression suffix
+SEGMENT_PATTERN = re.compile(
+    rf'^(?P<stream>{LOG_FILE_PREFIX}(?:-[^/]+?)?\.log)(?:\.(?P<index>\d+))?(?P<compressed>\.gz|\.zst)?$'
+)
+
+# combined-<host>-<pid>.log; the hostname is sanitized, so it has no '-'
+PROCESS_STREAM_PATTERN = re.compile(rf'^{LOG_FILE_PREFIX}-(?P<host>[^-]+)-(?P<pid>\d+)\.log$')
+
+LEVELS = {'DEBUG': 10, 'INFO': 20, 'WARNING': 30, 'ERROR': 40, 'CRITICAL': 50}
+
+# What `make tail-errors` used to grep for
+ATTENTION_PATTERN = re.compile(
+    r"error|exception|fail|circuit.?breaker|timeout|connection.?refused|http.?[45][0-9][0-9]|api.?error|"
+    r"request.?failed|rate.?limit|throttle|quota.?exceeded|too.?many.?requests|429",
+    re.IGNORECASE
+)
+
+
+def _hostname(hostname: Optional[str] = None) -> str:
+    return re.sub(r'[^A-Za-z0-9_.]', '_', hostname or socket.gethostname())
+
+
+def process_log_filename(log_dir: str, hostname: Optional[str] = None, pid: Optional[int] = None) -> str:
+    """Path of the log file for this process (or the given host and pid)."""
+    hostname = _hostname(hostname)
+    return os.path.join(log_dir, f"{LOG_FILE_PREFIX}-{hostname}-{pid or os.getpid()}.log")
+
+
+def resolve_compression(name: Optional[str]) -> Optional[str]:
+    """Normalize LOG_COMPRESSION. zstd falls back to gzip when zstandard is not installed."""
+    name = (name or '').strip().lower()
+    if name in ('', 'none', 'off'):
+        return None
+    if name not in COMPRESSION_SUFFIXES:
+        raise ValueError(f"Unknown log compression {name!r}, expected one of {sorted(COMPRESSION_SUFFIXES)}")
+    if name == 'zstd':
+        try:
+            import zstandard  # noqa: F401
+        except ImportError:
+            return 'gzip'
+    return name
+
+
+def compress_file(source: str, dest: str, method: str) -> None:
+    """Compress a rotated segment into dest and remove the source."""
+    if not os.path.exists(source):
+        return
+    with open(source, 'rb') as src:
+        if method == 'zstd':
+            import zstandard
+            with open(dest, 'wb') as dst:
+                zstandard.ZstdCompressor().copy_stream(src, dst)
+        else:
+            with gzip.open(dest, 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+    os.remove(source)
+
+
+def open_segment(path: str):
+    """Open a plain, .gz or .zst segment for reading text."""
+    if path.endswith('.zst'):
+        import zstandard
+        reader = zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+        return io.TextIOWrapper(reader, encoding='utf-8', errors='replace')
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8', errors='replace')
+    return open(path, encoding='utf-8', errors='replace')
+
+
+def log_segments(log_dir: str, include_rotated: bool = True) -> Dict[str, List[str]]:
+    """Segment paths per process stream, oldest first, the live file last."""
+    streams: Dict[str, List[Tuple[int, str]]] = {}
+    for path in glob.glob(os.path.join(log_dir, f"{LOG_FILE_PREFIX}*")):
+        match = SEGMENT_PATTERN.match(os.path.basename(path))
+        if not match:
+            continue
+        index = int(match.group('index') or 0)
+        if index and not include_rotated:
+            continue
+        streams.setdefault(match.group('stream'), []).append((index, path))
+    # Higher rotation index = older segment
+    return {stream: [path for _, path in sorted(segments, reverse=True)]
+            for stream, segments in sorted(streams.items())}
+
+
+def _process_alive(stream: str) -> bool:
+    """Whether the stream belongs to a running process on this host."""
+    match = PROCESS_STREAM_PATTERN.match(stream)
+    if not match or match.group('host') != _hostname():
+        return False
+    try:
+        os.kill(int(match.group('pid')), 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True  # exists, owned by another user
+    return True
+
+
+def prune_stale_logs(log_dir: str, max_age_seconds: int, now: Optional[float] = None) -> List[str]:
+    """
+    Delete the files of process streams that have not been written to for
+    max_age_seconds, rotated segments included.
+
+    A stream is kept while any of its segments is newer than that, and while
+    its process is still running on this host. This process's own stream is
+    always kept.
+
+    Returns:
+        List[str]: The paths removed
+    """
+    if max_age_seconds <= 0:
+        return []
+    cutoff = (now or time.time()) - max_age_seconds
+    own_stream = os.path.basename(process_log_filename(log_dir))
+    removed = []
+    for stream, paths in log_segments(log_dir).items():
+        if stream == own_stream:
+            continue
+        try:
+            newest = max(os.path.getmtime(path) for path in paths)
+        except FileNotFoundError:
+            continue  # rotated or pruned by another process meanwhile
+        if newest >= cutoff or _process_alive(stream):
+            continue
+        for path in paths:
+            try:
+                os.remove(path)
+                removed.append(path)
+            except FileNotFoundError:
+                pass
+    return removed
+
+
+def parse_line(line: str, previous_timestamp: str = '') -> Dict[str, Any]:
+    """Parse one JSON log line. Anything else (tracebacks, prints) keeps the previous timestamp."""
+    line = line.rstrip('\n')
+    try:
+        record = json.loads(line)
+        if isinstance(record, dict):
+            return record
+    except ValueError:
+        pass
+    return {'timestamp': previous_timestamp, 'level': '', 'message': line}
+
+
+def _read_stream(stream: str, paths: List[str]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    timestamp = ''
+    for path in paths:
+        try:
+            handle = open_segment(path)
+        except FileNotFoundError:
+            continue  # rotated away since it was listed
+        with handle:
+            for line in handle:
+                if not line.strip():
+                    continue
+                record = parse_line(line, timestamp)
+                timestamp = record.get('timestamp') or timestamp
+                yield stream, record
+
+
+def merge_logs(log_dir: str, include_rotated: bool = True) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """(stream, record) pairs from every process file, merged by timestamp."""
+    readers = [_read_stream(stream, paths) for stream, paths in log_segments(log_dir, include_rotated).items()]
+    return heapq.merge(*readers, key=lambda item: item[1].get('timestamp') or '')
+
+
+def parse_since(value: str, now: Optional[datetime] = None) -> str:
+    """'15m', '2h', '1d' or an ISO timestamp, as a UTC ISO string comparable to record timestamps."""
+    match = re.fullmatch(r'(\d+)([smhd])', value.strip())
+    if not match:
+        return datetime.fromisoformat(value.strip()).isoformat()
+    amount, unit = int(match.group(1)), match.group(2)
+    unit_name = {'s': 'seconds', 'm': 'minutes', 'h': 'hours', 'd': 'days'}[unit]
+    delta = timedelta(**{unit_name: amount})
+    return ((now or datetime.utcnow()) - delta).isoformat()
+
+
+class LogQuery:
+    """Record filter used by the CLI. All given conditions must match."""
+
+    def __init__(self, min_level: Optional[str] = None, pattern: Optional[str] = None,
+                 components: Optional[List[str]] = None, since: Optional[str] = None,
+                 attention: bool = False):
+        self.min_level = LEVELS[min_level.upper()] if min_level else None
+        self.pattern = re.compile(pattern, re.IGNORECASE) if pattern else None
+        self.components = set(components) if components else None
+        self.since = since
+        self.attention = attention
+
+    def matches(self, record: Dict[str, Any]) -> bool:
+        level = LEVELS.get(str(record.get('level') or '').upper(), 0)
+        if self.min_level is not None and level < self.min_level:
+            return False
+        if self.since and (record.get('timestamp') or '') < self.since:
+            return False
+        if self.components is not None and record.get('component') not in self.components:
+            return False
+        text = f"{record.get('message', '')} {record.get('error', '') or ''}"
+        if self.pattern and not self.pattern.search(text):
+            return False
+        if self.attention and level < LEVELS['ERROR'] and not ATTENTION_PATTERN.search(text):
+            return False
+        return True
+
+
+class LogFollower:
+    """Polls the live process files for new lines, like tail -F over all of them.
+
+    Files that appear later (new workers) are picked up on the next poll. A file
+    that was rotated or truncated is read again from the start.
+    """
+
+    def __init__(self, log_dir: str, from_start: bool = False):
+        self.log_dir = log_dir
+        self.from_start = from_start
+        self._offsets: Dict[str, Tuple[int, int]] = {}
+        self._partial: Dict[str, bytes] = {}
+        self._timestamps: Dict[str, str] = {}
+        self._first_poll = True
+
+    def poll(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """New (stream, record) pairs since the last poll, in timestamp order."""
+        batch = []
+        for stream, paths in log_segments(self.log_dir, include_rotated=False).items():
+            path = paths[-1]
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            inode, offset = self._offsets.get(path, (stat.st_ino, None))
+            if offset is None:
+                offset = stat.st_size if self._first_poll and not self.from_start else 0
+            elif inode != stat.st_ino or stat.st_size < offset:
+                offset = 0
+                self._partial.pop(path, None)
+            if stat.st_size > offset:
+                with open(path, 'rb') as handle:
+                    handle.seek(offset)
+                    data = self._partial.pop(path, b'') + handle.read()
+                    offset = handle.tell()
+                lines = data.split(b'\n')
+                if lines[-1]:
+                    self._partial[path] = lines[-1]  # incomplete line, finish it next time
+                for line in lines[:-1]:
+                    if line.strip():
+                        record = parse_line(line.decode('utf-8', 'replace'), self._timestamps.get(stream, ''))
+                        self._timestamps[stream] = record.get('timestamp') or self._timestamps.get(stream, '')
+                        batch.append((stream, record))
+            self._offsets[path] = (stat.st_ino, offset)
+        self._first_poll = False
+        batch.sort(key=lambda item: item[1].get('timestamp') or '')
+        return batch
@@ -4,14 +4,25 @@ import os
 import logging
 from pythonjsonlogger import jsonlogger
 from datetime import datetime
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 import sys
 import re
 import json
-from typing import Any, Dict, Union
+import atexit
+import hashlib
+import itertools
+import queue
+import threading
+import time
+from collections import Counter
+from functools import lru_cache
+from typing import Any, Dict, Optional, Union
 
 # Import settings for environment variable configuration
 from app.core.config import settings
+from app.core.log_files import (
+    COMPRESSION_SUFFIXES, compress_file, process_log_filename, prune_stale_logs, resolve_compression
+)
 
 try:
     from colorama import Fore, Style, init as colorama_init
@@ -37,35 +48,105 @@ MAX_BYTES = settings.LOG_ROTATION_SIZE
 BACKUP_COUNT = settings.LOG_BACKUP_COUNT
 
 class LogSanitizer:
-    """Utility class for sanitizing sensitive data in logs."""
+    """
+    Utility class for sanitizing sensitive data in logs.
+
+    A string is scanned once, with an alternation of only the patterns that
+    can match it: each pattern needs one of its PATTERN_TRIGGERS characters
+    (a digit for phone numbers, '@' for emails, ...). Strings with no trigger
+    at all, most component names and plain messages, are returned as they
+    are without running a regex.
+    """
     
-    # Patterns for sensitive data
+    # Patterns for sensitive data, in priority order. The email lookbehind and
+    # the phone lookahead only skip start positions that can't match.
     SENSITIVE_PATTERNS = {
-        'email': r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}',
-        'phone': r'(?:\+?[1-9]\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}',
+        'email': r'(?<![a-zA-Z0-9._%+-])[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}',
+        'phone': r'(?=[+(\d])(?:\+?[1-9]\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}',
         'credit_card': r'\b\d{4}[- ]?\d{4}[- ]?\d{4}[- ]?\d{4}\b',
-        'api_key': r'(?i)(api[_-]?key|apikey|token|secret)[_-]?[=:]\s*[\w\-\.]+',
-        'password': r'(?i)(password|passwd|pwd)[_-]?[=:]\s*[\w\-\.]+',
+        'api_key': r'(?i:(?:api[_-]?key|apikey|token|secret)[_-]?[=:]\s*[\w\-\.]+)',
+        'password': r'(?i:(?:password|passwd|pwd)[_-]?[=:]\s*[\w\-\.]+)',
         'jwt': r'eyJ[A-Za-z0-9-_=]+\.eyJ[A-Za-z0-9-_=]+\.?[A-Za-z0-9-_.+/=]*',
         'uuid': r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}',
     }
+    REDACTIONS = {name: f"[REDACTED_{name.upper()}]" for name in SENSITIVE_PATTERNS}
+
+    # Characters a string must contain for each pattern to match (the JWT
+    # pattern is checked for 'eyJ' instead)
+    _DIGITS = frozenset('0123456789')
+    PATTERN_TRIGGERS = {
+        'email': frozenset('@'),
+        'phone': _DIGITS,
+        'credit_card': _DIGITS,
+        'api_key': frozenset('=:'),
+        'password': frozenset('=:'),
+        'jwt': None,
+        'uuid': frozenset('-'),
+    }
+    TRIGGER_CHARS = frozenset().union(*(chars for chars in PATTERN_TRIGGERS.values() if chars))
     
-    # Fields that should always be redacted
-    SENSITIVE_FIELDS = {
+    # Fields that should always be redacted (matched as a substring of the field name)
+    SENSITIVE_FIELDS = frozenset({
         'password', 'token', 'secret', 'api_key', 'apikey', 'auth_token',
         'access_token', 'refresh_token', 'authorization', 'credit_card',
         'ssn', 'social_security', 'phone', 'email', 'address'
-    }
+    })
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def compiled_patterns(names: tuple) -> re.Pattern:
+        """One alternation of the named patterns, compiled once per combination."""
+        return re.compile('|'.join(
+            f'(?P<{name}>{LogSanitizer.SENSITIVE_PATTERNS[name]})' for name in names
+        ))
+
+    @classmethod
+    def _regex_for(cls, value: str) -> Optional[re.Pattern]:
+        """Regex of the patterns that can match `value`, None if none can."""
+        # Fast path: most strings (component names, ids, plain text) have no trigger at all
+        if cls.TRIGGER_CHARS.isdisjoint(value) and 'eyJ' not in value:
+            return None
+        present = set(value)
+        names = tuple(
+            name for name, chars in cls.PATTERN_TRIGGERS.items()
+            if ('eyJ' in value if chars is None else not chars.isdisjoint(present))
+        )
+        return cls.compiled_patterns(names) if names else None
+
+    @classmethod
+    def redact_string(cls, value: str) -> str:
+        """Replace each sensitive match in a string with its redaction marker."""
+        regex = cls._regex_for(value)
+        if regex is None:
+            return value
+        return regex.sub(lambda match: cls.REDACTIONS[match.lastgroup], value)
+
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def field_redaction(name: str) -> Optional[str]:
+        """Marker that replaces a field with this name, None if the field is not sensitive."""
+        lowered = name.lower()
+        if not any(sensitive in lowered for sensitive in LogSanitizer.SENSITIVE_FIELDS):
+            return None
+        # Use specific redaction message based on the field type
+        if 'email' in lowered:
+            return "[REDACTED_EMAIL]"
+        if 'phone' in lowered:
+            return "[REDACTED_PHONE]"
+        if 'api_key' in lowered:
+            return "[REDACTED_API_KEY]"
+        if 'password' in lowered:
+            return "[REDACTED_PASSWORD]"
+        return "[REDACTED]"
     
     @classmethod
     def sanitize_value(cls, value: Any) -> Any:
         """Sanitize a single value."""
         if isinstance(value, str):
-            # Check for sensitive patterns
-            for pattern_name, pattern in cls.SENSITIVE_PATTERNS.items():
-                if re.search(pattern, value):
-                    return f"[REDACTED_{pattern_name.upper()}]"
-            return value
+            # A string containing sensitive data is replaced as a whole
+            regex = cls._regex_for(value)
+            match = regex.search(value) if regex is not None else None
+            return cls.REDACTIONS[match.lastgroup] if match else value
         elif isinstance(value, dict):
             return cls.sanitize_dict(value)
         elif isinstance(value, list):
@@ -81,20 +162,8 @@ class LogSanitizer:
         sanitized = {}
         for key, value in data.items():
             # Check if the key itself is sensitive
-            if any(sensitive in key.lower() for sensitive in cls.SENSITIVE_FIELDS):
-                # Use specific redaction message based on the field type
-                if 'email' in key.lower():
-                    sanitized[key] = "[REDACTED_EMAIL]"
-                elif 'phone' in key.lower():
-                    sanitized[key] = "[REDACTED_PHONE]"
-                elif 'api_key' in key.lower():
-                    sanitized[key] = "[REDACTED_API_KEY]"
-                elif 'password' in key.lower():
-                    sanitized[key] = "[REDACTED_PASSWORD]"
-                else:
-                    sanitized[key] = "[REDACTED]"
-            else:
-                sanitized[key] = cls.sanitize_value(value)
+            redaction = cls.field_redaction(key) if isinstance(key, str) else None
+            sanitized[key] = redaction if redaction else cls.sanitize_value(value)
         return sanitized
     
     @classmethod
@@ -104,8 +173,7 @@ class LogSanitizer:
         if isinstance(record.msg, dict):
             record.msg = cls.sanitize_dict(record.msg)
         elif isinstance(record.msg, str):
-            for pattern_name, pattern in cls.SENSITIVE_PATTERNS.items():
-                record.msg = re.sub(pattern, f"[REDACTED_{pattern_name.upper()}]", record.msg)
+            record.msg = cls.redact_string(record.msg)
         
         # Sanitize args if they exist
         if record.args:
@@ -125,9 +193,11 @@ class CustomJsonFormatter(jsonlogger.JsonFormatter):
         # Add basic fields first
         super(CustomJsonFormatter, self).add_fields(log_record, record, message_dict)
         
-        # Add timestamp if not present
+        # Add timestamp if not present. Taken from the record, not the clock: with
+        # queued logging the line is formatted later, and the log CLI merges
+        # process files by this field
         if not log_record.get('timestamp'):
-            log_record['timestamp'] = datetime.utcnow().isoformat()
+            log_record['timestamp'] = datetime.utcfromtimestamp(record.created).isoformat(timespec='microseconds')
         
         # Add log level if not present
         if not log_record.get('level'):
@@ -145,42 +215,29 @@ class CustomJsonFormatter(jsonlogger.JsonFormatter):
 
 class SanitizingFilter(logging.Filter):
     """Filter to sanitize log records before they are processed."""
+
+    # Attributes every LogRecord has; anything else was passed in `extra`
+    STANDARD_ATTRS = frozenset(
+        logging.LogRecord('', logging.INFO, '', 0, '', None, None).__dict__
+    ) | {'message', 'asctime'}
     
     def filter(self, record: logging.LogRecord) -> bool:
         """Filter and sanitize the log record."""
         # Sanitize the log record first
         LogSanitizer.sanitize_log_record(record)
         
-        # Also sanitize any extra fields that were added to the record
-        # Get all attributes that aren't standard LogRecord attributes
-        standard_attrs = {
-            'name', 'msg', 'args', 'levelname', 'levelno', 'pathname', 'filename',
-            'module', 'exc_info', 'exc_text', 'stack_info', 'lineno', 'funcName',
-            'created', 'msecs', 'relativeCreated', 'thread', 'threadName',
-            'processName', 'process', 'message', 'asctime'
-        }
-        
-        for attr_name in dir(record):
-            if not attr_name.startswith('_') and attr_name not in standard_attrs:
-                attr_value = getattr(record, attr_name)
-                if not callable(attr_value):
-                    # Check if this is a sensitive field
-                    if any(sensitive in attr_name.lower() for sensitive in LogSanitizer.SENSITIVE_FIELDS):
-                        # Sanitize sensitive field names
-                        if 'email' in attr_name.lower():
-                            setattr(record, attr_name, "[REDACTED_EMAIL]")
-                        elif 'phone' in attr_name.lower():
-                            setattr(record, attr_name, "[REDACTED_PHONE]")
-                        elif 'api_key' in attr_name.lower():
-                            setattr(record, attr_name, "[REDACTED_API_KEY]")
-                        elif 'password' in attr_name.lower():
-                            setattr(record, attr_name, "[REDACTED_PASSWORD]")
-                        else:
-                            setattr(record, attr_name, "[REDACTED]")
-                    else:
-                        # Sanitize the value
-                        sanitized_value = LogSanitizer.sanitize_value(attr_value)
-                        setattr(record, attr_name, sanitized_value)
+        # Then the extra fields, which are the only non-standard keys of the record's __dict__
+        attributes = record.__dict__
+        for name, value in attributes.items():
+            if name in self.STANDARD_ATTRS or name.startswith('_'):
+                continue
+            redaction = LogSanitizer.field_redaction(name)
+            if redaction:
+                attributes[name] = redaction
+            elif isinstance(value, (str, dict, list)):
+                sanitized = LogSanitizer.sanitize_value(value)
+                if sanitized is not value:
+                    attributes[name] = sanitized
         
         return True
 
@@ -242,6 +299,277 @@ class EnhancedColorFormatter(logging.Formatter):
             msg = '\n' + colorize_json(pretty_json)
         return f"{level_str} {time_str_col} {context_str} {msg}"
 
+class ProcessFileHandler(RotatingFileHandler):
+    """
+    Write this process's own file, LOG_DIR/combined-<hostname>-<pid>.log.
+
+    A RotatingFileHandler on a file shared by several processes renames it
+    under the others at rollover, which loses or duplicates lines. With one
+    file per process, rollover only ever touches our own file. Files roll over
+    at max_bytes or after interval_seconds, and rotated segments can be
+    compressed (on the writer thread when logging is queued).
+
+    Since pids are not reused for the same file, the files of exited processes
+    pile up. At startup and at every rollover, other processes' files not
+    written to for retention_seconds are removed (0 keeps them).
+    """
+
+    def __init__(self, log_dir: str, max_bytes: int, backup_count: int,
+                 interval_seconds: int = 0, compression: Optional[str] = None,
+                 retention_seconds: int = 0):
+        self.log_dir = log_dir
+        self.interval_seconds = interval_seconds
+        self.retention_seconds = retention_seconds
+        super().__init__(process_log_filename(log_dir), maxBytes=max_bytes, backupCount=backup_count, delay=True)
+        self.rollover_at = self._next_rollover_at()
+        if compression:
+            suffix = COMPRESSION_SUFFIXES[compression]
+            self.namer = lambda name: name + suffix
+            self.rotator = lambda source, dest: compress_file(source, dest, compression)
+        self.prune_stale_files()
+
+    def _next_rollover_at(self) -> float:
+        return time.time() + self.interval_seconds if self.interval_seconds else float('inf')
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if record.created >= self.rollover_at:
+            if os.path.exists(self.baseFilename) and os.path.getsize(self.baseFilename) > 0:
+                return True
+            self.rollover_at = self._next_rollover_at()  # nothing written yet, keep the file
+        return bool(super().shouldRollover(record))
+
+    def doRollover(self) -> None:
+        super().doRollover()
+        self.rollover_at = self._next_rollover_at()
+        self.prune_stale_files()
+
+    def prune_stale_files(self) -> None:
+        """Remove the files of processes gone for longer than retention_seconds."""
+        try:
+            prune_stale_logs(self.log_dir, self.retention_seconds)
+        except OSError:
+            pass  # e.g. LOG_DIR not created yet; next rollover tries again
+
+    def reopen_for_current_process(self) -> None:
+        """Switch to the file of the current pid; called in a forked child."""
+        filename = os.path.abspath(process_log_filename(self.log_dir))
+        if filename == self.baseFilename:
+            return
+        self.acquire()
+        try:
+            if self.stream:
+                self.stream.close()
+                self.stream = None
+            self.baseFilename = filename
+            self.rollover_at = self._next_rollover_at()
+        finally:
+            self.release()
+
+
+class QueuedLogHandler(QueueHandler):
+    """
+    Hand records to the background writer thread instead of formatting and
+    writing them on the calling thread.
+
+    The queue holds LOG_BUFFER_SIZE records. When it is full, DEBUG and INFO
+    records are dropped at once; WARNING and above wait up to
+    LOG_QUEUE_BLOCK_SECONDS for room first. Dropped records are counted per
+    level (get_log_queue_stats() and log_records_dropped_total).
+    """
+
+    def __init__(self, capacity: int, block_seconds: float):
+        super().__init__(queue.Queue(maxsize=capacity))
+        self.capacity = capacity
+        self.block_seconds = block_seconds
+        self.dropped = Counter()
+        self._dropped_lock = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The writer is a thread of this process, so nothing is pickled. Only the
+        # message args are merged now, in case the caller mutates them afterwards.
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+            return
+        except queue.Full:
+            pass
+        if record.levelno >= logging.WARNING and self.block_seconds > 0:
+            try:
+                self.queue.put(record, timeout=self.block_seconds)
+                return
+            except queue.Full:
+                pass
+        with self._dropped_lock:
+            self.dropped[record.levelname] += 1
+        _count_dropped_record(record.levelname)
+
+
+class LogWriter(QueueListener):
+    """Background thread that formats queued records and writes them to the real handlers."""
+
+    def enqueue_sentinel(self) -> None:
+        # Wait for room: the sentinel must not be dropped or stop() never returns
+        self.queue.put(self._sentinel)
+
+
+def _count_dropped_record(level: str) -> None:
+    try:
+        from app.core.metrics import LOG_RECORDS_DROPPED_TOTAL
+    except ImportError:
+        return
+    LOG_RECORDS_DROPPED_TOTAL.labels(level=level).inc()
+
+
+_queue_handler: Optional[QueuedLogHandler] = None
+_log_writer: Optional[LogWriter] = None
+_process_file_handler: Optional[ProcessFileHandler] = None
+
+
+def _reopen_process_log_after_fork() -> None:
+    """A forked child writes its own file, not the parent's."""
+    if _process_file_handler is not None:
+        _process_file_handler.reopen_for_current_process()
+
+
+def _start_log_writer(targets) -> None:
+    global _log_writer
+    _log_writer = LogWriter(_queue_handler.queue, *targets, respect_handler_level=True)
+    _log_writer.start()
+
+
+def _restart_log_writer_after_fork() -> None:
+    """
+    Give a forked child (celery pool process, gunicorn worker) its own queue
+    and writer thread. The parent's thread does not exist in the child, and
+    the inherited queue's locks may have been held mid-operation.
+    """
+    if _queue_handler is None or _log_writer is None:
+        return
+    targets = _log_writer.handlers
+    _queue_handler.queue = queue.Queue(maxsize=_queue_handler.capacity)
+    _queue_handler.dropped = Counter()
+    _queue_handler._dropped_lock = threading.Lock()
+    _start_log_writer(targets)
+
+
+def stop_log_writer() -> None:
+    """Write out the queued records and stop the writer thread. Called at exit."""
+    global _log_writer
+    if _log_writer is not None:
+        _log_writer.stop()
+        _log_writer = None
+
+
+def get_log_queue_stats() -> Dict[str, Any]:
+    """Queue depth and dropped record counts of this process."""
+    if _queue_handler is None:
+        return {'enabled': False}
+    return {
+        'enabled': True,
+        'queued': _queue_handler.queue.qsize(),
+        'capacity': _queue_handler.capacity,
+        'dropped': dict(_queue_handler.dropped),
+        'writer_running': _log_writer is not None
+    }
+
+
+def _queued_logging(targets, level: int) -> QueuedLogHandler:
+    """Put the handlers behind a queue served by a writer thread; return the handler for the root logger."""
+    global _queue_handler
+    _queue_handler = QueuedLogHandler(settings.LOG_BUFFER_SIZE, settings.LOG_QUEUE_BLOCK_SECONDS)
+    _queue_handler.setLevel(level)
+    _queue_handler._is_central_handler = True
+    _start_log_writer(targets)
+    atexit.register(stop_log_writer)
+    os.register_at_fork(after_in_child=_restart_log_writer_after_fork)
+    return _queue_handler
+
+
+def _parse_pairs(spec: str) -> Dict[str, str]:
+    """Parse "a=1,b=2" into a dict, ignoring blanks and entries without '='."""
+    pairs = {}
+    for item in (spec or '').split(','):
+        name, sep, value = item.partition('=')
+        if sep and name.strip() and value.strip():
+            pairs[name.strip()] = value.strip()
+    return pairs
+
+
+def apply_log_levels(spec: str) -> Dict[str, int]:
+    """Set per-logger levels from "logger=LEVEL" pairs; unknown levels are skipped."""
+    applied = {}
+    for name, level_name in _parse_pairs(spec).items():
+        level = logging.getLevelName(level_name.upper())
+        if not isinstance(level, int):
+            logging.getLogger("app").warning(
+                f"Ignoring unknown log level {level_name!r} for logger {name!r}", extra={"component": "logger"}
+            )
+            continue
+        logging.getLogger(name).setLevel(level)
+        applied[name] = level
+    return applied
+
+
+class LogSampler:
+    """Keep 1 in N log lines per message kind.
+
+    The first line of each kind is always kept, then every Nth, so a sampled
+    message still shows up in low-volume runs. Kinds without a rate are kept.
+    Only guard success logs with this; warnings and errors are never sampled.
+    """
+
+    def __init__(self, rates: Dict[str, int]):
+        self.rates = {kind: rate for kind, rate in rates.items() if rate > 1}
+        self._counters: Dict[str, Any] = {}
+
+    @classmethod
+    def from_spec(cls, spec: str) -> 'LogSampler':
+        rates = {}
+        for kind, rate in _parse_pairs(spec).items():
+            try:
+                rates[kind] = int(rate)
+            except ValueError:
+                continue
+        return cls(rates)
+
+    def should_log(self, kind: str) -> bool:
+        rate = self.rates.get(kind)
+        if rate is None:
+            return True
+        counter = self._counters.get(kind)
+        if counter is None:
+            counter = self._counters.setdefault(kind, itertools.count())
+        # next() on itertools.count is atomic under the GIL, so no lock is needed
+        return next(counter) % rate == 0
+
+
+_log_sampler = LogSampler.from_spec(settings.LOG_SAMPLE_RATES)
+
+
+def should_sample(kind: str) -> bool:
+    """True if this occurrence of a sampled success log should be written (see LOG_SAMPLE_RATES)."""
+    return _log_sampler.should_log(kind)
+
+
+def log_payload(value: Any, max_chars: Optional[int] = None) -> str:
+    """Render a result dict or prompt for a log line, cut to LOG_PAYLOAD_MAX_CHARS.
+
+    Longer payloads keep their head plus the full length and a short sha256, so
+    identical payloads can still be matched across log lines.
+    """
+    text = value if isinstance(value, str) else str(value)
+    limit = settings.LOG_PAYLOAD_MAX_CHARS if max_chars is None else max_chars
+    if len(text) <= limit:
+        return text
+    digest = hashlib.sha256(text.encode('utf-8', 'replace')).hexdigest()[:12]
+    return f"{text[:limit]}... [{len(text)} chars, sha256 {digest}]"
+
+
 def init_logging(level: int | None = None) -> logging.Logger:
     """Bootstrap application-wide logging. Safe to call multiple times."""
 
@@ -262,6 +590,7 @@ def init_logging(level: int | None = None) -> logging.Logger:
     for h in root_logger.handlers:
         if getattr(h, "_is_central_handler", False):
             root_logger.setLevel(level)
+            apply_log_levels(settings.LOG_LEVELS)
             return logging.getLogger("app")
 
     # Console / docker-stdout
@@ -270,32 +599,47 @@ def init_logging(level: int | None = None) -> logging.Logger:
     console_handler.setLevel(level)
     console_handler._is_central_handler = True  # sentinel attr
 
-    # Shared rotating file – one file for all containers (same volume)
-    combined_log_path = os.path.join(LOG_DIR, "combined.log")
-    file_handler = RotatingFileHandler(
-        combined_log_path,
-        maxBytes=MAX_BYTES,
-        backupCount=BACKUP_COUNT,
+    # One file per process (containers share the LOG_DIR volume); scripts/logs.py merges them
+    global _process_file_handler
+    compression = resolve_compression(settings.LOG_COMPRESSION)
+    file_handler = ProcessFileHandler(
+        LOG_DIR,
+        max_bytes=MAX_BYTES,
+        backup_count=BACKUP_COUNT,
+        interval_seconds=settings.LOG_ROTATION_SECONDS,
+        compression=compression,
+        retention_seconds=settings.LOG_RETENTION_SECONDS,
     )
     file_handler.setFormatter(formatter)
     file_handler.setLevel(level)
     file_handler._is_central_handler = True
+    _process_file_handler = file_handler
+    os.register_at_fork(after_in_child=_reopen_process_log_after_fork)
 
     # Reset existing handlers (avoid duplicate logs when reloaded)
     root_logger.handlers = []
     root_logger.setLevel(level)
     root_logger.addFilter(SanitizingFilter())
-    root_logger.addHandler(console_handler)
-    root_logger.addHandler(file_handler)
+    if settings.LOG_QUEUE_ENABLED:
+        # Callers only enqueue; formatting and I/O happen on the writer thread
+        root_logger.addHandler(_queued_logging([console_handler, file_handler], level))
+    else:
+        root_logger.addHandler(console_handler)
+        root_logger.addHandler(file_handler)
 
     # Quiet noisy libraries
     logging.getLogger("werkzeug").setLevel(logging.ERROR)
     logging.getLogger("flask_limiter").setLevel(logging.ERROR)
     logging.getLogger("sqlalchemy.engine").setLevel(logging.WARNING)
     logging.getLogger("sqlalchemy.pool").setLevel(logging.INFO)
+    # Per-component overrides from settings win over the defaults above
+    apply_log_levels(settings.LOG_LEVELS)
 
     app_logger = logging.getLogger("app")
     app_logger.info("Centralised logger initialised", extra={"component": "logger"})
+    if settings.LOG_COMPRESSION.strip().lower() == 'zstd' and compression != 'zstd':
+        app_logger.warning("LOG_COMPRESSION=zstd but zstandard is not installed, using gzip",
+                           extra={"component": "logger"})
     return app_logger
 
 # Backwards-compatibility for existing imports
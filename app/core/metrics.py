@@ -0,0 +1,240 @@
+"""
+Prometheus Metrics
+
+Latency and throughput metrics for the lead pipeline:
+- vendor_request_duration_seconds: one vendor HTTP request attempt, by vendor and outcome
+- pipeline_stage_total / pipeline_stage_duration_seconds: enrich_lead_task steps
+- rate_limiter_wait_seconds / rate_limiter_denied_total: time spent getting a limiter slot
+- circuit_breaker_state and celery_queue_length: read from Redis when scraped
+- log_records_dropped_total: records the log queue dropped when full (app/core/logging_config.py)
+
+Vendor attempts, stage results and limiter waits are also added to the
+per-lead trace of the task being run (app/core/lead_trace.py), if any.
+
+The API serves them on /metrics. Each worker container serves them on
+METRICS_WORKER_PORT.
+
+Gunicorn workers and celery prefork children are separate processes. With
+PROMETHEUS_MULTIPROC_DIR set, every process writes its samples to files in
+that directory and a scrape aggregates all of them. The directory must be
+empty when the service starts: the API command clears it, workers call
+reset_multiproc_dir() before the pool is forked.
+"""
+import os
+import time
+from typing import Optional, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+    start_http_server
+)
+from prometheus_client.core import GaugeMetricFamily
+
+from app.core.config import settings
+from app.core.lead_trace import current_trace
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+if MULTIPROC_DIR:
+    os.makedirs(MULTIPROC_DIR, exist_ok=True)
+
+VENDOR_LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+STAGE_LATENCY_BUCKETS = (0.01, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+LIMITER_WAIT_BUCKETS = (0.001, 0.5, 1, 2, 5, 10, 30, 60, 120, 300)
+
+VENDOR_REQUEST_SECONDS = Histogram(
+    'vendor_request_duration_seconds',
+    'Duration of one vendor HTTP request attempt',
+    ['vendor', 'outcome'],
+    buckets=VENDOR_LATENCY_BUCKETS
+)
+PIPELINE_STAGE_TOTAL = Counter(
+    'pipeline_stage_total',
+    'Lead pipeline stage results',
+    ['stage', 'outcome']
+)
+PIPELINE_STAGE_SECONDS = Histogram(
+    'pipeline_stage_duration_seconds',
+    'Time a lead spent in a pipeline stage, limiter waits included',
+    ['stage'],
+    buckets=STAGE_LATENCY_BUCKETS
+)
+RATE_LIMITER_WAIT_SECONDS = Histogram(
+    'rate_limiter_wait_seconds',
+    'Time spent acquiring a rate limiter slot',
+    ['api'],
+    buckets=LIMITER_WAIT_BUCKETS
+)
+RATE_LIMITER_DENIED_TOTAL = Counter(
+    'rate_limiter_denied_total',
+    'Rate limiter acquisitions that gave up without a slot',
+    ['api']
+)
+LOG_RECORDS_DROPPED_TOTAL = Counter(
+    'log_records_dropped_total',
+    'Log records dropped because the log queue was full',
+    ['level']
+)
+
+PIPELINE_METRICS = (
+    VENDOR_REQUEST_SECONDS, PIPELINE_STAGE_TOTAL, PIPELINE_STAGE_SECONDS,
+    RATE_LIMITER_WAIT_SECONDS, RATE_LIMITER_DENIED_TOTAL, LOG_RECORDS_DROPPED_TOTAL
+)
+
+
+def vendor_outcome(status_code: Optional[int]) -> str:
+    """Map an HTTP status to a low-cardinality outcome label."""
+    if status_code is None:
+        return 'error'
+    if status_code == 429:
+        return 'rate_limited'
+    if status_code >= 500:
+        return 'server_error'
+    if status_code >= 400:
+        return 'client_error'
+    return 'ok'
+
+
+def observe_vendor_request(vendor: str, started: float, outcome: str) -> None:
+    """
+    Record one vendor request attempt.
+
+    Args:
+        vendor: Vendor name, e.g. 'perplexity'
+        started: time.monotonic() when the attempt started
+        outcome: 'ok', 'rate_limited', 'client_error', 'server_error', 'timeout' or 'error'
+    """
+    elapsed = time.monotonic() - started
+    VENDOR_REQUEST_SECONDS.labels(vendor=vendor, outcome=outcome).observe(elapsed)
+    trace = current_trace()
+    if trace is not None:
+        trace.add_vendor_request(elapsed)
+
+
+def record_stage(stage: str, outcome: str, started: Optional[float] = None) -> None:
+    """
+    Record the result of a pipeline stage for one lead.
+
+    Args:
+        stage: 'email_verification', 'enrichment', 'email_copy' or 'instantly'
+        outcome: 'success', 'error', 'rate_limited', 'circuit_breaker_open', 'deferred' or 'skipped'
+        started: time.monotonic() when the stage started, to record its duration
+    """
+    PIPELINE_STAGE_TOTAL.labels(stage=stage, outcome=outcome).inc()
+    if started is not None:
+        PIPELINE_STAGE_SECONDS.labels(stage=stage).observe(time.monotonic() - started)
+    trace = current_trace()
+    if trace is not None:
+        trace.end_stage(stage, outcome)
+
+
+def observe_limiter_wait(api: str, waited: float, acquired: bool) -> None:
+    """Record the time an acquire() took, or that it gave up."""
+    if acquired:
+        RATE_LIMITER_WAIT_SECONDS.labels(api=api).observe(waited)
+    else:
+        RATE_LIMITER_DENIED_TOTAL.labels(api=api).inc()
+    trace = current_trace()
+    if trace is not None:
+        trace.add_limiter_wait(waited)
+
+
+class PipelineStateCollector:
+    """
+    Gauges read from Redis at scrape time: the global circuit breaker state and
+    the length of each Celery queue. They are shared state, so every scraper
+    sees the same values and no process has to keep them up to date.
+    """
+
+    def __init__(self, redis_client=None):
+        self._redis = redis_client
+
+    @property
+    def redis(self):
+        if self._redis is None:
+            from app.core.config import get_redis_connection
+            self._redis = get_redis_connection()
+        return self._redis
+
+    def collect(self):
+        from app.core.circuit_breaker import CircuitBreakerService, CircuitState
+
+        breaker = GaugeMetricFamily(
+            'circuit_breaker_state', 'Global circuit breaker state (1 for the current state)', labels=['state']
+        )
+        try:
+            current = CircuitBreakerService(self.redis).get_global_circuit_state()
+            for state in CircuitState:
+                breaker.add_metric([state.value], 1.0 if state == current else 0.0)
+        except Exception as e:
+            logger.warning(f"Could not read circuit breaker state for metrics: {str(e)}",
+                           extra={'component': 'metrics'})
+        yield breaker
+
+        queues = GaugeMetricFamily('celery_queue_length', 'Tasks waiting in a Celery queue', labels=['queue'])
+        for queue in [q.strip() for q in settings.METRICS_CELERY_QUEUES.split(",") if q.strip()]:
+            try:
+                queues.add_metric([queue], float(self.redis.llen(queue)))
+            except Exception as e:
+                logger.warning(f"Could not read length of queue {queue} for metrics: {str(e)}",
+                               extra={'component': 'metrics'})
+        yield queues
+
+
+def build_registry(redis_client=None) -> CollectorRegistry:
+    """
+    Registry for a scrape: samples of every process when multiprocess mode is
+    on, otherwise this process's, plus the Redis-backed gauges.
+    """
+    registry = CollectorRegistry()
+    if MULTIPROC_DIR:
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        for metric in PIPELINE_METRICS:
+            registry.register(metric)
+    registry.register(PipelineStateCollector(redis_client))
+    return registry
+
+
+def render_metrics(redis_client=None) -> Tuple[bytes, str]:
+    """Render the metrics in the Prometheus text format."""
+    return generate_latest(build_registry(redis_client)), CONTENT_TYPE_LATEST
+
+
+def reset_multiproc_dir() -> None:
+    """Delete samples left by a previous run of this container. Call before forking."""
+    if not MULTIPROC_DIR:
+        return
+    for name in os.listdir(MULTIPROC_DIR):
+        if name.endswith(".db"):
+            os.remove(os.path.join(MULTIPROC_DIR, name))
+
+
+def start_worker_metrics_server(port: Optional[int] = None) -> bool:
+    """
+    Serve /metrics for a worker container on a sidecar port.
+
+    Called once from the celery main process; the pool children report through
+    PROMETHEUS_MULTIPROC_DIR.
+
+    Returns:
+        bool: True if the server started
+    """
+    if not settings.METRICS_ENABLED:
+        return False
+    port = port or settings.METRICS_WORKER_PORT
+    try:
+        start_http_server(port, registry=build_registry())
+    except OSError as e:
+        logger.warning(f"Worker metrics server not started on port {port}: {str(e)}",
+                       extra={'component': 'metrics', 'port': port})
+        return False
+    logger.info(f"Worker metrics served on port {port}", extra={'component': 'metrics', 'port': port})
+    return True
@@ -1,26 +1,31 @@
-from typing import List
-from fastapi import Request, HTTPException, status
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from starlette.middleware.base import BaseHTTPMiddleware
+import inspect
+
+from fastapi import HTTPException, status
+from starlette.datastructures import Headers
 from starlette.responses import JSONResponse
-import os
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from app.services.auth_service import AuthService
-from app.core.database import SessionLocal, get_db
+from app.core.database import get_db
 from app.core.logger import get_logger
+from app.core.user_cache import user_cache
 
 logger = get_logger(__name__)
 
-class AuthenticationMiddleware(BaseHTTPMiddleware):
+class AuthenticationMiddleware:
     """
     Middleware to handle authentication for protected endpoints.
     Only signup and signin endpoints are unprotected.
+
+    Plain ASGI rather than BaseHTTPMiddleware: the request is passed on
+    unchanged, without the extra task and body stream BaseHTTPMiddleware puts
+    around every call, so streaming responses work as they would without it.
     """
-    
+
     # Define unprotected endpoints (public routes)
-    UNPROTECTED_PATHS = {
+    UNPROTECTED_PATHS = frozenset({
         "/api/v1/auth/signup",
-        "/api/v1/auth/login", 
+        "/api/v1/auth/login",
         "/api/v1/health",
         "/api/v1/health/",
         "/api/v1/health/ready",
@@ -29,115 +34,90 @@ class AuthenticationMiddleware(BaseHTTPMiddleware):
         "/redoc",
         "/openapi.json",
         "/api/v1/openapi.json",
+        "/metrics",
         "/",
-    }
-    
-    # Paths that start with these prefixes are also unprotected
-    UNPROTECTED_PREFIXES = {
+    })
+
+    # Paths that start with these prefixes are also unprotected (a tuple, for str.startswith)
+    UNPROTECTED_PREFIXES = (
         "/docs",
         "/redoc",
         "/static",
-    }
+    )
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.auth_service = AuthService()
 
-    async def dispatch(self, request: Request, call_next):
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """
         Process the request and check authentication for protected endpoints.
         """
-        path = request.url.path
-        method = request.method
-        
-        # Skip authentication for OPTIONS requests (CORS preflight)
-        if method == "OPTIONS":
-            return await call_next(request)
-        
-        # Check if path is unprotected
-        if self._is_unprotected_path(path):
-            return await call_next(request)
-        
+        # Skip websockets/lifespan, OPTIONS requests (CORS preflight) and public paths
+        if scope["type"] != "http" or scope["method"] == "OPTIONS" or self._is_unprotected_path(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
         # Extract and validate token for protected endpoints
         try:
-            token = self._extract_token(request)
+            token = self._extract_token(scope)
             if not token:
-                return self._unauthorized_response("Token is missing")
-            
-            # Validate token and get user
-            user = await self._validate_token(token)
-            if not user:
-                return self._unauthorized_response("Invalid token")
-            
-            # Add user to request state for use in endpoints
-            request.state.current_user = user
-            
+                response = self._unauthorized_response("Token is missing")
+            else:
+                # Validate token and get user
+                user = self._validate_token(token, scope.get("app"))
+                if user:
+                    # Add user to request state for use in endpoints (request.state.current_user)
+                    scope.setdefault("state", {})["current_user"] = user
+                    response = None
+                else:
+                    response = self._unauthorized_response("Invalid token")
         except HTTPException as e:
-            return self._unauthorized_response(e.detail)
+            response = self._unauthorized_response(e.detail)
         except Exception as e:
-            logger.error(f"Authentication error for {path}: {str(e)}")
-            return self._unauthorized_response("Authentication failed")
-        
-        return await call_next(request)
-    
+            logger.error(f"Authentication error for {scope['path']}: {str(e)}")
+            response = self._unauthorized_response("Authentication failed")
+
+        if response is not None:
+            await response(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
+
     def _is_unprotected_path(self, path: str) -> bool:
         """Check if the path is unprotected."""
-        # Exact match
-        if path in self.UNPROTECTED_PATHS:
-            return True
-        
-        # Prefix match
-        for prefix in self.UNPROTECTED_PREFIXES:
-            if path.startswith(prefix):
-                return True
-        
-        return False
-    
-    def _extract_token(self, request: Request) -> str:
+        return path in self.UNPROTECTED_PATHS or path.startswith(self.UNPROTECTED_PREFIXES)
+
+    def _extract_token(self, scope: Scope) -> str:
         """Extract JWT token from Authorization header."""
-        auth_header = request.headers.get("Authorization")
+        auth_header = Headers(scope=scope).get("Authorization")
         if not auth_header:
             return None
-        
+
         if not auth_header.startswith("Bearer "):
             return None
-        
+
         return auth_header.split(" ")[1]
-    
-    async def _validate_token(self, token: str):
+
+    def _validate_token(self, token: str, app=None):
         """Validate JWT token and return user."""
-        auth_service = AuthService()
-        
-        # Check if we're in a test environment
-        # In tests, we need to use the test database configuration
-        if os.getenv('PYTEST_CURRENT_TEST') or 'pytest' in os.getenv('_', ''):
-            # Use the dependency injection system for database session
-            # This ensures we use the test database in tests
-            from app.main import app
-            if get_db in app.dependency_overrides:
-                db_generator = app.dependency_overrides[get_db]()
-                db = next(db_generator)
-                try:
-                    user = auth_service.get_current_user(token, db)
-                    return user
-                finally:
-                    try:
-                        next(db_generator)
-                    except StopIteration:
-                        pass
-            else:
-                # Fallback to regular session
-                db = SessionLocal()
-                try:
-                    user = auth_service.get_current_user(token, db)
-                    return user
-                finally:
-                    db.close()
-        else:
-            # Production/development - use regular session
-            db = SessionLocal()
-            try:
-                user = auth_service.get_current_user(token, db)
-                return user
-            finally:
-                db.close()
-    
+        # Signature and expiry are checked without the database; the user comes
+        # from the user cache and a session is only opened on a miss
+        user_id = self.auth_service.user_id_from_token(token)
+        user = user_cache.get(user_id)
+        if user is not None:
+            return user
+
+        # Open the session the way the endpoints get theirs, so an override of
+        # get_db (e.g. the test database) applies here as well
+        overrides = getattr(app, "dependency_overrides", None) or {}
+        provided = overrides.get(get_db, get_db)()
+        db = next(provided) if inspect.isgenerator(provided) else provided
+        try:
+            return self.auth_service.get_user(user_id, db)
+        finally:
+            if inspect.isgenerator(provided):
+                provided.close()
+
     def _unauthorized_response(self, message: str) -> JSONResponse:
         """Return standardized unauthorized response."""
         return JSONResponse(
@@ -157,4 +137,4 @@ class AuthenticationMiddleware(BaseHTTPMiddleware):
                 "Access-Control-Allow-Methods": "*",
                 "Access-Control-Allow-Headers": "*",
             }
-        ) 
\ No newline at end of file
+        )
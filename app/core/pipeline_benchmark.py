@@ -0,0 +1,362 @@
+"""
+Pipeline Benchmark
+
+Runs the real lead pipeline (Celery tasks, Postgres, Redis, rate limiters,
+circuit breaker) against the local vendor stand-ins in
+app/background_services/smoke_tests/fake_vendors.py, and reports throughput
+and cost per lead as JSON that can be compared across commits.
+
+A run:
+1. starts the fake vendor server and points PERPLEXITY_BASE_URL,
+   OPENAI_BASE_URL, INSTANTLY_BASE_URL and MILLIONVERIFIER_BULK_API_URL at it
+2. seeds a campaign with N leads from the Apollo dataset used by MockApifyClient
+   (the Apollo fetch itself is not part of the benchmark)
+3. starts an in-process Celery worker (thread pool) on the configured broker
+4. queues enrichment the way fetch_and_save_leads_task does (a bulk
+   verification job, or one enrich_lead_task per lead) and runs the beat
+   tasks itself
+5. waits until every lead has a finished lead_traces row
+
+The report holds leads/minute, per-stage p50/p95/p99 from lead_traces, SQL
+statements per lead on the app engine, Redis commands per lead (server INFO
+delta, so the Celery broker traffic is included) and requests/429s/errors
+seen by each fake vendor.
+
+Needs Postgres and Redis. Use a dedicated environment: the run closes the
+global circuit breaker and leaves its campaign in the database.
+"""
+import itertools
+import json
+import os
+import subprocess
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+from unittest.mock import patch
+
+from sqlalchemy import event, func
+
+from app.background_services.smoke_tests.fake_vendors import FakeVendorServer, VendorProfile
+from app.background_services.smoke_tests.mock_apify_client import DATASET_PATH
+from app.core.config import settings
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+FINISHED_STATUSES = ('completed', 'failed', 'paused')
+
+# Lower is better for every compared metric except throughput
+HIGHER_IS_BETTER = ('leads_per_minute',)
+
+UNLIMITED_RATE = 1_000_000
+
+BENCHMARK_CREDENTIALS = {
+    'PERPLEXITY_TOKEN': 'benchmark-perplexity',
+    'PERPLEXITY_TOKENS': '',
+    'OPENAI_API_KEY': 'benchmark-openai',
+    'OPENAI_API_KEYS': '',
+    'INSTANTLY_API_KEY': 'benchmark-instantly',
+    'MILLIONVERIFIER_API_KEY': 'benchmark-millionverifier'
+}
+
+
+class BenchmarkConfig:
+    """
+    Parameters of one benchmark run.
+
+    Args:
+        leads: Number of leads to push through the pipeline
+        concurrency: Worker threads
+        profiles: VendorProfile per vendor; missing vendors use the default profile
+        seed: Seed for the fake vendors' latency and failure draws
+        unlimited: Lift the vendor rate limits, to measure the pipeline itself
+        overrides: Settings to change for the run, e.g. {'INSTANTLY_BULK_ENABLED': True}
+        timeout_seconds: Give up waiting for the leads after this long
+        beat_interval: Seconds between runs of the beat tasks
+    """
+
+    def __init__(self, leads: int = 100, concurrency: int = 8,
+                 profiles: Optional[Dict[str, VendorProfile]] = None, seed: int = 0,
+                 unlimited: bool = False, overrides: Optional[Dict[str, Any]] = None,
+                 timeout_seconds: int = 900, beat_interval: float = 1.0):
+        self.leads = leads
+        self.concurrency = concurrency
+        self.profiles = profiles or {}
+        self.seed = seed
+        self.unlimited = unlimited
+        self.overrides = overrides or {}
+        self.timeout_seconds = timeout_seconds
+        self.beat_interval = beat_interval
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'leads': self.leads,
+            'concurrency': self.concurrency,
+            'profiles': {vendor: profile.to_dict() for vendor, profile in self.profiles.items()},
+            'seed': self.seed,
+            'unlimited': self.unlimited,
+            'overrides': self.overrides
+        }
+
+
+class QueryCounter:
+    """Count SQL statements run on an engine, except those inside ignoring()."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if getattr(self._local, 'ignoring', False):
+            return
+        with self._lock:
+            self.count += 1
+
+    def __enter__(self) -> "QueryCounter":
+        event.listen(self.engine, "before_cursor_execute", self._before_cursor_execute)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        event.remove(self.engine, "before_cursor_execute", self._before_cursor_execute)
+
+    @contextmanager
+    def ignoring(self):
+        self._local.ignoring = True
+        try:
+            yield
+        finally:
+            self._local.ignoring = False
+
+
+def parse_override(name: str, value: str) -> Any:
+    """Cast a NAME=VALUE override to the type of the existing setting."""
+    if not hasattr(settings, name):
+        raise ValueError(f"Unknown setting '{name}'")
+    current = getattr(settings, name)
+    if isinstance(current, bool):
+        return value.lower() in ('1', 'true', 'yes', 'on')
+    if isinstance(current, (int, float)):
+        return type(current)(value)
+    return value
+
+
+def git_commit() -> Optional[str]:
+    """Commit the benchmark ran on, None outside a git checkout."""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def seed_campaign(db, leads: int, run_id: str):
+    """
+    Create an organization and a running campaign with `leads` leads.
+
+    Records come from the MockApifyClient Apollo dataset, cycled when more
+    leads are asked for than it holds. Emails get a run-specific tag so
+    repeated runs never hit the duplicate-email check.
+    """
+    from app.models.campaign import Campaign
+    from app.models.campaign_status import CampaignStatus
+    from app.models.lead import Lead
+    from app.models.organization import Organization
+
+    with open(DATASET_PATH, 'r') as f:
+        records = [record for record in json.load(f) if record.get('email')]
+
+    organization = Organization(name=f"Benchmark {run_id}", description="Pipeline benchmark run")
+    db.add(organization)
+    db.flush()
+    campaign = Campaign(
+        name=f"Benchmark {run_id}",
+        status=CampaignStatus.RUNNING,
+        organization_id=organization.id,
+        fileName=f"benchmark-{run_id}",
+        totalRecords=leads,
+        url="https://app.apollo.io/#/people?benchmark",
+        instantly_campaign_id=f"benchmark-{run_id}"
+    )
+    db.add(campaign)
+    db.flush()
+
+    for index, record in zip(range(leads), itertools.cycle(records)):
+        local, _, domain = record['email'].strip().partition('@')
+        organization_data = record.get('organization') or {}
+        db.add(Lead(
+            campaign_id=campaign.id,
+            first_name=record.get('first_name'),
+            last_name=record.get('last_name'),
+            email=f"{local}+bench{run_id}{index}@{domain}",
+            phone=record.get('phone'),
+            company=organization_data.get('name') or record.get('organization_name'),
+            title=record.get('title'),
+            linkedin_url=record.get('linkedin_url'),
+            raw_data=record
+        ))
+    db.commit()
+    return campaign
+
+
+def _redis_commands(redis_client) -> int:
+    return int(redis_client.info('stats')['total_commands_processed'])
+
+
+def _run_beat_tasks() -> None:
+    from app.workers.campaign_tasks import (
+        flush_due_instantly_buffers_task,
+        poll_bulk_email_verification_task
+    )
+    for task in (poll_bulk_email_verification_task, flush_due_instantly_buffers_task):
+        try:
+            task()
+        except Exception as e:
+            logger.warning(f"Benchmark beat task {task.name} failed: {str(e)}",
+                           extra={'component': 'pipeline_benchmark'})
+
+
+def run_benchmark(config: BenchmarkConfig) -> Dict[str, Any]:
+    """
+    Run the pipeline for config.leads leads against fake vendors.
+
+    Returns:
+        Dict: The report (see the module docstring); 'complete' is False when
+              the run timed out before every lead finished
+    """
+    from celery.contrib.testing.worker import start_worker
+
+    from app.core.circuit_breaker import get_circuit_breaker
+    from app.core.config import get_redis_connection
+    from app.core.database import SessionLocal, engine
+    from app.core.lead_trace import summarize_campaign_traces
+    from app.models.lead import Lead
+    from app.models.lead_trace import LeadTrace
+    from app.workers.campaign_tasks import _queue_campaign_enrichment, start_bulk_email_verification
+    from app.workers.celery_app import celery_app
+
+    run_id = uuid.uuid4().hex[:8]
+    server = FakeVendorServer(config.profiles, seed=config.seed).start()
+    overrides = {
+        'PERPLEXITY_BASE_URL': server.url('perplexity'),
+        'OPENAI_BASE_URL': server.url('openai'),
+        'INSTANTLY_BASE_URL': server.url('instantly'),
+        'MILLIONVERIFIER_BULK_API_URL': server.url('millionverifier'),
+        'EMAIL_VERIFICATION_BULK_POLL_INTERVAL': 0,
+        **config.overrides
+    }
+    if config.unlimited:
+        for vendor in ('MILLIONVERIFIER', 'INSTANTLY', 'OPENAI', 'PERPLEXITY'):
+            overrides[f'{vendor}_RATE_LIMIT_REQUESTS'] = UNLIMITED_RATE
+
+    redis_client = get_redis_connection()
+    db = SessionLocal()
+    try:
+        with patch.dict(os.environ, BENCHMARK_CREDENTIALS), \
+                patch.multiple(settings, **overrides), \
+                QueryCounter(engine) as queries:
+            get_circuit_breaker(redis_client).manually_close_circuit()
+            with queries.ignoring():
+                campaign = seed_campaign(db, config.leads, run_id)
+            logger.info(f"Benchmark {run_id}: {config.leads} leads in campaign {campaign.id}",
+                        extra={'component': 'pipeline_benchmark'})
+
+            with start_worker(celery_app, pool='threads', concurrency=config.concurrency,
+                              perform_ping_check=False, loglevel='WARNING', shutdown_timeout=30):
+                queries.count = 0
+                redis_before = _redis_commands(redis_client)
+                started = time.monotonic()
+
+                bulk_job = None
+                if (settings.EMAIL_VERIFICATION_BULK_ENABLED
+                        and config.leads >= settings.EMAIL_VERIFICATION_BULK_MIN_LEADS):
+                    leads = db.query(Lead).filter(Lead.campaign_id == campaign.id).all()
+                    bulk_job = start_bulk_email_verification(db, campaign, leads)
+                if not bulk_job:
+                    _queue_campaign_enrichment(db, campaign.id)
+
+                finished = 0
+                deadline = started + config.timeout_seconds
+                while time.monotonic() < deadline:
+                    _run_beat_tasks()
+                    with queries.ignoring():
+                        finished = db.query(func.count(func.distinct(LeadTrace.lead_id))).filter(
+                            LeadTrace.campaign_id == campaign.id,
+                            LeadTrace.status.in_(FINISHED_STATUSES)
+                        ).scalar()
+                        db.rollback()
+                    if finished >= config.leads:
+                        break
+                    time.sleep(config.beat_interval)
+
+                elapsed = time.monotonic() - started
+                redis_commands = _redis_commands(redis_client) - redis_before
+                query_count = queries.count
+
+        traces = summarize_campaign_traces(db, campaign.id)
+    finally:
+        db.close()
+        server.stop()
+
+    return {
+        'run_id': run_id,
+        'commit': git_commit(),
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'config': config.to_dict(),
+        'settings': {name: value for name, value in overrides.items() if not name.endswith('_URL')},
+        'campaign_id': campaign.id,
+        'complete': finished >= config.leads,
+        'leads_finished': finished,
+        'elapsed_seconds': round(elapsed, 2),
+        'leads_per_minute': round(finished / elapsed * 60, 2) if elapsed else 0.0,
+        'db_queries_per_lead': round(query_count / finished, 2) if finished else None,
+        'redis_commands_per_lead': round(redis_commands / finished, 2) if finished else None,
+        'traces': traces,
+        'vendors': server.stats
+    }
+
+
+def flatten_metrics(report: Dict[str, Any]) -> Dict[str, float]:
+    """The numbers compare_reports() looks at, keyed by a dotted name."""
+    metrics = {
+        name: report[name]
+        for name in ('leads_per_minute', 'db_queries_per_lead', 'redis_commands_per_lead')
+        if report.get(name) is not None
+    }
+    for column, percentiles in report.get('traces', {}).get('percentiles_ms', {}).items():
+        for percentile, value in percentiles.items():
+            if value is not None:
+                metrics[f'{column}.{percentile}'] = value
+    return metrics
+
+
+def compare_reports(baseline: Dict[str, Any], current: Dict[str, Any],
+                    tolerance: float = 0.1) -> List[str]:
+    """
+    List the metrics of `current` that are worse than `baseline` by more than `tolerance`.
+
+    Args:
+        baseline: Report of the reference run
+        current: Report to check
+        tolerance: Allowed relative change, 0.1 = 10%
+
+    Returns:
+        List[str]: One line per regression, empty if none
+    """
+    before, after = flatten_metrics(baseline), flatten_metrics(current)
+    regressions = []
+    for name, old in before.items():
+        new = after.get(name)
+        if new is None or not old:
+            continue
+        change = (new - old) / old
+        worse = -change if name in HIGHER_IS_BETTER else change
+        if worse > tolerance:
+            regressions.append(f"{name}: {old:g} -> {new:g} ({change:+.1%})")
+    return regressions
@@ -0,0 +1,208 @@
+"""
+Query Plans
+
+Replays the hot job and lead queries with EXPLAIN (ANALYZE, BUFFERS) and
+flags the ones the planner answers with a sequential scan of a large table.
+
+The statements are built from the same ORM expressions the application uses
+(circuit breaker pause/resume, the beat pollers, latest job per campaign, job
+cleanup, lead fan-out and the enrichment resume lookup), with values taken from
+the database so the plans match production traffic.
+
+A sequential scan of a small table is what Postgres should do, so only scans
+of tables with at least `min_rows` rows are flagged. On a development database
+that is too small for that, prefer_indexes=True disables sequential scans for
+the replay: a query that still scans then has no usable index at all.
+
+Usage:
+    python scripts/explain_queries.py
+    python scripts/explain_queries.py --prefer-indexes
+"""
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects import postgresql
+
+from app.core.logger import get_logger
+from app.models.job import Job, JobStatus, JobType
+from app.models.lead import Lead
+from app.models.lead_artifact import LeadArtifact
+
+logger = get_logger(__name__)
+
+# Tables below this many rows are expected to be scanned
+DEFAULT_MIN_ROWS = 1000
+
+
+def _hot_queries() -> Dict[str, Callable[[Dict[str, Any]], Any]]:
+    """Statement builders by name, each taking the sample parameters."""
+    return {
+        # QueueManager.pause_all_jobs_on_breaker_open
+        'breaker_pause_open_jobs': lambda p: select(Job).where(
+            Job.status.in_([JobStatus.PENDING, JobStatus.PROCESSING])
+        ),
+        # QueueManager.resume_all_jobs_on_breaker_close
+        'breaker_resume_paused_jobs': lambda p: select(Job).where(Job.status == JobStatus.PAUSED),
+        # poll_bulk_email_verification_task (and process_email_copy_batches_task)
+        'bulk_job_poll': lambda p: select(Job).where(
+            Job.job_type == JobType.VERIFY_EMAILS_BULK, Job.status == JobStatus.PROCESSING
+        ),
+        # CampaignService.get_campaigns
+        'campaign_latest_job': lambda p: (
+            select(Job)
+            .where(Job.campaign_id.in_([p['campaign_id']]))
+            .order_by(Job.campaign_id, Job.created_at.desc())
+            .distinct(Job.campaign_id)
+        ),
+        # cleanup_campaign_jobs_task
+        'campaign_job_cleanup': lambda p: select(Job).where(
+            Job.campaign_id == p['campaign_id'],
+            Job.created_at < p['cutoff'],
+            Job.status.in_([JobStatus.COMPLETED, JobStatus.FAILED])
+        ),
+        # fetch_and_save_leads_task fan-out and the lead listing
+        'campaign_leads': lambda p: select(Lead).where(Lead.campaign_id == p['campaign_id']),
+        # process_job_task resuming an ENRICH_LEAD job
+        'enrichment_job_lead': lambda p: select(Lead).where(Lead.enrichment_job_id == p['job_id']).limit(1),
+        # campaigns_due_for_email_copy_batch
+        'email_copy_batch_due': lambda p: (
+            select(Lead.campaign_id, func.count(Lead.id), func.min(Lead.updated_at))
+            .where(Lead.artifacts.has(LeadArtifact.email_copy_gen_results['status'].astext == 'batch_pending'))
+            .group_by(Lead.campaign_id)
+        ),
+    }
+
+
+HOT_QUERIES = tuple(_hot_queries())
+
+
+class PlanReport:
+    """The plan of one replayed query and the sequential scans in it."""
+
+    def __init__(self, name: str, sql: str, plan: Dict[str, Any], table_rows: Dict[str, int], min_rows: int):
+        self.name = name
+        self.sql = sql
+        self.plan = plan
+        root = plan['Plan']
+        self.execution_ms: Optional[float] = plan.get('Execution Time')
+        self.shared_hit_blocks: Optional[int] = root.get('Shared Hit Blocks')
+        self.shared_read_blocks: Optional[int] = root.get('Shared Read Blocks')
+        self.scans: List[str] = []
+        self.seq_scans: List[str] = []
+        for node in iter_plan_nodes(root):
+            relation = node.get('Relation Name')
+            if not relation:
+                continue
+            if node['Node Type'] == 'Seq Scan':
+                self.scans.append(f"Seq Scan on {relation}")
+                if table_rows.get(relation, 0) >= min_rows:
+                    self.seq_scans.append(relation)
+            else:
+                index = f" using {node['Index Name']}" if node.get('Index Name') else ''
+                self.scans.append(f"{node['Node Type']} on {relation}{index}")
+
+    @property
+    def flagged(self) -> bool:
+        return bool(self.seq_scans)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'flagged': self.flagged,
+            'seq_scans': self.seq_scans,
+            'scans': self.scans,
+            'execution_ms': self.execution_ms,
+            'shared_hit_blocks': self.shared_hit_blocks,
+            'shared_read_blocks': self.shared_read_blocks,
+            'sql': self.sql
+        }
+
+
+def iter_plan_nodes(node: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Walk an EXPLAIN (FORMAT JSON) plan node and all nodes below it."""
+    yield node
+    for child in node.get('Plans', ()):
+        yield from iter_plan_nodes(child)
+
+
+def sample_params(db, campaign_id: Optional[str] = None, job_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Parameters for the replayed queries: the campaign with the most leads and
+    the enrichment job of one of its leads, unless given.
+    """
+    if campaign_id is None:
+        campaign_id = db.execute(
+            select(Lead.campaign_id).group_by(Lead.campaign_id).order_by(func.count().desc()).limit(1)
+        ).scalar() or ''
+    if job_id is None:
+        job_id = db.execute(
+            select(Lead.enrichment_job_id).where(Lead.enrichment_job_id.isnot(None)).limit(1)
+        ).scalar() or ''
+    return {'campaign_id': campaign_id, 'job_id': str(job_id), 'cutoff': datetime.utcnow() - timedelta(days=7)}
+
+
+def table_row_estimates(db) -> Dict[str, int]:
+    """Planner row estimates (pg_class.reltuples) of the tables the queries read."""
+    rows = db.execute(text(
+        "SELECT relname, reltuples::bigint FROM pg_class "
+        "WHERE relkind = 'r' AND relname IN ('jobs', 'leads', 'lead_artifacts')"
+    ))
+    return {name: max(count, 0) for name, count in rows}
+
+
+def compile_statement(statement) -> str:
+    """Render a statement with its values inlined, as psycopg2 sends it."""
+    return str(statement.compile(dialect=postgresql.dialect(), compile_kwargs={'literal_binds': True}))
+
+
+def explain_hot_queries(
+    db,
+    params: Optional[Dict[str, Any]] = None,
+    analyze: bool = True,
+    prefer_indexes: bool = False,
+    min_rows: int = DEFAULT_MIN_ROWS,
+    names: Optional[List[str]] = None
+) -> List[PlanReport]:
+    """
+    Explain the hot queries and report their scans.
+
+    Everything runs in one transaction that is rolled back, so ANALYZE (which
+    executes the queries) and the planner settings leave nothing behind.
+
+    Args:
+        db: Database session
+        params: Query parameters (default: sample_params(db))
+        analyze: Execute the queries for actual times and buffer counts
+        prefer_indexes: Disable sequential scans; every remaining one is flagged
+        min_rows: Flag sequential scans of tables with at least this many rows
+        names: Only these queries (default: all of HOT_QUERIES)
+
+    Returns:
+        List[PlanReport]: One report per query, in HOT_QUERIES order
+    """
+    builders = _hot_queries()
+    unknown = set(names or ()) - set(builders)
+    if unknown:
+        raise ValueError(f"Unknown queries {sorted(unknown)}, expected some of {list(builders)}")
+
+    options = 'ANALYZE, BUFFERS, FORMAT JSON' if analyze else 'FORMAT JSON'
+    reports = []
+    try:
+        params = params or sample_params(db)
+        table_rows = table_row_estimates(db)
+        if prefer_indexes:
+            db.execute(text("SET LOCAL enable_seqscan = off"))
+            min_rows = 0
+        for name, build in builders.items():
+            if names and name not in names:
+                continue
+            sql = compile_statement(build(params))
+            plan = db.execute(text(f"EXPLAIN ({options}) {sql}")).scalar()[0]
+            report = PlanReport(name, sql, plan, table_rows, min_rows)
+            if report.flagged:
+                logger.warning(f"Sequential scan in hot query {name}: {', '.join(report.seq_scans)}")
+            reports.append(report)
+    finally:
+        db.rollback()
+    return reports
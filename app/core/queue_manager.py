@@ -126,6 +126,16 @@ class QueueManager:
                 resumed_count = 0
                 for job in paused_jobs:
                     try:
+                        if job.job_type in (JobType.VERIFY_EMAILS_BULK, JobType.GENERATE_EMAIL_COPY_BATCH):
+                            # The vendor keeps processing the file while paused; hand the
+                            # job back to its beat poller
+                            job.status = JobStatus.PROCESSING
+                            job.error = None
+                            job.updated_at = datetime.utcnow()
+                            resumed_count += 1
+                            logger.info(f"Resumed {job.job_type.value} job {job.id}, returned to its beat poller")
+                            continue
+
                         # Resume job to PENDING status
                         job.status = JobStatus.PENDING
                         job.error = None  # Clear the pause error
@@ -0,0 +1,198 @@
+"""
+OpenTelemetry Tracing
+
+Spans for API requests, Celery tasks, SQLAlchemy queries, Redis commands and
+outgoing HTTP. The HTTP spans cover requests (vendor_http) and httpx (the
+OpenAI and Apify clients). The Celery instrumentation carries the trace context
+in the task message headers, so a campaign start is a single trace:
+
+    POST /campaigns/{id}/start -> fetch_and_save_leads_task -> enrich_lead_task (per lead)
+        -> one span per stage (app/core/lead_trace.py) -> vendor HTTP calls
+
+Tracing is off unless TRACING_ENABLED. Sampling is parent-based, with
+TRACING_SAMPLE_RATIO applied at the root. A campaign start is therefore kept
+or dropped as a whole. An unsampled request only costs a context lookup per
+span. Spans are exported from a background thread (BatchSpanProcessor), to:
+
+- otlp: an OpenTelemetry collector at TRACING_OTLP_ENDPOINT (gRPC)
+- file: one JSON span per line in TRACING_FILE_PATH
+- console: stdout
+
+Each process calls init_tracing() once: the API from create_application(),
+the workers from worker_process_init (after the prefork, since the export
+thread does not survive a fork). shutdown_tracing() flushes the queued spans
+and closes the span file; it runs on API shutdown, in worker_process_shutdown
+and at exit. When it is on, log records get a trace_id so the log files can be
+joined with the trace.
+"""
+import atexit
+import logging
+import os
+from typing import Any, Optional, Tuple
+
+from app.core.config import settings
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+EXPORTERS = ('otlp', 'file', 'console')
+
+_tracer = None
+_provider = None
+# Open TRACING_FILE_PATH of the file exporter, closed by shutdown_tracing()
+_span_file = None
+
+
+class TraceContextFilter(logging.Filter):
+    """Add the id of the current sampled trace to log records."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        trace_id = current_trace_id()
+        if trace_id:
+            record.trace_id = trace_id
+        return True
+
+
+def _build_exporter():
+    exporter = settings.TRACING_EXPORTER.lower()
+    if exporter not in EXPORTERS:
+        raise ValueError(f"Unknown TRACING_EXPORTER '{settings.TRACING_EXPORTER}', expected otlp, file or console")
+    if exporter == 'otlp':
+        from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+        return OTLPSpanExporter(endpoint=settings.TRACING_OTLP_ENDPOINT, insecure=True)
+
+    global _span_file
+    from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+    if exporter == 'file':
+        directory = os.path.dirname(settings.TRACING_FILE_PATH)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        _span_file = open(settings.TRACING_FILE_PATH, 'a')
+        return ConsoleSpanExporter(
+            out=_span_file,
+            formatter=lambda span: span.to_json(indent=None) + os.linesep
+        )
+    return ConsoleSpanExporter()
+
+
+def init_tracing(component: str, app=None) -> bool:
+    """
+    Set up the tracer provider and instrument this process. Safe to call more than once.
+
+    Args:
+        component: 'api' or 'worker', appended to TRACING_SERVICE_NAME
+        app: FastAPI application to instrument, for the API process
+
+    Returns:
+        bool: True if tracing is on in this process
+    """
+    global _tracer, _provider
+    if not settings.TRACING_ENABLED:
+        return False
+    if _tracer is not None:
+        return True
+
+    try:
+        from opentelemetry import trace
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+        from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+        from opentelemetry.instrumentation.celery import CeleryInstrumentor
+        from opentelemetry.instrumentation.httpx import HTTPXClientInstrumentor
+        from opentelemetry.instrumentation.redis import RedisInstrumentor
+        from opentelemetry.instrumentation.requests import RequestsInstrumentor
+        from opentelemetry.instrumentation.sqlalchemy import SQLAlchemyInstrumentor
+    except ImportError as e:
+        logger.warning(f"Tracing enabled but OpenTelemetry packages are missing: {str(e)}",
+                       extra={'component': 'tracing'})
+        return False
+
+    try:
+        exporter = _build_exporter()
+    except Exception as e:
+        logger.error(f"Tracing not started, exporter could not be created: {str(e)}",
+                     extra={'component': 'tracing'})
+        return False
+
+    provider = TracerProvider(
+        resource=Resource.create({'service.name': f"{settings.TRACING_SERVICE_NAME}-{component}"}),
+        sampler=ParentBased(TraceIdRatioBased(settings.TRACING_SAMPLE_RATIO))
+    )
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+
+    from app.core.database import async_engine, engine
+    CeleryInstrumentor().instrument()
+    SQLAlchemyInstrumentor().instrument(engines=[engine, async_engine.sync_engine])
+    RedisInstrumentor().instrument()
+    RequestsInstrumentor().instrument()
+    HTTPXClientInstrumentor().instrument()
+    if app is not None:
+        from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+        FastAPIInstrumentor.instrument_app(app, excluded_urls="metrics,health")
+
+    for handler in logging.getLogger().handlers:
+        handler.addFilter(TraceContextFilter())
+
+    _tracer = trace.get_tracer("app")
+    _provider = provider
+    atexit.register(shutdown_tracing)
+    logger.info(
+        f"Tracing {component} with exporter {settings.TRACING_EXPORTER}, "
+        f"sample ratio {settings.TRACING_SAMPLE_RATIO}",
+        extra={'component': 'tracing'}
+    )
+    return True
+
+
+def shutdown_tracing() -> None:
+    """Export the queued spans and close the span file. Safe to call more than once."""
+    global _tracer, _provider, _span_file
+    provider, span_file = _provider, _span_file
+    _tracer = _provider = _span_file = None
+    if provider is not None:
+        try:
+            provider.shutdown()
+        except Exception as e:
+            logger.warning(f"Tracing shutdown failed: {str(e)}", extra={'component': 'tracing'})
+    if span_file is not None:
+        span_file.close()
+
+
+def start_span(name: str, **attributes: Any) -> Optional[Tuple[Any, Any]]:
+    """
+    Start a span and make it the current one, for code that can't use a `with`
+    block (e.g. a pipeline stage opened and closed in different places).
+
+    Returns:
+        A handle for end_span(), or None when tracing is off
+    """
+    if _tracer is None:
+        return None
+    from opentelemetry import context, trace
+    span = _tracer.start_span(name, attributes=attributes)
+    return span, context.attach(trace.set_span_in_context(span))
+
+
+def end_span(handle: Optional[Tuple[Any, Any]], **attributes: Any) -> None:
+    """End a span started with start_span() and restore the previous current span."""
+    if handle is None:
+        return
+    from opentelemetry import context
+    span, token = handle
+    for key, value in attributes.items():
+        span.set_attribute(key, value)
+    context.detach(token)
+    span.end()
+
+
+def current_trace_id() -> Optional[str]:
+    """Hex id of the current trace if it is sampled, else None."""
+    if _tracer is None:
+        return None
+    from opentelemetry import trace
+    span_context = trace.get_current_span().get_span_context()
+    if not span_context.is_valid or not span_context.trace_flags.sampled:
+        return None
+    return format(span_context.trace_id, '032x')
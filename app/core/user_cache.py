@@ -0,0 +1,97 @@
+"""
+In-process cache of authenticated users.
+
+Every authenticated request used to open a session and load its User. The
+middleware now verifies the JWT on its own and takes the user from here, so
+the database is only hit on a miss. Entries expire after
+AUTH_USER_CACHE_SECONDS, the least recently used entry goes when
+AUTH_USER_CACHE_SIZE is reached, and any flush that updates or deletes a user
+drops it (a bulk update/delete of users clears the whole cache).
+
+Cached users are detached copies, so they never expire or lazy-load and can
+be shared by concurrent requests. Treat them as read-only; load the user in
+your own session to change it.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.core.config import settings
+from app.models.user import User
+
+
+class UserCache:
+    """Thread-safe TTL + LRU map of user id to a detached User copy."""
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0 and self.ttl_seconds > 0
+
+    def get(self, user_id: str) -> Optional[User]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            expires_at, user = entry
+            if expires_at <= time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return user
+
+    def put(self, user: User) -> User:
+        """Cache a copy of a loaded user and return the copy."""
+        snapshot = _detached_copy(user)
+        if not self.enabled:
+            return snapshot
+        with self._lock:
+            self._entries[snapshot.id] = (time.monotonic() + self.ttl_seconds, snapshot)
+            self._entries.move_to_end(snapshot.id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return snapshot
+
+    def invalidate(self, user_id: str) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _detached_copy(user: User) -> User:
+    copy = User(**{column.key: getattr(user, column.key) for column in User.__table__.columns})
+    make_transient_to_detached(copy)
+    return copy
+
+
+user_cache = UserCache(settings.AUTH_USER_CACHE_SIZE, settings.AUTH_USER_CACHE_SECONDS)
+
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def _invalidate_changed_user(mapper, connection, target) -> None:
+    user_cache.invalidate(target.id)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _invalidate_on_bulk_user_change(orm_execute_state) -> None:
+    if (orm_execute_state.is_update or orm_execute_state.is_delete) and orm_execute_state.bind_mapper is not None \
+            and orm_execute_state.bind_mapper.class_ is User:
+        user_cache.clear()
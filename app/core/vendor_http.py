@@ -0,0 +1,182 @@
+import os
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.core.config import settings
+from app.core.logger import get_logger
+from app.core.metrics import observe_vendor_request, vendor_outcome
+
+logger = get_logger(__name__)
+
+# One pooled session per (vendor, process). Celery prefork children must not
+# share the parent's sockets, so sessions are keyed by pid and created lazily.
+_sessions: Dict[Tuple[str, int], requests.Session] = {}
+
+
+def get_vendor_session(vendor: str) -> requests.Session:
+    """
+    Get the keep-alive session for a vendor in the current process.
+
+    Args:
+        vendor: Vendor name, e.g. 'perplexity'
+
+    Returns:
+        requests.Session: Session with a connection pool sized by VENDOR_HTTP_POOL_SIZE
+    """
+    key = (vendor, os.getpid())
+    session = _sessions.get(key)
+    if session is None:
+        session = requests.Session()
+        # Retries are handled by VendorTransport, never by urllib3
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=settings.VENDOR_HTTP_POOL_SIZE, max_retries=0)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        _sessions[key] = session
+    return session
+
+
+class VendorTransport:
+    """
+    HTTP transport shared by the vendor services.
+
+    Requests go through a pooled keep-alive session per vendor and are retried
+    with exponential backoff and full jitter. A Retry-After header from the
+    vendor takes precedence over the computed delay.
+
+    Only failures that are safe to repeat are retried:
+    - any request: connect timeouts and 429 responses (the vendor never
+      processed the request)
+    - idempotent requests only: connection drops, read timeouts and
+      502/503/504 responses
+
+    Every request has a total time budget. No retry is attempted if its delay
+    would run past the budget; the last response or error is returned instead.
+    The caller still calls raise_for_status() and handles RequestException.
+    """
+
+    SAFE_RETRY_STATUSES = {429}
+    IDEMPOTENT_RETRY_STATUSES = {429, 502, 503, 504}
+
+    def __init__(
+        self,
+        vendor: str,
+        read_timeout: float,
+        budget_seconds: float,
+        max_attempts: Optional[int] = None,
+        backoff_base: Optional[float] = None,
+        backoff_max: Optional[float] = None
+    ):
+        """
+        Initialize the VendorTransport.
+
+        Args:
+            vendor: Vendor name, used for the session pool and logging
+            read_timeout: Default read timeout per attempt in seconds
+            budget_seconds: Total time allowed for a request including retries
+            max_attempts: Attempts per request, defaults to settings
+            backoff_base: First backoff ceiling in seconds, defaults to settings
+            backoff_max: Largest backoff in seconds, defaults to settings
+        """
+        self.vendor = vendor
+        self.timeout = (settings.VENDOR_HTTP_CONNECT_TIMEOUT, read_timeout)
+        self.budget_seconds = budget_seconds
+        self.max_attempts = max_attempts or settings.VENDOR_HTTP_MAX_ATTEMPTS
+        self.backoff_base = settings.VENDOR_HTTP_BACKOFF_BASE if backoff_base is None else backoff_base
+        self.backoff_max = settings.VENDOR_HTTP_BACKOFF_MAX if backoff_max is None else backoff_max
+
+    @property
+    def session(self) -> requests.Session:
+        return get_vendor_session(self.vendor)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """Send a GET request. GETs are always treated as idempotent."""
+        return self._send("GET", self.session.get, url, idempotent=True, **kwargs)
+
+    def post(self, url: str, idempotent: bool = False, **kwargs) -> requests.Response:
+        """
+        Send a POST request.
+
+        Args:
+            url: Request URL
+            idempotent: True if repeating the request has no extra side effect
+                        (e.g. a completion), which allows retrying read failures
+        """
+        return self._send("POST", self.session.post, url, idempotent=idempotent, **kwargs)
+
+    def _is_retryable_error(self, error: requests.RequestException, idempotent: bool) -> bool:
+        if isinstance(error, requests.exceptions.ConnectTimeout):
+            return True
+        if idempotent:
+            return isinstance(error, (
+                requests.exceptions.ConnectionError,
+                requests.exceptions.Timeout,
+                requests.exceptions.ChunkedEncodingError
+            ))
+        return False
+
+    def _retry_after_seconds(self, response: requests.Response) -> Optional[float]:
+        """Parse a Retry-After header given in seconds or as an HTTP date."""
+        value = response.headers.get("Retry-After") if response.headers else None
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except (TypeError, ValueError):
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+    def _backoff_seconds(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for the given (1-based) failed attempt."""
+        ceiling = min(self.backoff_max, self.backoff_base * (2 ** (attempt - 1)))
+        return random.uniform(0, ceiling)
+
+    def _send(self, method: str, send, url: str, idempotent: bool, **kwargs) -> requests.Response:
+        kwargs.setdefault("timeout", self.timeout)
+        deadline = time.monotonic() + self.budget_seconds
+        retry_statuses = self.IDEMPOTENT_RETRY_STATUSES if idempotent else self.SAFE_RETRY_STATUSES
+
+        for attempt in range(1, self.max_attempts + 1):
+            started = time.monotonic()
+            try:
+                response = send(url, **kwargs)
+            except requests.RequestException as e:
+                observe_vendor_request(
+                    self.vendor, started, 'timeout' if isinstance(e, requests.exceptions.Timeout) else 'error'
+                )
+                if attempt == self.max_attempts or not self._is_retryable_error(e, idempotent):
+                    raise
+                reason = str(e)
+                delay = self._backoff_seconds(attempt)
+                if time.monotonic() + delay > deadline:
+                    raise
+            else:
+                observe_vendor_request(self.vendor, started, vendor_outcome(response.status_code))
+                if attempt == self.max_attempts or response.status_code not in retry_statuses:
+                    return response
+                reason = f"HTTP {response.status_code}"
+                retry_after = self._retry_after_seconds(response)
+                delay = retry_after if retry_after is not None else self._backoff_seconds(attempt)
+                if time.monotonic() + delay > deadline:
+                    return response
+                response.close()
+
+            logger.warning(
+                f"{self.vendor} {method} request failed ({reason}), "
+                f"retrying in {delay:.2f}s (attempt {attempt}/{self.max_attempts})",
+                extra={
+                    'component': 'vendor_http',
+                    'vendor': self.vendor,
+                    'attempt_number': attempt,
+                    'retry_delay_seconds': delay,
+                    'error': reason
+                }
+            )
+            time.sleep(delay)
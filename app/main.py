@@ -2,9 +2,10 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.endpoints import jobs, health, campaigns, organizations, auth, queue
-from app.api.endpoints import leads
+from app.api.endpoints import leads, metrics
 from app.core.config import settings
 from app.core.middleware import AuthenticationMiddleware
+from app.core.tracing import init_tracing, shutdown_tracing
 
 def create_application() -> FastAPI:
     app = FastAPI(
@@ -34,6 +35,14 @@ def create_application() -> FastAPI:
     app.include_router(leads.router, prefix=f"{settings.API_V1_STR}/leads", tags=["leads"])
     app.include_router(queue.router, prefix=f"{settings.API_V1_STR}/queue", tags=["queue"])
 
+    # Prometheus scrape endpoint, served outside the versioned API
+    if settings.METRICS_ENABLED:
+        app.include_router(metrics.router, tags=["metrics"])
+
+    # OpenTelemetry spans, when TRACING_ENABLED (each gunicorn worker imports the app after forking)
+    init_tracing("api", app)
+    app.router.add_event_handler("shutdown", shutdown_tracing)
+
     return app
 
 app = create_application()
\ No newline at end of file
@@ -3,6 +3,9 @@ from app.models.campaign import Campaign
 from app.models.campaign_status import CampaignStatus
 from app.models.organization import Organization
 from app.models.lead import Lead
+from app.models.lead_artifact import LeadArtifact
 from app.models.user import User
+from app.models.prompt_template import PromptTemplate
+from app.models.lead_trace import LeadTrace
 
-__all__ = ["Job", "JobStatus", "Campaign", "CampaignStatus", "Organization", "Lead", "User"]
+__all__ = ["Job", "JobStatus", "Campaign", "CampaignStatus", "Organization", "Lead", "LeadArtifact", "User", "PromptTemplate", "LeadTrace"]
@@ -27,6 +27,8 @@ class Campaign(Base):
     totalRecords = Column(Integer, nullable=False)
     url = Column(Text, nullable=False)
     instantly_campaign_id = Column(String(64), nullable=True)
+    # 'realtime' generates email copy inside enrich_lead_task, 'batch' defers it to the OpenAI Batch API
+    email_copy_mode = Column(String(16), nullable=False, default='realtime', server_default='realtime')
 
     # Relationship to jobs
     jobs = relationship("Job", back_populates="campaign")
@@ -128,7 +130,8 @@ class Campaign(Base):
             'fileName': self.fileName,
             'totalRecords': self.totalRecords,
             'url': self.url,
-            'instantly_campaign_id': self.instantly_campaign_id
+            'instantly_campaign_id': self.instantly_campaign_id,
+            'email_copy_mode': self.email_copy_mode
         }
 
     def __repr__(self):
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Enum, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Enum, Text, ForeignKey, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import enum
@@ -18,6 +18,8 @@ class JobType(str, enum.Enum):
     FETCH_LEADS = "FETCH_LEADS"
     ENRICH_LEAD = "ENRICH_LEAD"
     CLEANUP_CAMPAIGN = "CLEANUP_CAMPAIGN"
+    VERIFY_EMAILS_BULK = "VERIFY_EMAILS_BULK"
+    GENERATE_EMAIL_COPY_BATCH = "GENERATE_EMAIL_COPY_BATCH"
 
 class Job(Base):
     __tablename__ = "jobs"
@@ -30,10 +32,21 @@ class Job(Base):
     status = Column(Enum(JobStatus), default=JobStatus.PENDING, nullable=False)
     result = Column(Text)
     error = Column(Text)
-    campaign_id = Column(String(36), ForeignKey("campaigns.id"), nullable=True, index=True)
+    campaign_id = Column(String(36), ForeignKey("campaigns.id"), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     completed_at = Column(DateTime(timezone=True))
     
     # Relationship to campaign
-    campaign = relationship("Campaign", back_populates="jobs") 
\ No newline at end of file
+    campaign = relationship("Campaign", back_populates="jobs")
+
+    __table_args__ = (
+        # Latest job per campaign and cleanup by age; also serves campaign_id alone
+        Index('ix_jobs_campaign_id_created_at', 'campaign_id', 'created_at'),
+        # Circuit breaker pause/resume and the beat pollers only look for open
+        # jobs, a small part of the table once campaigns have run
+        Index(
+            'ix_jobs_open_status', 'status', 'job_type',
+            postgresql_where=status.in_([JobStatus.PENDING, JobStatus.PROCESSING, JobStatus.PAUSED])
+        ),
+    ) 
\ No newline at end of file
@@ -1,16 +1,34 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, Index
-from sqlalchemy.dialects.postgresql import JSON
+from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import uuid
 from typing import Dict, Any
 from app.core.database import Base
+from app.models.lead_artifact import ARTIFACT_FIELDS, LeadArtifact, artifact_summary
+
+
+def _artifact_attribute(field: str) -> property:
+    """Read and write one lead_artifacts document as if it were a Lead column."""
+    def get(lead):
+        return getattr(lead.artifacts, field) if lead.artifacts is not None else None
+
+    def set(lead, value):
+        if lead.artifacts is None:
+            if value is None:
+                return
+            lead.artifacts = LeadArtifact()
+        setattr(lead.artifacts, field, value)
+        for column, extracted in artifact_summary(field, value).items():
+            setattr(lead, column, extracted)
+
+    return property(get, set, doc=f"LeadArtifact.{field} of this lead (loaded on first access)")
+
 
 class Lead(Base):
     __tablename__ = 'leads'
 
     id = Column(String(36), primary_key=True, index=True, default=lambda: str(uuid.uuid4()))
-    campaign_id = Column(String(36), ForeignKey('campaigns.id'), nullable=False)
+    campaign_id = Column(String(36), ForeignKey('campaigns.id'), nullable=False, index=True)
     first_name = Column(String(100))
     last_name = Column(String(100))
     email = Column(String(255), index=True)
@@ -19,25 +37,44 @@ class Lead(Base):
     title = Column(String(255))
     linkedin_url = Column(String(255))
     source_url = Column(String(255))
-    raw_data = Column(JSON)
-    email_verification = Column(JSON, nullable=True)
-    enrichment_results = Column(JSON, nullable=True)
     enrichment_job_id = Column(String(36), nullable=True)
-    email_copy_gen_results = Column(JSON, nullable=True)
-    instantly_lead_record = Column(JSON, nullable=True)
+    # Extracted from the artifacts when they are set (see artifact_summary)
+    email_verification_status = Column(String(32), nullable=True)
+    enrichment_text = Column(Text, nullable=True)
+    email_copy = Column(Text, nullable=True)
+    instantly_lead_id = Column(String(64), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
 
     # Relationship to campaign
     campaign = relationship('Campaign', back_populates='leads')
 
+    # Vendor payloads, loaded on first access; use selectinload(Lead.artifacts)
+    # when a query needs them for many leads (or on an AsyncSession)
+    artifacts = relationship(
+        'LeadArtifact', back_populates='lead', uselist=False,
+        cascade='all, delete-orphan', passive_deletes=True
+    )
+    raw_data = _artifact_attribute('raw_data')
+    email_verification = _artifact_attribute('email_verification')
+    enrichment_results = _artifact_attribute('enrichment_results')
+    email_copy_gen_results = _artifact_attribute('email_copy_gen_results')
+    instantly_lead_record = _artifact_attribute('instantly_lead_record')
+
     # Add unique constraint on email field (only for non-null emails)
     __table_args__ = (
         Index('idx_leads_email_unique', 'email', unique=True, postgresql_where="email IS NOT NULL"),
+        # process_job_task finds the lead of a resumed ENRICH_LEAD job by it
+        Index('ix_leads_enrichment_job_id', 'enrichment_job_id', postgresql_where="enrichment_job_id IS NOT NULL"),
     )
 
-    def to_dict(self) -> Dict[str, Any]:
-        return {
+    def to_dict(self, include_artifacts: bool = True) -> Dict[str, Any]:
+        """
+        Args:
+            include_artifacts: Include the five artifact documents, which loads
+                the lead_artifacts row if it isn't loaded yet
+        """
+        data = {
             'id': self.id,
             'campaign_id': self.campaign_id,
             'first_name': self.first_name,
@@ -48,15 +85,17 @@ class Lead(Base):
             'title': self.title,
             'linkedin_url': self.linkedin_url,
             'source_url': self.source_url,
-            'raw_data': self.raw_data,
-            'email_verification': self.email_verification,
-            'enrichment_results': self.enrichment_results,
             'enrichment_job_id': self.enrichment_job_id,
-            'email_copy_gen_results': self.email_copy_gen_results,
-            'instantly_lead_record': self.instantly_lead_record,
+            'email_verification_status': self.email_verification_status,
+            'enrichment_text': self.enrichment_text,
+            'email_copy': self.email_copy,
+            'instantly_lead_id': self.instantly_lead_id,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
+        if include_artifacts:
+            data.update({field: getattr(self, field) for field in ARTIFACT_FIELDS})
+        return data
 
     def __repr__(self):
         return f'<Lead {self.id}>' 
\ No newline at end of file
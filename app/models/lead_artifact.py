@@ -0,0 +1,119 @@
+from sqlalchemy import Column, String, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import JSONB, insert
+from sqlalchemy.orm import Session, relationship
+from typing import Any, Dict, List, Optional
+
+from app.core.database import Base
+
+# JSON documents kept in lead_artifacts rather than on the lead row
+ARTIFACT_FIELDS = (
+    'raw_data',
+    'email_verification',
+    'enrichment_results',
+    'email_copy_gen_results',
+    'instantly_lead_record',
+)
+
+
+class LeadArtifact(Base):
+    """
+    The vendor payloads of a lead: the Apollo record, verification, enrichment,
+    OpenAI and Instantly responses.
+
+    They are kilobytes per lead and only read by the pipeline step that needs
+    them, so they live here, one row per lead, instead of widening every leads
+    row. Lead exposes each one as an attribute of the same name and keeps the
+    values the pipeline filters and reads often (see artifact_summary) as
+    columns of its own.
+    """
+    __tablename__ = "lead_artifacts"
+
+    lead_id = Column(String(36), ForeignKey('leads.id', ondelete='CASCADE'), primary_key=True)
+    raw_data = Column(JSONB(none_as_null=True), nullable=True)
+    email_verification = Column(JSONB(none_as_null=True), nullable=True)
+    enrichment_results = Column(JSONB(none_as_null=True), nullable=True)
+    email_copy_gen_results = Column(JSONB(none_as_null=True), nullable=True)
+    instantly_lead_record = Column(JSONB(none_as_null=True), nullable=True)
+
+    lead = relationship('Lead', back_populates='artifacts')
+
+    __table_args__ = (
+        # Leads waiting on an OpenAI batch (see _email_copy_status in campaign_tasks)
+        Index(
+            'ix_lead_artifacts_email_copy_batch',
+            email_copy_gen_results['status'].astext,
+            postgresql_where=email_copy_gen_results['status'].astext.in_(['batch_pending', 'batch_submitted'])
+        ),
+    )
+
+    def __repr__(self):
+        return f'<LeadArtifact {self.lead_id}>'
+
+
+def _message_content(result: Optional[Dict[str, Any]]) -> Optional[str]:
+    """The first choice's message content of an OpenAI-style chat completion."""
+    try:
+        return result['choices'][0]['message']['content']
+    except (KeyError, IndexError, TypeError):
+        return None
+
+
+def artifact_summary(field: str, value: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Lead columns extracted from an artifact.
+
+    Args:
+        field: One of ARTIFACT_FIELDS
+        value: The artifact document
+
+    Returns:
+        dict: Lead column values to set alongside the artifact (empty for raw_data)
+    """
+    value = value if isinstance(value, dict) else None
+    if field == 'email_verification':
+        return {'email_verification_status': value.get('result') if value else None}
+    if field == 'enrichment_results':
+        return {'enrichment_text': _message_content(value)}
+    if field == 'email_copy_gen_results':
+        return {'email_copy': _message_content(value)}
+    if field == 'instantly_lead_record':
+        return {'instantly_lead_id': str(value['id']) if value and value.get('id') else None}
+    return {}
+
+
+def bulk_update_lead_artifacts(db: Session, mappings: List[Dict[str, Any]]) -> None:
+    """
+    Write artifacts for many leads, the lead_artifacts counterpart of
+    db.bulk_update_mappings(Lead, mappings).
+
+    Each mapping is {'id': lead_id, <artifact field>: document, ...}. Artifact
+    rows are upserted (one INSERT ... ON CONFLICT per set of fields) and the
+    extracted lead columns are updated with bulk_update_mappings. The caller
+    commits.
+    """
+    by_fields: Dict[tuple, List[Dict[str, Any]]] = {}
+    lead_mappings = []
+    for mapping in mappings:
+        fields = tuple(sorted(key for key in mapping if key != 'id'))
+        unknown = set(fields) - set(ARTIFACT_FIELDS)
+        if unknown:
+            raise ValueError(f"Not lead artifact fields: {sorted(unknown)}")
+        by_fields.setdefault(fields, []).append(
+            {'lead_id': mapping['id'], **{field: mapping[field] for field in fields}}
+        )
+        lead_mapping = {'id': mapping['id']}
+        for field in fields:
+            lead_mapping.update(artifact_summary(field, mapping[field]))
+        if len(lead_mapping) > 1:
+            lead_mappings.append(lead_mapping)
+
+    for fields, rows in by_fields.items():
+        statement = insert(LeadArtifact).values(rows)
+        db.execute(statement.on_conflict_do_update(
+            index_elements=[LeadArtifact.lead_id],
+            set_={field: statement.excluded[field] for field in fields}
+        ))
+    if lead_mappings:
+        # Also bumps leads.updated_at, as writing the JSON columns on leads did
+        from app.models.lead import Lead
+        db.bulk_update_mappings(Lead, lead_mappings)
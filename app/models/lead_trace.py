@@ -0,0 +1,67 @@
+from sqlalchemy import Column, String, Integer, DateTime, JSON, ForeignKey
+from sqlalchemy.sql import func
+import uuid
+from typing import Dict, Any
+
+from app.core.database import Base
+
+
+class LeadTrace(Base):
+    """
+    Timing of one enrich_lead_task run for a lead (see app/core/lead_trace.py).
+
+    Written once when the task ends. The totals and per-stage durations are
+    fixed columns so percentiles can be computed in SQL; `stages` keeps the
+    per-stage detail as {stage: [offset_ms, ms, vendor_ms, limiter_wait_ms,
+    db_ms, vendor_calls, outcome]}.
+    """
+    __tablename__ = "lead_traces"
+
+    id = Column(String(36), primary_key=True, index=True, default=lambda: str(uuid.uuid4()))
+    lead_id = Column(String(36), ForeignKey('leads.id'), nullable=False, index=True)
+    campaign_id = Column(String(36), ForeignKey('campaigns.id'), nullable=False, index=True)
+    job_id = Column(String(36), nullable=True)
+    status = Column(String(20), nullable=False)
+    attempt = Column(Integer, nullable=False, default=1)
+    enqueued_at = Column(DateTime(timezone=True), nullable=True)
+    started_at = Column(DateTime(timezone=True), nullable=False)
+    queue_ms = Column(Integer, nullable=True)
+    total_ms = Column(Integer, nullable=False)
+    vendor_ms = Column(Integer, nullable=False, default=0)
+    limiter_wait_ms = Column(Integer, nullable=False, default=0)
+    db_ms = Column(Integer, nullable=False, default=0)
+    vendor_calls = Column(Integer, nullable=False, default=0)
+    email_verification_ms = Column(Integer, nullable=True)
+    enrichment_ms = Column(Integer, nullable=True)
+    email_copy_ms = Column(Integer, nullable=True)
+    instantly_ms = Column(Integer, nullable=True)
+    stages = Column(JSON, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert lead trace to dictionary for serialization."""
+        return {
+            'id': self.id,
+            'lead_id': self.lead_id,
+            'campaign_id': self.campaign_id,
+            'job_id': self.job_id,
+            'status': self.status,
+            'attempt': self.attempt,
+            'enqueued_at': self.enqueued_at.isoformat() if self.enqueued_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'queue_ms': self.queue_ms,
+            'total_ms': self.total_ms,
+            'vendor_ms': self.vendor_ms,
+            'limiter_wait_ms': self.limiter_wait_ms,
+            'db_ms': self.db_ms,
+            'vendor_calls': self.vendor_calls,
+            'email_verification_ms': self.email_verification_ms,
+            'enrichment_ms': self.enrichment_ms,
+            'email_copy_ms': self.email_copy_ms,
+            'instantly_ms': self.instantly_ms,
+            'stages': self.stages,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+    def __repr__(self):
+        return f'<LeadTrace {self.lead_id} {self.status}>'
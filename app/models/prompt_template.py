@@ -0,0 +1,48 @@
+from sqlalchemy import Column, String, Text, DateTime, JSON, ForeignKey, UniqueConstraint
+from sqlalchemy.sql import func
+import uuid
+from typing import Dict, Any
+
+from app.core.database import Base
+
+
+class PromptTemplate(Base):
+    """
+    Override of a built-in vendor prompt (see app/background_services/prompt_templates.py).
+
+    Scope is set by the foreign keys: a campaign template wins over an
+    organization template, which wins over a global one (both unset).
+    """
+    __tablename__ = "prompt_templates"
+    __table_args__ = (
+        UniqueConstraint('name', 'organization_id', 'campaign_id', name='uq_prompt_templates_name_scope'),
+    )
+
+    id = Column(String(36), primary_key=True, index=True, default=lambda: str(uuid.uuid4()))
+    name = Column(String(64), nullable=False, index=True)
+    organization_id = Column(String(36), ForeignKey('organizations.id'), nullable=True)
+    campaign_id = Column(String(36), ForeignKey('campaigns.id'), nullable=True)
+    model = Column(String(100), nullable=False)
+    system_prompt = Column(Text, nullable=False)
+    user_template = Column(Text, nullable=False)
+    parameters = Column(JSON, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert prompt template to dictionary for serialization."""
+        return {
+            'id': self.id,
+            'name': self.name,
+            'organization_id': self.organization_id,
+            'campaign_id': self.campaign_id,
+            'model': self.model,
+            'system_prompt': self.system_prompt,
+            'user_template': self.user_template,
+            'parameters': self.parameters,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+    def __repr__(self):
+        return f'<PromptTemplate {self.name} {self.id}>'
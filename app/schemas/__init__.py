@@ -17,7 +17,7 @@ from app.schemas.organization import (
     OrganizationResponse,
     OrganizationInDB
 )
-from app.schemas.lead import LeadCreate, LeadUpdate, LeadResponse
+from app.schemas.lead import LeadCreate, LeadUpdate, LeadResponse, LeadSummaryResponse
 from app.schemas.auth import (
     UserSignupRequest, 
     UserLoginRequest, 
@@ -53,6 +53,7 @@ __all__ = [
     "LeadCreate",
     "LeadUpdate",
     "LeadResponse",
+    "LeadSummaryResponse",
     "UserSignupRequest",
     "UserLoginRequest",
     "TokenResponse",
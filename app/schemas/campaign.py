@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Literal
 from pydantic import BaseModel, Field
 
 from app.models.campaign_status import CampaignStatus
@@ -13,6 +13,9 @@ class CampaignBase(BaseModel):
     fileName: str = Field(..., min_length=1, max_length=255, description="File name for the campaign")
     totalRecords: int = Field(..., ge=0, description="Total number of records in the campaign")
     url: str = Field(..., min_length=1, description="URL for the campaign")
+    email_copy_mode: Literal["realtime", "batch"] = Field(
+        "realtime", description="Generate email copy per lead ('realtime') or with the OpenAI Batch API ('batch')"
+    )
 
 
 class CampaignCreate(CampaignBase):
@@ -32,6 +35,7 @@ class CampaignUpdate(BaseModel):
     totalRecords: Optional[int] = Field(None, ge=0, description="Total number of records")
     url: Optional[str] = Field(None, min_length=1, description="Campaign URL")
     instantly_campaign_id: Optional[str] = Field(None, max_length=64, description="Instantly campaign ID")
+    email_copy_mode: Optional[Literal["realtime", "batch"]] = Field(None, description="Email copy generation mode")
 
 
 class CampaignInDB(CampaignBase):
@@ -73,6 +77,7 @@ class CampaignResponse(CampaignInDB):
             completed_at=campaign.completed_at,
             failed_at=campaign.failed_at,
             instantly_campaign_id=campaign.instantly_campaign_id,
+            email_copy_mode=campaign.email_copy_mode,
             valid_transitions=campaign.get_valid_transitions()
         )
 
@@ -38,10 +38,33 @@ class LeadUpdate(BaseModel):
     email_copy_gen_results: Optional[Dict[str, Any]] = Field(None, description="Email copy gen results JSON")
     instantly_lead_record: Optional[Dict[str, Any]] = Field(None, description="Instantly lead record JSON")
 
-class LeadResponse(LeadBase):
+class LeadSummaryResponse(BaseModel):
+    """A lead without its artifacts (the vendor JSON documents), as listed."""
     id: str = Field(..., description="Lead ID")
+    campaign_id: str = Field(..., max_length=36, description="Campaign ID")
+    first_name: Optional[str] = Field(None, max_length=100, description="First name")
+    last_name: Optional[str] = Field(None, max_length=100, description="Last name")
+    email: Optional[str] = Field(None, max_length=255, description="Email address")
+    phone: Optional[str] = Field(None, max_length=50, description="Phone number")
+    company: Optional[str] = Field(None, max_length=255, description="Company name")
+    title: Optional[str] = Field(None, max_length=255, description="Job title")
+    linkedin_url: Optional[str] = Field(None, max_length=255, description="LinkedIn URL")
+    source_url: Optional[str] = Field(None, max_length=255, description="Source URL")
+    enrichment_job_id: Optional[str] = Field(None, max_length=36, description="Enrichment job ID")
+    email_verification_status: Optional[str] = Field(None, description="Verification result from email_verification")
+    enrichment_text: Optional[str] = Field(None, description="Enrichment content from enrichment_results")
+    email_copy: Optional[str] = Field(None, description="Email body from email_copy_gen_results")
+    instantly_lead_id: Optional[str] = Field(None, description="Instantly lead ID from instantly_lead_record")
     created_at: datetime = Field(..., description="Creation timestamp")
     updated_at: datetime = Field(..., description="Last update timestamp")
 
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True
+
+class LeadResponse(LeadSummaryResponse):
+    """A lead with its artifacts."""
+    raw_data: Optional[Dict[str, Any]] = Field(None, description="Raw data as JSON")
+    email_verification: Optional[Dict[str, Any]] = Field(None, description="Email verification JSON")
+    enrichment_results: Optional[Dict[str, Any]] = Field(None, description="Enrichment results JSON")
+    email_copy_gen_results: Optional[Dict[str, Any]] = Field(None, description="Email copy gen results JSON")
+    instantly_lead_record: Optional[Dict[str, Any]] = Field(None, description="Instantly lead record JSON") 
\ No newline at end of file
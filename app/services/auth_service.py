@@ -9,6 +9,7 @@ import uuid
 
 from app.models.user import User
 from app.core.config import settings
+from app.core.user_cache import user_cache
 
 
 class AuthService:
@@ -137,21 +138,32 @@ class AuthService:
             "user": user.to_dict()
         }
 
-    def get_current_user(self, token: str, db: Session) -> User:
-        """Get current user from token."""
-        payload = self.verify_token(token)
+    @classmethod
+    def user_id_from_token(cls, token: str) -> str:
+        """Check the token's signature and expiry and return its user id; no database access."""
+        payload = cls.verify_token(token)
         user_id = payload.get("user_id")
         if user_id is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid token"
             )
-        
+        return user_id
+
+    def get_user(self, user_id: str, db: Session) -> User:
+        """Load an authenticated user, from the user cache when possible."""
+        user = user_cache.get(user_id)
+        if user is not None:
+            return user
+
         user = db.query(User).filter(User.id == user_id).first()
         if user is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="User not found"
             )
-        
-        return user 
\ No newline at end of file
+        return user_cache.put(user)
+
+    def get_current_user(self, token: str, db: Session) -> User:
+        """Get current user from token."""
+        return self.get_user(self.user_id_from_token(token), db)
@@ -1,9 +1,10 @@
 from typing import Dict, Any, Optional, List
 import re
 from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
+from starlette.concurrency import run_in_threadpool
 
 from app.models.campaign import Campaign
 from app.models.campaign_status import CampaignStatus
@@ -68,7 +69,7 @@ class CampaignService:
             logger.warning(f"Failed to initialize InstantlyService with rate limiting: {str(e)}")
             self.instantly_service = None
 
-    async def get_campaigns(self, db: Session, organization_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    async def get_campaigns(self, db: AsyncSession, organization_id: Optional[str] = None) -> List[Dict[str, Any]]:
         """Get all campaigns with latest job information, optionally filtered by organization."""
         try:
             if organization_id:
@@ -76,9 +77,7 @@ class CampaignService:
                 
                 # Validate organization exists
                 from app.models.organization import Organization
-                organization = db.query(Organization).filter(
-                    Organization.id == organization_id
-                ).first()
+                organization = await db.get(Organization, organization_id)
                 if not organization:
                     logger.warning(f'Organization {organization_id} not found during campaign fetch')
                     raise HTTPException(
@@ -86,30 +85,34 @@ class CampaignService:
                         detail=f"Organization {organization_id} not found"
                     )
                 
-                campaigns = (
-                    db.query(Campaign)
-                    .filter(Campaign.organization_id == organization_id)
+                campaigns = (await db.scalars(
+                    select(Campaign)
+                    .where(Campaign.organization_id == organization_id)
                     .order_by(Campaign.created_at.desc())
-                    .all()
-                )
+                )).all()
             else:
                 logger.info('Fetching all campaigns')
-                campaigns = db.query(Campaign).order_by(Campaign.created_at.desc()).all()
+                campaigns = (await db.scalars(select(Campaign).order_by(Campaign.created_at.desc()))).all()
             
             logger.info(f'Found {len(campaigns)} campaigns')
             
+            # Latest job of every campaign in one query (DISTINCT ON campaign_id)
+            latest_jobs = {}
+            if campaigns:
+                jobs = await db.scalars(
+                    select(Job)
+                    .where(Job.campaign_id.in_([campaign.id for campaign in campaigns]))
+                    .order_by(Job.campaign_id, Job.created_at.desc())
+                    .distinct(Job.campaign_id)
+                )
+                latest_jobs = {job.campaign_id: job for job in jobs}
+            
             campaign_list = []
-            for campaign in campaigns: #TODO: EK, why are we not doing a join beween jobs and campaigns, this should be done in sql 
+            for campaign in campaigns:
                 try:
                     campaign_dict = campaign.to_dict()
                     
-                    # Get latest job status for each campaign
-                    latest_job = (
-                        db.query(Job)
-                        .filter_by(campaign_id=campaign.id)
-                        .order_by(Job.created_at.desc())
-                        .first()
-                    )
+                    latest_job = latest_jobs.get(campaign.id)
                     if latest_job:
                         campaign_dict['latest_job'] = {
                             'id': latest_job.id,
@@ -138,12 +141,12 @@ class CampaignService:
                 detail=f"Error fetching campaigns: {str(e)}"
             )
 
-    async def get_campaign(self, campaign_id: str, db: Session) -> Dict[str, Any]:
+    async def get_campaign(self, campaign_id: str, db: AsyncSession) -> Dict[str, Any]:
         """Get a single campaign by ID."""
         try:
             logger.info(f'Fetching campaign {campaign_id}')
             
-            campaign = db.query(Campaign).filter(Campaign.id == campaign_id).first()
+            campaign = await db.get(Campaign, campaign_id)
             if not campaign:
                 logger.warning(f'Campaign {campaign_id} not found')
                 raise HTTPException(
@@ -168,16 +171,14 @@ class CampaignService:
                 detail=f"Error fetching campaign: {str(e)}"
             )
 
-    async def create_campaign(self, campaign_data: CampaignCreate, db: Session) -> Dict[str, Any]:
+    async def create_campaign(self, campaign_data: CampaignCreate, db: AsyncSession) -> Dict[str, Any]:
         """Create a new campaign with organization validation and global pause state checking."""
         try:
             logger.info(f"Creating campaign: {campaign_data.name}")
             
             # Check organization exists
             from app.models.organization import Organization
-            organization = db.query(Organization).filter(
-                Organization.id == campaign_data.organization_id
-            ).first()
+            organization = await db.get(Organization, campaign_data.organization_id)
             if not organization:
                 logger.warning(f'Organization {campaign_data.organization_id} not found during campaign creation')
                 raise HTTPException(
@@ -197,7 +198,8 @@ class CampaignService:
                 status=CampaignStatus.CREATED,
                 fileName=campaign_data.fileName,
                 totalRecords=campaign_data.totalRecords,
-                url=campaign_data.url
+                url=campaign_data.url,
+                email_copy_mode=campaign_data.email_copy_mode
             )
             
             # Set status message based on circuit breaker state
@@ -209,17 +211,18 @@ class CampaignService:
                 campaign.status_message = "Campaign created successfully. All services are available."
             
             db.add(campaign)
-            db.commit()
-            db.refresh(campaign)
+            await db.commit()
+            await db.refresh(campaign)
 
             # Create Instantly campaign only if circuit breaker is closed
             if self.instantly_service and not circuit_breaker_open:
                 try:
-                    instantly_response = self.instantly_service.create_campaign(name=campaign.name)
+                    # Blocking HTTP call: keep it off the event loop
+                    instantly_response = await run_in_threadpool(self.instantly_service.create_campaign, name=campaign.name)
                     instantly_campaign_id = instantly_response.get('id')
                     if instantly_campaign_id:
                         campaign.instantly_campaign_id = instantly_campaign_id
-                        db.commit()
+                        await db.commit()
                         logger.info(f"Created Instantly campaign with ID: {instantly_campaign_id}")
                     else:
                         logger.error(f"Instantly campaign creation failed: {instantly_response}")
@@ -227,7 +230,7 @@ class CampaignService:
                     logger.error(f"Error calling InstantlyService.create_campaign: {str(e)}")
                     # Update campaign status message to reflect Instantly service issue
                     campaign.status_message = f"{campaign.status_message} Warning: Instantly campaign creation failed."
-                    db.commit()
+                    await db.commit()
             else:
                 if not self.instantly_service:
                     logger.warning("InstantlyService not available, skipping campaign creation")
@@ -235,22 +238,24 @@ class CampaignService:
                     logger.warning("Circuit breaker is open, skipping Instantly campaign creation")
 
             logger.info(f'Successfully created campaign {campaign.id}')
+            # updated_at is set by the database on UPDATE; load it rather than lazy-loading in to_dict
+            await db.refresh(campaign)
             return campaign.to_dict()
             
         except HTTPException:
             raise
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             logger.error(f'Error creating campaign: {str(e)}', exc_info=True)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Error creating campaign: {str(e)}"
             )
 
-    async def update_campaign(self, campaign_id: str, update_data: CampaignUpdate, db: Session) -> Dict[str, Any]:
+    async def update_campaign(self, campaign_id: str, update_data: CampaignUpdate, db: AsyncSession) -> Dict[str, Any]:
         """Update campaign properties and return updated campaign."""
         try:
-            campaign = db.query(Campaign).filter(Campaign.id == campaign_id).first()
+            campaign = await db.get(Campaign, campaign_id)
             if not campaign:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -263,9 +268,7 @@ class CampaignService:
             # Validate organization exists if organization_id is being updated
             if 'organization_id' in update_dict:
                 from app.models.organization import Organization
-                organization = db.query(Organization).filter(
-                    Organization.id == update_dict['organization_id']
-                ).first()
+                organization = await db.get(Organization, update_dict['organization_id'])
                 if not organization:
                     logger.warning(f'Organization {update_dict["organization_id"]} not found during campaign update')
                     raise HTTPException(
@@ -276,8 +279,8 @@ class CampaignService:
             for field, value in update_dict.items():
                 setattr(campaign, field, value)
             
-            db.commit()
-            db.refresh(campaign)
+            await db.commit()
+            await db.refresh(campaign)
             
             logger.info(f'Successfully updated campaign {campaign_id}')
             return campaign.to_dict()
@@ -285,19 +288,19 @@ class CampaignService:
         except HTTPException:
             raise
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             logger.error(f'Error updating campaign: {str(e)}', exc_info=True)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Error updating campaign: {str(e)}"
             )
 
-    async def start_campaign(self, campaign_id: str, start_data: CampaignStart, db: Session) -> Dict[str, Any]:
+    async def start_campaign(self, campaign_id: str, start_data: CampaignStart, db: AsyncSession) -> Dict[str, Any]:
         """Start a campaign process with enhanced business rule validation."""
         try:
             logger.info(f"Starting campaign process for campaign_id={campaign_id}")
 
-            campaign = db.query(Campaign).filter(Campaign.id == campaign_id).first()
+            campaign = await db.get(Campaign, campaign_id)
             if not campaign:
                 logger.error(f"Campaign {campaign_id} not found during start.")
                 raise HTTPException(
@@ -347,7 +350,7 @@ class CampaignService:
                 success_message += f" (with warnings: {', '.join(validation_results['warnings'])})"
                 
             campaign.update_status(CampaignStatus.RUNNING, success_message)
-            db.commit()
+            await db.commit()
             logger.info(f"Campaign {campaign_id} status updated to RUNNING")
 
             job_params = {
@@ -366,23 +369,24 @@ class CampaignService:
                 status=JobStatus.PENDING
             )
             db.add(fetch_leads_job)
-            db.commit()
-            db.refresh(fetch_leads_job)
+            await db.commit()
+            await db.refresh(fetch_leads_job)
             
             logger.info(f"Created fetch_leads job with id={fetch_leads_job.id} for campaign {campaign_id}")
 
             # Enqueue Apollo scraping and lead saving as a background job
             logger.info(f"Enqueuing fetch_and_save_leads_task for campaign {campaign_id}")
             from app.workers.campaign_tasks import fetch_and_save_leads_task
-            task = fetch_and_save_leads_task.delay(job_params, campaign_id, fetch_leads_job.id)
+            task = await run_in_threadpool(fetch_and_save_leads_task.delay, job_params, campaign_id, fetch_leads_job.id)
             
             # Update job with task ID
             fetch_leads_job.task_id = task.id
-            db.commit()
+            await db.commit()
 
             logger.info(f'Successfully started campaign {campaign_id}')
             
             # Return campaign data with validation info
+            await db.refresh(campaign)
             campaign_dict = campaign.to_dict()
             campaign_dict['start_validation'] = {
                 'warnings': validation_results["warnings"],
@@ -394,15 +398,15 @@ class CampaignService:
         except HTTPException:
             raise
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             logger.error(f"Error starting campaign {campaign_id}: {str(e)}", exc_info=True)
             
             # Update campaign status to failed
             try:
-                campaign = db.query(Campaign).filter(Campaign.id == campaign_id).first()
+                campaign = await db.get(Campaign, campaign_id)
                 if campaign:
                     campaign.update_status(CampaignStatus.FAILED, status_error=str(e))
-                    db.commit()
+                    await db.commit()
             except Exception as inner_e:
                 logger.error(f"Error updating campaign status to failed: {str(inner_e)}")
             
@@ -481,7 +485,7 @@ class CampaignService:
         
         return True
 
-    async def cleanup_campaign_jobs(self, campaign_id: str, days: int, db: Session) -> Dict[str, Any]:
+    async def cleanup_campaign_jobs(self, campaign_id: str, days: int, db: AsyncSession) -> Dict[str, Any]:
         """Clean up old jobs for a campaign."""
         try:
             logger.info(f"Cleaning up jobs older than {days} days for campaign {campaign_id}")
@@ -490,7 +494,7 @@ class CampaignService:
             cutoff_date = datetime.utcnow() - timedelta(days=days)
             
             # Get campaign to validate it exists
-            campaign = db.query(Campaign).filter(Campaign.id == campaign_id).first()
+            campaign = await db.get(Campaign, campaign_id)
             if not campaign:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -498,12 +502,13 @@ class CampaignService:
                 )
             
             # Delete old jobs
-            deleted_count = db.query(Job).filter(
+            result = await db.execute(delete(Job).where(
                 Job.campaign_id == campaign_id,
                 Job.created_at < cutoff_date
-            ).delete()
+            ))
+            deleted_count = result.rowcount
             
-            db.commit()
+            await db.commit()
             
             logger.info(f"Cleaned up {deleted_count} jobs for campaign {campaign_id}")
             
@@ -517,18 +522,18 @@ class CampaignService:
         except HTTPException:
             raise
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             logger.error(f"Error cleaning up jobs for campaign {campaign_id}: {str(e)}", exc_info=True)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Error cleaning up jobs: {str(e)}"
             )
 
-    async def get_campaign_lead_stats(self, campaign_id: str, db: Session) -> "CampaignLeadStats":
+    async def get_campaign_lead_stats(self, campaign_id: str, db: AsyncSession) -> "CampaignLeadStats":
         """Return stats for a campaign's leads."""
         try:
             # Check if campaign exists
-            campaign = db.query(Campaign).filter(Campaign.id == campaign_id).first()
+            campaign = await db.get(Campaign, campaign_id)
             if not campaign:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -565,11 +570,23 @@ class CampaignService:
                 error_message=error_str
             )
 
-    async def get_campaign_instantly_analytics(self, campaign_id: str, db: Session) -> "InstantlyAnalytics":
+    async def get_campaign_trace_summary(self, campaign_id: str, db: AsyncSession) -> Dict[str, Any]:
+        """Return the percentile breakdown of a campaign's per-lead pipeline traces."""
+        campaign = await db.get(Campaign, campaign_id)
+        if not campaign:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Campaign {campaign_id} not found"
+            )
+
+        from app.core.lead_trace import summarize_campaign_traces
+        return await db.run_sync(summarize_campaign_traces, campaign_id)
+
+    async def get_campaign_instantly_analytics(self, campaign_id: str, db: AsyncSession) -> "InstantlyAnalytics":
         """Fetch and map Instantly analytics overview for a campaign."""
         try:
             # Get campaign
-            campaign = db.query(Campaign).filter(Campaign.id == campaign_id).first()
+            campaign = await db.get(Campaign, campaign_id)
             if not campaign:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -622,7 +639,7 @@ class CampaignService:
                     error="InstantlyService not available"
                 )
                 
-            analytics = self.instantly_service.get_campaign_analytics_overview(instantly_campaign_id)
+            analytics = await run_in_threadpool(self.instantly_service.get_campaign_analytics_overview, instantly_campaign_id)
             if 'error' in analytics:
                 return InstantlyAnalytics(
                     leads_count=campaign_dict.get("totalRecords"),
@@ -1,7 +1,10 @@
 from typing import Dict, Any, List, Optional
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from fastapi import HTTPException, status
 from app.models.lead import Lead
+from app.models.lead_artifact import ARTIFACT_FIELDS
 from app.schemas.lead import LeadCreate, LeadUpdate
 from sqlalchemy.exc import SQLAlchemyError
 from datetime import datetime
@@ -10,23 +13,38 @@ from app.core.logger import get_logger
 
 logger = get_logger(__name__)
 
+# An AsyncSession can't lazy load a lead's artifacts, so they are loaded up
+# front where they are read (the lead detail) or written
+WITH_ARTIFACTS = selectinload(Lead.artifacts)
+
+
+def _artifact_options(data: Dict[str, Any]) -> list:
+    """Load the artifacts with the lead only if the update sets one of them."""
+    return [WITH_ARTIFACTS] if set(data) & set(ARTIFACT_FIELDS) else []
+
+
 class LeadService:
-    """Service for handling lead-related operations."""
+    """
+    Service for handling lead-related operations.
 
-    async def get_leads(self, db: Session, campaign_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    Only get_lead returns the artifacts. Listing, create and update return the
+    lead columns, so they never read lead_artifacts for the response.
+    """
+
+    async def get_leads(self, db: AsyncSession, campaign_id: Optional[str] = None) -> List[Dict[str, Any]]:
         try:
-            query = db.query(Lead)
+            query = select(Lead)
             if campaign_id:
-                query = query.filter(Lead.campaign_id == campaign_id)
-            leads = query.all()
-            return [lead.to_dict() for lead in leads]
+                query = query.where(Lead.campaign_id == campaign_id)
+            leads = (await db.scalars(query)).all()
+            return [lead.to_dict(include_artifacts=False) for lead in leads]
         except SQLAlchemyError as e:
             logger.error(f"Error fetching leads: {str(e)}", exc_info=True)
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error fetching leads")
 
-    async def get_lead(self, lead_id: str, db: Session) -> Dict[str, Any]:
+    async def get_lead(self, lead_id: str, db: AsyncSession) -> Dict[str, Any]:
         try:
-            lead = db.query(Lead).filter(Lead.id == lead_id).first()
+            lead = await db.get(Lead, lead_id, options=[WITH_ARTIFACTS])
             if not lead:
                 raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Lead not found")
             return lead.to_dict()
@@ -34,21 +52,22 @@ class LeadService:
             logger.error(f"Error fetching lead: {str(e)}", exc_info=True)
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error fetching lead")
 
-    async def create_lead(self, lead_data: LeadCreate, db: Session) -> Dict[str, Any]:
+    async def create_lead(self, lead_data: LeadCreate, db: AsyncSession) -> Dict[str, Any]:
         try:
+            data = lead_data.dict(exclude_unset=True)
             # Check for duplicate lead (by email and campaign_id)
-            existing_lead = db.query(Lead).filter(
+            existing_lead = (await db.scalars(select(Lead).options(*_artifact_options(data)).where(
                 Lead.email == lead_data.email,
                 Lead.campaign_id == lead_data.campaign_id
-            ).first()
+            ).limit(1))).first()
             if existing_lead:
                 # Update existing lead
-                for key, value in lead_data.dict(exclude_unset=True).items():
+                for key, value in data.items():
                     setattr(existing_lead, key, value)
                 existing_lead.updated_at = datetime.utcnow()
-                db.commit()
-                db.refresh(existing_lead)
-                return existing_lead.to_dict()
+                await db.commit()
+                await db.refresh(existing_lead)
+                return existing_lead.to_dict(include_artifacts=False)
             # Create new lead
             lead = Lead(
                 **lead_data.dict(),
@@ -56,26 +75,27 @@ class LeadService:
                 updated_at=datetime.utcnow()
             )
             db.add(lead)
-            db.commit()
-            db.refresh(lead)
-            return lead.to_dict()
+            await db.commit()
+            await db.refresh(lead)
+            return lead.to_dict(include_artifacts=False)
         except SQLAlchemyError as e:
-            db.rollback()
+            await db.rollback()
             logger.error(f"Error creating lead: {str(e)}", exc_info=True)
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error creating lead")
 
-    async def update_lead(self, lead_id: str, update_data: LeadUpdate, db: Session) -> Dict[str, Any]:
+    async def update_lead(self, lead_id: str, update_data: LeadUpdate, db: AsyncSession) -> Dict[str, Any]:
         try:
-            lead = db.query(Lead).filter(Lead.id == lead_id).first()
+            data = update_data.dict(exclude_unset=True)
+            lead = await db.get(Lead, lead_id, options=_artifact_options(data))
             if not lead:
                 raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Lead not found")
-            for key, value in update_data.dict(exclude_unset=True).items():
+            for key, value in data.items():
                 setattr(lead, key, value)
             lead.updated_at = datetime.utcnow()
-            db.commit()
-            db.refresh(lead)
-            return lead.to_dict()
+            await db.commit()
+            await db.refresh(lead)
+            return lead.to_dict(include_artifacts=False)
         except SQLAlchemyError as e:
-            db.rollback()
+            await db.rollback()
             logger.error(f"Error updating lead: {str(e)}", exc_info=True)
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error updating lead") 
\ No newline at end of file
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error updating lead") 
@@ -1,7 +1,8 @@
 from typing import Dict, Any, List, Optional, Tuple
 import re
 from html import escape
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
 from fastapi import HTTPException, status
 from datetime import datetime
@@ -18,14 +19,32 @@ logger = get_logger(__name__)
 class OrganizationService:
     """Service for managing organization business logic."""
     
-    def get_campaign_count(self, org_id: str, db: Session) -> int:
+    async def get_campaign_count(self, org_id: str, db: AsyncSession) -> int:
         """Get the number of campaigns for an organization."""
         try:
-            count = db.query(Campaign).filter(Campaign.organization_id == org_id).count()
+            count = await db.scalar(
+                select(func.count(Campaign.id)).where(Campaign.organization_id == org_id)
+            )
             return count
         except Exception as e:
             logger.error(f'Error getting campaign count for organization {org_id}: {str(e)}')
             return 0
+
+    async def get_campaign_counts(self, org_ids: List[str], db: AsyncSession) -> Dict[str, int]:
+        """Get the number of campaigns for several organizations in one query."""
+        if not org_ids:
+            return {}
+        try:
+            rows = await db.execute(
+                select(Campaign.organization_id, func.count(Campaign.id))
+                .where(Campaign.organization_id.in_(org_ids))
+                .group_by(Campaign.organization_id)
+            )
+            counts = dict(rows.all())
+            return {org_id: counts.get(org_id, 0) for org_id in org_ids}
+        except Exception as e:
+            logger.error(f'Error getting campaign counts for organizations: {str(e)}')
+            return {org_id: 0 for org_id in org_ids}
     
     def sanitize_input(self, data: dict) -> dict:
         """Sanitize input data to prevent XSS and other attacks."""
@@ -58,7 +77,7 @@ class OrganizationService:
         
         return True, ''
 
-    async def create_organization(self, org_data: OrganizationCreate, db: Session) -> Dict[str, Any]:
+    async def create_organization(self, org_data: OrganizationCreate, db: AsyncSession) -> Dict[str, Any]:
         """Create a new organization."""
         try:
             logger.info(f'Creating organization: {org_data.name}')
@@ -92,8 +111,8 @@ class OrganizationService:
             )
             
             db.add(organization)
-            db.commit()
-            db.refresh(organization)
+            await db.commit()
+            await db.refresh(organization)
             
             logger.info(f'Successfully created organization {organization.id}')
             return organization.to_dict()
@@ -101,19 +120,19 @@ class OrganizationService:
         except HTTPException:
             raise
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             logger.error(f'Error creating organization: {str(e)}', exc_info=True)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Error creating organization: {str(e)}"
             )
 
-    async def get_organization(self, org_id: str, db: Session) -> Optional[Dict[str, Any]]:
+    async def get_organization(self, org_id: str, db: AsyncSession) -> Optional[Dict[str, Any]]:
         """Get a single organization by ID."""
         try:
             logger.info(f'Fetching organization {org_id}')
             
-            organization = db.query(Organization).filter(Organization.id == org_id).first()
+            organization = await db.get(Organization, org_id)
             if not organization:
                 logger.warning(f'Organization {org_id} not found')
                 return None
@@ -128,23 +147,25 @@ class OrganizationService:
                 detail=f"Error fetching organization: {str(e)}"
             )
 
-    async def get_organizations(self, db: Session, skip: int = 0, limit: int = 100, search: str = None) -> List[Dict[str, Any]]:
+    async def get_organizations(self, db: AsyncSession, skip: int = 0, limit: int = 100, search: str = None) -> List[Dict[str, Any]]:
         """Get organizations with optional pagination and search."""
         try:
             logger.info(f'Fetching organizations with skip={skip}, limit={limit}, search={search}')
             
-            query = db.query(Organization)
+            query = select(Organization)
             
             # Apply search filter if provided
             if search:
                 search_term = f"%{search}%"
-                query = query.filter(
+                query = query.where(
                     Organization.name.ilike(search_term) | 
                     Organization.description.ilike(search_term)
                 )
             
             # Apply pagination and ordering
-            organizations = query.order_by(Organization.created_at.desc()).offset(skip).limit(limit).all()
+            organizations = (await db.scalars(
+                query.order_by(Organization.created_at.desc()).offset(skip).limit(limit)
+            )).all()
             logger.info(f'Found {len(organizations)} organizations')
             
             return [org.to_dict() for org in organizations]
@@ -156,22 +177,22 @@ class OrganizationService:
                 detail=f"Error fetching organizations: {str(e)}"
             )
 
-    async def count_organizations(self, db: Session, search: str = None) -> int:
+    async def count_organizations(self, db: AsyncSession, search: str = None) -> int:
         """Count total organizations with optional search filter."""
         try:
             logger.info(f'Counting organizations with search={search}')
             
-            query = db.query(Organization)
+            query = select(func.count(Organization.id))
             
             # Apply search filter if provided
             if search:
                 search_term = f"%{search}%"
-                query = query.filter(
+                query = query.where(
                     Organization.name.ilike(search_term) | 
                     Organization.description.ilike(search_term)
                 )
             
-            count = query.count()
+            count = await db.scalar(query)
             logger.info(f'Total organizations count: {count}')
             
             return count
@@ -183,12 +204,12 @@ class OrganizationService:
                 detail=f"Error counting organizations: {str(e)}"
             )
 
-    async def update_organization(self, org_id: str, update_data: OrganizationUpdate, db: Session) -> Optional[Dict[str, Any]]:
+    async def update_organization(self, org_id: str, update_data: OrganizationUpdate, db: AsyncSession) -> Optional[Dict[str, Any]]:
         """Update organization properties."""
         try:
             logger.info(f'Updating organization {org_id}')
             
-            organization = db.query(Organization).filter(Organization.id == org_id).first()
+            organization = await db.get(Organization, org_id)
             if not organization:
                 logger.warning(f'Organization {org_id} not found')
                 return None
@@ -211,8 +232,8 @@ class OrganizationService:
             for field, value in sanitized_data.items():
                 setattr(organization, field, value)
             
-            db.commit()
-            db.refresh(organization)
+            await db.commit()
+            await db.refresh(organization)
             
             logger.info(f'Successfully updated organization {org_id}')
             return organization.to_dict()
@@ -220,7 +241,7 @@ class OrganizationService:
         except HTTPException:
             raise
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             logger.error(f'Error updating organization: {str(e)}', exc_info=True)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
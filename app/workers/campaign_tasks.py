@@ -1,20 +1,26 @@
 import os
 import json
+import random
 import time
-from datetime import datetime, timedelta
+import uuid
+from datetime import datetime, timedelta, timezone
 from typing import Dict, Any, List, Optional, Union
 from celery import Task
-from sqlalchemy.orm import Session
+from celery.exceptions import Retry
+from sqlalchemy import and_
+from sqlalchemy.orm import Session, selectinload
 from sqlalchemy.exc import SQLAlchemyError
 
 from app.core.logger import get_logger
+from app.core.logging_config import log_payload, should_sample
 from app.workers.celery_app import celery_app
 from app.core.database import get_db
 from app.models.campaign import Campaign
 from app.models.campaign_status import CampaignStatus
 from app.models.job import Job, JobType, JobStatus
 from app.models.lead import Lead
-from app.core.config import get_redis_connection
+from app.models.lead_artifact import LeadArtifact, bulk_update_lead_artifacts
+from app.core.config import settings, get_redis_connection
 from app.core.dependencies import (
     get_apollo_rate_limiter,
     get_email_verifier_rate_limiter,
@@ -23,6 +29,8 @@ from app.core.dependencies import (
     get_instantly_rate_limiter
 )
 from app.core.queue_manager import get_queue_manager, QueueManager
+from app.core.metrics import record_stage
+from app.core.lead_trace import LeadPipelineTrace, save_lead_trace
 
 logger = get_logger(__name__)
 
@@ -110,14 +118,26 @@ def fetch_and_save_leads_task(self, job_params: Dict[str, Any], campaign_id: str
         )
         
         # Trigger enrichment for each saved lead
+        bulk_job = None
         if leads_count > 0:
-            logger.info(f"Triggering enrichment for {leads_count} leads in campaign {campaign_id}")
             # Get all leads for this campaign that were just created
             leads = db.query(Lead).filter(Lead.campaign_id == campaign_id).all()
-            for lead in leads:
-                # Queue individual lead enrichment task
-                enrich_lead_task.delay(lead.id, campaign_id)
-                logger.info(f"Queued enrichment task for lead {lead.id} ({lead.email})")
+            if (settings.EMAIL_VERIFICATION_BULK_ENABLED
+                    and len(leads) >= settings.EMAIL_VERIFICATION_BULK_MIN_LEADS):
+                bulk_job = start_bulk_email_verification(db, campaign, leads)
+
+            if bulk_job:
+                # Enrichment is queued by poll_bulk_email_verification_task once results are in
+                logger.info(
+                    f"Started bulk email verification job {bulk_job.id} for {len(leads)} leads "
+                    f"in campaign {campaign_id}, enrichment deferred until it finishes"
+                )
+            else:
+                logger.info(f"Triggering enrichment for {leads_count} leads in campaign {campaign_id}")
+                for lead in leads:
+                    # Queue individual lead enrichment task
+                    enrich_lead_task.delay(lead.id, campaign_id)
+                    logger.info(f"Queued enrichment task for lead {lead.id} ({lead.email})")
         
         self.update_state(
             state="PROGRESS",
@@ -130,7 +150,10 @@ def fetch_and_save_leads_task(self, job_params: Dict[str, Any], campaign_id: str
         
         # Update job status to completed
         job.status = JobStatus.COMPLETED
-        job.result = f"Successfully fetched {leads_count} leads and queued enrichment tasks"
+        if bulk_job:
+            job.result = f"Successfully fetched {leads_count} leads and started bulk email verification"
+        else:
+            job.result = f"Successfully fetched {leads_count} leads and queued enrichment tasks"
         job.completed_at = datetime.utcnow()
         
         # Update campaign status (ensure it goes through RUNNING first)
@@ -151,7 +174,8 @@ def fetch_and_save_leads_task(self, job_params: Dict[str, Any], campaign_id: str
             "campaign_id": campaign_id,
             "status": "completed",
             "leads_fetched": leads_count,
-            "enrichment_queued": leads_count,
+            "enrichment_queued": 0 if bulk_job else leads_count,
+            "bulk_verification_job_id": bulk_job.id if bulk_job else None,
             "result": result
         }
         
@@ -174,6 +198,114 @@ def fetch_and_save_leads_task(self, job_params: Dict[str, Any], campaign_id: str
     finally:
         db.close()
 
+COMPANY_COUNTS_KEY_PREFIX = "company_enrichment:campaign_companies"
+COMPANY_COUNTS_TTL_SECONDS = 3600  # seconds
+
+def _company_lead_count(db: Session, redis_client, lead: Lead) -> int:
+    """
+    Count the leads of the lead's campaign at the same company (the lead included).
+
+    Companies are matched by normalize_company_name. The counts of the whole
+    campaign come from one GROUP BY, kept in a Redis hash for
+    COMPANY_COUNTS_TTL_SECONDS, so the enrichment tasks of a campaign share it
+    instead of counting per lead.
+    """
+    from sqlalchemy import func
+    from app.background_services.company_enrichment_service import normalize_company_name
+    normalized = normalize_company_name(lead.company)
+    if not normalized:
+        return 0
+
+    key = f"{COMPANY_COUNTS_KEY_PREFIX}:{lead.campaign_id}"
+    try:
+        pipe = redis_client.pipeline()
+        pipe.exists(key)
+        pipe.hget(key, normalized)
+        exists, count = pipe.execute()
+        if exists:
+            return int(count or 0)
+    except Exception as e:
+        logger.warning(f"Error reading company counts of campaign {lead.campaign_id}: {str(e)}")
+
+    counts: Dict[str, int] = {}
+    rows = db.query(Lead.company, func.count(Lead.id)).filter(
+        Lead.campaign_id == lead.campaign_id,
+        Lead.company.isnot(None)
+    ).group_by(Lead.company).all()
+    for company, company_count in rows:
+        name = normalize_company_name(company)
+        if name:
+            counts[name] = counts.get(name, 0) + company_count
+
+    try:
+        pipe = redis_client.pipeline()
+        # The '' field keeps the hash (and so the cached answer) for a campaign without companies
+        pipe.hset(key, mapping={'': 0, **counts})
+        pipe.expire(key, COMPANY_COUNTS_TTL_SECONDS)
+        pipe.execute()
+    except Exception as e:
+        logger.warning(f"Error caching company counts of campaign {lead.campaign_id}: {str(e)}")
+    return counts.get(normalized, 0)
+
+def _create_instantly_lead(db: Session, lead: Lead, campaign_id: str, circuit_breaker) -> Dict[str, Any]:
+    """
+    Create (or buffer, with INSTANTLY_BULK_ENABLED) the Instantly lead for a lead
+    whose email copy is ready, and store the outcome on lead.instantly_lead_record.
+    
+    Returns:
+        dict: The Instantly result; the caller commits the session
+    """
+    from app.background_services.instantly_service import InstantlyService
+    redis_client = get_redis_connection()
+    instantly_rate_limiter = get_instantly_rate_limiter(redis_client)
+    instantly_service = InstantlyService(rate_limiter=instantly_rate_limiter)
+    
+    # Get campaign for instantly_campaign_id
+    campaign = db.query(Campaign).filter(Campaign.id == campaign_id).first()
+    instantly_campaign_id = campaign.instantly_campaign_id if campaign else None
+    
+    # Email content extracted from the OpenAI response when it was stored,
+    # so the response itself (in lead_artifacts) isn't loaded here
+    email_content = lead.email_copy
+    if email_content is None:
+        logger.warning(f"Could not extract email content from OpenAI response for lead {lead.id}")
+        email_content = "Generated email content not available"
+    
+    if settings.INSTANTLY_BULK_ENABLED and instantly_campaign_id:
+        # Buffer the lead; it is pushed with the next bulk request for this campaign
+        from app.background_services.instantly_bulk_writer import InstantlyBulkWriter
+        writer = InstantlyBulkWriter(redis_client)
+        buffer_length = writer.enqueue(
+            instantly_campaign_id, lead.id, lead.email, lead.first_name, email_content
+        )
+        if writer.is_full(buffer_length):
+            flush_instantly_buffer_task.delay(instantly_campaign_id)
+        instantly_result = {
+            'status': 'queued',
+            'attempts': 0,
+            'queued_at': datetime.utcnow().isoformat()
+        }
+    else:
+        instantly_result = instantly_service.create_lead(
+            campaign_id=instantly_campaign_id,
+            email=lead.email,
+            first_name=lead.first_name,
+            personalization=email_content
+        )
+    
+    # Check for rate limiting in response (buffered leads report to the breaker on flush)
+    if instantly_result and instantly_result.get('status') == 'rate_limited':
+        circuit_breaker.record_failure(f"Instantly rate limit: {instantly_result.get('error', 'Rate limited')}", 
+                                       'rate_limit')
+    elif instantly_result.get('status') != 'queued':
+        circuit_breaker.record_success()
+    
+    lead.instantly_lead_record = instantly_result
+    if 'error' in instantly_result or should_sample('lead_result'):
+        logger.info(f"Instantly lead creation result for lead {lead.id}: {log_payload(instantly_result)}")
+    return instantly_result
+
+
 @celery_app.task(bind=True, name="enrich_lead_task")
 def enrich_lead_task(self, lead_id: str, campaign_id: str):
     """
@@ -186,6 +318,11 @@ def enrich_lead_task(self, lead_id: str, campaign_id: str):
     """
     db_gen = get_db()
     db: Session = next(db_gen)
+    trace = LeadPipelineTrace(
+        lead_id, campaign_id,
+        enqueued_at=getattr(self.request, 'enqueued_at', None),
+        attempt=(self.request.retries or 0) + 1
+    ).activate()
     
     try:
         logger.info(f"Starting enrich_lead_task for lead_id={lead_id}, campaign_id={campaign_id}")
@@ -261,24 +398,36 @@ def enrich_lead_task(self, lead_id: str, campaign_id: str):
         )
         
         logger.info(f"Verifying email for lead {lead_id} ({lead.email})")
+        stage_started = trace.start_stage('email_verification')
         email_success = False
         try:
             from app.background_services.email_verifier_service import EmailVerifierService
-            redis_client = get_redis_connection()
-            email_rate_limiter = get_email_verifier_rate_limiter(redis_client)
-            email_service = EmailVerifierService(rate_limiter=email_rate_limiter)
-            email_result = email_service.verify_email(lead.email)
-            logger.info(f"Email verification result for lead {lead_id}: {email_result}")
-            
+            if lead.email_verification and lead.email_verification.get('source') == 'bulk':
+                # Already verified by the campaign's bulk verification job
+                email_result = lead.email_verification
+                logger.info(f"Using bulk email verification result for lead {lead_id}")
+            else:
+                from app.background_services.email_verification_cache import EmailVerificationCache
+                redis_client = get_redis_connection()
+                email_rate_limiter = get_email_verifier_rate_limiter(redis_client)
+                email_service = EmailVerifierService(
+                    rate_limiter=email_rate_limiter,
+                    cache=EmailVerificationCache(redis_client)
+                )
+                email_result = email_service.verify_email(lead.email)
+                if 'error' in email_result or should_sample('lead_result'):
+                    logger.info(f"Email verification result for lead {lead_id}: {log_payload(email_result)}")
+
             # Store verification result
             lead.email_verification = email_result
-            email_success = email_result and email_result.get('result') == 'deliverable'
+            email_success = EmailVerifierService.is_deliverable(email_result)
             if not email_success:
                 error_details['email_verification'] = email_result
                 logger.warning(f"Email verification failed for lead {lead_id}, proceeding with enrichment anyway")
         except Exception as e:
             error_details['email_verification'] = str(e)
             logger.error(f"Email verification error for lead {lead_id}: {str(e)}")
+        record_stage('email_verification', 'success' if email_success else 'error', stage_started)
         
         # Step 2: Perplexity Enrichment
         self.update_state(
@@ -291,15 +440,46 @@ def enrich_lead_task(self, lead_id: str, campaign_id: str):
         )
         
         logger.info(f"Enriching lead {lead_id} with Perplexity API")
+        stage_started = trace.start_stage('enrichment')
         enrichment_success = False
         enrichment_result = {}
         try:
             from app.background_services.perplexity_service import PerplexityService
+            from app.background_services.prompt_templates import PromptTemplateRegistry
+            from app.background_services.completion_cache import get_completion_cache
             redis_client = get_redis_connection()
             perplexity_rate_limiter = get_perplexity_rate_limiter(redis_client)
-            perplexity_service = PerplexityService(rate_limiter=perplexity_rate_limiter)
-            enrichment_result = perplexity_service.enrich_lead(lead)
-            logger.info(f"Enrichment result for lead {lead_id}: {enrichment_result}")
+            prompt_templates = PromptTemplateRegistry(db)
+            completion_cache = get_completion_cache(redis_client)
+
+            perplexity_service = PerplexityService(
+                rate_limiter=perplexity_rate_limiter,
+                prompt_templates=prompt_templates,
+                completion_cache=completion_cache
+            )
+            company_context = None
+            if settings.COMPANY_ENRICHMENT_ENABLED:
+                from app.background_services.company_enrichment_service import CompanyEnrichmentService
+                company_service = CompanyEnrichmentService(
+                    redis_client=redis_client,
+                    perplexity_service=perplexity_service
+                )
+                # A lookup for a company no other lead shares would cost a call and save none
+                company_context = company_service.get_company_context(
+                    lead.company,
+                    fetch_on_miss=_company_lead_count(db, redis_client, lead) >= settings.COMPANY_ENRICHMENT_MIN_LEADS
+                )
+                if company_service.vendor_calls:
+                    # The company lookup used this task's limiter slot; wait briefly for
+                    # the next one rather than holding the worker for a whole window
+                    perplexity_service.rate_limit_wait_seconds = min(
+                        settings.COMPANY_ENRICHMENT_RATE_LIMIT_WAIT_SECONDS,
+                        perplexity_rate_limiter.period_seconds
+                    )
+
+            enrichment_result = perplexity_service.enrich_lead(lead, company_context=company_context)
+            if 'error' in enrichment_result or should_sample('lead_result'):
+                logger.info(f"Enrichment result for lead {lead_id}: {log_payload(enrichment_result)}")
             
             # Check for rate limiting in response
             if enrichment_result and enrichment_result.get('status') == 'rate_limited':
@@ -310,6 +490,7 @@ def enrich_lead_task(self, lead_id: str, campaign_id: str):
                 enrichment_job.error = f"Paused due to Perplexity rate limit: {enrichment_result.get('error')}"
                 enrichment_job.completed_at = datetime.utcnow()
                 db.commit()
+                record_stage('enrichment', 'rate_limited', stage_started)
                 return {
                     "lead_id": lead_id,
                     "job_id": enrichment_job.id,
@@ -330,6 +511,7 @@ def enrich_lead_task(self, lead_id: str, campaign_id: str):
             logger.error(f"Enrichment error for lead {lead_id}: {str(e)}")
             enrichment_result = {'error': str(e)}
             lead.enrichment_results = enrichment_result
+        record_stage('enrichment', 'success' if enrichment_success else 'error', stage_started)
         
         # Step 3: Email Copy Generation
         self.update_state(
@@ -341,16 +523,36 @@ def enrich_lead_task(self, lead_id: str, campaign_id: str):
             }
         )
         
+        stage_started = trace.start_stage('email_copy')
         email_copy_success = False
-        if enrichment_success:
+        email_copy_deferred = False
+        email_copy_outcome = 'error'
+        if enrichment_success and campaign.email_copy_mode == 'batch':
+            # Generated later with the campaign's OpenAI batch (process_email_copy_batches_task)
+            lead.email_copy_gen_results = {
+                'status': 'batch_pending',
+                'queued_at': datetime.utcnow().isoformat()
+            }
+            email_copy_deferred = True
+            email_copy_outcome = 'deferred'
+            logger.info(f"Deferred email copy generation for lead {lead_id} to the OpenAI batch")
+        elif enrichment_success:
             logger.info(f"Generating email copy for lead {lead_id}")
             try:
                 from app.background_services.openai_service import OpenAIService
+                from app.background_services.prompt_templates import PromptTemplateRegistry
+                from app.background_services.completion_cache import get_completion_cache
                 redis_client = get_redis_connection()
                 openai_rate_limiter = get_openai_rate_limiter(redis_client)
-                openai_service = OpenAIService(rate_limiter=openai_rate_limiter, circuit_breaker=circuit_breaker)
+                openai_service = OpenAIService(
+                    rate_limiter=openai_rate_limiter,
+                    circuit_breaker=circuit_breaker,
+                    prompt_templates=PromptTemplateRegistry(db),
+                    completion_cache=get_completion_cache(redis_client)
+                )
                 email_copy_result = openai_service.generate_email_copy(lead, enrichment_result)
-                logger.info(f"Email copy generation result for lead {lead_id}: {email_copy_result}")
+                if 'error' in email_copy_result or should_sample('lead_result'):
+                    logger.info(f"Email copy generation result for lead {lead_id}: {log_payload(email_copy_result)}")
                 
                 # Check for rate limiting or circuit breaker response
                 if email_copy_result and email_copy_result.get('status') in ['rate_limited', 'circuit_breaker_open']:
@@ -358,6 +560,7 @@ def enrich_lead_task(self, lead_id: str, campaign_id: str):
                     # For circuit breaker open, just skip and mark as failed
                     error_details['email_copy'] = f"OpenAI service unavailable: {email_copy_result.get('error', 'Service unavailable')}"
                     email_copy_success = False
+                    email_copy_outcome = email_copy_result.get('status')
                     
                     # If circuit breaker is open, pause this job
                     if email_copy_result.get('status') == 'circuit_breaker_open':
@@ -365,6 +568,7 @@ def enrich_lead_task(self, lead_id: str, campaign_id: str):
                         enrichment_job.error = f"Paused due to OpenAI circuit breaker: {email_copy_result.get('error')}"
                         enrichment_job.completed_at = datetime.utcnow()
                         db.commit()
+                        record_stage('email_copy', email_copy_outcome, stage_started)
                         return {
                             "lead_id": lead_id,
                             "job_id": enrichment_job.id,
@@ -374,6 +578,7 @@ def enrich_lead_task(self, lead_id: str, campaign_id: str):
                 else:
                     # Normal success handling
                     email_copy_success = 'error' not in email_copy_result and email_copy_result.get('status') not in ['rate_limited', 'circuit_breaker_open']
+                    email_copy_outcome = 'success' if email_copy_success else 'error'
                 
                 # Store email copy results
                 lead.email_copy_gen_results = email_copy_result
@@ -384,6 +589,8 @@ def enrich_lead_task(self, lead_id: str, campaign_id: str):
         else:
             logger.warning(f"Skipping email copy generation for lead {lead_id} due to enrichment failure")
             error_details['email_copy'] = "Skipped due to enrichment failure"
+            email_copy_outcome = 'skipped'
+        record_stage('email_copy', email_copy_outcome, stage_started)
         
         # Step 4: Instantly Lead Creation
         self.update_state(
@@ -395,6 +602,7 @@ def enrich_lead_task(self, lead_id: str, campaign_id: str):
             }
         )
         
+        stage_started = trace.start_stage('instantly')
         instantly_success = False
         instantly_result = {}
         
@@ -407,54 +615,29 @@ def enrich_lead_task(self, lead_id: str, campaign_id: str):
         if not email_copy_success:
             missing_fields.append('email_copy_gen_results')
         
-        if missing_fields:
+        if email_copy_deferred:
+            logger.info(f"Instantly lead creation for lead {lead_id} deferred until its email copy batch completes")
+            record_stage('instantly', 'deferred', stage_started)
+        elif missing_fields:
             msg = f"Skipping Instantly lead creation for lead {lead.id} due to missing fields: {', '.join(missing_fields)}"
             logger.warning(msg)
             error_details['instantly'] = msg
             lead.instantly_lead_record = {'error': msg}
+            record_stage('instantly', 'skipped', stage_started)
         elif email_copy_success:
             logger.info(f"Creating Instantly lead for lead {lead_id}")
             try:
-                from app.background_services.instantly_service import InstantlyService
-                redis_client = get_redis_connection()
-                instantly_rate_limiter = get_instantly_rate_limiter(redis_client)
-                instantly_service = InstantlyService(rate_limiter=instantly_rate_limiter)
-                
-                # Get campaign for instantly_campaign_id
-                campaign = db.query(Campaign).filter(Campaign.id == campaign_id).first()
-                instantly_campaign_id = campaign.instantly_campaign_id if campaign else None
-                
-                # Extract email content from OpenAI response
-                email_content = ""
-                if lead.email_copy_gen_results and 'choices' in lead.email_copy_gen_results:
-                    try:
-                        email_content = lead.email_copy_gen_results['choices'][0]['message']['content']
-                    except (KeyError, IndexError, TypeError) as e:
-                        logger.warning(f"Could not extract email content from OpenAI response for lead {lead_id}: {e}")
-                        email_content = "Generated email content not available"
-                
-                instantly_result = instantly_service.create_lead(
-                    campaign_id=instantly_campaign_id,
-                    email=lead.email,
-                    first_name=lead.first_name,
-                    personalization=email_content
-                )
-                
-                # Check for rate limiting in response
-                if instantly_result and instantly_result.get('status') == 'rate_limited':
-                    circuit_breaker.record_failure(f"Instantly rate limit: {instantly_result.get('error', 'Rate limited')}", 
-                                                 'rate_limit')
-                else:
-                    circuit_breaker.record_success()
-                
+                instantly_result = _create_instantly_lead(db, lead, campaign_id, circuit_breaker)
                 instantly_success = 'error' not in instantly_result and instantly_result.get('status') != 'rate_limited'
-                lead.instantly_lead_record = instantly_result
-                logger.info(f"Instantly lead creation result for lead {lead_id}: {instantly_result}")
             except Exception as e:
                 circuit_breaker.record_failure(f"Instantly service error: {str(e)}", 'exception')
                 error_details['instantly'] = str(e)
                 logger.error(f"Instantly lead creation failed for lead {lead_id}: {str(e)}")
                 lead.instantly_lead_record = {'error': str(e)}
+            if instantly_result.get('status') == 'rate_limited':
+                record_stage('instantly', 'rate_limited', stage_started)
+            else:
+                record_stage('instantly', 'success' if instantly_success else 'error', stage_started)
         
         # Commit all lead updates
         db.commit()
@@ -466,6 +649,8 @@ def enrich_lead_task(self, lead_id: str, campaign_id: str):
             'email_copy_success': email_copy_success,
             'instantly_success': instantly_success
         }
+        if email_copy_deferred:
+            job_result['email_copy_deferred'] = True
         
         if instantly_result:
             # Ensure instantly_result is JSON serializable by converting it to a simple dict
@@ -499,7 +684,8 @@ def enrich_lead_task(self, lead_id: str, campaign_id: str):
             enrichment_job.error = json.dumps({'error': str(db_error)}) if not error_details else json.dumps(error_details)
             db.commit()
         
-        logger.info(f"Lead {lead_id} enrichment complete. Results: {job_result}")
+        if error_details or should_sample('lead_result'):
+            logger.info(f"Lead {lead_id} enrichment complete. Results: {log_payload(job_result)}")
         
         return {
             "lead_id": lead_id,
@@ -527,6 +713,10 @@ def enrich_lead_task(self, lead_id: str, campaign_id: str):
         raise
         
     finally:
+        # One insert per run, once the lead's job has its final status
+        if 'enrichment_job' in locals() and enrichment_job:
+            save_lead_trace(db, trace, enrichment_job)
+        trace.deactivate()
         db.close()
 
 @celery_app.task(bind=True, name="cleanup_campaign_jobs_task")
@@ -741,6 +931,616 @@ def process_job_task(self, job_id: int, job_type: str, campaign_id: str):
     finally:
         db.close()
 
+# Instantly bulk writer
+#
+# With INSTANTLY_BULK_ENABLED, enrich_lead_task buffers ready leads per
+# instantly_campaign_id (see InstantlyBulkWriter). A full buffer queues
+# flush_instantly_buffer_task right away; flush_due_instantly_buffers_task runs
+# on beat and flushes buffers whose oldest lead has waited
+# INSTANTLY_BULK_MAX_WAIT_SECONDS.
+
+def _get_instantly_bulk_writer(db: Session):
+    """Build an InstantlyBulkWriter wired to the rate limiter and circuit breaker."""
+    from app.background_services.instantly_service import InstantlyService
+    from app.background_services.instantly_bulk_writer import InstantlyBulkWriter
+    redis_client = get_redis_connection()
+    queue_manager = QueueManager(redis_client=redis_client, db=db)
+    return InstantlyBulkWriter(
+        redis_client,
+        instantly_service=InstantlyService(rate_limiter=get_instantly_rate_limiter(redis_client)),
+        circuit_breaker=queue_manager.circuit_breaker
+    )
+
+
+@celery_app.task(name="flush_instantly_buffer_task")
+def flush_instantly_buffer_task(instantly_campaign_id: str):
+    """Flush one batch of an Instantly campaign's lead buffer."""
+    db_gen = get_db()
+    db: Session = next(db_gen)
+
+    try:
+        writer = _get_instantly_bulk_writer(db)
+        return writer.flush(instantly_campaign_id, db)
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error flushing Instantly buffer for campaign {instantly_campaign_id}: {str(e)}", exc_info=True)
+        raise
+    finally:
+        db.close()
+
+
+@celery_app.task(name="flush_due_instantly_buffers_task")
+def flush_due_instantly_buffers_task():
+    """Beat task: flush every Instantly buffer whose oldest lead has waited long enough."""
+    db_gen = get_db()
+    db: Session = next(db_gen)
+
+    try:
+        writer = _get_instantly_bulk_writer(db)
+        outcomes = {}
+        for instantly_campaign_id in writer.due_campaigns():
+            try:
+                outcomes[instantly_campaign_id] = writer.flush(instantly_campaign_id, db)
+            except Exception as e:
+                db.rollback()
+                logger.error(
+                    f"Error flushing Instantly buffer for campaign {instantly_campaign_id}: {str(e)}",
+                    exc_info=True
+                )
+                outcomes[instantly_campaign_id] = {'status': 'error', 'error': str(e)}
+        return {"status": "flushed" if outcomes else "idle", "campaigns": outcomes}
+    finally:
+        db.close()
+
+
+# Bulk email verification
+#
+# When EMAIL_VERIFICATION_BULK_ENABLED, fetch_and_save_leads_task uploads the
+# campaign's emails as one MillionVerifier bulk file and records a
+# VERIFY_EMAILS_BULK job holding the vendor file_id. The beat-scheduled
+# poll_bulk_email_verification_task checks each open job without blocking a
+# worker; once the file is finished, results are streamed into
+# Lead.email_verification in batches and per-lead enrichment is queued. If
+# the bulk job fails or times out, enrichment is queued anyway and each lead
+# falls back to single-email verification.
+
+BULK_VERIFICATION_LOCK_PREFIX = "bulk_email_verification:lock"
+BULK_VERIFICATION_LOCK_TIMEOUT = 600  # seconds
+
+
+def _get_email_verifier_service(redis_client):
+    """Build an EmailVerifierService with the shared rate limiter and cache."""
+    from app.background_services.email_verifier_service import EmailVerifierService
+    from app.background_services.email_verification_cache import EmailVerificationCache
+    return EmailVerifierService(
+        rate_limiter=get_email_verifier_rate_limiter(redis_client),
+        cache=EmailVerificationCache(redis_client)
+    )
+
+
+def _queue_campaign_enrichment(db: Session, campaign_id: str) -> int:
+    """Queue enrich_lead_task for every lead in a campaign."""
+    lead_ids = [row.id for row in db.query(Lead.id).filter(Lead.campaign_id == campaign_id)]
+    for lead_id in lead_ids:
+        enrich_lead_task.delay(lead_id, campaign_id)
+    logger.info(f"Queued enrichment tasks for {len(lead_ids)} leads in campaign {campaign_id}")
+    return len(lead_ids)
+
+
+def start_bulk_email_verification(db: Session, campaign: Campaign, leads: List[Lead]) -> Optional[Job]:
+    """
+    Upload a campaign's emails to the MillionVerifier bulk API and record the job.
+    
+    Args:
+        db: Database session
+        campaign: Campaign the leads belong to
+        leads: Leads to verify
+        
+    Returns:
+        Job: The VERIFY_EMAILS_BULK job, or None if the upload failed and the
+             caller should fall back to per-lead verification
+    """
+    try:
+        email_service = _get_email_verifier_service(get_redis_connection())
+        upload = email_service.start_bulk_verification(
+            [lead.email for lead in leads if lead.email],
+            file_name=f"campaign_{campaign.id}.csv"
+        )
+    except Exception as e:
+        logger.error(f"Could not start bulk email verification for campaign {campaign.id}: {str(e)}")
+        return None
+
+    if upload.get('status') == 'error':
+        logger.warning(
+            f"Bulk email verification upload failed for campaign {campaign.id}, "
+            f"falling back to per-lead verification: {upload.get('error')}"
+        )
+        return None
+
+    job = Job(
+        campaign_id=campaign.id,
+        name='VERIFY_EMAILS_BULK',
+        description=f'Bulk email verification for campaign {campaign.id}',
+        job_type=JobType.VERIFY_EMAILS_BULK,
+        status=JobStatus.PROCESSING,
+        result=json.dumps({'file_id': upload['file_id'], 'email_count': upload['email_count']})
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def apply_bulk_verification_results(db: Session, job: Job, email_service) -> int:
+    """
+    Stream a finished bulk file's results into the leads' email_verification.
+    
+    Leads are updated with bulk_update_mappings in batches of
+    EMAIL_VERIFICATION_BULK_UPDATE_BATCH_SIZE, committing after each batch.
+    Re-applying the same file is idempotent.
+    
+    Returns:
+        int: Number of leads updated
+    """
+    file_id = json.loads(job.result)['file_id']
+
+    lead_ids_by_email: Dict[str, List[str]] = {}
+    rows = db.query(Lead.id, Lead.email).filter(
+        Lead.campaign_id == job.campaign_id,
+        Lead.email.isnot(None)
+    )
+    for lead_id, email in rows:
+        lead_ids_by_email.setdefault(email.strip().lower(), []).append(lead_id)
+
+    batch_size = settings.EMAIL_VERIFICATION_BULK_UPDATE_BATCH_SIZE
+    batch: List[Dict[str, Any]] = []
+    updated = 0
+    for result in email_service.iter_bulk_results(file_id):
+        for lead_id in lead_ids_by_email.get(result['email'].lower(), ()):
+            batch.append({'id': lead_id, 'email_verification': result})
+        if len(batch) >= batch_size:
+            bulk_update_lead_artifacts(db, batch)
+            db.commit()
+            updated += len(batch)
+            batch = []
+    if batch:
+        bulk_update_lead_artifacts(db, batch)
+        db.commit()
+        updated += len(batch)
+
+    return updated
+
+
+def poll_bulk_verification_job(db: Session, job: Job, email_service) -> str:
+    """
+    Check one VERIFY_EMAILS_BULK job and finish it if the vendor is done.
+    
+    Returns:
+        str: 'pending', 'completed' or 'failed'
+    """
+    details = json.loads(job.result)
+    file_id = details['file_id']
+    info = email_service.get_bulk_status(file_id)
+    vendor_status = str(info.get('status', '')).lower()
+
+    if vendor_status in email_service.BULK_FINISHED_STATUSES:
+        updated = apply_bulk_verification_results(db, job, email_service)
+        job.status = JobStatus.COMPLETED
+        job.result = json.dumps({**details, 'updated_leads': updated})
+        job.completed_at = datetime.utcnow()
+        db.commit()
+        logger.info(f"Bulk email verification job {job.id} completed, {updated} leads updated")
+        _queue_campaign_enrichment(db, job.campaign_id)
+        return 'completed'
+
+    error = None
+    if vendor_status in email_service.BULK_FAILED_STATUSES:
+        error = f"Bulk verification file {file_id} ended with status '{vendor_status}'"
+    else:
+        created_at = job.created_at
+        if created_at and created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=timezone.utc)
+        age = (datetime.now(timezone.utc) - created_at).total_seconds() if created_at else 0
+        if age > settings.EMAIL_VERIFICATION_BULK_TIMEOUT_SECONDS:
+            error = f"Bulk verification file {file_id} timed out after {int(age)}s"
+
+    if error:
+        logger.warning(f"{error}, falling back to per-lead verification")
+        job.status = JobStatus.FAILED
+        job.error = error
+        job.completed_at = datetime.utcnow()
+        db.commit()
+        _queue_campaign_enrichment(db, job.campaign_id)
+        return 'failed'
+
+    logger.info(
+        f"Bulk email verification job {job.id} still processing "
+        f"({info.get('percent', 'unknown')}% done)"
+    )
+    return 'pending'
+
+
+@celery_app.task(name="poll_bulk_email_verification_task")
+def poll_bulk_email_verification_task():
+    """
+    Beat task: poll open bulk email verification jobs once and return.
+    
+    Each job is guarded by a Redis lock so overlapping beat runs never apply
+    the same result file twice at the same time.
+    """
+    db_gen = get_db()
+    db: Session = next(db_gen)
+
+    try:
+        jobs = db.query(Job).filter(
+            Job.job_type == JobType.VERIFY_EMAILS_BULK,
+            Job.status == JobStatus.PROCESSING
+        ).all()
+        if not jobs:
+            return {"status": "idle", "jobs": {}}
+
+        redis_client = get_redis_connection()
+        email_service = _get_email_verifier_service(redis_client)
+        outcomes = {}
+        for job in jobs:
+            lock_key = f"{BULK_VERIFICATION_LOCK_PREFIX}:{job.id}"
+            token = uuid.uuid4().hex
+            if not redis_client.set(lock_key, token, nx=True, ex=BULK_VERIFICATION_LOCK_TIMEOUT):
+                outcomes[job.id] = 'locked'
+                continue
+            try:
+                outcomes[job.id] = poll_bulk_verification_job(db, job, email_service)
+            except Exception as e:
+                # Leave the job open; the next poll retries it
+                db.rollback()
+                logger.error(f"Error polling bulk email verification job {job.id}: {str(e)}", exc_info=True)
+                outcomes[job.id] = 'error'
+            finally:
+                # Only release our own lock; after a timeout another run may hold it
+                if redis_client.get(lock_key) == token:
+                    redis_client.delete(lock_key)
+
+        return {"status": "polled", "jobs": outcomes}
+
+    finally:
+        db.close()
+
+
+# OpenAI batch email copy
+#
+# Campaigns with email_copy_mode='batch' skip email copy generation in
+# enrich_lead_task; the lead's email_copy_gen_results is set to
+# {'status': 'batch_pending'}. The beat-scheduled
+# process_email_copy_batches_task submits each campaign's pending leads as
+# one OpenAI Batch API job (GENERATE_EMAIL_COPY_BATCH) once enough are
+# waiting or the oldest has waited long enough, and polls open jobs. When a
+# batch ends, its output is streamed into Lead.email_copy_gen_results and
+# finish_email_copy_task is queued per lead to create the Instantly lead.
+# Leads the batch produced no copy for fall back to a realtime call there.
+
+EMAIL_COPY_BATCH_LOCK_KEY = "email_copy_batch:lock"
+EMAIL_COPY_BATCH_LOCK_TIMEOUT = 600  # seconds
+# Retries of a realtime fallback the OpenAI limiter turned away
+EMAIL_COPY_FALLBACK_MAX_RETRIES = 5
+
+
+def _get_openai_service(db: Session):
+    """Build an OpenAIService for batch calls (batches have their own quota, no limiter)."""
+    from app.background_services.openai_service import OpenAIService
+    from app.background_services.prompt_templates import PromptTemplateRegistry
+    return OpenAIService(prompt_templates=PromptTemplateRegistry(db))
+
+
+def _email_copy_status(status: str, *criteria):
+    return Lead.artifacts.has(and_(LeadArtifact.email_copy_gen_results['status'].astext == status, *criteria))
+
+
+def _email_copy_batch_leads(db: Session, job: Job):
+    """Query the leads submitted with a GENERATE_EMAIL_COPY_BATCH job that have no result yet."""
+    return db.query(Lead).filter(
+        Lead.campaign_id == job.campaign_id,
+        _email_copy_status(
+            'batch_submitted', LeadArtifact.email_copy_gen_results['batch_job_id'].astext == str(job.id)
+        )
+    )
+
+
+def campaigns_due_for_email_copy_batch(db: Session) -> List[str]:
+    """
+    Get campaigns whose pending leads should be submitted as a batch now.
+    
+    A campaign is due when it has OPENAI_BATCH_MIN_REQUESTS pending leads or
+    its oldest pending lead has waited OPENAI_BATCH_MAX_WAIT_SECONDS.
+    """
+    from sqlalchemy import func
+    rows = db.query(Lead.campaign_id, func.count(Lead.id), func.min(Lead.updated_at)).filter(
+        _email_copy_status('batch_pending')
+    ).group_by(Lead.campaign_id).all()
+
+    now = datetime.now(timezone.utc)
+    due = []
+    for campaign_id, pending_count, oldest in rows:
+        if oldest and oldest.tzinfo is None:
+            oldest = oldest.replace(tzinfo=timezone.utc)
+        waited = (now - oldest).total_seconds() if oldest else 0
+        if pending_count >= settings.OPENAI_BATCH_MIN_REQUESTS or waited >= settings.OPENAI_BATCH_MAX_WAIT_SECONDS:
+            due.append(campaign_id)
+    return due
+
+
+def submit_email_copy_batch(db: Session, campaign_id: str, openai_service) -> Optional[Job]:
+    """
+    Submit up to OPENAI_BATCH_MAX_REQUESTS pending leads of a campaign as one batch.
+    
+    Returns:
+        Job: The GENERATE_EMAIL_COPY_BATCH job, or None if nothing was submitted.
+             On a submit error the leads stay pending for the next run.
+    """
+    leads = db.query(Lead).options(selectinload(Lead.artifacts)).filter(
+        Lead.campaign_id == campaign_id,
+        _email_copy_status('batch_pending')
+    ).order_by(Lead.updated_at).limit(settings.OPENAI_BATCH_MAX_REQUESTS).all()
+
+    batch_requests = []
+    for lead in leads:
+        body = openai_service.build_email_copy_request(lead, lead.enrichment_results)
+        if body.get('status') == 'error':
+            lead.email_copy_gen_results = body
+        else:
+            batch_requests.append({'custom_id': lead.id, 'body': body})
+    if not batch_requests:
+        db.commit()
+        return None
+
+    submitted = openai_service.submit_email_copy_batch(batch_requests, file_name=f"campaign_{campaign_id}.jsonl")
+    if submitted.get('status') == 'error':
+        db.commit()
+        logger.warning(f"OpenAI batch submit failed for campaign {campaign_id}, leads stay pending: {submitted.get('error')}")
+        return None
+
+    job = Job(
+        campaign_id=campaign_id,
+        name='GENERATE_EMAIL_COPY_BATCH',
+        description=f'OpenAI batch email copy generation for campaign {campaign_id}',
+        job_type=JobType.GENERATE_EMAIL_COPY_BATCH,
+        status=JobStatus.PROCESSING,
+        result=json.dumps(submitted)
+    )
+    db.add(job)
+    db.flush()
+
+    submitted_ids = {item['custom_id'] for item in batch_requests}
+    mappings = [
+        {'id': lead.id, 'email_copy_gen_results': {
+            'status': 'batch_submitted',
+            'batch_job_id': job.id,
+            'batch_id': submitted['batch_id']
+        }}
+        for lead in leads if lead.id in submitted_ids
+    ]
+    bulk_update_lead_artifacts(db, mappings)
+    db.commit()
+    db.refresh(job)
+    logger.info(f"Submitted {len(mappings)} leads of campaign {campaign_id} as email copy batch job {job.id}")
+    return job
+
+
+def apply_email_copy_batch_results(db: Session, job: Job, openai_service, file_id: str) -> int:
+    """
+    Stream a batch output or error file into Lead.email_copy_gen_results.
+    
+    Only leads still waiting on this job are updated, in batches of
+    OPENAI_BATCH_UPDATE_BATCH_SIZE, committing after each batch.
+    
+    Returns:
+        int: Number of leads updated
+    """
+    waiting_ids = {row.id for row in _email_copy_batch_leads(db, job).with_entities(Lead.id)}
+    batch_id = json.loads(job.result)['batch_id']
+
+    batch_size = settings.OPENAI_BATCH_UPDATE_BATCH_SIZE
+    batch: List[Dict[str, Any]] = []
+    updated = 0
+    for item in openai_service.iter_batch_results(file_id):
+        lead_id = item['custom_id']
+        if lead_id not in waiting_ids:
+            continue
+        waiting_ids.discard(lead_id)
+        if 'result' in item:
+            result = {**item['result'], 'batch_id': batch_id}
+        else:
+            result = {'status': 'error', 'error': item['error'], 'batch_id': batch_id}
+        batch.append({'id': lead_id, 'email_copy_gen_results': result})
+        if len(batch) >= batch_size:
+            bulk_update_lead_artifacts(db, batch)
+            db.commit()
+            updated += len(batch)
+            batch = []
+    if batch:
+        bulk_update_lead_artifacts(db, batch)
+        db.commit()
+        updated += len(batch)
+
+    return updated
+
+
+def poll_email_copy_batch_job(db: Session, job: Job, openai_service) -> str:
+    """
+    Check one GENERATE_EMAIL_COPY_BATCH job and finish it if the batch has ended.
+    
+    Returns:
+        str: 'pending', 'completed' or 'failed'
+    """
+    details = json.loads(job.result)
+    info = openai_service.get_batch_status(details['batch_id'])
+    vendor_status = str(info.get('status', '')).lower()
+
+    if vendor_status not in openai_service.BATCH_FINISHED_STATUSES | openai_service.BATCH_FAILED_STATUSES:
+        logger.info(f"Email copy batch job {job.id} still processing (status: {vendor_status or 'unknown'})")
+        return 'pending'
+
+    lead_ids = [lead_id for (lead_id,) in _email_copy_batch_leads(db, job).with_entities(Lead.id)]
+
+    # Expired and cancelled batches can still carry partial output
+    updated = 0
+    for file_key in ('output_file_id', 'error_file_id'):
+        if info.get(file_key):
+            updated += apply_email_copy_batch_results(db, job, openai_service, info[file_key])
+
+    # Leads still waiting got no line in either file; finish_email_copy_task retries them in realtime
+    missing = _email_copy_batch_leads(db, job).count()
+
+    job.result = json.dumps({**details, 'updated_leads': updated, 'missing_leads': missing})
+    job.completed_at = datetime.utcnow()
+    if vendor_status in openai_service.BATCH_FINISHED_STATUSES:
+        job.status = JobStatus.COMPLETED
+        outcome = 'completed'
+    else:
+        job.status = JobStatus.FAILED
+        job.error = f"OpenAI batch {details['batch_id']} ended with status '{vendor_status}'"
+        outcome = 'failed'
+    db.commit()
+
+    for lead_id in lead_ids:
+        finish_email_copy_task.delay(lead_id, job.campaign_id)
+    logger.info(
+        f"Email copy batch job {job.id} {outcome}: {updated} leads updated, {missing} without result, "
+        f"{len(lead_ids)} queued for Instantly"
+    )
+    return outcome
+
+
+@celery_app.task(name="process_email_copy_batches_task")
+def process_email_copy_batches_task():
+    """
+    Beat task: submit due email copy batches and poll open ones, then return.
+    
+    A Redis lock keeps overlapping beat runs from submitting the same
+    pending leads twice.
+    """
+    redis_client = get_redis_connection()
+    token = str(uuid.uuid4())
+    if not redis_client.set(EMAIL_COPY_BATCH_LOCK_KEY, token, nx=True, ex=EMAIL_COPY_BATCH_LOCK_TIMEOUT):
+        return {"status": "locked"}
+
+    db_gen = get_db()
+    db: Session = next(db_gen)
+
+    try:
+        due_campaigns = campaigns_due_for_email_copy_batch(db)
+        open_jobs = db.query(Job).filter(
+            Job.job_type == JobType.GENERATE_EMAIL_COPY_BATCH,
+            Job.status == JobStatus.PROCESSING
+        ).all()
+        if not due_campaigns and not open_jobs:
+            return {"status": "idle", "submitted": {}, "jobs": {}}
+
+        openai_service = _get_openai_service(db)
+        submitted = {}
+        for campaign_id in due_campaigns:
+            try:
+                job = submit_email_copy_batch(db, campaign_id, openai_service)
+                submitted[campaign_id] = job.id if job else None
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Error submitting email copy batch for campaign {campaign_id}: {str(e)}", exc_info=True)
+                submitted[campaign_id] = 'error'
+
+        outcomes = {}
+        for job in open_jobs:
+            try:
+                outcomes[job.id] = poll_email_copy_batch_job(db, job, openai_service)
+            except Exception as e:
+                # Leave the job open; the next run retries it
+                db.rollback()
+                logger.error(f"Error polling email copy batch job {job.id}: {str(e)}", exc_info=True)
+                outcomes[job.id] = 'error'
+
+        return {"status": "processed", "submitted": submitted, "jobs": outcomes}
+
+    finally:
+        db.close()
+        # Only release our own lock; after a timeout another run may hold it
+        if redis_client.get(EMAIL_COPY_BATCH_LOCK_KEY) == token:
+            redis_client.delete(EMAIL_COPY_BATCH_LOCK_KEY)
+
+
+@celery_app.task(bind=True, name="finish_email_copy_task", max_retries=EMAIL_COPY_FALLBACK_MAX_RETRIES)
+def finish_email_copy_task(self, lead_id: str, campaign_id: str):
+    """
+    Finish a lead whose email copy went through an OpenAI batch.
+    
+    Leads the batch produced no copy for are generated in realtime first.
+    When the OpenAI limiter turns that call away, the task is retried after
+    the limiter window (with backoff and jitter, as the batch fallbacks of a
+    campaign arrive together) instead of failing the lead.
+    Then the Instantly lead is created as in enrich_lead_task.
+    """
+    db_gen = get_db()
+    db: Session = next(db_gen)
+
+    try:
+        lead = db.query(Lead).filter(Lead.id == lead_id).first()
+        if not lead:
+            logger.error(f"Lead {lead_id} not found for batch email copy")
+            return {"lead_id": lead_id, "status": "failed", "reason": "Lead not found"}
+
+        redis_client = get_redis_connection()
+        circuit_breaker = QueueManager(redis_client=redis_client, db=db).circuit_breaker
+
+        copy_result = lead.email_copy_gen_results or {}
+        if 'choices' not in copy_result:
+            from app.background_services.openai_service import OpenAIService
+            from app.background_services.prompt_templates import PromptTemplateRegistry
+            from app.background_services.completion_cache import get_completion_cache
+            logger.info(f"Email copy batch gave no result for lead {lead_id}, generating in realtime")
+            openai_service = OpenAIService(
+                rate_limiter=get_openai_rate_limiter(redis_client),
+                circuit_breaker=circuit_breaker,
+                prompt_templates=PromptTemplateRegistry(db),
+                completion_cache=get_completion_cache(redis_client)
+            )
+            copy_result = openai_service.generate_email_copy(lead, lead.enrichment_results)
+            if copy_result.get('status') == 'rate_limited' and self.request.retries < self.max_retries:
+                retry_after = copy_result.get('retry_after_seconds') or settings.OPENAI_RATE_LIMIT_PERIOD
+                countdown = retry_after * 2 ** self.request.retries + random.uniform(0, retry_after)
+                logger.info(f"OpenAI rate limit for lead {lead_id}, retrying email copy in {countdown:.0f}s")
+                raise self.retry(countdown=countdown)
+            lead.email_copy_gen_results = copy_result
+            if 'error' in copy_result or copy_result.get('status') in ['rate_limited', 'circuit_breaker_open']:
+                lead.instantly_lead_record = {'error': f"Email copy generation failed: {copy_result.get('error')}"}
+                db.commit()
+                return {"lead_id": lead_id, "status": "failed", "reason": copy_result.get('error')}
+
+        if not lead.email or not lead.first_name:
+            msg = f"Skipping Instantly lead creation for lead {lead.id} due to missing email or first_name"
+            logger.warning(msg)
+            lead.instantly_lead_record = {'error': msg}
+            db.commit()
+            return {"lead_id": lead_id, "status": "skipped", "reason": msg}
+
+        try:
+            instantly_result = _create_instantly_lead(db, lead, campaign_id, circuit_breaker)
+        except Exception as e:
+            circuit_breaker.record_failure(f"Instantly service error: {str(e)}", 'exception')
+            logger.error(f"Instantly lead creation failed for lead {lead_id}: {str(e)}")
+            instantly_result = {'error': str(e)}
+            lead.instantly_lead_record = instantly_result
+        db.commit()
+
+        instantly_success = 'error' not in instantly_result and instantly_result.get('status') != 'rate_limited'
+        return {"lead_id": lead_id, "status": "completed", "instantly_success": instantly_success}
+
+    except Retry:
+        raise
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error finishing batch email copy for lead {lead_id}: {str(e)}", exc_info=True)
+        raise
+    finally:
+        db.close()
+
+
 @celery_app.task(name="campaign_health_check")
 def campaign_health_check():
     """Health check task specifically for campaign operations."""
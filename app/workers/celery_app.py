@@ -1,3 +1,4 @@
+import time
 from celery import Celery
 from app.core.config import settings
 
@@ -32,6 +33,22 @@ celery_app.conf.update(
     worker_max_tasks_per_child=1000,
 )
 
+# Periodic tasks (run by `celery -A app.workers.celery_app beat`)
+celery_app.conf.beat_schedule = {
+    "poll-bulk-email-verification": {
+        "task": "poll_bulk_email_verification_task",
+        "schedule": settings.EMAIL_VERIFICATION_BULK_POLL_INTERVAL,
+    },
+    "flush-due-instantly-buffers": {
+        "task": "flush_due_instantly_buffers_task",
+        "schedule": settings.INSTANTLY_BULK_FLUSH_INTERVAL,
+    },
+    "process-email-copy-batches": {
+        "task": "process_email_copy_batches_task",
+        "schedule": settings.OPENAI_BATCH_POLL_INTERVAL,
+    },
+}
+
 # Configure Celery's internal logging to use our centralized system
 celery_app.conf.update(
     worker_hijack_root_logger=False,  # Don't let Celery hijack root logger
@@ -50,7 +67,41 @@ celery_task_logger.setLevel(logging.INFO)
 celery_worker_logger.setLevel(logging.INFO)
 
 # Worker lifecycle signals
-from celery.signals import worker_ready, worker_shutdown, task_prerun, task_postrun, task_failure
+from celery.signals import (
+    before_task_publish, worker_init, worker_process_init, worker_process_shutdown, worker_ready, worker_shutdown,
+    task_prerun, task_postrun, task_failure
+)
+
+@before_task_publish.connect
+def stamp_enqueue_time(headers=None, **kwargs):
+    """Stamp the publish time on every task message; it is read back as task.request.enqueued_at."""
+    if headers is not None:
+        headers['enqueued_at'] = time.time()
+
+@worker_init.connect
+def worker_init_handler(sender=None, **kwargs):
+    """Clear stale metrics samples before the pool children are forked."""
+    from app.core.metrics import reset_multiproc_dir
+    reset_multiproc_dir()
+
+@worker_process_init.connect
+def worker_process_init_handler(**kwargs):
+    """
+    Drop the database connections inherited from the parent and start tracing in
+    each pool child; the span export thread does not survive the fork.
+    """
+    from app.core.database import dispose_engines_after_fork
+    dispose_engines_after_fork()
+    from app.core.tracing import init_tracing
+    init_tracing("worker")
+
+@worker_process_shutdown.connect
+def worker_process_shutdown_handler(**kwargs):
+    """Write out the pool child's queued spans and log records before it exits."""
+    from app.core.tracing import shutdown_tracing
+    shutdown_tracing()
+    from app.core.logging_config import stop_log_writer
+    stop_log_writer()
 
 @worker_ready.connect
 def worker_ready_handler(sender=None, **kwargs):
@@ -60,6 +111,10 @@ def worker_ready_handler(sender=None, **kwargs):
         "worker_pid": sender.pid if sender else "unknown",
         "event": "worker_ready"
     })
+    # Sidecar /metrics port for this worker container (pool children report
+    # through PROMETHEUS_MULTIPROC_DIR)
+    from app.core.metrics import start_worker_metrics_server
+    start_worker_metrics_server()
 
 @worker_shutdown.connect
 def worker_shutdown_handler(sender=None, **kwargs):
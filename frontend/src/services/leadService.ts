@@ -3,6 +3,7 @@ import {
   LeadCreate, 
   LeadUpdate, 
   LeadResponse, 
+  LeadSummaryResponse,
   LeadListFilters,
   LeadSearchFilters 
 } from '../types/lead';
@@ -89,7 +90,7 @@ class LeadService {
   /**
    * List leads with optional filtering
    */
-  async listLeads(filters: LeadListFilters = {}): Promise<LeadResponse[]> {
+  async listLeads(filters: LeadListFilters = {}): Promise<LeadSummaryResponse[]> {
     try {
       const params = this.buildUrlParams(filters);
       const url = `${this.baseUrl}${params.toString() ? `?${params.toString()}` : ''}`;
@@ -99,7 +100,7 @@ class LeadService {
         headers: this.getHeaders(),
       });
 
-      return this.handleResponse<LeadResponse[]>(response);
+      return this.handleResponse<LeadSummaryResponse[]>(response);
     } catch (error) {
       console.error('Error listing leads:', error);
       throw error;
@@ -126,7 +127,7 @@ class LeadService {
   /**
    * Create a new lead
    */
-  async createLead(leadData: LeadCreate): Promise<LeadResponse> {
+  async createLead(leadData: LeadCreate): Promise<LeadSummaryResponse> {
     try {
       const response = await fetch(this.baseUrl, {
         method: 'POST',
@@ -134,7 +135,7 @@ class LeadService {
         body: JSON.stringify(leadData),
       });
 
-      return this.handleResponse<LeadResponse>(response);
+      return this.handleResponse<LeadSummaryResponse>(response);
     } catch (error) {
       console.error('Error creating lead:', error);
       throw error;
@@ -144,7 +145,7 @@ class LeadService {
   /**
    * Update a lead
    */
-  async updateLead(leadId: string, leadData: LeadUpdate): Promise<LeadResponse> {
+  async updateLead(leadId: string, leadData: LeadUpdate): Promise<LeadSummaryResponse> {
     try {
       const response = await fetch(`${this.baseUrl}/${leadId}`, {
         method: 'PUT',
@@ -152,7 +153,7 @@ class LeadService {
         body: JSON.stringify(leadData),
       });
 
-      return this.handleResponse<LeadResponse>(response);
+      return this.handleResponse<LeadSummaryResponse>(response);
     } catch (error) {
       console.error(`Error updating lead ${leadId}:`, error);
       throw error;
@@ -184,7 +185,7 @@ class LeadService {
   /**
    * Get leads filtered by campaign ID
    */
-  async getLeadsByCampaign(campaignId: string, filters: Omit<LeadListFilters, 'campaign_id'> = {}): Promise<LeadResponse[]> {
+  async getLeadsByCampaign(campaignId: string, filters: Omit<LeadListFilters, 'campaign_id'> = {}): Promise<LeadSummaryResponse[]> {
     return this.listLeads({
       ...filters,
       campaign_id: campaignId
@@ -194,7 +195,7 @@ class LeadService {
   /**
    * Search leads with advanced filtering
    */
-  async searchLeads(searchFilters: LeadSearchFilters): Promise<LeadResponse[]> {
+  async searchLeads(searchFilters: LeadSearchFilters): Promise<LeadSummaryResponse[]> {
     try {
       const params = this.buildUrlParams(searchFilters);
       const url = `${this.baseUrl}${params.toString() ? `?${params.toString()}` : ''}`;
@@ -204,7 +205,7 @@ class LeadService {
         headers: this.getHeaders(),
       });
 
-      return this.handleResponse<LeadResponse[]>(response);
+      return this.handleResponse<LeadSummaryResponse[]>(response);
     } catch (error) {
       console.error('Error searching leads:', error);
       throw error;
@@ -214,7 +215,7 @@ class LeadService {
   /**
    * Get leads with email addresses
    */
-  async getLeadsWithEmail(campaignId?: string, filters: LeadListFilters = {}): Promise<LeadResponse[]> {
+  async getLeadsWithEmail(campaignId?: string, filters: LeadListFilters = {}): Promise<LeadSummaryResponse[]> {
     const allLeads = await this.listLeads({
       ...filters,
       ...(campaignId && { campaign_id: campaignId })
@@ -224,39 +225,33 @@ class LeadService {
   }
 
   /**
-   * Get leads with verified emails
+   * Get leads with verified emails (leads with a verification result)
    */
-  async getLeadsWithVerifiedEmail(campaignId?: string, filters: LeadListFilters = {}): Promise<LeadResponse[]> {
+  async getLeadsWithVerifiedEmail(campaignId?: string, filters: LeadListFilters = {}): Promise<LeadSummaryResponse[]> {
     const allLeads = await this.listLeads({
       ...filters,
       ...(campaignId && { campaign_id: campaignId })
     });
     
-    return allLeads.filter(lead => 
-      lead.email_verification && 
-      Object.keys(lead.email_verification).length > 0
-    );
+    return allLeads.filter(lead => Boolean(lead.email_verification_status));
   }
 
   /**
-   * Get leads with enrichment data
+   * Get leads with enrichment data (leads with enrichment content)
    */
-  async getLeadsWithEnrichment(campaignId?: string, filters: LeadListFilters = {}): Promise<LeadResponse[]> {
+  async getLeadsWithEnrichment(campaignId?: string, filters: LeadListFilters = {}): Promise<LeadSummaryResponse[]> {
     const allLeads = await this.listLeads({
       ...filters,
       ...(campaignId && { campaign_id: campaignId })
     });
     
-    return allLeads.filter(lead => 
-      lead.enrichment_results && 
-      Object.keys(lead.enrichment_results).length > 0
-    );
+    return allLeads.filter(lead => Boolean(lead.enrichment_text));
   }
 
   /**
    * Get leads by company
    */
-  async getLeadsByCompany(company: string, filters: Omit<LeadListFilters, 'company'> = {}): Promise<LeadResponse[]> {
+  async getLeadsByCompany(company: string, filters: Omit<LeadListFilters, 'company'> = {}): Promise<LeadSummaryResponse[]> {
     return this.listLeads({
       ...filters,
       company
@@ -280,18 +275,10 @@ class LeadService {
       return {
         total: leads.length,
         withEmail: leads.filter(lead => lead.email && lead.email.trim() !== '').length,
-        withVerifiedEmail: leads.filter(lead => 
-          lead.email_verification && Object.keys(lead.email_verification).length > 0
-        ).length,
-        withEnrichment: leads.filter(lead => 
-          lead.enrichment_results && Object.keys(lead.enrichment_results).length > 0
-        ).length,
-        withEmailCopy: leads.filter(lead => 
-          lead.email_copy_gen_results && Object.keys(lead.email_copy_gen_results).length > 0
-        ).length,
-        withInstantlyRecord: leads.filter(lead => 
-          lead.instantly_lead_record && Object.keys(lead.instantly_lead_record).length > 0
-        ).length,
+        withVerifiedEmail: leads.filter(lead => Boolean(lead.email_verification_status)).length,
+        withEnrichment: leads.filter(lead => Boolean(lead.enrichment_text)).length,
+        withEmailCopy: leads.filter(lead => Boolean(lead.email_copy)).length,
+        withInstantlyRecord: leads.filter(lead => Boolean(lead.instantly_lead_id)).length,
       };
     } catch (error) {
       console.error(`Error getting lead stats for campaign ${campaignId}:`, error);
@@ -302,12 +289,12 @@ class LeadService {
   /**
    * Bulk create leads
    */
-  async bulkCreateLeads(leadsData: LeadCreate[]): Promise<LeadResponse[]> {
+  async bulkCreateLeads(leadsData: LeadCreate[]): Promise<LeadSummaryResponse[]> {
     try {
       const promises = leadsData.map(leadData => this.createLead(leadData));
       const results = await Promise.allSettled(promises);
       
-      const successfulLeads: LeadResponse[] = [];
+      const successfulLeads: LeadSummaryResponse[] = [];
       const errors: Error[] = [];
       
       results.forEach((result, index) => {
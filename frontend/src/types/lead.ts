@@ -37,12 +37,37 @@ export interface LeadUpdate {
   instantly_lead_record?: Record<string, any>;
 }
 
-export interface LeadResponse extends LeadBase {
+// A lead as listed, created and updated: the artifacts (vendor JSON documents)
+// are left out, with the values read from them as plain fields
+export interface LeadSummaryResponse {
   id: string;
+  campaign_id: string;
+  first_name?: string;
+  last_name?: string;
+  email?: string;
+  phone?: string;
+  company?: string;
+  title?: string;
+  linkedin_url?: string;
+  source_url?: string;
+  enrichment_job_id?: string;
+  email_verification_status?: string | null;
+  enrichment_text?: string | null;
+  email_copy?: string | null;
+  instantly_lead_id?: string | null;
   created_at: string;
   updated_at: string;
 }
 
+// A lead with its artifacts, as returned by the lead detail endpoint
+export interface LeadResponse extends LeadSummaryResponse {
+  raw_data?: Record<string, any>;
+  email_verification?: Record<string, any>;
+  enrichment_results?: Record<string, any>;
+  email_copy_gen_results?: Record<string, any>;
+  instantly_lead_record?: Record<string, any>;
+}
+
 // Filter interfaces for API queries
 export interface LeadListFilters {
   skip?: number;
@@ -54,7 +79,7 @@ export interface LeadListFilters {
 
 // API Response interfaces
 export interface LeadListResponse {
-  leads: LeadResponse[];
+  leads: LeadSummaryResponse[];
   total?: number;
 }
 
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Pipeline Benchmark Script
+
+Runs the Celery lead pipeline against local fake vendors and writes a JSON
+report: leads/minute, per-stage latency percentiles, DB queries and Redis
+commands per lead. Needs Postgres and Redis (the configured broker).
+
+Usage:
+    python scripts/benchmark_pipeline.py --leads 200 --output baseline.json
+    python scripts/benchmark_pipeline.py --leads 200 --profile perplexity=latency=1.5,429=0.05
+    python scripts/benchmark_pipeline.py --leads 200 --set INSTANTLY_BULK_ENABLED=true
+    python scripts/benchmark_pipeline.py --leads 200 --compare baseline.json --tolerance 0.1
+
+--unlimited lifts the vendor rate limits, so the run measures the pipeline
+rather than the limiter budget. With --compare the script exits with 1 if
+any metric is worse than the baseline by more than --tolerance.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+# Add the parent directory to the Python path so we can import from app
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.background_services.smoke_tests.fake_vendors import VENDORS, VendorProfile
+from app.core.pipeline_benchmark import BenchmarkConfig, compare_reports, parse_override, run_benchmark
+
+
+def parse_profiles(values) -> dict:
+    """Parse repeated vendor=spec arguments."""
+    profiles = {}
+    for item in values or []:
+        vendor, _, spec = item.partition('=')
+        if vendor not in VENDORS:
+            raise argparse.ArgumentTypeError(
+                f"Expected vendor=spec with vendor in {', '.join(VENDORS)}, got: {item}"
+            )
+        profiles[vendor] = VendorProfile.parse(spec)
+    return profiles
+
+
+def parse_overrides(values) -> dict:
+    """Parse repeated NAME=VALUE setting overrides."""
+    overrides = {}
+    for item in values or []:
+        name, _, value = item.partition('=')
+        overrides[name] = parse_override(name, value)
+    return overrides
+
+
+def print_report(report: dict) -> None:
+    status = "complete" if report['complete'] else "TIMED OUT"
+    print(f"""
+=== PIPELINE BENCHMARK ({status}) ===
+
+Commit: {report['commit'] or 'unknown'}
+Leads: {report['leads_finished']}/{report['config']['leads']} in {report['elapsed_seconds']}s
+Throughput: {report['leads_per_minute']} leads/minute
+DB queries per lead: {report['db_queries_per_lead']}
+Redis commands per lead: {report['redis_commands_per_lead']}
+Runs per status: {report['traces']['statuses']}
+""")
+    print(f"{'Timing (ms)':<24}{'p50':>10}{'p95':>10}{'p99':>10}")
+    for column, percentiles in report['traces']['percentiles_ms'].items():
+        print(f"{column:<24}" + "".join(
+            f"{(percentiles[p] if percentiles[p] is not None else '-'):>10}" for p in ('p50', 'p95', 'p99')
+        ))
+    print(f"\n{'Vendor':<18}{'Requests':>10}{'OK':>8}{'429':>8}{'Errors':>8}")
+    for vendor, stats in report['vendors'].items():
+        print(f"{vendor:<18}{stats['requests']:>10}{stats['ok']:>8}{stats['rate_limited']:>8}{stats['errors']:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the lead pipeline against fake vendors")
+    parser.add_argument('--leads', type=int, default=100, help='Leads to process')
+    parser.add_argument('--concurrency', type=int, default=8, help='Worker threads')
+    parser.add_argument('--profile', action='append', metavar='VENDOR=SPEC',
+                        help="Vendor profile, e.g. openai=latency=0.8,jitter=0.3,errors=0.02,429=0.05")
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the fake vendors')
+    parser.add_argument('--unlimited', action='store_true', help='Lift vendor rate limits')
+    parser.add_argument('--set', action='append', metavar='NAME=VALUE', dest='overrides',
+                        help='Override a setting for the run')
+    parser.add_argument('--timeout', type=int, default=900, help='Seconds to wait for the leads')
+    parser.add_argument('--output', help='Write the JSON report to this file')
+    parser.add_argument('--compare', help='Baseline report to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.1, help='Allowed relative regression')
+    args = parser.parse_args()
+
+    try:
+        config = BenchmarkConfig(
+            leads=args.leads,
+            concurrency=args.concurrency,
+            profiles=parse_profiles(args.profile),
+            seed=args.seed,
+            unlimited=args.unlimited,
+            overrides=parse_overrides(args.overrides),
+            timeout_seconds=args.timeout
+        )
+    except (argparse.ArgumentTypeError, ValueError) as e:
+        parser.error(str(e))
+
+    report = run_benchmark(config)
+    print_report(report)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline['config'] != report['config']:
+            print("\nWarning: baseline was run with a different configuration")
+        regressions = compare_reports(baseline, report, args.tolerance)
+        if regressions:
+            print(f"\nRegressions against {args.compare} (tolerance {args.tolerance:.0%}):")
+            for line in regressions:
+                print(f"  - {line}")
+            sys.exit(1)
+        print(f"\nNo regressions against {args.compare}")
+
+    if not report['complete']:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Capacity Planning Script
+
+Simulates the lead pipeline against the configured rate limits, credentials
+and worker fleet for a monthly sending target, and reports throughput, the
+bottleneck stage, queue growth and time to completion.
+
+Usage:
+    python scripts/capacity_plan.py --target 80000
+    python scripts/capacity_plan.py --target 200000 --accounts perplexity=3 --replicas 12
+    python scripts/capacity_plan.py --target 200000 --fit --plan
+
+--fit estimates stage pass rates from stored leads (needs the database).
+--plan adds accounts / worker replicas until the target is met.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Dict
+
+# Add the parent directory to the Python path so we can import from app
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.capacity_planner import (
+    STAGE_ORDER,
+    build_pipeline_model,
+    fit_pass_rates,
+    plan_capacity,
+    simulate
+)
+
+
+def parse_stage_values(values, cast) -> Dict[str, float]:
+    """Parse repeated stage=value arguments."""
+    parsed = {}
+    for item in values or []:
+        stage, _, value = item.partition('=')
+        if stage not in STAGE_ORDER or not value:
+            raise argparse.ArgumentTypeError(
+                f"Expected stage=value with stage in {', '.join(STAGE_ORDER)}, got: {item}"
+            )
+        parsed[stage] = cast(value)
+    return parsed
+
+
+def print_report(report: dict, added: Dict[str, int]) -> None:
+    status = "MET" if report['meets_target'] else "NOT MET"
+    print(f"""
+=== CAPACITY PLAN ===
+
+Target: {report['monthly_target']:,} emails/month over {report['days']:g} days ({status})
+Leads to scrape: {report['required_leads']:,} in {report['actor_runs']} actor runs (${report['actor_cost']:,.2f})
+Sent: {report['sent']:,} ({report['sent_within_window']:,} inside the window)
+Sustained throughput: {report['throughput_per_month']:,} emails/month
+Time to complete: {report['time_to_complete_days']:.2f} days
+Bottleneck: {report['bottleneck']}
+Max worker queue: {report['max_worker_queue']:,} tasks
+""")
+    print(f"{'Stage':<20}{'Accounts':>9}{'Calls':>10}{'Pass':>7}{'Util':>7}{'Mean wait':>11}{'Queue/h':>9}")
+    for name, stage in report['stages'].items():
+        utilization = report['utilization'].get(name)
+        print(
+            f"{name:<20}{stage['accounts']:>9}{stage['calls']:>10,}{stage['pass_rate']:>7.2f}"
+            f"{(f'{utilization:.0%}' if utilization is not None else '-'):>7}"
+            f"{stage['mean_wait_seconds']:>10.1f}s{report['queue_growth_per_hour'][name]:>9.1f}"
+        )
+        if stage['http_pool_exceeded']:
+            print(f"  ! {name} needs more connections than VENDOR_HTTP_POOL_SIZE allows")
+    print(f"{'workers':<20}{'':>9}{'':>10}{'':>7}{report['utilization']['workers']:>7.0%}"
+          f"{'':>11}{report['queue_growth_per_hour']['workers']:>9.1f}")
+
+    recommendations = report['recommendations']
+    print("\nSteady-state minimum (no limiter waits):")
+    for name, count in recommendations['accounts'].items():
+        print(f"  - {name}: {count} account(s)")
+    print(f"  - workers: {recommendations['worker_slots']} slots ({recommendations['worker_replicas']} replicas)")
+    if added:
+        print("\nAdded to meet the target:")
+        for name, count in added.items():
+            print(f"  - {name}: +{count} {'replica(s)' if name == 'workers' else 'account(s)'}")
+
+
+def main():
+    """Main entry point for the capacity planning script."""
+    parser = argparse.ArgumentParser(description='Simulate pipeline capacity for a monthly target')
+    parser.add_argument('--target', type=int, default=80000, help='Emails to send per month (default: 80000)')
+    parser.add_argument('--days', type=float, default=30, help='Length of the simulated window in days')
+    parser.add_argument('--replicas', type=int, help='Worker replicas (default: WORKER_REPLICAS)')
+    parser.add_argument('--concurrency', type=int, help='Celery concurrency (default: WORKER_CONCURRENCY)')
+    parser.add_argument('--accounts', action='append', metavar='STAGE=N', help='Vendor accounts for a stage')
+    parser.add_argument('--pass-rate', action='append', metavar='STAGE=RATE', help='Pass rate for a stage')
+    parser.add_argument('--latency', action='append', metavar='STAGE=SECONDS', help='Call latency for a stage')
+    parser.add_argument('--company-lookup-ratio', type=float, default=1.0,
+                        help='Company-context Perplexity calls per lead (default: 1.0)')
+    parser.add_argument('--openai-batch', action='store_true', help='Generate email copy with OpenAI batches')
+    parser.add_argument('--fit', action='store_true', help='Fit pass rates from stored leads')
+    parser.add_argument('--plan', action='store_true', help='Add accounts / replicas until the target is met')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed')
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+
+    args = parser.parse_args()
+
+    try:
+        pass_rates = parse_stage_values(args.pass_rate, float)
+        accounts = parse_stage_values(args.accounts, int)
+        latencies = parse_stage_values(args.latency, float)
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+
+    if args.fit:
+        from app.core.database import SessionLocal
+        db = SessionLocal()
+        try:
+            fitted = fit_pass_rates(db)
+        finally:
+            db.close()
+        # Explicit --pass-rate values win over fitted ones
+        pass_rates = {**fitted, **pass_rates}
+        if not args.json:
+            print("Fitted pass rates: " + (", ".join(f"{k}={v:.3f}" for k, v in fitted.items()) or "none"))
+
+    model = build_pipeline_model(
+        pass_rates=pass_rates,
+        latencies=latencies,
+        accounts=accounts,
+        worker_replicas=args.replicas,
+        worker_concurrency=args.concurrency,
+        company_lookup_ratio=args.company_lookup_ratio,
+        openai_batch=args.openai_batch
+    )
+
+    added = {}
+    if args.plan:
+        result, added = plan_capacity(model, args.target, days=args.days, seed=args.seed)
+    else:
+        result = simulate(model, args.target, days=args.days, seed=args.seed)
+
+    report = result.to_dict()
+    if args.json:
+        print(json.dumps({**report, 'added': added}, indent=2))
+    else:
+        print_report(report, added)
+
+    sys.exit(0 if result.meets_target else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Query Plan Script
+
+Replays the hot job and lead queries with EXPLAIN (ANALYZE, BUFFERS) against
+DATABASE_URL and flags sequential scans of large tables. Exits with 1 when a
+query is flagged, so it can gate a migration or run in CI.
+
+Usage:
+    python scripts/explain_queries.py
+    python scripts/explain_queries.py --prefer-indexes            # small / dev databases
+    python scripts/explain_queries.py --campaign-id <id> --query campaign_leads --plan
+    python scripts/explain_queries.py --json | jq '.[] | select(.flagged)'
+
+The queries run inside a transaction that is rolled back. ANALYZE executes
+them; use --no-analyze on a busy primary to get estimated plans only.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+# Add the parent directory to the Python path so we can import from app
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.query_plans import DEFAULT_MIN_ROWS, HOT_QUERIES, explain_hot_queries, sample_params
+
+
+def print_report(reports, show_plan: bool) -> None:
+    print(f"{'Query':<28}{'Time':>10}{'Hit':>8}{'Read':>8}  Scans")
+    for report in reports:
+        time_ms = f"{report.execution_ms:.2f}ms" if report.execution_ms is not None else '-'
+        hit = report.shared_hit_blocks if report.shared_hit_blocks is not None else '-'
+        read = report.shared_read_blocks if report.shared_read_blocks is not None else '-'
+        marker = '!' if report.flagged else ' '
+        print(f"{marker}{report.name:<27}{time_ms:>10}{hit:>8}{read:>8}  {'; '.join(report.scans)}")
+        if show_plan:
+            print(f"    {report.sql}")
+            print('    ' + json.dumps(report.plan['Plan'], indent=2).replace('\n', '\n    '))
+
+    flagged = [report for report in reports if report.flagged]
+    if flagged:
+        print("\nSequential scans of large tables:")
+        for report in flagged:
+            print(f"  - {report.name}: {', '.join(report.seq_scans)}")
+    else:
+        print("\nNo flagged sequential scans.")
+
+
+def main():
+    """Main entry point for the query plan script."""
+    parser = argparse.ArgumentParser(description='Explain the hot job/lead queries and flag sequential scans')
+    parser.add_argument('--campaign-id', help='Campaign to use (default: the one with the most leads)')
+    parser.add_argument('--job-id', help='Enrichment job to use (default: one of a lead)')
+    parser.add_argument('--min-rows', type=int, default=DEFAULT_MIN_ROWS,
+                        help=f'Flag sequential scans of tables with at least this many rows (default: {DEFAULT_MIN_ROWS})')
+    parser.add_argument('--prefer-indexes', action='store_true',
+                        help='Disable sequential scans; flag every query that still needs one')
+    parser.add_argument('--no-analyze', action='store_true', help='Estimated plans only, without running the queries')
+    parser.add_argument('--query', action='append', choices=HOT_QUERIES, help='Only this query (repeatable)')
+    parser.add_argument('--plan', action='store_true', help='Print the SQL and full plan of each query')
+    parser.add_argument('--json', action='store_true', help='Print the reports as JSON')
+
+    args = parser.parse_args()
+
+    from app.core.database import SessionLocal
+    db = SessionLocal()
+    try:
+        params = sample_params(db, campaign_id=args.campaign_id, job_id=args.job_id)
+        reports = explain_hot_queries(
+            db,
+            params=params,
+            analyze=not args.no_analyze,
+            prefer_indexes=args.prefer_indexes,
+            min_rows=args.min_rows,
+            names=args.query
+        )
+    finally:
+        db.close()
+
+    if args.json:
+        print(json.dumps([report.to_dict() for report in reports], indent=2))
+    else:
+        print_report(reports, args.plan)
+
+    sys.exit(1 if any(report.flagged for report in reports) else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Log Viewer Script
+
+Merges the per-process log files in LOG_DIR (combined-<hostname>-<pid>.log and
+their rotated, possibly compressed segments) into one stream ordered by
+timestamp, filters it, and optionally follows new lines across all processes.
+
+Usage:
+    python scripts/logs.py --since 1h --level ERROR
+    python scripts/logs.py --component campaign_tasks --grep "lead 3f2b"
+    python scripts/logs.py --errors --follow        # what `make tail-errors` runs
+    python scripts/logs.py --follow --json | jq 'select(.campaign_id)'
+
+--errors keeps ERROR and above plus lines about failures, timeouts, circuit
+breakers and rate limits. LOG_DIR is read from the environment (default ./logs);
+settings are not loaded, so the script works without a database.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+# Add the parent directory to the Python path so we can import from app
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.log_files import LogFollower, LogQuery, merge_logs, parse_since
+
+
+def format_record(stream: str, record: dict, as_json: bool) -> str:
+    """One output line: the raw JSON, or timestamp, level, process file, source and message."""
+    if as_json:
+        return json.dumps(record, ensure_ascii=False)
+    line = (f"{record.get('timestamp', '')} {record.get('level', '') or '-':<8} "
+            f"[{stream[:-len('.log')]}] {record.get('source') or record.get('name') or ''}: "
+            f"{record.get('message', '')}")
+    if record.get('exc_text'):
+        line += '\n' + record['exc_text']
+    return line
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description='Merge, filter and follow the per-process log files')
+    parser.add_argument('--dir', default=os.getenv('LOG_DIR', './logs'), help='Log directory (default: $LOG_DIR or ./logs)')
+    parser.add_argument('--level', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL'], type=str.upper,
+                        help='Minimum level')
+    parser.add_argument('--grep', help='Case-insensitive regex on the message and error fields')
+    parser.add_argument('--component', action='append', help='Only this component (repeatable)')
+    parser.add_argument('--since', help="Only records after this: 15m, 2h, 1d or an ISO timestamp (UTC)")
+    parser.add_argument('--errors', action='store_true',
+                        help='Errors plus failure, timeout, circuit breaker and rate limit lines')
+    parser.add_argument('--follow', '-f', action='store_true', help='Keep printing new lines from every process')
+    parser.add_argument('--current-only', action='store_true', help='Skip rotated segments')
+    parser.add_argument('--json', action='store_true', help='Print the JSON records unchanged')
+    parser.add_argument('--interval', type=float, default=1.0, help='Poll interval for --follow in seconds')
+
+    args = parser.parse_args()
+    if not os.path.isdir(args.dir):
+        parser.error(f"Log directory not found: {args.dir}")
+
+    try:
+        since = parse_since(args.since) if args.since else None
+    except ValueError:
+        parser.error(f"Invalid --since value: {args.since}")
+    query = LogQuery(min_level=args.level, pattern=args.grep, components=args.component,
+                     since=since, attention=args.errors)
+
+    try:
+        if args.follow:
+            follower = LogFollower(args.dir)
+            while True:
+                for stream, record in follower.poll():
+                    if query.matches(record):
+                        print(format_record(stream, record, args.json), flush=True)
+                time.sleep(args.interval)
+        else:
+            for stream, record in merge_logs(args.dir, include_rotated=not args.current_only):
+                if query.matches(record):
+                    print(format_record(stream, record, args.json))
+    except (KeyboardInterrupt, BrokenPipeError):
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -26,6 +26,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from app.core.logger import get_logger
 from app.core.config import settings
+from app.core.log_files import process_log_filename
 
 class LoggingSystemValidator:
     """Validates the unified logging system through operational tests."""
@@ -33,7 +34,7 @@ class LoggingSystemValidator:
     def __init__(self):
         self.logger = get_logger("logging.validator")
         self.results: Dict[str, Dict[str, Any]] = {}
-        self.log_file_path = Path(settings.LOG_DIR) / "combined.log"
+        self.log_file_path = Path(process_log_filename(settings.LOG_DIR))
     
     def run_all_tests(self) -> Dict[str, Dict[str, Any]]:
         """Run all validation tests and return results."""
@@ -165,7 +166,7 @@ class LoggingSystemValidator:
         large_message = "X" * 1024  # 1KB message
         messages_needed = (settings.LOG_ROTATION_SIZE // 1024) + 100  # Exceed rotation size
         
-        initial_files = list(self.log_file_path.parent.glob("combined.log*"))
+        initial_files = list(self.log_file_path.parent.glob(f"{self.log_file_path.name}*"))
         results["initial_file_count"] = len(initial_files)
         
         # Generate logs to exceed rotation size
@@ -177,20 +178,20 @@ class LoggingSystemValidator:
             
             # Check for rotation every 1000 messages
             if i % 1000 == 0:
-                files = list(self.log_file_path.parent.glob("combined.log*"))
+                files = list(self.log_file_path.parent.glob(f"{self.log_file_path.name}*"))
                 if len(files) > len(initial_files):
                     results["rotation_triggered"] = True
                     results["messages_to_rotation"] = i + 1
                     break
         
         # Check final file state
-        final_files = list(self.log_file_path.parent.glob("combined.log*"))
+        final_files = list(self.log_file_path.parent.glob(f"{self.log_file_path.name}*"))
         results["final_file_count"] = len(final_files)
         results["rotation_occurred"] = len(final_files) > len(initial_files)
         
         if results.get("rotation_occurred"):
             # Check for backup files
-            backup_files = [f for f in final_files if f.name != "combined.log"]
+            backup_files = [f for f in final_files if f.name != self.log_file_path.name]
             results["backup_files"] = [f.name for f in backup_files]
             results["backup_count_correct"] = len(backup_files) <= settings.LOG_BACKUP_COUNT
         
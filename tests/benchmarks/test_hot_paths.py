@@ -0,0 +1,186 @@
+"""
+Micro-benchmarks for code that runs on every lead, request or log line.
+
+Each benchmark fails when its mean exceeds the ceiling in THRESHOLDS_US.
+Ceilings are set well above the expected mean, so they only catch large
+slowdowns. On a slow machine, scale them with BENCHMARK_THRESHOLD_SCALE.
+Smaller regressions show up when runs are compared against a saved baseline:
+
+    pytest tests/benchmarks --benchmark-autosave
+    pytest tests/benchmarks --benchmark-compare --benchmark-compare-fail=mean:15%
+
+Redis is replaced by fakeredis, so the numbers cover our code and the client
+library and leave out network round trips. Models come from the test
+Postgres database.
+"""
+import logging
+import os
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+fakeredis = pytest.importorskip("fakeredis")
+
+from app.core.api_integration_rate_limiter import ApiIntegrationRateLimiter
+from app.core.circuit_breaker import CircuitBreakerService
+from app.core.logging_config import LogSanitizer, SanitizingFilter
+from app.models.campaign import Campaign
+from app.models.campaign_status import CampaignStatus
+from app.models.lead import Lead
+from app.schemas.campaign import CampaignResponse
+from app.schemas.lead import LeadResponse
+
+# Mean time per call, in microseconds
+THRESHOLDS_US = {
+    'limiter_acquire': 2000,
+    'limiter_acquire_denied': 1500,
+    'breaker_should_allow_request': 400,
+    'sanitize_log_record': 100,
+    'sanitizing_filter': 150,
+    'lead_to_dict': 100,
+    'campaign_to_dict': 80,
+    'lead_response': 120,
+    'campaign_response': 100,
+}
+
+THRESHOLD_SCALE = float(os.getenv("BENCHMARK_THRESHOLD_SCALE", "1"))
+
+
+def assert_under_threshold(benchmark, name: str) -> None:
+    """Fail if the benchmark's mean time is above its ceiling."""
+    if benchmark.disabled:
+        return
+    mean_us = benchmark.stats.stats.mean * 1_000_000
+    limit_us = THRESHOLDS_US[name] * THRESHOLD_SCALE
+    assert mean_us < limit_us, f"{name} took {mean_us:.1f}us per call, threshold is {limit_us:.0f}us"
+
+
+@pytest.fixture
+def fake_redis():
+    client = fakeredis.FakeRedis(decode_responses=True)
+    yield client
+    client.flushall()
+
+
+def _log_record() -> logging.LogRecord:
+    """A typical pipeline INFO line with structured extras."""
+    record = logging.LogRecord(
+        'app.workers.campaign_tasks', logging.INFO, __file__, 1,
+        "Enrichment completed for lead 3f2b6c1e-8d4a-4f7e-9b1a-2c5d7e9f0a1b in campaign ACME Q3 outbound",
+        None, None
+    )
+    record.__dict__.update({
+        'component': 'campaign_tasks',
+        'lead_id': '3f2b6c1e-8d4a-4f7e-9b1a-2c5d7e9f0a1b',
+        'campaign_id': '7a9c2e4f-1b3d-4f5a-8c6e-0d2f4a6b8c0e',
+        'email': 'jane.doe@example.com',
+        'duration_ms': 812.4,
+        'rate_limiter_remaining': 12,
+    })
+    return record
+
+
+@pytest.fixture
+def campaign(db_session, organization):
+    campaign = Campaign(
+        name="Benchmark Campaign",
+        description="Campaign used by the hot path benchmarks",
+        organization_id=organization.id,
+        status=CampaignStatus.RUNNING,
+        fileName="benchmark.csv",
+        totalRecords=500,
+        url="https://app.apollo.io/#/people?page=1",
+        instantly_campaign_id="instantly-benchmark"
+    )
+    db_session.add(campaign)
+    db_session.commit()
+    db_session.refresh(campaign)
+    return campaign
+
+
+@pytest.fixture
+def lead(db_session, campaign):
+    lead = Lead(
+        campaign_id=campaign.id,
+        first_name="Jane",
+        last_name="Doe",
+        email="jane.doe@example.com",
+        company="Example Corp",
+        title="VP Sales",
+        linkedin_url="https://www.linkedin.com/in/janedoe",
+        raw_data={
+            'id': 'apollo-1', 'name': 'Jane Doe', 'headline': 'VP Sales at Example Corp',
+            'organization': {'name': 'Example Corp', 'website_url': 'https://example.com',
+                             'estimated_num_employees': 250, 'industry': 'software'},
+            'employment_history': [{'title': 'Sales Director', 'organization_name': 'Other Co'}] * 5,
+            'departments': ['sales'], 'seniority': 'vp'
+        },
+        email_verification={'email': 'jane.doe@example.com', 'result': 'ok', 'quality': 'good'},
+        enrichment_results={'choices': [{'message': {'content': 'Example Corp recently expanded. ' * 20}}]},
+        email_copy_gen_results={'choices': [{'message': {'content': 'Hi Jane, I noticed... ' * 15}}]},
+        instantly_lead_record={'id': 'instantly-1', 'email': 'jane.doe@example.com'}
+    )
+    db_session.add(lead)
+    db_session.commit()
+    db_session.refresh(lead)
+    return lead
+
+
+class TestRateLimiterBenchmarks:
+
+    def test_acquire(self, benchmark, fake_redis):
+        limiter = ApiIntegrationRateLimiter(fake_redis, 'Benchmark', max_requests=10**9, period_seconds=60)
+        assert benchmark(limiter.acquire) is True
+        assert_under_threshold(benchmark, 'limiter_acquire')
+
+    def test_acquire_denied(self, benchmark, fake_redis):
+        limiter = ApiIntegrationRateLimiter(fake_redis, 'Benchmark', max_requests=1, period_seconds=60)
+        limiter.acquire()
+        assert benchmark(limiter.acquire) is False
+        assert_under_threshold(benchmark, 'limiter_acquire_denied')
+
+
+class TestCircuitBreakerBenchmarks:
+
+    def test_should_allow_request(self, benchmark, fake_redis):
+        breaker = CircuitBreakerService(fake_redis)
+        assert benchmark(breaker.should_allow_request) is True
+        assert_under_threshold(benchmark, 'breaker_should_allow_request')
+
+
+class TestLogSanitizerBenchmarks:
+
+    def test_sanitize_log_record(self, benchmark):
+        benchmark.pedantic(
+            LogSanitizer.sanitize_log_record, setup=lambda: ((_log_record(),), {}),
+            rounds=2000, warmup_rounds=50
+        )
+        assert_under_threshold(benchmark, 'sanitize_log_record')
+
+    def test_sanitizing_filter(self, benchmark):
+        log_filter = SanitizingFilter()
+        benchmark.pedantic(
+            log_filter.filter, setup=lambda: ((_log_record(),), {}),
+            rounds=2000, warmup_rounds=50
+        )
+        assert_under_threshold(benchmark, 'sanitizing_filter')
+
+
+class TestSerializationBenchmarks:
+
+    def test_lead_to_dict(self, benchmark, lead):
+        assert benchmark(lead.to_dict)['email'] == lead.email
+        assert_under_threshold(benchmark, 'lead_to_dict')
+
+    def test_campaign_to_dict(self, benchmark, campaign):
+        assert benchmark(campaign.to_dict)['id'] == campaign.id
+        assert_under_threshold(benchmark, 'campaign_to_dict')
+
+    def test_lead_response(self, benchmark, lead):
+        response = benchmark(lambda: LeadResponse(**lead.to_dict()))
+        assert response.id == lead.id
+        assert_under_threshold(benchmark, 'lead_response')
+
+    def test_campaign_response(self, benchmark, campaign):
+        response = benchmark(CampaignResponse.from_campaign, campaign)
+        assert response.id == campaign.id
+        assert_under_threshold(benchmark, 'campaign_response')
@@ -1,12 +1,14 @@
 import os
 import pytest
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import NullPool
 from fastapi.testclient import TestClient
 import uuid
 
 from app.main import app
-from app.core.database import Base, get_db
+from app.core.database import Base, async_database_url, get_async_db, get_db
 from app.core.config import settings
 from app.models.organization import Organization
 from app.models.user import User
@@ -29,6 +31,11 @@ SQLALCHEMY_DATABASE_URL = f"postgresql://{settings.POSTGRES_USER}:{settings.POST
 engine = create_engine(SQLALCHEMY_DATABASE_URL, pool_pre_ping=True)
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# The async endpoints use asyncpg. NullPool because TestClient may run each request
+# on a new event loop and asyncpg connections can't move between loops.
+async_engine = create_async_engine(async_database_url(SQLALCHEMY_DATABASE_URL), poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 # Create tables
 Base.metadata.create_all(bind=engine)
 
@@ -40,18 +47,24 @@ def override_get_db():
     finally:
         db.close()
 
-# Override the dependency
+async def override_get_async_db():
+    """Override the async database dependency."""
+    async with TestingAsyncSessionLocal() as db:
+        yield db
+
+# Override the dependencies
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_async_db] = override_get_async_db
 
 @pytest.fixture(scope="function")
 def db_session():
-    """Create a fresh database session for each test with transaction rollback."""
-    connection = engine.connect()
-    transaction = connection.begin()
-    session = TestingSessionLocal(bind=connection)
-    
-    # Begin a nested transaction
-    session.begin_nested()
+    """Create a fresh database session for each test.
+
+    Commits are real so the async endpoints, which read through their own asyncpg
+    connection, see the test data; cleanup_database empties the tables around
+    every test.
+    """
+    session = TestingSessionLocal()
     
     # Override get_db to use this specific session
     def override_get_db_session():
@@ -61,10 +74,8 @@ def db_session():
     
     yield session
     
-    # Rollback the transaction
+    session.rollback()
     session.close()
-    transaction.rollback()
-    connection.close()
     
     # Restore original override
     app.dependency_overrides[get_db] = override_get_db
@@ -88,12 +99,16 @@ def cleanup_database():
     from app.models.organization import Organization
     from app.models.user import User
     from app.models.lead import Lead
+    from app.models.lead_trace import LeadTrace
+    from app.models.prompt_template import PromptTemplate
     
     # Clean before test
     db = TestingSessionLocal()
     try:
         # Delete in correct order to respect foreign keys
         # Leads must be deleted before campaigns
+        db.query(LeadTrace).delete()
+        db.query(PromptTemplate).delete()
         db.query(Lead).delete()
         db.query(Job).delete()
         db.query(Campaign).delete()
@@ -112,6 +127,8 @@ def cleanup_database():
     try:
         # Delete in correct order to respect foreign keys
         # Leads must be deleted before campaigns
+        db.query(LeadTrace).delete()
+        db.query(PromptTemplate).delete()
         db.query(Lead).delete()
         db.query(Job).delete()
         db.query(Campaign).delete()
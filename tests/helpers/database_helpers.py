@@ -20,7 +20,12 @@ from app.models.lead import Lead
 
 
 class DatabaseHelpers:
-    """Database verification helpers for testing."""
+    """
+    Database verification helpers for testing.
+
+    The API writes through its own async sessions, so lookups use
+    populate_existing() to re-read rows the test session already holds.
+    """
     
     def __init__(self, db_session: Session):
         """Initialize with database session."""
@@ -40,7 +45,7 @@ class DatabaseHelpers:
         Raises:
             AssertionError: If campaign not found or values don't match
         """
-        campaign = self.db_session.query(Campaign).filter(Campaign.id == campaign_id).first()
+        campaign = self.db_session.query(Campaign).populate_existing().filter(Campaign.id == campaign_id).first()
         assert campaign is not None, f"Campaign {campaign_id} not found in database"
         
         if expected_data:
@@ -72,7 +77,7 @@ class DatabaseHelpers:
         Raises:
             AssertionError: If campaign exists in database
         """
-        campaign = self.db_session.query(Campaign).filter(Campaign.id == campaign_id).first()
+        campaign = self.db_session.query(Campaign).populate_existing().filter(Campaign.id == campaign_id).first()
         assert campaign is None, f"Campaign {campaign_id} should not exist in database but was found"
     
     def count_campaigns_in_db(self) -> int:
@@ -139,7 +144,7 @@ class DatabaseHelpers:
         Raises:
             AssertionError: If status doesn't match
         """
-        campaign = self.db_session.query(Campaign).filter(Campaign.id == campaign_id).first()
+        campaign = self.db_session.query(Campaign).populate_existing().filter(Campaign.id == campaign_id).first()
         assert campaign is not None, f"Campaign {campaign_id} not found in database"
         
         # Convert string to CampaignStatus enum if needed
@@ -250,7 +255,7 @@ class DatabaseHelpers:
         Raises:
             AssertionError: If job not found or status doesn't match
         """
-        job = self.db_session.query(Job).filter(Job.id == job_id).first()
+        job = self.db_session.query(Job).populate_existing().filter(Job.id == job_id).first()
         assert job is not None, f"Job {job_id} not found in database"
         
         # Convert string to JobStatus enum if needed
@@ -278,7 +283,7 @@ class DatabaseHelpers:
         Raises:
             AssertionError: If timestamps are invalid
         """
-        campaign = self.db_session.query(Campaign).filter(Campaign.id == campaign_id).first()
+        campaign = self.db_session.query(Campaign).populate_existing().filter(Campaign.id == campaign_id).first()
         assert campaign is not None, f"Campaign {campaign_id} not found in database"
         
         # Verify created_at exists
@@ -347,7 +352,7 @@ class DatabaseHelpers:
         Raises:
             AssertionError: If lead not found or values don't match
         """
-        lead = self.db_session.query(Lead).filter(Lead.id == lead_id).first()
+        lead = self.db_session.query(Lead).populate_existing().filter(Lead.id == lead_id).first()
         assert lead is not None, f"Lead {lead_id} not found in database"
         if expected_data:
             for field, expected_value in expected_data.items():
@@ -0,0 +1,147 @@
+"""
+Local stub server mimicking the MillionVerifier bulk file API.
+
+Implements the three endpoints EmailVerifierService uses:
+    POST /upload    multipart upload of a CSV with an 'email' column
+    GET  /fileinfo  file status ('in_progress' until polled enough times, then 'finished')
+    GET  /download  result CSV (email,quality,result,free,role)
+
+Usage:
+    stub = MillionVerifierBulkStub(polls_until_finished=2, results={'bad@x.com': 'invalid'})
+    stub.start()
+    service.bulk_base_url = stub.base_url
+    ...
+    stub.stop()
+"""
+
+import csv
+import io
+import itertools
+import json
+import threading
+from email.parser import BytesParser
+from email.policy import default as default_policy
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+
+class MillionVerifierBulkStub:
+    """In-process HTTP server that behaves like the MillionVerifier bulk API."""
+
+    API_KEY = "test-key"
+
+    def __init__(self, polls_until_finished: int = 1, results: Optional[Dict[str, str]] = None,
+                 final_status: str = "finished"):
+        """
+        Args:
+            polls_until_finished: fileinfo calls answered 'in_progress' before the final status
+            results: Per-email result overrides; every other email is 'ok'
+            final_status: Status reported once processing is done ('finished' or 'error')
+        """
+        self.polls_until_finished = polls_until_finished
+        self.results = {k.lower(): v for k, v in (results or {}).items()}
+        self.final_status = final_status
+        self.files: Dict[str, Dict] = {}
+        self.requests: List[str] = []
+        self._ids = itertools.count(1000)
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/bulkapi/v2/"
+
+    def start(self) -> "MillionVerifierBulkStub":
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def _make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status: int, body: bytes, content_type: str = "application/json"):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _json(self, payload: Dict, status: int = 200):
+                self._send(status, json.dumps(payload).encode("utf-8"))
+
+            def _route(self):
+                parsed = urlparse(self.path)
+                params = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+                endpoint = parsed.path.rstrip("/").rsplit("/", 1)[-1]
+                stub.requests.append(endpoint)
+                if params.get("key") != stub.API_KEY:
+                    self._json({"error": "Invalid API key"}, status=401)
+                    return None, None
+                return endpoint, params
+
+            def do_POST(self):
+                endpoint, params = self._route()
+                if endpoint is None:
+                    return
+                if endpoint != "upload":
+                    self._json({"error": "Not found"}, status=404)
+                    return
+
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                message = BytesParser(policy=default_policy).parsebytes(
+                    f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode("utf-8") + body
+                )
+                emails = []
+                for part in message.iter_parts():
+                    if part.get_param("name", header="content-disposition") == "file_contents":
+                        text = part.get_payload(decode=True).decode("utf-8")
+                        emails = [row["email"] for row in csv.DictReader(io.StringIO(text))]
+
+                file_id = str(next(stub._ids))
+                stub.files[file_id] = {"emails": emails, "polls": 0}
+                self._json({"file_id": file_id, "status": "in_progress", "total_rows": len(emails)})
+
+            def do_GET(self):
+                endpoint, params = self._route()
+                if endpoint is None:
+                    return
+                file = stub.files.get(params.get("file_id", ""))
+                if not file:
+                    self._json({"error": "File not found"}, status=404)
+                    return
+
+                if endpoint == "fileinfo":
+                    file["polls"] += 1
+                    done = file["polls"] > stub.polls_until_finished
+                    self._json({
+                        "file_id": params["file_id"],
+                        "status": stub.final_status if done else "in_progress",
+                        "percent": 100 if done else 50,
+                        "total_rows": len(file["emails"])
+                    })
+                elif endpoint == "download":
+                    buffer = io.StringIO()
+                    writer = csv.writer(buffer)
+                    writer.writerow(["email", "quality", "result", "free", "role"])
+                    for email in file["emails"]:
+                        result = stub.results.get(email.lower(), "ok")
+                        quality = "good" if result == "ok" else "bad"
+                        writer.writerow([email, quality, result, "no", "no"])
+                    self._send(200, buffer.getvalue().encode("utf-8"), content_type="text/csv")
+                else:
+                    self._json({"error": "Not found"}, status=404)
+
+        return Handler
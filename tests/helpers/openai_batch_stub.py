@@ -0,0 +1,218 @@
+"""
+Local stub server mimicking the OpenAI Batch API.
+
+Implements the endpoints OpenAIService uses for batch email copy:
+    POST /v1/files                multipart upload of a JSONL input file (purpose=batch)
+    POST /v1/batches              create a batch for an uploaded file
+    GET  /v1/batches/{id}         batch status ('in_progress' until polled enough times)
+    GET  /v1/files/{id}/content   output / error JSONL file
+
+Usage:
+    stub = OpenAIBatchStub(polls_until_finished=1, fail_custom_ids={'lead-2'}).start()
+    with patch.object(settings, 'OPENAI_BASE_URL', stub.base_url):
+        service = OpenAIService()
+    ...
+    stub.stop()
+"""
+
+import itertools
+import json
+import threading
+import time
+from email.parser import BytesParser
+from email.policy import default as default_policy
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Set
+
+
+class OpenAIBatchStub:
+    """In-process HTTP server that behaves like the OpenAI files and batches API."""
+
+    API_KEY = "test-key"
+
+    def __init__(self, polls_until_finished: int = 1, fail_custom_ids: Optional[Set[str]] = None,
+                 drop_custom_ids: Optional[Set[str]] = None, final_status: str = "completed"):
+        """
+        Args:
+            polls_until_finished: Batch retrievals answered 'in_progress' before the final status
+            fail_custom_ids: Requests answered with an error line in the error file
+            drop_custom_ids: Requests left out of both output files (e.g. an expired batch)
+            final_status: Status reported once processing is done ('completed', 'expired', ...)
+        """
+        self.polls_until_finished = polls_until_finished
+        self.fail_custom_ids = set(fail_custom_ids or ())
+        self.drop_custom_ids = set(drop_custom_ids or ())
+        self.final_status = final_status
+        self.files: Dict[str, Dict] = {}
+        self.batches: Dict[str, Dict] = {}
+        self.requests: List[str] = []
+        self._ids = itertools.count(1)
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "OpenAIBatchStub":
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def _new_file(self, filename: str, purpose: str, content: bytes) -> Dict:
+        file_id = f"file-{next(self._ids)}"
+        self.files[file_id] = {
+            "id": file_id,
+            "object": "file",
+            "bytes": len(content),
+            "created_at": int(time.time()),
+            "filename": filename,
+            "purpose": purpose,
+            "status": "processed",
+            "content": content
+        }
+        return self.files[file_id]
+
+    def _finish(self, batch: Dict) -> None:
+        """Write output and error files for a batch's input requests."""
+        output_lines, error_lines = [], []
+        input_lines = self.files[batch["input_file_id"]]["content"].decode("utf-8").splitlines()
+        for line in filter(None, input_lines):
+            request = json.loads(line)
+            custom_id = request["custom_id"]
+            if custom_id in self.drop_custom_ids:
+                continue
+            if custom_id in self.fail_custom_ids:
+                error_lines.append({
+                    "id": f"batch_req_{custom_id}",
+                    "custom_id": custom_id,
+                    "response": {"status_code": 400, "body": {"error": {"message": "Invalid request"}}},
+                    "error": None
+                })
+                continue
+            output_lines.append({
+                "id": f"batch_req_{custom_id}",
+                "custom_id": custom_id,
+                "response": {
+                    "status_code": 200,
+                    "body": {
+                        "id": f"chatcmpl-{custom_id}",
+                        "object": "chat.completion",
+                        "model": request["body"]["model"],
+                        "choices": [{
+                            "index": 0,
+                            "message": {"role": "assistant", "content": f"Email copy for {custom_id}"},
+                            "finish_reason": "stop"
+                        }]
+                    }
+                },
+                "error": None
+            })
+
+        def to_jsonl(items):
+            return "".join(json.dumps(item) + "\n" for item in items).encode("utf-8")
+
+        if output_lines:
+            batch["output_file_id"] = self._new_file("output.jsonl", "batch_output", to_jsonl(output_lines))["id"]
+        if error_lines:
+            batch["error_file_id"] = self._new_file("errors.jsonl", "batch_output", to_jsonl(error_lines))["id"]
+        batch["request_counts"] = {
+            "total": len(input_lines),
+            "completed": len(output_lines),
+            "failed": len(error_lines)
+        }
+
+    def _make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status: int, body: bytes, content_type: str = "application/json"):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _json(self, payload: Dict, status: int = 200):
+                self._send(status, json.dumps(payload).encode("utf-8"))
+
+            def _route(self):
+                stub.requests.append(f"{self.command} {self.path}")
+                if self.headers.get("Authorization") != f"Bearer {stub.API_KEY}":
+                    self._json({"error": {"message": "Invalid API key"}}, status=401)
+                    return None
+                return self.path.split("?", 1)[0].rstrip("/").split("/")[2:]
+
+            def do_POST(self):
+                parts = self._route()
+                if parts is None:
+                    return
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+                if parts == ["files"]:
+                    message = BytesParser(policy=default_policy).parsebytes(
+                        f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode("utf-8") + body
+                    )
+                    fields, filename, content = {}, "input.jsonl", b""
+                    for part in message.iter_parts():
+                        name = part.get_param("name", header="content-disposition")
+                        if name == "file":
+                            filename = part.get_filename() or filename
+                            content = part.get_payload(decode=True)
+                        else:
+                            fields[name] = part.get_content().strip()
+                    file = stub._new_file(filename, fields.get("purpose", "batch"), content)
+                    self._json({k: v for k, v in file.items() if k != "content"})
+                elif parts == ["batches"]:
+                    request = json.loads(body)
+                    if request.get("input_file_id") not in stub.files:
+                        self._json({"error": {"message": "File not found"}}, status=404)
+                        return
+                    batch_id = f"batch_{next(stub._ids)}"
+                    stub.batches[batch_id] = {
+                        "id": batch_id,
+                        "object": "batch",
+                        "endpoint": request["endpoint"],
+                        "input_file_id": request["input_file_id"],
+                        "completion_window": request["completion_window"],
+                        "status": "validating",
+                        "created_at": int(time.time()),
+                        "output_file_id": None,
+                        "error_file_id": None,
+                        "polls": 0
+                    }
+                    self._json({k: v for k, v in stub.batches[batch_id].items() if k != "polls"})
+                else:
+                    self._json({"error": {"message": "Not found"}}, status=404)
+
+            def do_GET(self):
+                parts = self._route()
+                if parts is None:
+                    return
+
+                if len(parts) == 2 and parts[0] == "batches" and parts[1] in stub.batches:
+                    batch = stub.batches[parts[1]]
+                    batch["polls"] += 1
+                    if batch["polls"] > stub.polls_until_finished and batch["status"] != stub.final_status:
+                        stub._finish(batch)
+                        batch["status"] = stub.final_status
+                    elif batch["status"] == "validating":
+                        batch["status"] = "in_progress"
+                    self._json({k: v for k, v in batch.items() if k != "polls"})
+                elif len(parts) == 3 and parts[0] == "files" and parts[2] == "content" and parts[1] in stub.files:
+                    self._send(200, stub.files[parts[1]]["content"], content_type="application/octet-stream")
+                else:
+                    self._json({"error": {"message": "Not found"}}, status=404)
+
+        return Handler
@@ -148,7 +148,7 @@ class TestEndToEndRateLimiting:
         
         # Mock all external API calls
         with patch('requests.get') as mock_email_get, \
-             patch('requests.post') as mock_post, \
+             patch('requests.Session.post') as mock_post, \
              patch('app.background_services.openai_service.OpenAI') as mock_openai:
             
             # Setup mocks
@@ -126,7 +126,22 @@ class TestRedisIntegration:
         # Should be able to acquire again
         assert limiter.acquire() == True
         assert limiter.get_remaining() == 0
-    
+
+    def test_denied_attempts_do_not_extend_the_window(self, redis_client):
+        """Test that the window expiry is set on the first hit only."""
+        limiter = ApiIntegrationRateLimiter(
+            redis_client=redis_client,
+            api_name='TestWindow',
+            max_requests=1,
+            period_seconds=30
+        )
+        redis_client.delete(limiter.key)
+
+        assert limiter.acquire() == True
+        redis_client.expire(limiter.key, 10)
+        assert limiter.acquire() == False
+        assert 0 < redis_client.ttl(limiter.key) <= 10
+
     @patch.dict('os.environ', {'MILLIONVERIFIER_API_KEY': 'test_key'})
     def test_email_verifier_service_with_redis(self, redis_client):
         """Test EmailVerifierService with real Redis rate limiting."""
@@ -169,7 +184,7 @@ class TestRedisIntegration:
         redis_client.delete(rate_limiter.key)
         redis_client.delete(rate_limiter.last_request_key)
         
-        with patch('requests.post') as mock_post:
+        with patch('requests.Session.post') as mock_post:
             mock_response = Mock()
             mock_response.json.return_value = {'choices': [{'message': {'content': 'Test enrichment'}}]}
             mock_response.raise_for_status.return_value = None
@@ -211,7 +226,7 @@ class TestRedisIntegration:
         # Clear rate limit state
         redis_client.delete(rate_limiter.key)
         
-        with patch('requests.post') as mock_post:
+        with patch('requests.Session.post') as mock_post:
             mock_response = Mock()
             mock_response.json.return_value = {'id': 'test_lead_id', 'status': 'created'}
             mock_response.raise_for_status.return_value = None
@@ -0,0 +1,171 @@
+"""
+Tests for the async (asyncpg) session path used by the API endpoints.
+"""
+import asyncio
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from app.core.database import async_database_url
+from app.models.campaign import Campaign
+from app.models.campaign_status import CampaignStatus
+from app.models.job import Job, JobStatus, JobType
+from app.models.lead import Lead
+from app.schemas.lead import LeadCreate
+from app.services.campaign import CampaignService
+from app.services.lead import LeadService
+from tests.conftest import TestingAsyncSessionLocal, async_engine
+
+
+@contextmanager
+def count_async_queries():
+    """Collect the SQL statements sent through the asyncpg engine."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(async_engine.sync_engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(async_engine.sync_engine, 'before_cursor_execute', before_cursor_execute)
+
+
+def _campaign(db_session, organization, name="Async Campaign"):
+    campaign = Campaign(
+        name=name,
+        description="Campaign for async session tests",
+        organization_id=organization.id,
+        status=CampaignStatus.CREATED,
+        fileName="leads.csv",
+        totalRecords=10,
+        url="https://app.apollo.io/#/async-test",
+    )
+    db_session.add(campaign)
+    db_session.commit()
+    return campaign
+
+
+def _run(call):
+    """Run call(db) with a fresh AsyncSession on its own event loop."""
+    async def run():
+        async with TestingAsyncSessionLocal() as db:
+            return await call(db)
+    return asyncio.run(run())
+
+
+def test_async_database_url():
+    assert async_database_url("postgresql://u:p@db:5432/app") == "postgresql+asyncpg://u:p@db:5432/app"
+    assert async_database_url("postgresql+psycopg2://u:p@db/app") == "postgresql+asyncpg://u:p@db/app"
+    assert async_database_url("sqlite:///test.db") == "sqlite:///test.db"
+
+
+class TestLeadServiceAsync:
+    """Test LeadService on a real AsyncSession."""
+
+    def test_create_updates_existing_lead_by_email_and_campaign(self, db_session, organization):
+        campaign = _campaign(db_session, organization)
+        service = LeadService()
+        lead_in = LeadCreate(campaign_id=campaign.id, email="ada@example.com", first_name="Ada")
+
+        created = _run(lambda db: service.create_lead(lead_in, db))
+        updated = _run(lambda db: service.create_lead(
+            LeadCreate(campaign_id=campaign.id, email="ada@example.com", first_name="Grace"), db
+        ))
+
+        assert updated["id"] == created["id"]
+        assert updated["first_name"] == "Grace"
+        assert db_session.query(Lead).filter(Lead.campaign_id == campaign.id).count() == 1
+
+    def test_get_leads_filters_by_campaign(self, db_session, organization):
+        first, second = _campaign(db_session, organization, "First"), _campaign(db_session, organization, "Second")
+        db_session.add_all([
+            Lead(campaign_id=first.id, email="a@example.com"),
+            Lead(campaign_id=second.id, email="b@example.com"),
+        ])
+        db_session.commit()
+
+        leads = _run(lambda db: LeadService().get_leads(db, campaign_id=first.id))
+        assert [lead["email"] for lead in leads] == ["a@example.com"]
+
+
+class TestCampaignServiceAsync:
+    """Test CampaignService queries on a real AsyncSession."""
+
+    def test_get_campaigns_loads_latest_jobs_in_one_query(self, db_session, organization):
+        campaigns = [_campaign(db_session, organization, f"Campaign {i}") for i in range(3)]
+        now = datetime.utcnow()
+        for campaign in campaigns:
+            for age, job_status in ((2, JobStatus.COMPLETED), (1, JobStatus.FAILED)):
+                db_session.add(Job(
+                    campaign_id=campaign.id, name="FETCH_LEADS", job_type=JobType.FETCH_LEADS,
+                    status=job_status, created_at=now - timedelta(hours=age),
+                ))
+        db_session.commit()
+
+        with count_async_queries() as statements:
+            result = _run(lambda db: CampaignService().get_campaigns(db))
+
+        # One query for the campaigns and one for all their latest jobs
+        assert len(statements) == 2
+        assert len(result) == 3
+        assert {campaign["latest_job"]["status"] for campaign in result} == {JobStatus.FAILED.value}
+
+    def test_cleanup_campaign_jobs_deletes_old_jobs(self, db_session, organization):
+        campaign = _campaign(db_session, organization)
+        db_session.add_all([
+            Job(campaign_id=campaign.id, name="old", created_at=datetime.utcnow() - timedelta(days=10)),
+            Job(campaign_id=campaign.id, name="new"),
+        ])
+        db_session.commit()
+
+        result = _run(lambda db: CampaignService().cleanup_campaign_jobs(campaign.id, 7, db))
+
+        assert result["jobs_deleted"] == 1
+        assert [job.name for job in db_session.query(Job).filter(Job.campaign_id == campaign.id)] == ["new"]
+
+
+class TestAsyncEndpoints:
+    """Test that the converted endpoints read and write through asyncpg."""
+
+    def test_lead_endpoints_use_async_session(self, authenticated_client, db_session, organization):
+        campaign = _campaign(db_session, organization)
+
+        with count_async_queries() as statements:
+            created = authenticated_client.post("/api/v1/leads/", json={
+                "campaign_id": campaign.id, "email": f"lead{uuid.uuid4().hex[:6]}@example.com",
+                "email_verification": {"result": "ok"}
+            })
+        assert created.status_code == 201
+        assert statements, "the lead should be written through the async engine"
+
+        lead_id = created.json()["data"]["id"]
+        with count_async_queries() as statements:
+            listed = authenticated_client.get(f"/api/v1/leads/?campaign_id={campaign.id}")
+        assert [lead["id"] for lead in listed.json()["data"]["leads"]] == [lead_id]
+        # Listing returns the lead columns only and never reads lead_artifacts
+        assert listed.json()["data"]["leads"][0]["email_verification_status"] == "ok"
+        assert "email_verification" not in listed.json()["data"]["leads"][0]
+        assert not any("lead_artifacts" in statement for statement in statements)
+
+        # The detail loads the artifacts
+        detail = authenticated_client.get(f"/api/v1/leads/{lead_id}")
+        assert detail.json()["data"]["email_verification"] == {"result": "ok"}
+
+        updated = authenticated_client.put(f"/api/v1/leads/{lead_id}", json={"company": "Async Co"})
+        assert updated.json()["data"]["company"] == "Async Co"
+        assert db_session.get(Lead, lead_id).company == "Async Co"
+
+    def test_organization_list_counts_campaigns(self, authenticated_client, db_session, multiple_organizations):
+        _campaign(db_session, multiple_organizations[0])
+        _campaign(db_session, multiple_organizations[0], "Another")
+
+        response = authenticated_client.get("/api/v1/organizations/")
+        assert response.status_code == 200
+        counts = {org["id"]: org["campaign_count"] for org in response.json()["data"]}
+        assert counts == {
+            multiple_organizations[0].id: 2, multiple_organizations[1].id: 0, multiple_organizations[2].id: 0
+        }
@@ -0,0 +1,154 @@
+"""
+Tests for the capacity planner and its pipeline simulation.
+"""
+import pytest
+from unittest.mock import patch
+
+from app.core.capacity_planner import (
+    PipelineModel,
+    StageSpec,
+    _WindowLimiter,
+    build_pipeline_model,
+    fit_pass_rates,
+    plan_capacity,
+    simulate
+)
+from app.models.campaign import Campaign
+from app.models.campaign_status import CampaignStatus
+from app.models.lead import Lead
+
+
+def _model(perplexity_accounts=1, replicas=4, perplexity_latency=1.0, instantly_batch=1):
+    """Small pipeline: one Perplexity call per minute per account, everything else generous."""
+    stages = [
+        StageSpec('apollo', 30, 60, 60.0, 1.0, items_per_call=100),
+        StageSpec('email_verification', 60, 60, 0.5, 0.5),
+        StageSpec('perplexity', 1, 60, perplexity_latency, 1.0, accounts=perplexity_accounts),
+        StageSpec('openai', 60, 60, 1.0, 1.0),
+        StageSpec('instantly', 60, 60, 0.5, 1.0, items_per_call=instantly_batch)
+    ]
+    return PipelineModel(stages, worker_replicas=replicas, worker_concurrency=1, leads_per_run=100)
+
+
+class TestWindowLimiter:
+    """Test the simulated fixed-window limiter."""
+
+    def test_full_window_moves_to_next(self):
+        limiter = _WindowLimiter(capacity=2, period_seconds=10)
+        assert limiter.reserve(1) == 1
+        assert limiter.reserve(2) == 2
+        assert limiter.reserve(3) == 10
+        assert limiter.reserve(4) == 10
+        assert limiter.reserve(5) == 20
+        assert limiter.reserve(31) == 31
+
+
+class TestSimulation:
+    """Test throughput, bottleneck and queue reporting."""
+
+    def test_provisioned_pipeline_meets_target(self):
+        # 360 emails/day needs ~0.25 Perplexity calls/minute; 1 account allows 1
+        result = simulate(_model(), monthly_target=360 * 30, days=1)
+        assert result.meets_target
+        assert result.required_leads == 720
+        assert result.actor_runs == 8
+        assert abs(result.sent - 360) < 40
+        assert result.queue_growth_per_hour()['workers'] == pytest.approx(0, abs=1)
+
+    def test_results_are_reproducible(self):
+        first = simulate(_model(), monthly_target=3000, days=1, seed=7)
+        second = simulate(_model(), monthly_target=3000, days=1, seed=7)
+        assert first.to_dict() == second.to_dict()
+
+    def test_rate_limited_stage_is_the_bottleneck(self):
+        # 2,880 emails/day needs 2 Perplexity calls/minute; 1 account allows 1
+        result = simulate(_model(), monthly_target=2880 * 30, days=1)
+        assert not result.meets_target
+        assert result.bottleneck == 'perplexity'
+        assert result.stage_utilization()['perplexity'] > 0.95
+        assert result.time_to_complete_days > 1.5
+        assert result.queue_growth_per_hour()['workers'] > 0
+        assert result.recommendations()['accounts']['perplexity'] == 3
+
+    def test_worker_slots_can_be_the_bottleneck(self):
+        result = simulate(
+            _model(perplexity_accounts=100, replicas=1, perplexity_latency=300.0),
+            monthly_target=720 * 30,
+            days=1
+        )
+        assert not result.meets_target
+        assert result.bottleneck == 'workers'
+
+    def test_bulk_stage_carries_several_leads_per_call(self):
+        result = simulate(_model(instantly_batch=50), monthly_target=360 * 30, days=1)
+        stats = result.to_dict()['stages']['instantly']
+        assert stats['passed'] == result.sent
+        assert stats['calls'] == pytest.approx(result.sent / 50, abs=2)
+
+    def test_plan_adds_accounts_to_the_bottleneck(self):
+        result, added = plan_capacity(_model(), monthly_target=2000 * 30, days=1)
+        assert result.meets_target
+        assert added == {'perplexity': 1}
+
+    def test_zero_pass_rate_is_rejected(self):
+        model = _model()
+        model.stage('openai').pass_rate = 0
+        with pytest.raises(ValueError, match="Combined pass rate"):
+            simulate(model, monthly_target=100, days=1)
+
+
+class TestBuildPipelineModel:
+    """Test that the model follows the live settings."""
+
+    def test_limits_and_credentials_come_from_settings(self):
+        with patch.dict('os.environ', {'PERPLEXITY_TOKENS': 'a,b,c'}), \
+             patch('app.core.capacity_planner.settings.PERPLEXITY_RATE_LIMIT_REQUESTS', 4), \
+             patch('app.core.capacity_planner.settings.WORKER_REPLICAS', 5):
+            model = build_pipeline_model(accounts={'openai': 2})
+
+        perplexity = model.stage('perplexity')
+        assert perplexity.max_requests == 4
+        assert perplexity.accounts == 3
+        assert model.stage('openai').accounts == 2
+        assert model.worker_replicas == 5
+
+    def test_bulk_modes_change_the_stages(self):
+        with patch('app.core.capacity_planner.settings.EMAIL_VERIFICATION_BULK_ENABLED', True), \
+             patch('app.core.capacity_planner.settings.INSTANTLY_BULK_ENABLED', True), \
+             patch('app.core.capacity_planner.settings.COMPANY_ENRICHMENT_ENABLED', False):
+            model = build_pipeline_model(openai_batch=True)
+
+        assert not model.stage('email_verification').rate_limited
+        assert not model.stage('openai').rate_limited
+        assert model.stage('perplexity').calls_per_item == 1.0
+        assert model.stage('instantly').items_per_call > 1
+
+
+def test_fit_pass_rates_from_stored_leads(db_session, organization):
+    campaign = Campaign(
+        name="Capacity Campaign",
+        status=CampaignStatus.COMPLETED,
+        fileName="capacity.csv",
+        totalRecords=25,
+        url="https://app.apollo.io/capacity",
+        organization_id=organization.id
+    )
+    db_session.add(campaign)
+    db_session.commit()
+
+    for i in range(20):
+        db_session.add(Lead(
+            campaign_id=campaign.id,
+            email=f"capacity{i}@example.com",
+            email_verification={'result': 'ok' if i < 15 else 'invalid'},
+            enrichment_results={'choices': []} if i < 18 else {'error': 'HTTP 500'},
+            email_copy_gen_results={'status': 'batch_pending'} if i < 5 else {'choices': []}
+        ))
+    db_session.commit()
+
+    rates = fit_pass_rates(db_session, min_samples=10)
+    assert rates['apollo'] == pytest.approx(0.8)
+    assert rates['email_verification'] == pytest.approx(0.75)
+    assert rates['perplexity'] == pytest.approx(0.9)
+    assert rates['openai'] == pytest.approx(1.0)
+    assert 'instantly' not in rates
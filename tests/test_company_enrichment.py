@@ -0,0 +1,207 @@
+"""
+Tests for company-level enrichment dedup and single-flight coalescing.
+
+These tests use the real Redis connection (skipped if unavailable) and a mocked
+PerplexityService so no external API calls are made.
+"""
+import threading
+import time
+import pytest
+from unittest.mock import Mock, patch
+
+from app.core.config import get_redis_connection
+from app.background_services.company_enrichment_service import (
+    CompanyEnrichmentService,
+    normalize_company_name
+)
+from app.background_services.openai_service import OpenAIService
+from app.background_services.perplexity_service import PerplexityService
+from app.models.campaign import Campaign
+from app.models.campaign_status import CampaignStatus
+from app.models.lead import Lead
+from app.workers.campaign_tasks import _company_lead_count
+
+
+def _perplexity_response(content):
+    return {"choices": [{"message": {"content": content}}]}
+
+
+@pytest.fixture
+def redis_client():
+    """Redis client fixture - skip if Redis not available."""
+    try:
+        client = get_redis_connection()
+        client.ping()
+    except Exception as e:
+        pytest.skip(f"Redis not available: {str(e)}")
+    yield client
+    for key in client.scan_iter("company_enrichment:*"):
+        client.delete(key)
+
+
+class TestNormalizeCompanyName:
+    """Test company name normalization used as the dedup key."""
+
+    def test_case_punctuation_and_suffixes(self):
+        assert normalize_company_name("Acme, Inc.") == "acme"
+        assert normalize_company_name("ACME Inc") == "acme"
+        assert normalize_company_name("  Acme   Widgets  LLC ") == "acme widgets"
+
+    def test_suffix_only_name_is_kept(self):
+        assert normalize_company_name("Company") == "company"
+
+    def test_empty_values(self):
+        assert normalize_company_name(None) == ""
+        assert normalize_company_name("  ,. ") == ""
+
+
+class TestCompanyEnrichmentService:
+    """Test caching and single-flight behaviour."""
+
+    def test_cache_hit_skips_vendor_call(self, redis_client):
+        perplexity = Mock()
+        perplexity.enrich_company.return_value = _perplexity_response("Acme builds widgets.")
+        service = CompanyEnrichmentService(redis_client, perplexity, ttl_seconds=60)
+
+        assert service.get_company_context("Acme, Inc.") == "Acme builds widgets."
+        assert service.get_company_context("ACME inc") == "Acme builds widgets."
+        assert perplexity.enrich_company.call_count == 1
+
+    def test_failed_lookup_is_not_cached(self, redis_client):
+        perplexity = Mock()
+        perplexity.enrich_company.return_value = {"error": "boom"}
+        service = CompanyEnrichmentService(redis_client, perplexity, ttl_seconds=60)
+
+        assert service.get_company_context("Failing Co") is None
+        assert service.get_company_context("Failing Co") is None
+        assert perplexity.enrich_company.call_count == 2
+        # Lock must be released after a failure
+        assert not redis_client.exists("company_enrichment:lock:failing")
+
+    def test_concurrent_requests_are_coalesced(self, redis_client):
+        def slow_enrich(company):
+            time.sleep(0.5)
+            return _perplexity_response("Shared context")
+
+        perplexity = Mock()
+        perplexity.enrich_company.side_effect = slow_enrich
+        service = CompanyEnrichmentService(redis_client, perplexity, ttl_seconds=60, wait_timeout=5)
+        service.POLL_INTERVAL = 0.05
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(service.get_company_context("Globex")))
+            for _ in range(5)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert results == ["Shared context"] * 5
+        assert perplexity.enrich_company.call_count == 1
+
+    def test_cache_only_lookup_skips_vendor_call(self, redis_client):
+        perplexity = Mock()
+        perplexity.enrich_company.return_value = _perplexity_response("Initech makes TPS reports.")
+        service = CompanyEnrichmentService(redis_client, perplexity, ttl_seconds=60)
+
+        assert service.get_company_context("Initech", fetch_on_miss=False) is None
+        assert service.vendor_calls == 0
+        assert service.get_company_context("Initech") == "Initech makes TPS reports."
+        assert service.get_company_context("Initech", fetch_on_miss=False) == "Initech makes TPS reports."
+        assert service.vendor_calls == 1
+
+    def test_follower_gives_up_when_lock_check_fails(self):
+        redis_client = Mock()
+        redis_client.get.return_value = None
+        redis_client.set.return_value = False
+        redis_client.exists.side_effect = ConnectionError("Redis down")
+        perplexity = Mock()
+        service = CompanyEnrichmentService(redis_client, perplexity, wait_timeout=5)
+
+        assert service.get_company_context("Hooli") is None
+        perplexity.enrich_company.assert_not_called()
+
+    def test_missing_company_returns_none(self, redis_client):
+        perplexity = Mock()
+        service = CompanyEnrichmentService(redis_client, perplexity)
+        assert service.get_company_context(None) is None
+        perplexity.enrich_company.assert_not_called()
+
+
+class TestPerplexityPromptMerging:
+    """Test the person-level prompt of a lead whose company is already researched."""
+
+    @pytest.fixture
+    def service(self):
+        with patch.dict('os.environ', {'PERPLEXITY_TOKEN': 'test-token'}):
+            return PerplexityService()
+
+    @pytest.fixture
+    def lead(self):
+        return Lead(
+            id="lead-1",
+            first_name="Jane",
+            last_name="Doe",
+            company="Acme",
+            title="CTO",
+            raw_data={"headline": "CTO at Acme"}
+        )
+
+    def test_prompt_without_context_is_unchanged(self, service, lead):
+        prompt = service.build_prompt(lead)
+        assert prompt["messages"][1]["content"] == "Jane Doe who is the CTO at Acme at Acme"
+
+    def test_prompt_with_context(self, service, lead):
+        prompt = service.build_prompt(lead, company_context="Acme builds widgets.")
+        content = prompt["messages"][1]["content"]
+        assert content.startswith("Jane Doe who is the CTO at Acme at Acme")
+        assert "Acme builds widgets." in content
+        assert prompt["max_tokens"] == 300
+
+    def test_result_carries_the_company_context(self, service, lead):
+        response = _perplexity_response("Jane leads engineering.")
+        with patch.object(service, '_request_completion', return_value=response):
+            result = service.enrich_lead(lead, company_context="Acme builds widgets.")
+
+        assert result["company_context"] == "Acme builds widgets."
+        assert "company_context" not in response
+
+        with patch.dict('os.environ', {'OPENAI_API_KEY': 'test-key'}):
+            openai_service = OpenAIService()
+        request = openai_service.build_email_copy_request(lead, result)
+        content = request["messages"][1]["content"]
+        assert "Jane leads engineering.\n\nCompany: Acme builds widgets." in content
+
+    def test_company_prompt_requires_name(self, service):
+        with pytest.raises(ValueError):
+            service.build_company_prompt("")
+
+
+class TestCompanyLeadCount:
+    """Test the per-campaign company counts that gate company lookups."""
+
+    def test_counts_are_read_once_per_campaign(self, redis_client, db_session, organization):
+        campaign = Campaign(
+            name="Company Campaign", status=CampaignStatus.RUNNING, fileName="companies.csv",
+            totalRecords=3, url="https://app.apollo.io/companies", organization_id=organization.id
+        )
+        db_session.add(campaign)
+        db_session.commit()
+        leads = [
+            Lead(campaign_id=campaign.id, email="a@acme.com", company="Acme, Inc."),
+            Lead(campaign_id=campaign.id, email="b@acme.com", company="ACME"),
+            Lead(campaign_id=campaign.id, email="c@globex.com", company="Globex"),
+        ]
+        db_session.add_all(leads)
+        db_session.commit()
+
+        assert _company_lead_count(db_session, redis_client, leads[0]) == 2
+        assert _company_lead_count(db_session, redis_client, leads[2]) == 1
+
+        # Later leads of the campaign are counted once the cached counts expire
+        db_session.add(Lead(campaign_id=campaign.id, email="d@globex.com", company="Globex"))
+        db_session.commit()
+        assert _company_lead_count(db_session, redis_client, leads[2]) == 1
+        assert _company_lead_count(db_session, redis_client, Lead(campaign_id=campaign.id, company=None)) == 0
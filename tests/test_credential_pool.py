@@ -0,0 +1,134 @@
+"""
+Tests for multi-key vendor credential pools.
+
+These tests use the real Redis connection (skipped if unavailable). Vendor
+HTTP calls are mocked.
+"""
+import uuid
+import pytest
+from unittest.mock import Mock, patch
+
+from app.core.api_integration_rate_limiter import ApiIntegrationRateLimiter
+from app.core.config import get_redis_connection, settings
+from app.core.credential_pool import (
+    CredentialPool,
+    build_rate_limiter,
+    credential_id,
+    get_vendor_credentials
+)
+from app.core.dependencies import get_perplexity_rate_limiter
+from app.background_services.perplexity_service import PerplexityService
+from app.models.lead import Lead
+
+
+@pytest.fixture
+def redis_client():
+    """Redis client fixture - skip if Redis not available."""
+    try:
+        client = get_redis_connection()
+        client.ping()
+    except Exception as e:
+        pytest.skip(f"Redis not available: {str(e)}")
+    yield client
+    for pattern in ("ratelimit:PoolTest*", "credential_quarantine:PoolTest*"):
+        for key in client.scan_iter(pattern):
+            client.delete(key)
+
+
+@pytest.fixture
+def pool(redis_client):
+    api_name = f"PoolTest-{uuid.uuid4().hex[:8]}"
+    return CredentialPool(redis_client, api_name, ["key-a", "key-b", "key-c"], max_requests=2, period_seconds=60)
+
+
+class TestCredentials:
+    """Test credential configuration."""
+
+    def test_pool_env_wins_over_single_key(self):
+        with patch.dict('os.environ', {'X_KEYS': 'a, b,,a', 'X_KEY': 'single'}):
+            assert get_vendor_credentials('X_KEYS', 'X_KEY') == ['a', 'b']
+        with patch.dict('os.environ', {'X_KEY': 'single'}, clear=True):
+            assert get_vendor_credentials('X_KEYS', 'X_KEY') == ['single']
+
+    def test_single_credential_keeps_plain_limiter(self):
+        limiter = build_rate_limiter(Mock(), 'Perplexity', ['only'], 1, 5)
+        assert type(limiter) is ApiIntegrationRateLimiter
+        assert limiter.key == "ratelimit:Perplexity"
+
+    def test_dependency_builds_pool_from_env(self):
+        with patch.dict('os.environ', {'PERPLEXITY_TOKENS': 'p1,p2'}):
+            limiter = get_perplexity_rate_limiter(Mock())
+        assert isinstance(limiter, CredentialPool)
+        assert limiter.max_requests == 2 * settings.PERPLEXITY_RATE_LIMIT_REQUESTS
+
+
+class TestCredentialPool:
+    """Test least-loaded selection, aggregate capacity and quarantine."""
+
+    def test_capacity_scales_with_credentials(self, pool):
+        used = []
+        while pool.acquire():
+            used.append(pool.credential)
+        assert len(used) == 6
+        assert used[:3] == ["key-a", "key-b", "key-c"]
+        assert {c: used.count(c) for c in set(used)} == {"key-a": 2, "key-b": 2, "key-c": 2}
+        assert pool.get_remaining() == 0
+
+    def test_least_loaded_credential_is_chosen(self, pool):
+        pool.limiters["key-a"].acquire()
+        pool.limiters["key-b"].acquire()
+        assert pool.acquire()
+        assert pool.credential == "key-c"
+
+    def test_rate_limit_quarantines_credential(self, pool, redis_client):
+        assert pool.acquire()
+        assert pool.report_status(429, {'Retry-After': '30'})
+        assert 0 < redis_client.ttl(pool._quarantine_key("key-a")) <= 30
+
+        seen = set()
+        while pool.acquire():
+            seen.add(pool.credential)
+        assert seen == {"key-b", "key-c"}
+
+    def test_auth_failure_uses_long_quarantine(self, pool, redis_client):
+        pool.acquire()
+        assert pool.report_status(401)
+        ttl = redis_client.ttl(pool._quarantine_key(pool.credential))
+        assert ttl > settings.CREDENTIAL_QUARANTINE_SECONDS
+
+    def test_success_and_server_errors_do_not_quarantine(self, pool):
+        pool.acquire()
+        assert not pool.report_status(200)
+        assert not pool.report_status(500)
+        assert pool.get_remaining() == 5
+
+    def test_all_quarantined_denies(self, pool):
+        for credential in pool.credentials:
+            pool.quarantine(credential, 30, "test")
+        assert not pool.acquire()
+        assert not pool.is_allowed()
+
+    def test_redis_keys_never_contain_secrets(self, pool, redis_client):
+        pool.acquire()
+        pool.report_status(429)
+        keys = list(redis_client.scan_iter(f"*{pool.api_name}*"))
+        assert keys
+        assert not any("key-a" in key for key in keys)
+        assert any(credential_id("key-a") in key for key in keys)
+
+
+def test_perplexity_uses_acquired_credential(pool):
+    response = Mock(status_code=429, headers={})
+    response.raise_for_status.side_effect = Exception("429 Too Many Requests")
+    lead = Lead(id="lead-1", first_name="Jane", last_name="Doe", company="Acme", title="CTO")
+    with patch.dict('os.environ', {'PERPLEXITY_TOKEN': 'key-a'}):
+        service = PerplexityService(rate_limiter=pool)
+
+    with patch('requests.Session.post', return_value=response) as post:
+        result = service.enrich_lead(lead)
+
+    assert 'error' in result
+    assert post.call_args.kwargs['headers']['Authorization'] == "Bearer key-a"
+    # The throttled key is quarantined; the next call goes to another account
+    assert pool.acquire()
+    assert pool.credential != "key-a"
@@ -1,5 +1,6 @@
 import pytest
 from sqlalchemy.orm import sessionmaker
+from app.core.config import settings
 from app.core.database import Base, get_db
 from app.models.job import Job, JobStatus, JobType
 from app.main import app
@@ -33,4 +34,64 @@ def test_job_status_enum():
     assert JobStatus.PROCESSING.value == "PROCESSING"
     assert JobStatus.COMPLETED.value == "COMPLETED"
     assert JobStatus.FAILED.value == "FAILED"
-    assert JobStatus.CANCELLED.value == "CANCELLED" 
\ No newline at end of file
+    assert JobStatus.CANCELLED.value == "CANCELLED" 
+
+class TestEnginePools:
+    """Test the per-role pool configuration."""
+
+    def test_process_role_from_command_line(self, monkeypatch):
+        from app.core.database import process_role
+        monkeypatch.setattr(settings, "DB_PROCESS_ROLE", "")
+        assert process_role(["/usr/local/bin/uvicorn", "app.main:app"]) == "api"
+        assert process_role(["/usr/lib/python3/site-packages/uvicorn/__main__.py", "app.main:app"]) == "api"
+        assert process_role(["/usr/local/bin/celery", "-A", "app.workers.celery_app", "worker"]) == "worker"
+        assert process_role(["/usr/local/bin/celery", "-A", "app.workers.celery_app", "beat"]) == "script"
+        assert process_role(["scripts/logs.py", "--follow"]) == "script"
+
+    def test_process_role_setting_wins(self, monkeypatch):
+        from app.core.database import process_role
+        monkeypatch.setattr(settings, "DB_PROCESS_ROLE", "Worker")
+        assert process_role(["/usr/local/bin/uvicorn"]) == "worker"
+        monkeypatch.setattr(settings, "DB_PROCESS_ROLE", "beat")
+        with pytest.raises(ValueError, match="DB_PROCESS_ROLE"):
+            process_role()
+
+    def test_engine_options_per_role(self, monkeypatch):
+        from app.core.database import engine_options
+        monkeypatch.setattr(settings, "DB_PGBOUNCER_MODE", False)
+        monkeypatch.setattr(settings, "DB_POOL_SIZE_WORKER", 2)
+        monkeypatch.setattr(settings, "DB_MAX_OVERFLOW_WORKER", 3)
+        options = engine_options("worker")
+        assert (options["pool_size"], options["max_overflow"]) == (2, 3)
+        assert options["pool_recycle"] == settings.DB_POOL_RECYCLE_SECONDS
+        assert engine_options("api")["pool_size"] == settings.DB_POOL_SIZE_API
+
+    def test_pgbouncer_mode_has_no_pool_or_statement_cache(self, monkeypatch):
+        import asyncio
+        from sqlalchemy import text
+        from sqlalchemy.ext.asyncio import create_async_engine
+        from sqlalchemy.pool import NullPool
+        from app.core.database import async_database_url, engine_options
+        from tests.conftest import SQLALCHEMY_DATABASE_URL
+
+        monkeypatch.setattr(settings, "DB_PGBOUNCER_MODE", True)
+        assert engine_options("api") == {"poolclass": NullPool}
+        options = engine_options("api", is_async=True)
+        assert options["connect_args"]["statement_cache_size"] == 0
+
+        async def select_twice():
+            bouncer_engine = create_async_engine(async_database_url(SQLALCHEMY_DATABASE_URL), **options)
+            try:
+                async with bouncer_engine.connect() as conn:
+                    return [(await conn.execute(text("SELECT 1"))).scalar() for _ in range(2)]
+            finally:
+                await bouncer_engine.dispose()
+
+        assert asyncio.run(select_twice()) == [1, 1]
+
+    def test_dispose_after_fork_gives_fresh_pools(self):
+        from app.core.database import async_engine, dispose_engines_after_fork, engine
+        pools = (engine.pool, async_engine.sync_engine.pool)
+        dispose_engines_after_fork()
+        assert engine.pool is not pools[0]
+        assert async_engine.sync_engine.pool is not pools[1]
@@ -0,0 +1,261 @@
+"""
+Tests for OpenAI Batch API email copy generation.
+
+The Batch API is served by a local stub (tests/helpers/openai_batch_stub.py),
+so the upload / create / poll / download cycle runs through the real OpenAI
+client without external calls.
+"""
+import json
+import pytest
+from celery.exceptions import Retry
+from unittest.mock import Mock, patch
+
+from app.core.config import settings
+from app.core.queue_manager import QueueManager
+from app.background_services.openai_service import OpenAIService
+from app.models.campaign import Campaign
+from app.models.campaign_status import CampaignStatus
+from app.models.job import Job, JobStatus, JobType
+from app.models.lead import Lead
+from app.workers.campaign_tasks import (
+    campaigns_due_for_email_copy_batch,
+    submit_email_copy_batch,
+    poll_email_copy_batch_job,
+    process_email_copy_batches_task,
+    finish_email_copy_task,
+    EMAIL_COPY_FALLBACK_MAX_RETRIES
+)
+from tests.helpers.openai_batch_stub import OpenAIBatchStub
+
+
+ENRICHMENT = {'choices': [{'message': {'content': 'Acme sells anvils.'}}]}
+
+
+@pytest.fixture
+def batch_stub():
+    stub = OpenAIBatchStub(polls_until_finished=1).start()
+    yield stub
+    stub.stop()
+
+
+@pytest.fixture
+def openai_service(batch_stub):
+    with patch.dict('os.environ', {'OPENAI_API_KEY': OpenAIBatchStub.API_KEY}), \
+         patch.object(settings, 'OPENAI_BASE_URL', batch_stub.base_url):
+        return OpenAIService()
+
+
+@pytest.fixture
+def campaign_with_leads(db_session, organization):
+    campaign = Campaign(
+        name="Batch Email Copy Campaign",
+        status=CampaignStatus.RUNNING,
+        fileName="batch.csv",
+        totalRecords=3,
+        url="https://app.apollo.io/batch",
+        organization_id=organization.id,
+        email_copy_mode='batch'
+    )
+    db_session.add(campaign)
+    db_session.commit()
+
+    leads = [
+        Lead(
+            campaign_id=campaign.id,
+            email=f"lead{i}@batch-example.com",
+            first_name=f"Lead{i}",
+            last_name="Test",
+            company="Acme",
+            enrichment_results=ENRICHMENT,
+            email_copy_gen_results={'status': 'batch_pending'}
+        )
+        for i in range(3)
+    ]
+    db_session.add_all(leads)
+    db_session.commit()
+    return campaign, leads
+
+
+class TestBatchService:
+    """Test the Batch API methods against the stub server."""
+
+    def test_submit_poll_and_stream_results(self, openai_service, batch_stub):
+        body = {'model': 'gpt-4', 'messages': [{'role': 'user', 'content': 'Hi'}]}
+        submitted = openai_service.submit_email_copy_batch(
+            [{'custom_id': 'a', 'body': body}, {'custom_id': 'b', 'body': body}],
+            file_name='test.jsonl'
+        )
+        assert submitted['request_count'] == 2
+        batch_id = submitted['batch_id']
+
+        assert openai_service.get_batch_status(batch_id)['status'] == 'in_progress'
+        info = openai_service.get_batch_status(batch_id)
+        assert info['status'] == 'completed'
+
+        results = {r['custom_id']: r for r in openai_service.iter_batch_results(info['output_file_id'])}
+        assert results['a']['result']['choices'][0]['message']['content'] == 'Email copy for a'
+        assert set(results) == {'a', 'b'}
+
+    def test_error_lines_are_reported(self, openai_service, batch_stub):
+        batch_stub.polls_until_finished = 0
+        batch_stub.fail_custom_ids = {'b'}
+        body = {'model': 'gpt-4', 'messages': []}
+        submitted = openai_service.submit_email_copy_batch(
+            [{'custom_id': 'a', 'body': body}, {'custom_id': 'b', 'body': body}],
+            file_name='test.jsonl'
+        )
+        info = openai_service.get_batch_status(submitted['batch_id'])
+
+        [error] = list(openai_service.iter_batch_results(info['error_file_id']))
+        assert error['custom_id'] == 'b'
+        assert error['error'] == {'message': 'Invalid request'}
+
+    def test_batch_calls_ignore_the_completion_deadline(self, batch_stub):
+        batch_stub.polls_until_finished = 0
+        body = {'model': 'gpt-4', 'messages': []}
+        with patch.dict('os.environ', {'OPENAI_API_KEY': OpenAIBatchStub.API_KEY}), \
+             patch.object(settings, 'OPENAI_BASE_URL', batch_stub.base_url), \
+             patch.object(settings, 'OPENAI_TOTAL_TIMEOUT', 0.000001):
+            service = OpenAIService()
+            service.client = service.client.with_options(max_retries=0)
+            submitted = service.submit_email_copy_batch([{'custom_id': 'a', 'body': body}], file_name='test.jsonl')
+            info = service.get_batch_status(submitted['batch_id'])
+            assert [r['custom_id'] for r in service.iter_batch_results(info['output_file_id'])] == ['a']
+
+    def test_submit_error_is_returned(self, batch_stub):
+        with patch.dict('os.environ', {'OPENAI_API_KEY': 'wrong-key'}), \
+             patch.object(settings, 'OPENAI_BASE_URL', batch_stub.base_url):
+            service = OpenAIService()
+        service.client = service.client.with_options(max_retries=0)
+        result = service.submit_email_copy_batch([{'custom_id': 'a', 'body': {}}], file_name='test.jsonl')
+        assert result['status'] == 'error'
+
+    def test_empty_submit_is_rejected(self, openai_service, batch_stub):
+        assert openai_service.submit_email_copy_batch([], file_name='test.jsonl')['status'] == 'error'
+        assert batch_stub.requests == []
+
+
+class TestEmailCopyBatchJob:
+    """Test the campaign-level job lifecycle driven by the beat task."""
+
+    @pytest.fixture(autouse=True)
+    def patch_tasks(self):
+        with patch('app.workers.campaign_tasks.finish_email_copy_task') as finish_task:
+            self.finish_task = finish_task
+            yield
+
+    def test_campaign_due_by_count_or_wait(self, db_session, campaign_with_leads):
+        campaign, _ = campaign_with_leads
+        with patch.object(settings, 'OPENAI_BATCH_MIN_REQUESTS', 10), \
+             patch.object(settings, 'OPENAI_BATCH_MAX_WAIT_SECONDS', 3600):
+            assert campaign.id not in campaigns_due_for_email_copy_batch(db_session)
+        with patch.object(settings, 'OPENAI_BATCH_MIN_REQUESTS', 3):
+            assert campaign.id in campaigns_due_for_email_copy_batch(db_session)
+
+    def test_job_completes_and_queues_instantly(self, db_session, campaign_with_leads,
+                                                openai_service, batch_stub):
+        campaign, leads = campaign_with_leads
+        batch_stub.drop_custom_ids = {leads[2].id}
+
+        job = submit_email_copy_batch(db_session, campaign.id, openai_service)
+        assert job.job_type == JobType.GENERATE_EMAIL_COPY_BATCH
+        assert json.loads(job.result)['request_count'] == 3
+        db_session.refresh(leads[0])
+        assert leads[0].email_copy_gen_results['status'] == 'batch_submitted'
+
+        assert poll_email_copy_batch_job(db_session, job, openai_service) == 'pending'
+        self.finish_task.delay.assert_not_called()
+
+        with patch.object(settings, 'OPENAI_BATCH_UPDATE_BATCH_SIZE', 1), \
+             patch.object(db_session, 'bulk_update_mappings', wraps=db_session.bulk_update_mappings) as bulk_update:
+            assert poll_email_copy_batch_job(db_session, job, openai_service) == 'completed'
+        assert bulk_update.call_count == 2
+
+        assert job.status == JobStatus.COMPLETED
+        assert json.loads(job.result)['updated_leads'] == 2
+        assert json.loads(job.result)['missing_leads'] == 1
+        for lead in leads[:2]:
+            db_session.refresh(lead)
+            assert lead.email_copy_gen_results['choices'][0]['message']['content'] == f"Email copy for {lead.id}"
+        # Every submitted lead is finished, including the one without output
+        assert self.finish_task.delay.call_count == 3
+
+    def test_expired_batch_fails_job(self, db_session, campaign_with_leads, openai_service, batch_stub):
+        batch_stub.polls_until_finished = 0
+        batch_stub.final_status = 'expired'
+        campaign, leads = campaign_with_leads
+        batch_stub.drop_custom_ids = {lead.id for lead in leads}
+        job = submit_email_copy_batch(db_session, campaign.id, openai_service)
+
+        assert poll_email_copy_batch_job(db_session, job, openai_service) == 'failed'
+        assert job.status == JobStatus.FAILED
+        assert "expired" in job.error
+        assert self.finish_task.delay.call_count == 3
+
+    def test_submit_failure_keeps_leads_pending(self, db_session, campaign_with_leads, openai_service):
+        campaign, leads = campaign_with_leads
+        with patch.object(openai_service, 'submit_email_copy_batch', return_value={'status': 'error', 'error': 'boom'}):
+            assert submit_email_copy_batch(db_session, campaign.id, openai_service) is None
+        db_session.refresh(leads[0])
+        assert leads[0].email_copy_gen_results == {'status': 'batch_pending'}
+
+
+def test_resumed_email_copy_batch_job_returns_to_poller(db_session, campaign_with_leads):
+    campaign, _ = campaign_with_leads
+    job = Job(
+        campaign_id=campaign.id,
+        name='GENERATE_EMAIL_COPY_BATCH',
+        job_type=JobType.GENERATE_EMAIL_COPY_BATCH,
+        status=JobStatus.PAUSED,
+        result=json.dumps({'batch_id': 'batch_1', 'request_count': 3})
+    )
+    db_session.add(job)
+    db_session.commit()
+
+    queue_manager = QueueManager(redis_client=Mock(), db=db_session)
+    with patch.object(queue_manager, '_create_celery_task_for_job') as create_task:
+        queue_manager.resume_all_jobs_on_breaker_close()
+
+    create_task.assert_not_called()
+    assert job.status == JobStatus.PROCESSING
+
+
+@pytest.mark.parametrize('holder, released', [('ours', True), ('another run', False)])
+def test_beat_run_releases_only_its_own_lock(db_session, holder, released):
+    redis_client = Mock()
+    redis_client.set.return_value = True
+    redis_client.get.side_effect = lambda key: redis_client.set.call_args[0][1] if holder == 'ours' else holder
+
+    with patch('app.workers.campaign_tasks.get_redis_connection', return_value=redis_client), \
+         patch('app.workers.campaign_tasks.get_db', return_value=iter([db_session])):
+        assert process_email_copy_batches_task()['status'] == 'idle'
+
+    assert redis_client.delete.called is released
+
+
+@pytest.mark.parametrize('retries, retried', [(0, True), (EMAIL_COPY_FALLBACK_MAX_RETRIES, False)])
+def test_rate_limited_fallback_is_retried(db_session, campaign_with_leads, retries, retried):
+    campaign, leads = campaign_with_leads
+    lead_id = leads[0].id
+    rate_limited = {'status': 'rate_limited', 'error': 'Rate limit exceeded', 'retry_after_seconds': 5}
+
+    finish_email_copy_task.push_request(retries=retries)
+    try:
+        with patch.dict('os.environ', {'OPENAI_API_KEY': 'test-key'}), \
+             patch('app.workers.campaign_tasks.get_redis_connection', return_value=Mock()), \
+             patch('app.workers.campaign_tasks.get_db', return_value=iter([db_session])), \
+             patch.object(OpenAIService, 'generate_email_copy', return_value=rate_limited):
+            if retried:
+                with pytest.raises(Retry):
+                    finish_email_copy_task(lead_id, campaign.id)
+            else:
+                assert finish_email_copy_task(lead_id, campaign.id)['status'] == 'failed'
+    finally:
+        finish_email_copy_task.pop_request()
+
+    lead = db_session.get(Lead, lead_id, populate_existing=True)
+    if retried:
+        assert lead.email_copy_gen_results == {'status': 'batch_pending'}
+        assert lead.instantly_lead_record is None
+    else:
+        assert lead.email_copy_gen_results == rate_limited
@@ -0,0 +1,197 @@
+"""
+Tests for MillionVerifier bulk file verification.
+
+The bulk API is served by a local stub (tests/helpers/millionverifier_bulk_stub.py),
+so the HTTP upload / poll / download cycle runs for real without external calls.
+"""
+import json
+import uuid
+import pytest
+from unittest.mock import Mock, patch
+
+from app.core.config import settings
+from app.core.queue_manager import QueueManager
+from app.background_services.email_verifier_service import EmailVerifierService
+from app.models.campaign import Campaign
+from app.models.campaign_status import CampaignStatus
+from app.models.job import Job, JobStatus, JobType
+from app.models.lead import Lead
+from app.workers.campaign_tasks import (
+    start_bulk_email_verification,
+    poll_bulk_verification_job,
+    poll_bulk_email_verification_task
+)
+from tests.helpers.millionverifier_bulk_stub import MillionVerifierBulkStub
+
+
+@pytest.fixture
+def bulk_stub():
+    stub = MillionVerifierBulkStub(
+        polls_until_finished=1,
+        results={'bad@bulk-example.com': 'invalid', 'maybe@bulk-example.com': 'catch_all'}
+    ).start()
+    yield stub
+    stub.stop()
+
+
+@pytest.fixture
+def email_service(bulk_stub):
+    with patch.dict('os.environ', {'MILLIONVERIFIER_API_KEY': MillionVerifierBulkStub.API_KEY}):
+        service = EmailVerifierService()
+    service.bulk_base_url = bulk_stub.base_url
+    return service
+
+
+@pytest.fixture
+def campaign_with_leads(db_session, organization):
+    campaign = Campaign(
+        name="Bulk Verification Campaign",
+        status=CampaignStatus.RUNNING,
+        fileName="bulk.csv",
+        totalRecords=4,
+        url="https://app.apollo.io/bulk",
+        organization_id=organization.id
+    )
+    db_session.add(campaign)
+    db_session.commit()
+
+    suffix = uuid.uuid4().hex[:8]
+    emails = [f"good{i}-{suffix}@bulk-example.com" for i in range(3)] + ['bad@bulk-example.com']
+    leads = [Lead(campaign_id=campaign.id, email=email, first_name="Test") for email in emails]
+    db_session.add_all(leads)
+    db_session.commit()
+    return campaign, leads
+
+
+class TestBulkVerificationService:
+    """Test the bulk file API methods against the stub server."""
+
+    def test_upload_poll_and_download(self, email_service, bulk_stub):
+        upload = email_service.start_bulk_verification(
+            ['a@bulk-example.com', 'A@bulk-example.com', 'bad@bulk-example.com', ''],
+            file_name='test.csv'
+        )
+        assert upload['email_count'] == 2
+        file_id = upload['file_id']
+
+        assert email_service.get_bulk_status(file_id)['status'] == 'in_progress'
+        assert email_service.get_bulk_status(file_id)['status'] == 'finished'
+
+        results = {r['email']: r for r in email_service.iter_bulk_results(file_id)}
+        assert results['a@bulk-example.com']['result'] == 'ok'
+        assert results['a@bulk-example.com']['source'] == 'bulk'
+        assert EmailVerifierService.is_deliverable(results['a@bulk-example.com'])
+        assert not EmailVerifierService.is_deliverable(results['bad@bulk-example.com'])
+
+    @pytest.mark.parametrize("policy,expected", [("accept", True), ("verify", False)])
+    def test_catch_all_follows_policy(self, email_service, policy, expected):
+        upload = email_service.start_bulk_verification(['maybe@bulk-example.com'], file_name='test.csv')
+        with patch.object(settings, 'EMAIL_VERIFICATION_CATCH_ALL_POLICY', policy):
+            [result] = list(email_service.iter_bulk_results(upload['file_id']))
+        assert result['is_catch_all'] is True
+        assert EmailVerifierService.is_deliverable(result) is expected
+
+    def test_upload_error_is_returned(self, email_service):
+        email_service.api_key = 'wrong-key'
+        result = email_service.start_bulk_verification(['a@bulk-example.com'], file_name='test.csv')
+        assert result['status'] == 'error'
+
+    def test_empty_upload_is_rejected(self, email_service, bulk_stub):
+        assert email_service.start_bulk_verification([], file_name='test.csv')['status'] == 'error'
+        assert bulk_stub.requests == []
+
+
+class TestBulkVerificationJob:
+    """Test the campaign-level job lifecycle driven by the beat poller."""
+
+    @pytest.fixture(autouse=True)
+    def patch_tasks(self, email_service):
+        with patch('app.workers.campaign_tasks._get_email_verifier_service', return_value=email_service), \
+             patch('app.workers.campaign_tasks.get_redis_connection', return_value=Mock()), \
+             patch('app.workers.campaign_tasks.enrich_lead_task') as enrich_task:
+            self.enrich_task = enrich_task
+            yield
+
+    def test_job_completes_and_updates_leads_in_batches(self, db_session, campaign_with_leads, email_service):
+        campaign, leads = campaign_with_leads
+        job = start_bulk_email_verification(db_session, campaign, leads)
+        assert job.job_type == JobType.VERIFY_EMAILS_BULK
+        assert json.loads(job.result)['email_count'] == 4
+
+        assert poll_bulk_verification_job(db_session, job, email_service) == 'pending'
+        self.enrich_task.delay.assert_not_called()
+
+        with patch.object(settings, 'EMAIL_VERIFICATION_BULK_UPDATE_BATCH_SIZE', 2), \
+             patch.object(db_session, 'bulk_update_mappings', wraps=db_session.bulk_update_mappings) as bulk_update:
+            assert poll_bulk_verification_job(db_session, job, email_service) == 'completed'
+        assert bulk_update.call_count == 2
+
+        assert job.status == JobStatus.COMPLETED
+        assert json.loads(job.result)['updated_leads'] == 4
+        for lead in leads:
+            db_session.refresh(lead)
+            assert lead.email_verification['source'] == 'bulk'
+        assert {lead.email_verification['result'] for lead in leads} == {'ok', 'invalid'}
+        assert self.enrich_task.delay.call_count == 4
+
+    def test_failed_job_falls_back_to_per_lead_enrichment(self, db_session, campaign_with_leads,
+                                                          email_service, bulk_stub):
+        bulk_stub.polls_until_finished = 0
+        bulk_stub.final_status = 'error'
+        campaign, leads = campaign_with_leads
+        job = start_bulk_email_verification(db_session, campaign, leads)
+
+        assert poll_bulk_verification_job(db_session, job, email_service) == 'failed'
+        assert job.status == JobStatus.FAILED
+        assert "error" in job.error
+        assert self.enrich_task.delay.call_count == 4
+
+    def test_upload_failure_returns_none(self, db_session, campaign_with_leads, email_service):
+        email_service.api_key = 'wrong-key'
+        campaign, leads = campaign_with_leads
+        assert start_bulk_email_verification(db_session, campaign, leads) is None
+
+
+def test_resumed_bulk_job_returns_to_poller(db_session, campaign_with_leads):
+    campaign, _ = campaign_with_leads
+    job = Job(
+        campaign_id=campaign.id,
+        name='VERIFY_EMAILS_BULK',
+        job_type=JobType.VERIFY_EMAILS_BULK,
+        status=JobStatus.PAUSED,
+        result=json.dumps({'file_id': '1', 'email_count': 4})
+    )
+    db_session.add(job)
+    db_session.commit()
+
+    queue_manager = QueueManager(redis_client=Mock(), db=db_session)
+    with patch.object(queue_manager, '_create_celery_task_for_job') as create_task:
+        queue_manager.resume_all_jobs_on_breaker_close()
+
+    create_task.assert_not_called()
+    assert job.status == JobStatus.PROCESSING
+
+
+@pytest.mark.parametrize('holder, released', [('ours', True), ('another run', False)])
+def test_poll_releases_only_its_own_lock(db_session, campaign_with_leads, holder, released):
+    campaign, _ = campaign_with_leads
+    job = Job(
+        campaign_id=campaign.id,
+        name='VERIFY_EMAILS_BULK',
+        job_type=JobType.VERIFY_EMAILS_BULK,
+        status=JobStatus.PROCESSING,
+        result=json.dumps({'file_id': '1', 'email_count': 4})
+    )
+    db_session.add(job)
+    db_session.commit()
+    redis_client = Mock()
+    redis_client.set.return_value = True
+    redis_client.get.side_effect = lambda key: redis_client.set.call_args[0][1] if holder == 'ours' else holder
+
+    with patch('app.workers.campaign_tasks.get_redis_connection', return_value=redis_client), \
+         patch('app.workers.campaign_tasks.get_db', return_value=iter([db_session])), \
+         patch('app.workers.campaign_tasks._get_email_verifier_service'), \
+         patch('app.workers.campaign_tasks.poll_bulk_verification_job', return_value='processing'):
+        assert poll_bulk_email_verification_task()['jobs'] == {job.id: 'processing'}
+
+    assert redis_client.delete.called is released
@@ -0,0 +1,122 @@
+"""
+Tests for the email verification result cache and domain-level short-circuiting.
+
+These tests use the real Redis connection (skipped if unavailable).
+"""
+import json
+import pytest
+from unittest.mock import patch
+
+from app.core.config import get_redis_connection, settings
+from app.background_services.email_verification_cache import EmailVerificationCache, get_email_domain
+from app.background_services.email_verifier_service import EmailVerifierService
+
+
+@pytest.fixture
+def redis_client():
+    """Redis client fixture - skip if Redis not available."""
+    try:
+        client = get_redis_connection()
+        client.ping()
+    except Exception as e:
+        pytest.skip(f"Redis not available: {str(e)}")
+    yield client
+    for key in client.scan_iter("email_verification:*"):
+        client.delete(key)
+
+
+@pytest.fixture
+def cache(redis_client):
+    return EmailVerificationCache(redis_client, email_ttl_seconds=60, domain_ttl_seconds=60)
+
+
+@pytest.fixture
+def service(cache):
+    with patch.dict('os.environ', {'MILLIONVERIFIER_API_KEY': 'test-key'}):
+        return EmailVerifierService(cache=cache)
+
+
+# A MillionVerifier single-email response
+VENDOR_RESULT = {
+    'email': 'jane@cached-example.com',
+    'result': 'ok',
+    'quality': 'good',
+    'free': False,
+    'role': False,
+    'is_mx_found': True,
+    'is_catch_all': False,
+    'credits': 1
+}
+
+
+def _set_domain_facts(redis_client, domain, **facts):
+    redis_client.setex(f"email_verification:domain:{domain}", 60, json.dumps(facts))
+
+
+def test_get_email_domain():
+    assert get_email_domain("Jane@Example.COM") == "example.com"
+    assert get_email_domain("not-an-email") == ""
+
+
+def test_result_is_cached_per_email(service, cache):
+    cache.record_result("jane@cached-example.com", VENDOR_RESULT)
+
+    result = service.verify_email("JANE@cached-example.com")
+    assert result['cached'] is True
+    assert result['result'] == 'ok'
+
+
+def test_domain_facts_learned_from_vendor_result(cache):
+    cache.record_result("john@learned-example.com", VENDOR_RESULT)
+    facts = cache.get_domain_facts("learned-example.com")
+    assert facts['mx_found'] is True
+    assert facts['catch_all'] is False
+
+
+def test_stubbed_result_is_not_cached(service, cache):
+    result = service.verify_email("jane@stubbed-example.com")
+    assert result['result'] == 'deliverable'
+    assert 'cached' not in result
+
+    assert cache.get_email_result("jane@stubbed-example.com") is None
+    assert cache.get_domain_facts("stubbed-example.com") == {}
+
+
+def test_errors_are_not_cached(cache):
+    cache.record_result("err@example.org", {'status': 'error', 'error': 'boom'})
+    assert cache.get_email_result("err@example.org") is None
+
+
+def test_disposable_domain_short_circuits(service):
+    result = service.verify_email("someone@mailinator.com")
+    assert result['result'] == 'disposable'
+    assert result['short_circuited'] is True
+    assert result['credits_used'] == 0
+    assert not EmailVerifierService.is_deliverable(result)
+
+
+def test_domain_without_mx_short_circuits(service, redis_client):
+    _set_domain_facts(redis_client, "no-mx-example.com", mx_found=False)
+    result = service.verify_email("a@no-mx-example.com")
+    assert result['result'] == 'invalid'
+    assert result['reason'] == 'domain_without_mx'
+
+
+@pytest.mark.parametrize("policy,expected_deliverable,short_circuited", [
+    ("accept", True, True),
+    ("reject", False, True),
+    ("verify", True, False),
+])
+def test_catch_all_policy(service, redis_client, policy, expected_deliverable, short_circuited):
+    _set_domain_facts(redis_client, "catchall-example.com", mx_found=True, catch_all=True)
+    with patch.object(settings, 'EMAIL_VERIFICATION_CATCH_ALL_POLICY', policy):
+        result = service.verify_email(f"{policy}@catchall-example.com")
+    assert EmailVerifierService.is_deliverable(result) is expected_deliverable
+    assert bool(result.get('short_circuited')) is short_circuited
+
+
+def test_service_without_cache_is_unchanged():
+    with patch.dict('os.environ', {'MILLIONVERIFIER_API_KEY': 'test-key'}):
+        service = EmailVerifierService()
+    result = service.verify_email("someone@mailinator.com")
+    assert result['result'] == 'deliverable'
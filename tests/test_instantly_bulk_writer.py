@@ -0,0 +1,222 @@
+"""
+Tests for the buffered Instantly bulk writer.
+
+These tests use the real Redis connection (skipped if unavailable). The
+Instantly API is replaced by a mock service.
+"""
+import uuid
+import pytest
+from unittest.mock import Mock, patch
+
+from app.core.config import get_redis_connection
+from app.background_services.instantly_bulk_writer import InstantlyBulkWriter
+from app.background_services.instantly_service import InstantlyService
+from app.models.campaign import Campaign
+from app.models.campaign_status import CampaignStatus
+from app.models.lead import Lead
+
+
+@pytest.fixture
+def redis_client():
+    """Redis client fixture - skip if Redis not available."""
+    try:
+        client = get_redis_connection()
+        client.ping()
+    except Exception as e:
+        pytest.skip(f"Redis not available: {str(e)}")
+    yield client
+    for key in client.scan_iter("instantly_buffer*"):
+        client.delete(key)
+
+
+@pytest.fixture
+def instantly_campaign_id():
+    return f"inst-{uuid.uuid4().hex[:8]}"
+
+
+@pytest.fixture
+def leads(db_session, organization):
+    campaign = Campaign(
+        name="Instantly Bulk Campaign",
+        status=CampaignStatus.RUNNING,
+        fileName="bulk.csv",
+        totalRecords=3,
+        url="https://app.apollo.io/bulk",
+        organization_id=organization.id
+    )
+    db_session.add(campaign)
+    db_session.commit()
+
+    leads = [
+        Lead(campaign_id=campaign.id, email=f"lead{i}@bulk-example.com", first_name=f"Lead{i}")
+        for i in range(3)
+    ]
+    db_session.add_all(leads)
+    db_session.commit()
+    return leads
+
+
+def _enqueue_all(writer, instantly_campaign_id, leads):
+    for lead in leads:
+        writer.enqueue(instantly_campaign_id, lead.id, lead.email, lead.first_name, "Hello")
+
+
+class TestEnqueue:
+    """Test buffering and flush triggers."""
+
+    def test_enqueue_reports_buffer_length(self, redis_client, instantly_campaign_id):
+        writer = InstantlyBulkWriter(redis_client, batch_size=2)
+        assert writer.enqueue(instantly_campaign_id, "l1", "a@example.com", "A", "Hi") == 1
+        length = writer.enqueue(instantly_campaign_id, "l2", "b@example.com", "B", "Hi")
+        assert length == 2
+        assert writer.is_full(length)
+
+    def test_due_campaigns_respects_max_wait(self, redis_client, instantly_campaign_id):
+        writer = InstantlyBulkWriter(redis_client)
+        writer.enqueue(instantly_campaign_id, "l1", "a@example.com", "A", "Hi")
+        assert instantly_campaign_id not in writer.due_campaigns(max_wait_seconds=60)
+        assert instantly_campaign_id in writer.due_campaigns(max_wait_seconds=0)
+
+    def test_batch_size_capped_at_vendor_limit(self, redis_client):
+        writer = InstantlyBulkWriter(redis_client, batch_size=5000)
+        assert writer.batch_size == InstantlyService.MAX_BULK_LEADS
+
+
+class TestFlush:
+    """Test flushing a buffer and mapping results back to leads."""
+
+    def test_flush_records_per_item_results(self, redis_client, db_session, leads, instantly_campaign_id):
+        service = Mock()
+        service.create_leads_bulk.return_value = {'results': [
+            {'id': 'inst-1', 'email': leads[0].email},
+            {'error': 'Lead was not created by Instantly bulk request'},
+            {'id': 'inst-3', 'email': leads[2].email},
+        ]}
+        writer = InstantlyBulkWriter(redis_client, instantly_service=service, max_attempts=3)
+        _enqueue_all(writer, instantly_campaign_id, leads)
+
+        outcome = writer.flush(instantly_campaign_id, db_session)
+
+        assert outcome == {'status': 'flushed', 'created': 2, 'retried': 1, 'failed': 0}
+        service.create_leads_bulk.assert_called_once()
+        for lead in leads:
+            db_session.refresh(lead)
+        assert leads[0].instantly_lead_record['id'] == 'inst-1'
+        assert leads[1].instantly_lead_record['status'] == 'queued'
+        assert leads[1].instantly_lead_record['attempts'] == 1
+        assert leads[2].instantly_lead_record['id'] == 'inst-3'
+        # Only the failed lead is left in the buffer
+        assert redis_client.llen(f"instantly_buffer:{instantly_campaign_id}") == 1
+
+    def test_flush_gives_up_after_max_attempts(self, redis_client, db_session, leads, instantly_campaign_id):
+        service = Mock()
+        service.create_leads_bulk.return_value = {'error': 'HTTP 500'}
+        writer = InstantlyBulkWriter(redis_client, instantly_service=service, max_attempts=2)
+        writer.enqueue(instantly_campaign_id, leads[0].id, leads[0].email, leads[0].first_name, "Hi")
+
+        writer.flush(instantly_campaign_id, db_session)
+        outcome = writer.flush(instantly_campaign_id, db_session)
+
+        assert outcome['failed'] == 1
+        db_session.refresh(leads[0])
+        assert leads[0].instantly_lead_record == {'error': 'HTTP 500', 'attempts': 2}
+        assert redis_client.llen(f"instantly_buffer:{instantly_campaign_id}") == 0
+        assert instantly_campaign_id not in writer.due_campaigns(max_wait_seconds=0)
+
+    def test_rate_limited_flush_keeps_batch(self, redis_client, db_session, leads, instantly_campaign_id):
+        service = Mock()
+        service.create_leads_bulk.return_value = {'status': 'rate_limited', 'error': 'Rate limit exceeded'}
+        breaker = Mock()
+        writer = InstantlyBulkWriter(redis_client, instantly_service=service, circuit_breaker=breaker)
+        _enqueue_all(writer, instantly_campaign_id, leads)
+
+        outcome = writer.flush(instantly_campaign_id, db_session)
+
+        assert outcome['status'] == 'rate_limited'
+        breaker.record_failure.assert_called_once()
+        buffered = redis_client.lrange(f"instantly_buffer:{instantly_campaign_id}", 0, -1)
+        assert len(buffered) == 3
+        assert str(leads[0].id) in buffered[0]
+
+    def test_failed_bulk_request_keeps_batch(self, redis_client, db_session, leads, instantly_campaign_id):
+        service = Mock()
+        service.create_leads_bulk.side_effect = ConnectionError("connection reset")
+        writer = InstantlyBulkWriter(redis_client, instantly_service=service)
+        _enqueue_all(writer, instantly_campaign_id, leads)
+
+        with pytest.raises(ConnectionError):
+            writer.flush(instantly_campaign_id, db_session)
+
+        buffered = redis_client.lrange(f"instantly_buffer:{instantly_campaign_id}", 0, -1)
+        assert len(buffered) == 3
+        assert str(leads[0].id) in buffered[0]
+        assert redis_client.get(f"instantly_buffer:lock:{instantly_campaign_id}") is None
+
+    def test_failed_commit_keeps_batch(self, redis_client, db_session, leads, instantly_campaign_id):
+        service = Mock()
+        service.create_leads_bulk.return_value = {'results': [
+            {'id': 'inst-1'}, {'error': 'Lead was not created by Instantly bulk request'}, {'id': 'inst-3'}
+        ]}
+        writer = InstantlyBulkWriter(redis_client, instantly_service=service, max_attempts=3)
+        _enqueue_all(writer, instantly_campaign_id, leads)
+
+        with patch('app.background_services.instantly_bulk_writer.bulk_update_lead_artifacts',
+                   side_effect=RuntimeError("database is gone")):
+            with pytest.raises(RuntimeError):
+                writer.flush(instantly_campaign_id, db_session)
+
+        # The whole batch is back once, without the retry of the failed lead
+        buffered = redis_client.lrange(f"instantly_buffer:{instantly_campaign_id}", 0, -1)
+        assert len(buffered) == 3
+        assert '"attempts": 0' in buffered[1]
+        assert instantly_campaign_id in writer.due_campaigns(max_wait_seconds=0)
+
+    def test_empty_flush_keeps_campaign_with_new_leads_pending(self, redis_client, db_session, instantly_campaign_id):
+        writer = InstantlyBulkWriter(redis_client, instantly_service=Mock())
+        writer.enqueue(instantly_campaign_id, "l1", "a@example.com", "A", "Hi")
+        writer._pop_batch(instantly_campaign_id)
+        writer.enqueue(instantly_campaign_id, "l2", "b@example.com", "B", "Hi")
+
+        writer._update_pending(instantly_campaign_id)
+        assert instantly_campaign_id in writer.due_campaigns(max_wait_seconds=0)
+
+        writer._pop_batch(instantly_campaign_id)
+        writer._update_pending(instantly_campaign_id)
+        assert instantly_campaign_id not in writer.due_campaigns(max_wait_seconds=0)
+
+    def test_flush_skips_when_locked(self, redis_client, db_session, instantly_campaign_id):
+        service = Mock()
+        writer = InstantlyBulkWriter(redis_client, instantly_service=service)
+        redis_client.set(f"instantly_buffer:lock:{instantly_campaign_id}", "other", ex=10)
+
+        assert writer.flush(instantly_campaign_id, db_session)['status'] == 'locked'
+        service.create_leads_bulk.assert_not_called()
+
+
+class TestCreateLeadsBulk:
+    """Test result mapping in InstantlyService.create_leads_bulk."""
+
+    def test_maps_created_leads_by_index_and_email(self):
+        with patch.dict('os.environ', {'INSTANTLY_API_KEY': 'test-key'}):
+            service = InstantlyService(rate_limiter=None)
+        response = Mock(status_code=200)
+        response.json.return_value = {
+            'created_leads': [
+                {'id': 'x1', 'email': 'a@example.com', 'index': 0},
+                {'id': 'x3', 'email': 'C@example.com'},
+            ],
+            'skipped_count': 1
+        }
+        leads = [
+            {'email': 'a@example.com', 'first_name': 'A', 'personalization': 'Hi'},
+            {'email': 'b@example.com', 'first_name': 'B', 'personalization': 'Hi'},
+            {'email': 'c@example.com', 'first_name': 'C', 'personalization': 'Hi'},
+        ]
+        with patch('requests.Session.post', return_value=response) as post:
+            result = service.create_leads_bulk('camp-1', leads)
+
+        assert len(post.call_args.kwargs['json']['leads']) == 3
+        assert result['results'][0]['id'] == 'x1'
+        assert 'error' in result['results'][1]
+        assert result['results'][2]['id'] == 'x3'
+        assert result['summary'] == {'skipped_count': 1}
@@ -0,0 +1,124 @@
+"""
+Tests for the lead_artifacts side table behind the Lead JSON attributes.
+"""
+import pytest
+from sqlalchemy import event
+
+from app.models.campaign import Campaign
+from app.models.campaign_status import CampaignStatus
+from app.models.lead import Lead
+from app.models.lead_artifact import LeadArtifact, artifact_summary, bulk_update_lead_artifacts
+from app.workers.campaign_tasks import _email_copy_status
+from tests.conftest import engine
+
+COPY = {'choices': [{'message': {'content': 'Hi Ada, ...'}}]}
+
+
+@pytest.fixture
+def campaign(db_session, organization):
+    campaign = Campaign(
+        name="Artifacts Campaign",
+        status=CampaignStatus.RUNNING,
+        fileName="artifacts.csv",
+        totalRecords=2,
+        url="https://app.apollo.io/artifacts",
+        organization_id=organization.id
+    )
+    db_session.add(campaign)
+    db_session.commit()
+    return campaign
+
+
+def test_artifact_summary():
+    assert artifact_summary('email_verification', {'result': 'catch_all'}) == {'email_verification_status': 'catch_all'}
+    assert artifact_summary('enrichment_results', {'error': 'HTTP 500'}) == {'enrichment_text': None}
+    assert artifact_summary('email_copy_gen_results', COPY) == {'email_copy': 'Hi Ada, ...'}
+    assert artifact_summary('instantly_lead_record', {'id': 42}) == {'instantly_lead_id': '42'}
+    assert artifact_summary('raw_data', {'headline': 'CTO'}) == {}
+
+
+class TestLeadAttributes:
+    """Test that the artifacts read and write like Lead columns."""
+
+    def test_set_on_constructor_and_read_back(self, db_session, campaign):
+        lead = Lead(
+            campaign_id=campaign.id, email="ada@example.com",
+            raw_data={'headline': 'CTO'}, email_copy_gen_results=COPY
+        )
+        db_session.add(lead)
+        db_session.commit()
+        db_session.expire_all()
+
+        lead = db_session.get(Lead, lead.id)
+        assert lead.email_copy == 'Hi Ada, ...'
+        assert lead.raw_data == {'headline': 'CTO'}
+        assert lead.email_verification is None
+        assert db_session.get(LeadArtifact, lead.id).email_copy_gen_results == COPY
+
+    def test_lead_without_artifacts_has_no_row(self, db_session, campaign):
+        lead = Lead(campaign_id=campaign.id, email="bare@example.com", raw_data=None, email_verification=None)
+        db_session.add(lead)
+        db_session.commit()
+
+        assert lead.artifacts is None
+        assert db_session.query(LeadArtifact).count() == 0
+
+    def test_lead_query_does_not_read_artifacts(self, db_session, campaign):
+        campaign_id = campaign.id
+        db_session.add(Lead(campaign_id=campaign_id, email="ada@example.com", raw_data={'headline': 'CTO'}))
+        db_session.commit()
+        db_session.expire_all()
+
+        statements = []
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(engine, 'before_cursor_execute', listener)
+        try:
+            leads = db_session.query(Lead).filter(Lead.campaign_id == campaign_id).all()
+            assert [lead.email for lead in leads] == ["ada@example.com"]
+        finally:
+            event.remove(engine, 'before_cursor_execute', listener)
+        assert len(statements) == 1
+        assert 'lead_artifacts' not in statements[0]
+
+    def test_deleting_lead_deletes_artifacts(self, db_session, campaign):
+        lead = Lead(campaign_id=campaign.id, email="ada@example.com", instantly_lead_record={'id': 'inst-1'})
+        db_session.add(lead)
+        db_session.commit()
+
+        db_session.query(Lead).filter(Lead.id == lead.id).delete()
+        db_session.commit()
+        assert db_session.query(LeadArtifact).count() == 0
+
+
+class TestBulkUpdateLeadArtifacts:
+    """Test bulk writes of artifacts and their extracted columns."""
+
+    def test_inserts_and_updates_rows(self, db_session, campaign):
+        with_row = Lead(campaign_id=campaign.id, email="a@example.com", raw_data={'headline': 'CTO'})
+        without_row = Lead(campaign_id=campaign.id, email="b@example.com")
+        db_session.add_all([with_row, without_row])
+        db_session.commit()
+
+        bulk_update_lead_artifacts(db_session, [
+            {'id': with_row.id, 'email_verification': {'result': 'ok'}},
+            {'id': without_row.id, 'email_verification': {'result': 'invalid'}},
+        ])
+        db_session.commit()
+
+        assert with_row.raw_data == {'headline': 'CTO'}
+        assert with_row.email_verification == {'result': 'ok'}
+        assert with_row.email_verification_status == 'ok'
+        assert without_row.email_verification == {'result': 'invalid'}
+        assert without_row.email_verification_status == 'invalid'
+
+    def test_rejects_lead_columns(self, db_session):
+        with pytest.raises(ValueError):
+            bulk_update_lead_artifacts(db_session, [{'id': 'x', 'company': 'Acme'}])
+
+    def test_email_copy_status_filter(self, db_session, campaign):
+        pending = Lead(campaign_id=campaign.id, email="a@example.com", email_copy_gen_results={'status': 'batch_pending'})
+        done = Lead(campaign_id=campaign.id, email="b@example.com", email_copy_gen_results=COPY)
+        db_session.add_all([pending, done, Lead(campaign_id=campaign.id, email="c@example.com")])
+        db_session.commit()
+
+        assert [lead.id for lead in db_session.query(Lead).filter(_email_copy_status('batch_pending'))] == [pending.id]
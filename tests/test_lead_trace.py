@@ -0,0 +1,148 @@
+"""
+Tests for the per-lead pipeline trace and the campaign percentile breakdown.
+"""
+import time
+import pytest
+from unittest.mock import Mock
+
+from app.core.lead_trace import LeadPipelineTrace, current_trace, save_lead_trace, summarize_campaign_traces
+from app.core.metrics import observe_limiter_wait, observe_vendor_request, record_stage
+from app.models.campaign import Campaign
+from app.models.campaign_status import CampaignStatus
+from app.models.job import JobStatus
+from app.models.lead import Lead
+from app.models.lead_trace import LeadTrace
+
+
+@pytest.fixture
+def campaign_lead(db_session, organization):
+    campaign = Campaign(
+        name="Trace Campaign",
+        status=CampaignStatus.RUNNING,
+        fileName="trace.csv",
+        totalRecords=10,
+        url="https://app.apollo.io/trace",
+        organization_id=organization.id
+    )
+    db_session.add(campaign)
+    db_session.commit()
+    lead = Lead(campaign_id=campaign.id, email="trace@example.com", first_name="Trace")
+    db_session.add(lead)
+    db_session.commit()
+    return campaign, lead
+
+
+class TestLeadPipelineTrace:
+    """Test what a trace collects while it is active."""
+
+    def test_stage_collects_vendor_limiter_and_attempts(self):
+        trace = LeadPipelineTrace('lead-1', 'campaign-1', enqueued_at=time.time() - 2).activate()
+        try:
+            started = trace.start_stage('enrichment')
+            observe_limiter_wait('TraceApi', 0.5, True)
+            observe_vendor_request('trace-vendor', time.monotonic() - 0.25, 'server_error')
+            observe_vendor_request('trace-vendor', time.monotonic() - 0.25, 'ok')
+            record_stage('enrichment', 'success', started)
+        finally:
+            trace.deactivate()
+
+        offset_ms, ms, vendor_ms, wait_ms, db_ms, calls, outcome = trace.stages['enrichment']
+        assert vendor_ms == pytest.approx(500, abs=20)
+        assert wait_ms == 500
+        assert calls == 2
+        assert outcome == 'success'
+        assert trace.queue_ms == pytest.approx(2000, abs=100)
+
+        row = trace.to_model('completed', 'job-1')
+        assert row.enrichment_ms == ms
+        assert row.email_copy_ms is None
+        assert row.vendor_calls == 2
+        assert row.limiter_wait_ms == 500
+
+    def test_nothing_is_collected_when_inactive(self):
+        trace = LeadPipelineTrace('lead-1', 'campaign-1')
+        trace.activate()
+        trace.deactivate()
+
+        observe_vendor_request('trace-vendor', time.monotonic(), 'ok')
+        record_stage('enrichment', 'success')
+
+        assert current_trace() is None
+        assert trace.vendor_calls == 0
+        assert trace.stages == {}
+        assert trace.queue_ms is None
+
+    def test_db_time_is_measured(self, db_session):
+        trace = LeadPipelineTrace('lead-1', 'campaign-1').activate()
+        try:
+            trace.start_stage('email_verification')
+            db_session.execute(Lead.__table__.select().limit(1))
+            record_stage('email_verification', 'success')
+        finally:
+            trace.deactivate()
+
+        assert trace.db_seconds > 0
+        assert trace.stages['email_verification'][1] >= trace.stages['email_verification'][4]
+
+
+def test_trace_is_saved_once_with_job_status(db_session, campaign_lead):
+    campaign, lead = campaign_lead
+    trace = LeadPipelineTrace(lead.id, campaign.id).activate()
+    trace.start_stage('instantly')
+    record_stage('instantly', 'skipped')
+
+    assert save_lead_trace(db_session, trace, Mock(status=JobStatus.PAUSED, id='job-1'))
+
+    rows = db_session.query(LeadTrace).filter(LeadTrace.lead_id == lead.id).all()
+    assert len(rows) == 1
+    assert rows[0].status == 'paused'
+    assert rows[0].stages['instantly'][6] == 'skipped'
+    assert current_trace() is None
+
+
+def _add_traces(db_session, campaign, lead):
+    for i, (queue_ms, vendor_ms) in enumerate([(100, 1000), (200, 2000), (300, 3000)]):
+        db_session.add(LeadTrace(
+            lead_id=lead.id,
+            campaign_id=campaign.id,
+            status='completed' if i else 'failed',
+            attempt=1,
+            started_at=lead.created_at,
+            queue_ms=queue_ms,
+            total_ms=vendor_ms + 500,
+            vendor_ms=vendor_ms,
+            limiter_wait_ms=0,
+            db_ms=100,
+            vendor_calls=3,
+            enrichment_ms=vendor_ms
+        ))
+    db_session.commit()
+
+
+def test_campaign_summary_percentiles(db_session, campaign_lead):
+    campaign, lead = campaign_lead
+    _add_traces(db_session, campaign, lead)
+
+    summary = summarize_campaign_traces(db_session, campaign.id)
+
+    assert summary['traces'] == 3
+    assert summary['statuses'] == {'completed': 2, 'failed': 1}
+    assert summary['percentiles_ms']['queue_ms']['p50'] == 200
+    assert summary['percentiles_ms']['vendor_ms']['p95'] == pytest.approx(2900)
+    assert summary['percentiles_ms']['instantly_ms']['p50'] is None
+    # queue 600 + total 7,500: vendor 6,000, DB 300, other 1,200
+    assert summary['share']['queue'] == pytest.approx(600 / 8100, abs=1e-4)
+    assert summary['share']['vendor'] == pytest.approx(6000 / 8100, abs=1e-4)
+    assert summary['share']['other'] == pytest.approx(1200 / 8100, abs=1e-4)
+
+
+def test_trace_summary_endpoint(authenticated_client, db_session, campaign_lead):
+    campaign, lead = campaign_lead
+    _add_traces(db_session, campaign, lead)
+
+    response = authenticated_client.get(f"/api/v1/campaigns/{campaign.id}/traces/summary")
+    assert response.status_code == 200
+    assert response.json()['data']['traces'] == 3
+
+    response = authenticated_client.get("/api/v1/campaigns/missing-campaign/traces/summary")
+    assert response.status_code == 404
@@ -0,0 +1,189 @@
+"""
+Tests for per-process log files, rotation and the merge/follow tools.
+"""
+import gzip
+import json
+import logging
+import os
+import time
+import pytest
+from unittest.mock import patch
+
+from app.core.log_files import (
+    LogFollower, LogQuery, log_segments, merge_logs, parse_since, process_log_filename, prune_stale_logs,
+    resolve_compression
+)
+from app.core.logging_config import ProcessFileHandler
+
+
+def _line(timestamp, message, level="INFO", **fields):
+    return json.dumps({"timestamp": timestamp, "level": level, "message": message, **fields}) + "\n"
+
+
+def _write(path, *lines, opener=open):
+    with opener(path, "wt") as handle:
+        handle.writelines(lines)
+
+
+def _record(message, created=None):
+    record = logging.LogRecord("app.test", logging.INFO, __file__, 1, message, None, None)
+    if created is not None:
+        record.created = created
+    return record
+
+
+class TestProcessFileHandler:
+    """Test the per-process handler."""
+
+    def test_writes_file_named_after_host_and_pid(self, tmp_path):
+        handler = ProcessFileHandler(str(tmp_path), max_bytes=0, backup_count=2)
+        handler.emit(_record("hello"))
+        handler.close()
+
+        assert handler.baseFilename == os.path.abspath(process_log_filename(str(tmp_path)))
+        assert os.path.basename(handler.baseFilename).endswith(f"-{os.getpid()}.log")
+        assert open(handler.baseFilename).read() == "hello\n"
+
+    def test_rolls_over_by_size_and_compresses(self, tmp_path):
+        handler = ProcessFileHandler(str(tmp_path), max_bytes=30, backup_count=2, compression="gzip")
+        for i in range(5):
+            handler.emit(_record(f"message number {i}"))
+        handler.close()
+
+        name = os.path.basename(handler.baseFilename)
+        assert sorted(os.listdir(tmp_path)) == [name, f"{name}.1.gz", f"{name}.2.gz"]
+        with gzip.open(tmp_path / f"{name}.1.gz", "rt") as rotated:
+            assert rotated.read() == "message number 3\n"
+
+    def test_rolls_over_by_age_but_not_when_empty(self, tmp_path):
+        handler = ProcessFileHandler(str(tmp_path), max_bytes=0, backup_count=2, interval_seconds=60)
+        assert handler.rollover_at == pytest.approx(time.time() + 60, abs=5)
+
+        # Due, but nothing has been written yet
+        handler.emit(_record("first", created=handler.rollover_at + 1))
+        assert not os.path.exists(handler.baseFilename + ".1")
+
+        handler.emit(_record("second", created=handler.rollover_at + 1))
+        handler.close()
+        assert open(handler.baseFilename + ".1").read() == "first\n"
+        assert open(handler.baseFilename).read() == "second\n"
+
+    def test_forked_child_switches_to_its_own_file(self, tmp_path):
+        handler = ProcessFileHandler(str(tmp_path), max_bytes=0, backup_count=2)
+        handler.emit(_record("parent"))
+        parent_file = handler.baseFilename
+
+        with patch("os.getpid", return_value=424242):
+            handler.reopen_for_current_process()
+            handler.emit(_record("child"))
+        handler.close()
+
+        assert handler.baseFilename.endswith("-424242.log")
+        assert open(parent_file).read() == "parent\n"
+        assert open(handler.baseFilename).read() == "child\n"
+
+    def test_prunes_stale_files_of_other_processes(self, tmp_path):
+        old = time.time() - 3600
+        stale = process_log_filename(str(tmp_path), hostname="old-host", pid=11)
+        _write(stale, _line("2026-01-01T00:00:00", "bye"))
+        _write(stale + ".1.gz", _line("2026-01-01T00:00:00", "older"), opener=gzip.open)
+        recent = process_log_filename(str(tmp_path), hostname="old-host", pid=12)
+        _write(recent, _line("2026-01-01T00:00:00", "hi"))
+        own = process_log_filename(str(tmp_path))
+        _write(own, _line("2026-01-01T00:00:00", "me"))
+        for path in (stale, stale + ".1.gz", own):
+            os.utime(path, (old, old))
+
+        assert prune_stale_logs(str(tmp_path), max_age_seconds=0) == []
+        handler = ProcessFileHandler(str(tmp_path), max_bytes=0, backup_count=2, retention_seconds=600)
+        handler.close()
+
+        assert sorted(os.listdir(tmp_path)) == sorted(os.path.basename(path) for path in (recent, own))
+
+    def test_keeps_stale_files_of_running_processes(self, tmp_path):
+        old = time.time() - 3600
+        running = process_log_filename(str(tmp_path), pid=os.getppid())
+        _write(running, _line("2026-01-01T00:00:00", "idle"))
+        os.utime(running, (old, old))
+
+        assert prune_stale_logs(str(tmp_path), max_age_seconds=600) == []
+
+    def test_zstd_falls_back_to_gzip_without_zstandard(self):
+        with patch.dict("sys.modules", {"zstandard": None}):
+            assert resolve_compression("zstd") == "gzip"
+        assert resolve_compression("") is None
+        with pytest.raises(ValueError, match="Unknown log compression"):
+            resolve_compression("lz4")
+
+
+class TestMergeLogs:
+    """Test reading the process files back as one stream."""
+
+    def test_merges_processes_and_segments_in_time_order(self, tmp_path):
+        _write(tmp_path / "combined-api-1.log.2", _line("2026-01-01T00:00:01", "api 1"))
+        _write(tmp_path / "combined-api-1.log.1.gz", _line("2026-01-01T00:00:03", "api 2"), opener=gzip.open)
+        _write(tmp_path / "combined-api-1.log", _line("2026-01-01T00:00:05", "api 3"))
+        _write(tmp_path / "combined-worker-7.log",
+               _line("2026-01-01T00:00:02", "worker 1"), "Traceback (most recent call last):\n",
+               _line("2026-01-01T00:00:04", "worker 2"))
+        _write(tmp_path / "unrelated.log", _line("2026-01-01T00:00:00", "ignored"))
+
+        assert log_segments(str(tmp_path))["combined-api-1.log"] == [
+            str(tmp_path / "combined-api-1.log.2"), str(tmp_path / "combined-api-1.log.1.gz"),
+            str(tmp_path / "combined-api-1.log")
+        ]
+        merged = [(stream, record["message"]) for stream, record in merge_logs(str(tmp_path))]
+        assert merged == [
+            ("combined-api-1.log", "api 1"),
+            ("combined-worker-7.log", "worker 1"),
+            ("combined-worker-7.log", "Traceback (most recent call last):"),
+            ("combined-api-1.log", "api 2"),
+            ("combined-worker-7.log", "worker 2"),
+            ("combined-api-1.log", "api 3"),
+        ]
+        current = [record["message"] for _, record in merge_logs(str(tmp_path), include_rotated=False)]
+        assert current == ["worker 1", "Traceback (most recent call last):", "worker 2", "api 3"]
+
+    def test_query_filters(self):
+        error = {"timestamp": "2026-01-01T10:00:00", "level": "ERROR", "message": "Boom", "component": "api"}
+        limited = {"timestamp": "2026-01-01T10:00:00", "level": "WARNING", "message": "Rate limit hit",
+                   "component": "campaign_tasks"}
+        info = {"timestamp": "2026-01-01T09:00:00", "level": "INFO", "message": "Lead saved", "component": "api"}
+
+        assert [r for r in (error, limited, info) if LogQuery(attention=True).matches(r)] == [error, limited]
+        assert [r for r in (error, limited, info) if LogQuery(min_level="warning").matches(r)] == [error, limited]
+        assert [r for r in (error, limited, info) if LogQuery(components=["api"], since="2026-01-01T09:30:00").matches(r)] == [error]
+        assert [r for r in (error, limited, info) if LogQuery(pattern="lead SAVED").matches(r)] == [info]
+
+    def test_parse_since(self):
+        from datetime import datetime
+        now = datetime(2026, 1, 1, 12, 0, 0)
+        assert parse_since("90m", now=now) == "2026-01-01T10:30:00"
+        assert parse_since("2026-01-01T08:00:00") == "2026-01-01T08:00:00"
+        with pytest.raises(ValueError):
+            parse_since("yesterday")
+
+
+class TestLogFollower:
+    """Test following new lines across process files."""
+
+    def test_follows_new_lines_new_files_and_rotation(self, tmp_path):
+        api = tmp_path / "combined-api-1.log"
+        _write(api, _line("2026-01-01T00:00:01", "old"))
+        follower = LogFollower(str(tmp_path))
+        assert follower.poll() == []
+
+        with open(api, "a") as handle:
+            handle.write(_line("2026-01-01T00:00:03", "api new"))
+            handle.write('{"timestamp": "2026-01-01T00:00:09", "mess')
+        _write(tmp_path / "combined-worker-2.log", _line("2026-01-01T00:00:02", "worker new"))
+        assert [record["message"] for _, record in follower.poll()] == ["worker new", "api new"]
+
+        with open(api, "a") as handle:
+            handle.write('age": "api finished"}\n')
+        assert [record["message"] for _, record in follower.poll()] == ["api finished"]
+
+        # Rotated: the live file is new and starts empty
+        os.rename(api, str(api) + ".1")
+        _write(api, _line("2026-01-01T00:00:10", "after rotation"))
+        assert [record["message"] for _, record in follower.poll()] == ["after rotation"]
@@ -6,9 +6,12 @@ import pytest
 from unittest.mock import patch, MagicMock
 from pathlib import Path
 import sys
+import threading
+import time
 
+from app.core import logging_config
 from app.core.logger import get_logger
-from app.core.logging_config import init_logging, CustomJsonFormatter, SanitizingFilter
+from app.core.logging_config import init_logging, CustomJsonFormatter, LogSanitizer, SanitizingFilter
 from app.core.config import settings
 
 
@@ -220,6 +223,43 @@ class TestSensitiveDataSanitization:
         assert result is True
         assert record.getMessage() == original_msg
 
+    def test_extra_fields_are_sanitized_by_name_and_value(self):
+        """Test that extra fields are redacted by name, or by value when the name is harmless."""
+        record = logging.LogRecord(
+            name="test", level=logging.INFO, pathname="", lineno=0,
+            msg="Lead processed", args=(), exc_info=None
+        )
+        record.__dict__.update({
+            "lead_email": "test@example.com",
+            "contact": "reach me at test@example.com",
+            "details": {"api_key": "abc", "note": "password=hunter2"},
+            "component": "campaign_tasks",
+            "attempt": 2
+        })
+
+        self.sanitizer.filter(record)
+        assert record.lead_email == "[REDACTED_EMAIL]"
+        assert record.contact == "[REDACTED_EMAIL]"
+        assert record.details == {"api_key": "[REDACTED_API_KEY]", "note": "[REDACTED_PASSWORD]"}
+        assert record.component == "campaign_tasks"
+        assert record.attempt == 2
+
+    def test_strings_without_trigger_characters_are_returned_as_is(self):
+        """Test the fast path: no regex runs and the same object comes back."""
+        value = "Enrichment completed for lead in campaign"
+        with patch.object(LogSanitizer, 'compiled_patterns') as compiled_patterns:
+            assert LogSanitizer.redact_string(value) is value
+            assert LogSanitizer.sanitize_value(value) is value
+        compiled_patterns.assert_not_called()
+
+    def test_only_patterns_that_can_match_are_compiled_in(self):
+        """Test that the alternation is narrowed to the patterns the string can match."""
+        regex = LogSanitizer._regex_for("lead 3f2b6c1e-8d4a-4f7e-9b1a-2c5d7e9f0a1b")
+        assert set(regex.groupindex) == {'phone', 'credit_card', 'uuid'}
+        assert LogSanitizer.redact_string(
+            "lead 3f2b6c1e-8d4a-4f7e-9b1a-2c5d7e9f0a1b with token eyJhbGciOi.eyJzdWIiOi.sig"
+        ) == "lead [REDACTED_UUID] with token [REDACTED_JWT]"
+
 
 class TestJSONFormatting:
     """Test JSON log formatting functionality."""
@@ -532,4 +572,126 @@ class TestEdgeCases:
         except Exception:
             success = False
         
-        assert success 
\ No newline at end of file
+        assert success 
+
+class TestQueuedLogging:
+    """Test the log queue and its background writer."""
+
+    @staticmethod
+    def _record(level=logging.INFO, msg="Lead %s processed", args=("lead-1",)):
+        return logging.LogRecord(
+            name="test.queue", level=level, pathname="", lineno=0,
+            msg=msg, args=args, exc_info=None
+        )
+
+    def test_root_logger_only_enqueues(self):
+        """Test that the root logger's only handler is the queue when queued logging is on."""
+        handlers = logging.getLogger().handlers
+        central = [h for h in handlers if getattr(h, "_is_central_handler", False)]
+        assert [type(h) for h in central] == [logging_config.QueuedLogHandler]
+        assert logging_config.get_log_queue_stats()['writer_running'] is True
+
+    def test_args_are_merged_before_enqueueing(self):
+        """Test that the message is fixed when logged, not when written."""
+        handler = logging_config.QueuedLogHandler(capacity=10, block_seconds=0)
+        args = {"status": "pending"}
+        handler.handle(self._record(msg="Job %(status)s", args=(args,)))
+        args["status"] = "done"
+
+        record = handler.queue.get_nowait()
+        assert record.msg == "Job pending"
+        assert record.args is None
+
+    def test_full_queue_drops_and_counts_info(self):
+        """Test that INFO records are dropped without waiting when the queue is full."""
+        handler = logging_config.QueuedLogHandler(capacity=1, block_seconds=5)
+        handler.handle(self._record())
+        started = time.monotonic()
+        handler.handle(self._record())
+        handler.handle(self._record())
+
+        assert time.monotonic() - started < 1
+        assert handler.queue.qsize() == 1
+        assert handler.dropped == {"INFO": 2}
+
+    def test_full_queue_waits_before_dropping_warnings(self):
+        """Test that WARNING records wait for room before being dropped."""
+        handler = logging_config.QueuedLogHandler(capacity=1, block_seconds=0.05)
+        handler.handle(self._record())
+        started = time.monotonic()
+        handler.handle(self._record(level=logging.WARNING))
+
+        assert time.monotonic() - started >= 0.05
+        assert handler.dropped == {"WARNING": 1}
+
+    def test_writer_formats_on_its_own_thread(self):
+        """Test that records reach the target handler, formatted off the calling thread."""
+        threads = []
+
+        class Recorder(logging.Handler):
+            def emit(self, record):
+                threads.append(threading.current_thread())
+                self.message = self.format(record)
+
+        target = Recorder()
+        handler = logging_config.QueuedLogHandler(capacity=10, block_seconds=0)
+        writer = logging_config.LogWriter(handler.queue, target, respect_handler_level=True)
+        writer.start()
+        handler.handle(self._record())
+        writer.stop()
+
+        assert target.message == "Lead lead-1 processed"
+        assert threads and threads[0] is not threading.current_thread()
+
+    def test_child_gets_a_fresh_queue_and_writer_after_fork(self):
+        """Test the after-fork hook: new queue, new writer thread, same target handlers."""
+        handler = logging_config.QueuedLogHandler(capacity=10, block_seconds=0)
+        handler.dropped["INFO"] = 3
+        target = logging.NullHandler()
+        writer = logging_config.LogWriter(handler.queue, target)
+        old_queue = handler.queue
+        with patch.object(logging_config, "_queue_handler", handler), \
+                patch.object(logging_config, "_log_writer", writer):
+            logging_config._restart_log_writer_after_fork()
+            new_writer = logging_config._log_writer
+            try:
+                assert handler.queue is not old_queue
+                assert handler.dropped == {}
+                assert new_writer is not writer and new_writer.handlers == (target,)
+                assert new_writer.queue is handler.queue
+            finally:
+                new_writer.stop()
+
+
+class TestLogVolumeControls:
+    """Test per-logger levels, sampling and payload truncation."""
+
+    def test_apply_log_levels(self):
+        applied = logging_config.apply_log_levels(
+            "app.test_levels.workers=WARNING, app.test_levels.services=debug,app.test_levels.bad=LOUD,junk"
+        )
+        try:
+            assert applied == {"app.test_levels.workers": logging.WARNING, "app.test_levels.services": logging.DEBUG}
+            assert logging.getLogger("app.test_levels.workers").getEffectiveLevel() == logging.WARNING
+            assert not logging.getLogger("app.test_levels.workers").isEnabledFor(logging.INFO)
+            assert logging.getLogger("app.test_levels.bad").level == logging.NOTSET
+        finally:
+            for name in applied:
+                logging.getLogger(name).setLevel(logging.NOTSET)
+
+    def test_sampler_keeps_first_and_every_nth(self):
+        sampler = logging_config.LogSampler.from_spec("lead_result=10,prompt=1,bad=x")
+        kept = [sampler.should_log("lead_result") for _ in range(30)]
+        assert [i for i, keep in enumerate(kept) if keep] == [0, 10, 20]
+        assert all(sampler.should_log("prompt") for _ in range(5))
+        assert all(sampler.should_log("unconfigured") for _ in range(5))
+
+    def test_log_payload_truncates_with_length_and_hash(self):
+        assert logging_config.log_payload({"status": "ok"}, max_chars=50) == "{'status': 'ok'}"
+
+        payload = {"content": "x" * 1000}
+        rendered = logging_config.log_payload(payload, max_chars=40)
+        assert rendered.startswith(str(payload)[:40] + "...")
+        assert f"[{len(str(payload))} chars, sha256 " in rendered
+        assert rendered == logging_config.log_payload(dict(payload), max_chars=40)
+        assert len(rendered) < 100
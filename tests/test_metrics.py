@@ -0,0 +1,95 @@
+"""
+Tests for the Prometheus metrics subsystem.
+
+Redis and vendor HTTP calls are mocked; samples are read from the default
+(single-process) registry.
+"""
+import pytest
+from unittest.mock import Mock, patch
+from prometheus_client import REGISTRY
+
+from app.core.api_integration_rate_limiter import ApiIntegrationRateLimiter
+from app.core.credential_pool import CredentialPool, credential_id
+from app.core.metrics import PipelineStateCollector, record_stage, render_metrics, vendor_outcome
+from app.core.vendor_http import VendorTransport
+
+
+def _sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def _redis(count=1, ttl=10):
+    redis_client = Mock()
+    redis_client.get.return_value = None
+    redis_client.mget.side_effect = lambda keys: [None] * len(keys)
+    redis_client.pipeline.return_value.execute.return_value = (count, ttl)
+    return redis_client
+
+
+@pytest.mark.parametrize("status_code,outcome", [
+    (200, 'ok'), (201, 'ok'), (404, 'client_error'), (429, 'rate_limited'), (503, 'server_error'), (None, 'error')
+])
+def test_vendor_outcome(status_code, outcome):
+    assert vendor_outcome(status_code) == outcome
+
+
+def test_vendor_request_attempts_are_timed():
+    transport = VendorTransport('metrics-vendor', read_timeout=10, budget_seconds=60, max_attempts=2, backoff_base=0)
+    response = Mock(status_code=503, headers={})
+    ok = Mock(status_code=200, headers={})
+    before_error = _sample('vendor_request_duration_seconds_count', vendor='metrics-vendor', outcome='server_error')
+    before_ok = _sample('vendor_request_duration_seconds_count', vendor='metrics-vendor', outcome='ok')
+
+    with patch('requests.Session.get', side_effect=[response, ok]), patch('app.core.vendor_http.time.sleep'):
+        transport.get('https://vendor.example/items')
+
+    assert _sample('vendor_request_duration_seconds_count', vendor='metrics-vendor', outcome='server_error') == before_error + 1
+    assert _sample('vendor_request_duration_seconds_count', vendor='metrics-vendor', outcome='ok') == before_ok + 1
+
+
+def test_limiter_records_wait_and_denials():
+    before_wait = _sample('rate_limiter_wait_seconds_count', api='MetricsApi')
+    before_denied = _sample('rate_limiter_denied_total', api='MetricsApi')
+
+    assert ApiIntegrationRateLimiter(_redis(count=1), 'MetricsApi', 1, 60).acquire()
+    assert not ApiIntegrationRateLimiter(_redis(count=2), 'MetricsApi', 1, 60).acquire()
+
+    assert _sample('rate_limiter_wait_seconds_count', api='MetricsApi') == before_wait + 1
+    assert _sample('rate_limiter_denied_total', api='MetricsApi') == before_denied + 1
+
+
+def test_credential_pool_records_under_vendor_name():
+    pool = CredentialPool(_redis(count=1), 'MetricsPool', ['key-a', 'key-b'], 1, 60)
+    before = _sample('rate_limiter_wait_seconds_count', api='MetricsPool')
+
+    assert pool.acquire()
+
+    assert _sample('rate_limiter_wait_seconds_count', api='MetricsPool') == before + 1
+    assert _sample('rate_limiter_wait_seconds_count', api=f"MetricsPool:{credential_id('key-a')}") == 0
+
+
+def test_stage_results_are_counted():
+    before = _sample('pipeline_stage_total', stage='enrichment', outcome='rate_limited')
+    record_stage('enrichment', 'rate_limited')
+    assert _sample('pipeline_stage_total', stage='enrichment', outcome='rate_limited') == before + 1
+
+
+def test_breaker_state_and_queue_length_are_read_from_redis():
+    redis_client = _redis()
+    redis_client.llen.return_value = 42
+
+    body, content_type = render_metrics(redis_client)
+
+    text = body.decode()
+    assert content_type.startswith('text/plain')
+    assert 'circuit_breaker_state{state="closed"} 1.0' in text
+    assert 'circuit_breaker_state{state="open"} 0.0' in text
+    assert 'celery_queue_length{queue="celery"} 42.0' in text
+    assert 'pipeline_stage_total' in text
+
+
+def test_metrics_endpoint_is_public(client):
+    with patch.object(PipelineStateCollector, 'redis', new=property(lambda self: _redis())):
+        response = client.get("/metrics")
+    assert response.status_code == 200
+    assert 'vendor_request_duration_seconds' in response.text
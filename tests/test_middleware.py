@@ -0,0 +1,72 @@
+"""
+Tests for the ASGI authentication middleware.
+"""
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.core.database import get_db
+from app.core.middleware import AuthenticationMiddleware
+from tests.conftest import override_get_db
+from tests.helpers.auth_helpers import AuthHelpers
+
+
+def _app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(AuthenticationMiddleware)
+    app.dependency_overrides[get_db] = override_get_db
+
+    @app.get("/api/v1/health/live")
+    def live():
+        return {"ok": True}
+
+    @app.get("/private/whoami")
+    def whoami(request: Request):
+        return {"id": request.state.current_user.id}
+
+    @app.get("/private/export")
+    def export():
+        return StreamingResponse((f"row {i}\n" for i in range(3)), media_type="text/plain")
+
+    return app
+
+
+def test_path_checks():
+    middleware = AuthenticationMiddleware(app=None)
+    assert middleware._is_unprotected_path("/api/v1/auth/login")
+    assert middleware._is_unprotected_path("/docs/oauth2-redirect")
+    assert middleware._is_unprotected_path("/static/app.js")
+    assert not middleware._is_unprotected_path("/api/v1/campaigns/")
+    assert not middleware._is_unprotected_path("/api/v1/auth/me")
+
+
+def test_public_path_and_preflight_pass_without_token():
+    client = TestClient(_app())
+    assert client.get("/api/v1/health/live").status_code == 200
+    assert client.options("/private/whoami").status_code != 401
+
+
+def test_missing_and_invalid_tokens_are_rejected():
+    client = TestClient(_app())
+    missing = client.get("/private/whoami")
+    assert missing.status_code == 401
+    assert missing.json()["error"]["message"] == "Token is missing"
+    assert missing.headers["WWW-Authenticate"] == "Bearer"
+
+    invalid = client.get("/private/whoami", headers={"Authorization": "Bearer nope"})
+    assert invalid.status_code == 401
+    assert invalid.json()["error"]["message"] == "Invalid token"
+
+
+def test_user_on_request_state_and_streaming_passes_through(db_session):
+    user, token, headers = AuthHelpers.create_authenticated_user(db_session)
+    app = _app()
+    # The user only exists in db_session's transaction; the middleware must load it from there
+    app.dependency_overrides[get_db] = lambda: db_session
+    client = TestClient(app)
+
+    assert client.get("/private/whoami", headers=headers).json() == {"id": user.id}
+
+    streamed = client.get("/private/export", headers=headers)
+    assert streamed.status_code == 200
+    assert streamed.text == "row 0\nrow 1\nrow 2\n"
@@ -0,0 +1,174 @@
+"""
+Tests for the fake vendor server and the pipeline benchmark harness.
+
+The vendor services are pointed at the fake server, so no external API calls
+are made. The end-to-end run needs Redis and is skipped without it.
+"""
+import os
+import random
+import pytest
+import requests
+from unittest.mock import patch
+
+from app.background_services.smoke_tests.fake_vendors import FakeVendorServer, VendorProfile
+from app.core.config import get_redis_connection, settings
+from app.core.pipeline_benchmark import BenchmarkConfig, compare_reports, parse_override, run_benchmark
+from app.models.lead import Lead
+
+CREDENTIALS = {
+    'PERPLEXITY_TOKEN': 'test-token', 'PERPLEXITY_TOKENS': '',
+    'OPENAI_API_KEY': 'test-key', 'OPENAI_API_KEYS': '',
+    'INSTANTLY_API_KEY': 'test-key'
+}
+
+
+@pytest.fixture
+def fake_vendors():
+    server = FakeVendorServer({vendor: VendorProfile(latency=0.01, jitter=0) for vendor in
+                               ('perplexity', 'openai', 'instantly', 'millionverifier')}).start()
+    with patch.dict(os.environ, CREDENTIALS):
+        yield server
+    server.stop()
+
+
+def _lead():
+    return Lead(id='lead-1', first_name='Ada', last_name='Lovelace', email='ada@example.com',
+                company='Analytical Engines', title='CTO')
+
+
+class TestVendorProfile:
+    """Test profile parsing and sampling."""
+
+    def test_parse(self):
+        profile = VendorProfile.parse("latency=0.8,jitter=0.1,errors=0.02,429=0.05,retry_after=2")
+        assert profile.to_dict() == {
+            'latency': 0.8, 'jitter': 0.1, 'error_rate': 0.02, 'rate_limit_rate': 0.05, 'retry_after': 2
+        }
+
+    def test_parse_rejects_unknown_field(self):
+        with pytest.raises(ValueError, match="Unknown profile field"):
+            VendorProfile.parse("latency=1,timeouts=0.1")
+
+    def test_sample_matches_rates_and_is_seeded(self):
+        profile = VendorProfile(latency=0.5, jitter=0.3, error_rate=0.1, rate_limit_rate=0.2)
+        draws = [profile.sample(random.Random(7)) for _ in range(2)]
+        assert draws[0] == draws[1]
+
+        rng = random.Random(1)
+        statuses = [profile.sample(rng)[1] for _ in range(5000)]
+        assert statuses.count(429) / 5000 == pytest.approx(0.2, abs=0.02)
+        assert statuses.count(500) / 5000 == pytest.approx(0.1, abs=0.02)
+
+
+class TestFakeVendorServer:
+    """Test the vendor services against the fake server."""
+
+    def test_perplexity_enrichment(self, fake_vendors):
+        from app.background_services.perplexity_service import PerplexityService
+        with patch.object(settings, 'PERPLEXITY_BASE_URL', fake_vendors.url('perplexity')):
+            result = PerplexityService().enrich_lead(_lead())
+
+        assert result['choices'][0]['message']['content']
+        assert fake_vendors.stats['perplexity']['ok'] == 1
+
+    def test_openai_streamed_email_copy(self, fake_vendors):
+        from app.background_services.openai_service import OpenAIService
+        with patch.object(settings, 'OPENAI_BASE_URL', fake_vendors.url('openai')), \
+                patch.object(settings, 'OPENAI_STREAMING_ENABLED', True):
+            result = OpenAIService().generate_email_copy(_lead(), {'enrichment': 'Recently raised a round'})
+
+        assert result['choices'][0]['message']['content'].startswith("Hi there")
+        assert fake_vendors.stats['openai']['requests'] == 1
+
+    def test_openai_completion_is_not_retried(self):
+        from app.background_services.openai_service import OpenAIService
+        server = FakeVendorServer({'openai': VendorProfile(latency=0, error_rate=1.0)}).start()
+        try:
+            with patch.dict(os.environ, CREDENTIALS), \
+                    patch.object(settings, 'OPENAI_BASE_URL', server.url('openai')), \
+                    patch.object(settings, 'OPENAI_STREAMING_ENABLED', False):
+                result = OpenAIService().generate_email_copy(_lead(), {'enrichment': 'Recently raised a round'})
+        finally:
+            server.stop()
+
+        assert result['status'] == 'error'
+        assert server.stats['openai']['requests'] == 1
+
+    def test_instantly_lead_and_bulk_add(self, fake_vendors):
+        from app.background_services.instantly_service import InstantlyService
+        with patch.object(settings, 'INSTANTLY_BASE_URL', fake_vendors.url('instantly')):
+            service = InstantlyService()
+            single = service.create_lead('campaign-1', 'ada@example.com', 'Ada', 'Hi Ada')
+            bulk = service.create_leads_bulk('campaign-1', [{'email': 'a@example.com'}, {'email': 'b@example.com'}])
+
+        assert single['email'] == 'ada@example.com'
+        assert [r['email'] for r in bulk['results']] == ['a@example.com', 'b@example.com']
+        assert fake_vendors.stats['instantly']['requests'] == 2
+
+    def test_errors_and_rate_limits_follow_profile(self):
+        server = FakeVendorServer({'perplexity': VendorProfile(latency=0, rate_limit_rate=1.0, retry_after=3),
+                                   'openai': VendorProfile(latency=0, error_rate=1.0)}).start()
+        try:
+            limited = requests.post(f"{server.url('perplexity')}/chat/completions", json={})
+            failed = requests.post(f"{server.url('openai')}/chat/completions", json={})
+        finally:
+            server.stop()
+
+        assert limited.status_code == 429
+        assert limited.headers['Retry-After'] == '3'
+        assert failed.status_code == 500
+        assert server.stats['perplexity']['rate_limited'] == 1
+        assert server.stats['openai']['errors'] == 1
+
+
+class TestCompareReports:
+    """Test regression detection between two reports."""
+
+    @staticmethod
+    def _report(leads_per_minute, queries, total_p95):
+        return {
+            'leads_per_minute': leads_per_minute,
+            'db_queries_per_lead': queries,
+            'redis_commands_per_lead': 40.0,
+            'traces': {'percentiles_ms': {'total_ms': {'p50': 900.0, 'p95': total_p95, 'p99': None}}}
+        }
+
+    def test_within_tolerance(self):
+        assert compare_reports(self._report(100, 30, 2000), self._report(95, 32, 2150), 0.1) == []
+
+    def test_regressions_in_both_directions(self):
+        regressions = compare_reports(self._report(100, 30, 2000), self._report(80, 30, 3000), 0.1)
+        assert len(regressions) == 2
+        assert regressions[0].startswith("leads_per_minute: 100 -> 80")
+        assert regressions[1].startswith("total_ms.p95: 2000 -> 3000")
+
+    def test_improvements_are_not_regressions(self):
+        assert compare_reports(self._report(100, 30, 2000), self._report(150, 20, 1000), 0.1) == []
+
+
+def test_parse_override_uses_setting_type():
+    assert parse_override('INSTANTLY_BULK_ENABLED', 'true') is True
+    assert parse_override('INSTANTLY_BULK_BATCH_SIZE', '50') == 50
+    with pytest.raises(ValueError, match="Unknown setting"):
+        parse_override('NOT_A_SETTING', '1')
+
+
+def test_run_benchmark_end_to_end(db_session):
+    """Push a few leads through the real pipeline (skipped if Redis is not available)."""
+    try:
+        get_redis_connection().ping()
+    except Exception as e:
+        pytest.skip(f"Redis not available: {str(e)}")
+
+    fast = VendorProfile(latency=0.01, jitter=0)
+    report = run_benchmark(BenchmarkConfig(
+        leads=3, concurrency=2, unlimited=True, timeout_seconds=120, beat_interval=0.2,
+        profiles={vendor: fast for vendor in ('perplexity', 'openai', 'instantly', 'millionverifier')}
+    ))
+
+    assert report['complete'] is True
+    assert report['leads_finished'] == 3
+    assert report['leads_per_minute'] > 0
+    assert report['db_queries_per_lead'] > 0
+    assert report['traces']['traces'] >= 3
+    assert report['vendors']['perplexity']['requests'] >= 3
@@ -0,0 +1,192 @@
+"""
+Tests for the prompt template registry and the prompt-hash completion cache.
+
+Cache tests use the real Redis connection (skipped if unavailable). Vendor
+HTTP calls are mocked.
+"""
+import pytest
+from unittest.mock import Mock, patch
+
+from app.core.config import get_redis_connection
+from app.background_services.completion_cache import CompletionCache, prompt_hash
+from app.background_services.perplexity_service import PerplexityService
+from app.background_services.prompt_templates import (
+    PromptTemplateRegistry,
+    clear_prompt_cache,
+    compile_prompt,
+    get_default_prompt
+)
+from app.models.campaign import Campaign
+from app.models.campaign_status import CampaignStatus
+from app.models.lead import Lead
+from app.models.prompt_template import PromptTemplate
+
+
+@pytest.fixture(autouse=True)
+def fresh_prompt_cache():
+    clear_prompt_cache()
+    yield
+    clear_prompt_cache()
+
+
+@pytest.fixture
+def redis_client():
+    """Redis client fixture - skip if Redis not available."""
+    try:
+        client = get_redis_connection()
+        client.ping()
+    except Exception as e:
+        pytest.skip(f"Redis not available: {str(e)}")
+    yield client
+    for key in client.scan_iter("completion_cache:test*"):
+        client.delete(key)
+
+
+@pytest.fixture
+def campaign(db_session, organization):
+    campaign = Campaign(
+        name="Prompt Template Campaign",
+        status=CampaignStatus.RUNNING,
+        fileName="prompts.csv",
+        totalRecords=1,
+        url="https://app.apollo.io/prompts",
+        organization_id=organization.id
+    )
+    db_session.add(campaign)
+    db_session.commit()
+    return campaign
+
+
+def _override(db_session, user_template, **scope):
+    template = PromptTemplate(
+        name='perplexity_lead',
+        model='sonar-pro',
+        system_prompt='Be brief.',
+        user_template=user_template,
+        parameters={'temperature': 0.1},
+        **scope
+    )
+    db_session.add(template)
+    db_session.commit()
+    return template
+
+
+class TestCompiledPrompt:
+    """Test template compilation and rendering."""
+
+    def test_default_prompt_matches_legacy_request(self):
+        prompt = get_default_prompt('perplexity_lead')
+        request = prompt.build_request(prompt.render({
+            'first_name': 'Jane', 'last_name': 'Doe', 'headline': 'CTO', 'company_name': 'Acme'
+        }))
+        assert request['model'] == 'llama-3.1-sonar-small-128k-online'
+        assert request['messages'][1]['content'] == 'Jane Doe who is the CTO at Acme'
+        assert request['frequency_penalty'] == 1
+
+    def test_templates_are_compiled_once(self):
+        first = compile_prompt('t', 'm', 's', 'Hello {name}')
+        assert compile_prompt('t', 'm', 's', 'Hello {name}') is first
+        assert first.fields == {'name'}
+
+    def test_escaped_braces_are_literal(self):
+        prompt = compile_prompt('t', 'm', 's', 'Reply in JSON like {{"name": "{name}"}}')
+        assert prompt.render({'name': 'Jane'}) == 'Reply in JSON like {"name": "Jane"}'
+
+    @pytest.mark.parametrize("template", ["{lead.__class__}", "{values[0]}", "{name!r}", "{}"])
+    def test_non_simple_placeholders_are_rejected(self, template):
+        with pytest.raises(ValueError, match="Invalid placeholder"):
+            compile_prompt('bad', 'm', 's', template)
+
+    def test_missing_value_raises(self):
+        prompt = compile_prompt('t', 'm', 's', '{first_name} at {company_name}')
+        with pytest.raises(ValueError, match="company_name"):
+            prompt.render({'first_name': 'Jane'})
+
+
+class TestPromptTemplateRegistry:
+    """Test override resolution order."""
+
+    def test_without_db_uses_defaults(self):
+        assert PromptTemplateRegistry().get('email_copy') is get_default_prompt('email_copy')
+
+    def test_campaign_beats_organization_beats_global(self, db_session, campaign, organization):
+        registry = PromptTemplateRegistry(db_session, cache_seconds=0)
+        assert registry.get('perplexity_lead', campaign.id) is get_default_prompt('perplexity_lead')
+
+        _override(db_session, 'global {first_name}')
+        assert registry.get('perplexity_lead', campaign.id).render({'first_name': 'A'}) == 'global A'
+
+        _override(db_session, 'org {first_name}', organization_id=organization.id)
+        assert registry.get('perplexity_lead', campaign.id).render({'first_name': 'A'}) == 'org A'
+
+        _override(db_session, 'campaign {first_name}', campaign_id=campaign.id)
+        prompt = registry.get('perplexity_lead', campaign.id)
+        assert prompt.render({'first_name': 'A'}) == 'campaign A'
+        assert prompt.model == 'sonar-pro'
+        assert prompt.parameters == {'temperature': 0.1}
+
+    def test_resolved_prompt_is_reused_within_window(self, db_session, campaign):
+        registry = PromptTemplateRegistry(db_session, cache_seconds=60)
+        default = registry.get('perplexity_lead', campaign.id)
+        _override(db_session, 'campaign {first_name}', campaign_id=campaign.id)
+        assert registry.get('perplexity_lead', campaign.id) is default
+
+    def test_database_error_falls_back_to_default(self):
+        db = Mock()
+        db.query.side_effect = Exception("connection lost")
+        assert PromptTemplateRegistry(db).get('email_copy', 'c1') is get_default_prompt('email_copy')
+
+
+class TestCompletionCache:
+    """Test prompt hashing and cached completions."""
+
+    def test_prompt_hash_ignores_key_order(self):
+        a = {'model': 'gpt-4', 'messages': [{'role': 'user', 'content': 'Hi'}], 'temperature': 0.7}
+        b = {'temperature': 0.7, 'messages': [{'content': 'Hi', 'role': 'user'}], 'model': 'gpt-4'}
+        assert prompt_hash(a) == prompt_hash(b)
+        assert prompt_hash(a) != prompt_hash({**a, 'temperature': 0.2})
+
+    def test_only_successful_completions_are_stored(self, redis_client):
+        cache = CompletionCache(redis_client, ttl_seconds=60)
+        request = {'model': 'gpt-4', 'messages': [{'role': 'user', 'content': 'Hi'}]}
+
+        cache.set('test', request, {'error': 'HTTP 500'})
+        assert cache.get('test', request) is None
+
+        completion = {'id': 'c1', 'choices': [{'message': {'content': 'Hello'}}]}
+        cache.set('test', request, completion)
+        assert cache.get('test', request) == completion
+        assert redis_client.ttl(f"completion_cache:test:{prompt_hash(request)}") <= 60
+
+    def test_redis_errors_are_a_miss(self):
+        redis_client = Mock()
+        redis_client.get.side_effect = Exception("Redis down")
+        assert CompletionCache(redis_client).get('test', {'model': 'm'}) is None
+
+    def test_perplexity_cache_hit_skips_request(self):
+        cached = {'id': 'cached', 'choices': [{'message': {'content': 'Known'}}]}
+        cache = Mock()
+        cache.get.return_value = cached
+        lead = Lead(id="lead-1", first_name="Jane", last_name="Doe", company="Acme", title="CTO")
+        with patch.dict('os.environ', {'PERPLEXITY_TOKEN': 'test-token'}):
+            service = PerplexityService(completion_cache=cache)
+
+        with patch('requests.Session.post') as post:
+            assert service.enrich_lead(lead) == cached
+        post.assert_not_called()
+
+    def test_perplexity_result_is_stored(self):
+        cache = Mock()
+        cache.get.return_value = None
+        response = Mock(status_code=200)
+        response.json.return_value = {'id': 'new', 'choices': [{'message': {'content': 'Fresh'}}]}
+        lead = Lead(id="lead-1", first_name="Jane", last_name="Doe", company="Acme", title="CTO")
+        with patch.dict('os.environ', {'PERPLEXITY_TOKEN': 'test-token'}):
+            service = PerplexityService(completion_cache=cache)
+
+        with patch('requests.Session.post', return_value=response):
+            service.enrich_lead(lead)
+        vendor, request, result = cache.set.call_args.args
+        assert vendor == 'perplexity'
+        assert request['messages'][1]['content'] == 'Jane Doe who is the CTO at Acme'
+        assert result['id'] == 'new'
@@ -0,0 +1,64 @@
+"""
+Tests for the hot query plan checks (app/core/query_plans.py).
+"""
+import pytest
+
+from app.core.query_plans import HOT_QUERIES, PlanReport, explain_hot_queries, iter_plan_nodes
+from app.models.campaign import Campaign
+from app.models.campaign_status import CampaignStatus
+from app.models.job import Job, JobStatus, JobType
+from app.models.lead import Lead
+
+
+def _plan(*children):
+    return {
+        'Execution Time': 1.5,
+        'Plan': {'Node Type': 'Hash Join', 'Shared Hit Blocks': 10, 'Shared Read Blocks': 2, 'Plans': list(children)}
+    }
+
+
+def test_plan_report_flags_seq_scans_of_large_tables():
+    plan = _plan(
+        {'Node Type': 'Seq Scan', 'Relation Name': 'leads'},
+        {'Node Type': 'Hash', 'Plans': [{'Node Type': 'Seq Scan', 'Relation Name': 'jobs'}]},
+        {'Node Type': 'Index Scan', 'Relation Name': 'lead_artifacts', 'Index Name': 'lead_artifacts_pkey'},
+    )
+    assert len(list(iter_plan_nodes(plan['Plan']))) == 5
+
+    report = PlanReport('q', 'SELECT 1', plan, {'leads': 50000, 'jobs': 10}, min_rows=1000)
+
+    assert report.flagged
+    assert report.seq_scans == ['leads']
+    assert report.scans == [
+        'Seq Scan on leads', 'Seq Scan on jobs', 'Index Scan on lead_artifacts using lead_artifacts_pkey'
+    ]
+    assert report.to_dict()['execution_ms'] == 1.5
+    assert report.to_dict()['shared_read_blocks'] == 2
+
+
+def test_unknown_query_name(db_session):
+    with pytest.raises(ValueError):
+        explain_hot_queries(db_session, names=['not_a_query'])
+
+
+def test_hot_queries_use_indexes(db_session, organization):
+    campaign = Campaign(
+        name="Plan Campaign", status=CampaignStatus.RUNNING, fileName="plans.csv",
+        totalRecords=1, url="https://app.apollo.io/plans", organization_id=organization.id
+    )
+    db_session.add(campaign)
+    db_session.commit()
+    job = Job(campaign_id=campaign.id, name="ENRICH_LEAD", job_type=JobType.ENRICH_LEAD, status=JobStatus.PAUSED)
+    db_session.add(job)
+    db_session.commit()
+    db_session.add(Lead(campaign_id=campaign.id, email="plan@example.com", enrichment_job_id=str(job.id)))
+    db_session.commit()
+
+    # With sequential scans disabled, a query only scans when no index fits it
+    reports = {report.name: report for report in explain_hot_queries(db_session, prefer_indexes=True)}
+
+    assert set(reports) == set(HOT_QUERIES)
+    assert [name for name, report in reports.items() if report.flagged] == []
+    assert 'Index Scan on jobs using ix_jobs_open_status' in reports['breaker_resume_paused_jobs'].scans
+    assert 'Index Scan on leads using ix_leads_campaign_id' in reports['campaign_leads'].scans
+    assert reports['campaign_leads'].execution_ms is not None
@@ -0,0 +1,87 @@
+"""
+Tests for OpenTelemetry tracing.
+
+Span tests use an in-memory exporter and are skipped when the OpenTelemetry
+SDK is not installed.
+"""
+import logging
+import pytest
+from unittest.mock import patch
+
+from app.core import tracing
+from app.core.lead_trace import LeadPipelineTrace
+from app.core.metrics import record_stage
+
+
+def test_tracing_is_off_by_default():
+    assert tracing.init_tracing("api") is False
+    assert tracing.start_span("lead.enrichment") is None
+    assert tracing.current_trace_id() is None
+    tracing.end_span(None, outcome='success')
+
+
+def test_unknown_exporter_is_rejected():
+    with patch('app.core.tracing.settings.TRACING_EXPORTER', 'zipkin'):
+        with pytest.raises(ValueError, match="Unknown TRACING_EXPORTER"):
+            tracing._build_exporter()
+
+
+def test_shutdown_closes_the_span_file(tmp_path):
+    pytest.importorskip("opentelemetry.sdk")
+    with patch('app.core.tracing.settings.TRACING_EXPORTER', 'file'), \
+            patch('app.core.tracing.settings.TRACING_FILE_PATH', str(tmp_path / 'spans.jsonl')):
+        tracing._build_exporter()
+    span_file = tracing._span_file
+
+    tracing.shutdown_tracing()
+
+    assert span_file.closed
+    assert tracing._span_file is None
+    tracing.shutdown_tracing()
+
+
+@pytest.fixture
+def span_exporter():
+    """Route tracing spans to an in-memory exporter without touching the global provider."""
+    pytest.importorskip("opentelemetry.sdk")
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+    from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    with patch.object(tracing, '_tracer', provider.get_tracer("test")):
+        yield exporter
+
+
+def test_stage_spans_nest_and_carry_outcome(span_exporter):
+    trace = LeadPipelineTrace('lead-1', 'campaign-1').activate()
+    try:
+        started = trace.start_stage('enrichment')
+        handle = tracing.start_span('perplexity.request')
+        trace_id = tracing.current_trace_id()
+        tracing.end_span(handle)
+        record_stage('enrichment', 'success', started)
+        trace.start_stage('email_copy')
+    finally:
+        trace.deactivate()
+
+    spans = {span.name: span for span in span_exporter.get_finished_spans()}
+    assert spans['lead.enrichment'].attributes['outcome'] == 'success'
+    assert spans['lead.enrichment'].attributes['lead.id'] == 'lead-1'
+    assert spans['perplexity.request'].parent.span_id == spans['lead.enrichment'].context.span_id
+    assert format(spans['lead.enrichment'].context.trace_id, '032x') == trace_id
+    # A stage left open is ended when the trace is deactivated
+    assert 'lead.email_copy' in spans
+
+
+def test_log_records_get_the_trace_id(span_exporter):
+    record = logging.LogRecord('app', logging.INFO, __file__, 1, 'message', None, None)
+    handle = tracing.start_span('request')
+    try:
+        tracing.TraceContextFilter().filter(record)
+    finally:
+        tracing.end_span(handle)
+
+    assert record.trace_id == format(handle[0].get_span_context().trace_id, '032x')
@@ -0,0 +1,116 @@
+"""
+Tests for the authenticated user cache and the middleware's stateless token path.
+"""
+import time
+import pytest
+from contextlib import contextmanager
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.user_cache import UserCache, user_cache
+from app.models.user import User
+from tests.helpers.auth_helpers import AuthHelpers
+
+
+@contextmanager
+def count_user_queries():
+    """Collect the SQL statements that read the users table."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if 'FROM users' in statement:
+            statements.append(statement)
+
+    event.listen(Engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(Engine, 'before_cursor_execute', before_cursor_execute)
+
+
+def _user(user_id: str) -> User:
+    return User(id=user_id, email=f"{user_id}@example.com", name="", password=b"hash")
+
+
+@pytest.fixture(autouse=True)
+def empty_user_cache():
+    user_cache.clear()
+    yield
+    user_cache.clear()
+
+
+class TestUserCache:
+    """Test expiry, eviction and copies."""
+
+    def test_returns_detached_copy(self):
+        cache = UserCache(max_size=10, ttl_seconds=60)
+        original = _user("u1")
+        cached = cache.put(original)
+
+        assert cached is not original
+        assert cache.get("u1") is cached
+        assert cached.email == "u1@example.com"
+
+    def test_expires_after_ttl(self):
+        cache = UserCache(max_size=10, ttl_seconds=0.05)
+        cache.put(_user("u1"))
+        time.sleep(0.1)
+        assert cache.get("u1") is None
+        assert len(cache) == 0
+
+    def test_evicts_least_recently_used(self):
+        cache = UserCache(max_size=2, ttl_seconds=60)
+        cache.put(_user("u1"))
+        cache.put(_user("u2"))
+        cache.get("u1")
+        cache.put(_user("u3"))
+
+        assert cache.get("u2") is None
+        assert cache.get("u1") is not None and cache.get("u3") is not None
+
+    def test_disabled_with_zero_size(self):
+        cache = UserCache(max_size=0, ttl_seconds=60)
+        assert cache.put(_user("u1")).id == "u1"
+        assert cache.get("u1") is None
+
+
+class TestCachedAuthentication:
+    """Test that authenticated requests reuse the cached user."""
+
+    def test_user_loaded_once_per_request_then_cached(self, client, db_session):
+        user, token, headers = AuthHelpers.create_authenticated_user(db_session)
+
+        with count_user_queries() as first:
+            response = client.get("/api/v1/auth/me", headers=headers)
+        assert response.status_code == 200
+        assert response.json()["id"] == user.id
+        # Middleware loads the user; get_current_user reuses it from request.state
+        assert len(first) == 1
+
+        with count_user_queries() as second:
+            assert client.get("/api/v1/auth/me", headers=headers).status_code == 200
+            assert client.get("/api/v1/campaigns/", headers=headers).status_code == 200
+        assert second == []
+
+    def test_update_and_delete_invalidate(self, client, db_session):
+        user, token, headers = AuthHelpers.create_authenticated_user(db_session)
+        assert client.get("/api/v1/auth/me", headers=headers).status_code == 200
+
+        user.name = "Renamed"
+        db_session.commit()
+        assert client.get("/api/v1/auth/me", headers=headers).json()["name"] == "Renamed"
+
+        db_session.delete(user)
+        db_session.commit()
+        assert client.get("/api/v1/auth/me", headers=headers).status_code == 401
+
+    def test_bulk_delete_clears_cache(self, db_session):
+        user_cache.put(_user("u1"))
+        db_session.query(User).filter(User.id == "missing").delete()
+        assert len(user_cache) == 0
+
+    def test_invalid_token_never_reaches_database(self, client, db_session):
+        with count_user_queries() as statements:
+            response = client.get("/api/v1/auth/me", headers={"Authorization": "Bearer not-a-jwt"})
+        assert response.status_code == 401
+        assert statements == []
@@ -0,0 +1,110 @@
+"""
+Tests for the shared vendor HTTP transport (pooled sessions, backoff, Retry-After).
+
+HTTP calls are mocked at the requests.Session level and sleeps are patched out.
+"""
+import pytest
+import requests
+from unittest.mock import Mock, patch
+
+from app.core.vendor_http import VendorTransport, get_vendor_session
+
+
+def _response(status_code, headers=None):
+    response = Mock()
+    response.status_code = status_code
+    response.headers = headers or {}
+    return response
+
+
+@pytest.fixture
+def transport():
+    return VendorTransport('test-vendor', read_timeout=10, budget_seconds=60, max_attempts=3,
+                           backoff_base=1, backoff_max=8)
+
+
+@pytest.fixture
+def mock_sleep():
+    with patch('app.core.vendor_http.time.sleep') as sleep:
+        yield sleep
+
+
+def test_session_is_reused_per_vendor():
+    assert get_vendor_session('vendor-a') is get_vendor_session('vendor-a')
+    assert get_vendor_session('vendor-a') is not get_vendor_session('vendor-b')
+
+
+def test_default_timeout_applied(transport):
+    with patch('requests.Session.get', return_value=_response(200)) as mock_get:
+        transport.get('https://vendor.example/items')
+    assert mock_get.call_args.kwargs['timeout'] == transport.timeout
+
+
+def test_get_retries_server_errors_with_backoff(transport, mock_sleep):
+    with patch('requests.Session.get', side_effect=[_response(503), _response(502), _response(200)]) as mock_get:
+        response = transport.get('https://vendor.example/items')
+
+    assert response.status_code == 200
+    assert mock_get.call_count == 3
+    delays = [c.args[0] for c in mock_sleep.call_args_list]
+    assert 0 <= delays[0] <= 1 and 0 <= delays[1] <= 2
+
+
+def test_retry_after_header_is_honored(transport, mock_sleep):
+    with patch('requests.Session.post', side_effect=[_response(429, {'Retry-After': '7'}), _response(200)]):
+        response = transport.post('https://vendor.example/items', json={})
+
+    assert response.status_code == 200
+    mock_sleep.assert_called_once_with(7.0)
+
+
+def test_non_idempotent_post_not_retried_on_server_error(transport, mock_sleep):
+    with patch('requests.Session.post', return_value=_response(503)) as mock_post:
+        response = transport.post('https://vendor.example/items', json={})
+
+    assert response.status_code == 503
+    mock_post.assert_called_once()
+    mock_sleep.assert_not_called()
+
+
+def test_non_idempotent_post_not_retried_on_read_timeout(transport, mock_sleep):
+    with patch('requests.Session.post', side_effect=requests.exceptions.ReadTimeout("read timed out")) as mock_post:
+        with pytest.raises(requests.exceptions.ReadTimeout):
+            transport.post('https://vendor.example/items', json={})
+    mock_post.assert_called_once()
+
+
+def test_connect_timeout_retried_for_any_request(transport, mock_sleep):
+    side_effect = [requests.exceptions.ConnectTimeout("connect timed out"), _response(201)]
+    with patch('requests.Session.post', side_effect=side_effect) as mock_post:
+        response = transport.post('https://vendor.example/items', json={})
+
+    assert response.status_code == 201
+    assert mock_post.call_count == 2
+
+
+def test_idempotent_post_retried_on_read_timeout(transport, mock_sleep):
+    side_effect = [requests.exceptions.ReadTimeout("read timed out"), _response(200)]
+    with patch('requests.Session.post', side_effect=side_effect) as mock_post:
+        response = transport.post('https://vendor.example/completions', idempotent=True, json={})
+
+    assert response.status_code == 200
+    assert mock_post.call_count == 2
+
+
+def test_last_response_returned_after_max_attempts(transport, mock_sleep):
+    with patch('requests.Session.get', return_value=_response(503)) as mock_get:
+        response = transport.get('https://vendor.example/items')
+
+    assert response.status_code == 503
+    assert mock_get.call_count == 3
+    assert mock_sleep.call_count == 2
+
+
+def test_retry_after_beyond_budget_stops_retrying(transport, mock_sleep):
+    with patch('requests.Session.get', return_value=_response(429, {'Retry-After': '120'})) as mock_get:
+        response = transport.get('https://vendor.example/items')
+
+    assert response.status_code == 429
+    mock_get.assert_called_once()
+    mock_sleep.assert_not_called()